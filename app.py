@@ -2,6 +2,7 @@ import os
 from flask import Flask
 from werkzeug.middleware.proxy_fix import ProxyFix
 from celery import Celery
+from celery.signals import setup_logging
 import redis
 
 # Phase 7: All SQLAlchemy imports removed - chain-only mode
@@ -11,6 +12,16 @@ from utils.logging_config import configure_structlog, get_logger
 
 configure_structlog()
 
+
+@setup_logging.connect
+def keep_structlog_in_celery(**kwargs):
+    """Stop Celery workers replacing the root logger's handlers.
+
+    With any receiver on setup_logging, Celery leaves logging alone, so
+    worker logs keep going through the structlog queue configured above.
+    """
+
+
 # Phase 7: Database classes removed - chain-only mode
 
 # Initialize Celery
@@ -20,7 +31,17 @@ def make_celery(app):
         backend=app.config['CELERY_RESULT_BACKEND'],
         broker=app.config['CELERY_BROKER_URL']
     )
-    celery.conf.update(app.config)
+
+    # Chain-native periodic tasks, routed to dedicated queues. Broker and
+    # backend come from the constructor; Flask's upper-case config is not
+    # copied in because Celery refuses to mix old and new setting names.
+    from config_chain import chain_config
+    from tasks.schedule import TASK_ROUTES, build_beat_schedule
+    celery.conf.update(
+        include=['tasks.background'],
+        task_routes=TASK_ROUTES,
+        beat_schedule=build_beat_schedule(chain_config),
+    )
     return celery
 
 # Initialize Redis — prefer REDIS_URL (Railway/production), fall back to host/port
@@ -38,7 +59,7 @@ def create_app():
     logger = get_logger(__name__)
     app = Flask(__name__)
     # Chain-only mode: No sessions needed with JWT auth
-    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
     
     # Set secret key for flash messages only (not for sessions)
     app.secret_key = os.environ.get("SESSION_SECRET", "phase7-blockchain-only-flash-messages")
@@ -115,7 +136,24 @@ def create_app():
         logger.info("Production monitoring service started")
     except Exception as e:
         logger.error(f"Failed to start monitoring service: {e}")
-    
+
+    # Start fee oracle refresher (single shared gas snapshot for all paths)
+    try:
+        from services.fee_oracle import get_fee_oracle
+        get_fee_oracle().start()
+    except Exception as e:
+        logger.error(f"Failed to start fee oracle: {e}")
+
+    # Start transaction tracker (async receipts for admin resolution/fee txs)
+    try:
+        from services.tx_tracker import get_tx_tracker
+        from services.v2_resolution import register_tx_handlers
+        tx_tracker = get_tx_tracker()
+        register_tx_handlers(tx_tracker)
+        tx_tracker.start()
+    except Exception as e:
+        logger.error(f"Failed to start transaction tracker: {e}")
+
     return app, celery
 
 app, celery = create_app()
@@ -69,6 +69,22 @@ class ChainConfig:
     # Keep Celery for background blockchain monitoring
     CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', REDIS_URL + '/0')
     CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', REDIS_URL + '/0')
+
+    # Beat schedule for chain-native tasks (tasks/schedule.py)
+    INDEX_BLOCKS_INTERVAL = int(os.environ.get('INDEX_BLOCKS_INTERVAL', '15'))  # seconds
+    EXPIRED_MARKETS_INTERVAL = int(os.environ.get('EXPIRED_MARKETS_INTERVAL', '15'))  # seconds
+    RESOLUTION_PREWARM_WINDOW = int(os.environ.get('RESOLUTION_PREWARM_WINDOW', '600'))  # seconds before end_time
+    RESOLUTION_LEASE_TTL = int(os.environ.get('RESOLUTION_LEASE_TTL', '60'))  # seconds, renewed by heartbeat
+    RESOLUTION_STALE_AFTER = int(os.environ.get('RESOLUTION_STALE_AFTER', '300'))  # re-dispatch abandoned jobs after
+    RESOLUTION_RETRY_BASE = int(os.environ.get('RESOLUTION_RETRY_BASE', '60'))  # seconds before retrying a failed market, doubling
+    RESOLUTION_RETRY_MAX = int(os.environ.get('RESOLUTION_RETRY_MAX', '3600'))  # cap on the retry backoff
+    AGGREGATES_REFRESH_INTERVAL = int(os.environ.get('AGGREGATES_REFRESH_INTERVAL', '300'))  # 5 minutes
+    TASK_BACKLOG_ALERT = int(os.environ.get('TASK_BACKLOG_ALERT', '100'))  # queued tasks per queue
+
+    # V2 event indexer (chain_indexer.py)
+    INDEXER_CONFIRMATIONS = int(os.environ.get('INDEXER_CONFIRMATIONS', '2'))
+    INDEXER_MAX_BLOCKS = int(os.environ.get('INDEXER_MAX_BLOCKS', '2000'))  # blocks per eth_getLogs
+    INDEXER_START_BLOCK = int(os.environ['INDEXER_START_BLOCK']) if os.environ.get('INDEXER_START_BLOCK') else None
     
     # ============== NODE OPERATOR CONFIGURATION ==============
     # Node identity (chain-only, no database storage)
@@ -84,8 +100,18 @@ class ChainConfig:
     # X.com Oracle settings
     XCOM_API_URL = os.environ.get('XCOM_API_URL', 'https://api.x.com/v2')
     XCOM_BEARER_TOKEN = os.environ.get('XCOM_BEARER_TOKEN')
-    # Screenshot capture uses Playwright headless browser (xcom_api_service.py).
+    # X API scheduler (xcom_scheduler.py): pay-per-use credits are posts read per UTC day
+    XCOM_DAILY_CREDIT_BUDGET = int(os.environ.get('XCOM_DAILY_CREDIT_BUDGET', '10000'))  # 0 = unlimited
+    XCOM_RESOLUTION_RESERVE = float(os.environ.get('XCOM_RESOLUTION_RESERVE', '0.2'))  # share held back from previews
+    XCOM_RESOLUTION_MAX_WAIT = int(os.environ.get('XCOM_RESOLUTION_MAX_WAIT', '30'))  # seconds resolution may queue
+    # Screenshot capture uses a persistent Playwright browser pool (browser_pool.py).
     # No external screenshot service is needed.
+    SCREENSHOT_POOL_SIZE = int(os.environ.get('SCREENSHOT_POOL_SIZE', '2'))  # concurrent captures
+    SCREENSHOT_QUEUE_SIZE = int(os.environ.get('SCREENSHOT_QUEUE_SIZE', '20'))  # waiting captures
+    SCREENSHOT_TIMEOUT = int(os.environ.get('SCREENSHOT_TIMEOUT', '15'))  # seconds per capture
+    # Content-addressed screenshot blobs (blob_store.py), LRU-evicted past the size cap
+    SCREENSHOT_STORE_DIR = os.environ.get('SCREENSHOT_STORE_DIR', 'cache/screenshots')
+    SCREENSHOT_STORE_MAX_MB = int(os.environ.get('SCREENSHOT_STORE_MAX_MB', '512'))
 
     # IPFS for decentralized storage
     IPFS_GATEWAY_URL = os.environ.get('IPFS_GATEWAY_URL', 'https://ipfs.io/ipfs/')
@@ -116,7 +142,45 @@ class ChainConfig:
     MONITORING_INTERVAL = int(os.environ.get('MONITORING_INTERVAL', '60'))  # 60 seconds
     CONTRACT_SYNC_INTERVAL = int(os.environ.get('CONTRACT_SYNC_INTERVAL', '30'))  # 30 seconds
     GAS_PRICE_CHECK_INTERVAL = int(os.environ.get('GAS_PRICE_CHECK_INTERVAL', '300'))  # 5 minutes
-    
+
+    # EIP-1559 fee oracle (eth_feeHistory percentiles, shared snapshot)
+    FEE_HISTORY_BLOCKS = int(os.environ.get('FEE_HISTORY_BLOCKS', '20'))
+    FEE_ORACLE_REFRESH_INTERVAL = int(os.environ.get('FEE_ORACLE_REFRESH_INTERVAL', '10'))  # 10 seconds
+    FEE_ORACLE_MAX_AGE = int(os.environ.get('FEE_ORACLE_MAX_AGE', '60'))  # snapshot considered stale after 60s
+
+    # Transaction tracker (async receipt polling for admin transactions)
+    TX_TRACKER_POLL_INTERVAL = int(os.environ.get('TX_TRACKER_POLL_INTERVAL', '3'))  # 3 seconds
+    TX_TRACKER_PENDING_TIMEOUT = int(os.environ.get('TX_TRACKER_PENDING_TIMEOUT', '600'))  # 10 minutes
+
+    # Batched payout claims (services/claim_planner.py)
+    MULTICALL3_ADDRESS = os.environ.get('MULTICALL3_ADDRESS', '0xcA11bde05977b3631167028862bE2a173976CA11')
+    MAX_CLAIM_GAS_PER_TX = int(os.environ.get('MAX_CLAIM_GAS_PER_TX', '3000000'))  # gas per claim transaction
+
+    # Wallet portfolios (services/portfolio_index.py), dropped on the wallet's next event
+    PORTFOLIO_CACHE_TTL = int(os.environ.get('PORTFOLIO_CACHE_TTL', '3600'))  # 1 hour upper bound
+
+    # Predictor leaderboards (services/leaderboard.py)
+    LEADERBOARD_MIN_ENTRIES = int(os.environ.get('LEADERBOARD_MIN_ENTRIES', '3'))  # resolved entries before ratio boards
+    AI_AGENT_WALLETS = [w.strip() for w in os.environ.get('AI_AGENT_WALLETS', '').split(',') if w.strip()]
+
+    # Shared /ai_agent rate limits (services/rate_limiter.py); route quotas are per IP, scaled per tier
+    RATE_LIMIT_WALLET_MULTIPLIER = int(os.environ.get('RATE_LIMIT_WALLET_MULTIPLIER', '2'))  # JWT-authenticated wallets
+    RATE_LIMIT_AGENT_MULTIPLIER = int(os.environ.get('RATE_LIMIT_AGENT_MULTIPLIER', '5'))  # AI agent wallets
+
+    # Near-duplicate prediction warnings (services/prediction_index.py)
+    NEAR_DUPLICATE_DISTANCE = int(os.environ.get('NEAR_DUPLICATE_DISTANCE', '3'))  # edits after clean_text
+
+    # Monte Carlo win odds (services/win_probability.py), dropped on each new submission
+    WIN_PROBABILITY_DRAWS = int(os.environ.get('WIN_PROBABILITY_DRAWS', '2000'))  # Dirichlet weight draws
+    WIN_PROBABILITY_HISTORY = int(os.environ.get('WIN_PROBABILITY_HISTORY', '200'))  # actor's past tweets used
+    WIN_PROBABILITY_CACHE_TTL = int(os.environ.get('WIN_PROBABILITY_CACHE_TTL', '900'))  # 15 minutes
+
+    # Submission clustering for the admin AI-transparency view (services/submission_clusters.py)
+    COPYCAT_DISTANCE_THRESHOLD = float(os.environ.get('COPYCAT_DISTANCE_THRESHOLD', '0.2'))  # edits per byte
+
+    # Contract constants and owner, cached per deployment (services/contract_metadata.py)
+    CONTRACT_METADATA_CHECK_INTERVAL = int(os.environ.get('CONTRACT_METADATA_CHECK_INTERVAL', '300'))  # code hash recheck
+
     # ============== DEPRECATED CONFIGURATIONS ==============
     # These are explicitly NOT included in chain-only config:
     # - DATABASE_URL (no database)
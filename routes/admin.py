@@ -17,6 +17,7 @@ from services.oracle import OracleService
 from services.time_sync import TimeSyncService
 from services.node_communication import NodeCommunicationService
 from services.blockchain import BlockchainService
+from services.submission_clusters import get_submission_clusters
 # from services.ai_transparency import AITransparencyService  # Phase 7: Database-dependent
 from config import Config
 
@@ -570,6 +571,20 @@ def api_agent_details(agent_id):
         logger.error(f"Error getting agent details: {e}")
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/ai_transparency/market/<int:market_id>/diversity')
+def api_market_diversity(market_id):
+    """Pairwise-distance clusters, copy-cat pairs and diversity metrics of a market's submissions"""
+    try:
+        threshold = request.args.get('threshold', type=float)
+        analysis = get_submission_clusters().analyze(market_id, threshold)
+        if analysis is None:
+            return jsonify({'error': 'Market not found'}), 404
+        return jsonify(analysis)
+
+    except Exception as e:
+        logger.error(f"Error analyzing market {market_id} diversity: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/ai_transparency/audit/<audit_id>')
 def api_audit_details(audit_id):
     """Get audit details"""
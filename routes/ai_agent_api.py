@@ -9,8 +9,7 @@ import logging
 from datetime import datetime, timezone
 from decimal import Decimal
 from flask import Blueprint, jsonify, request, render_template
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+from web3 import Web3
 # from sqlalchemy import and_  # Phase 7: SQLAlchemy removed
 from utils.validation import ValidationUtils
 from utils.crypto import CryptoUtils
@@ -19,16 +18,21 @@ from services.blockchain import BlockchainService
 # Phase 1: Ledger service deprecated - handled by blockchain events
 # from services.ledger import LedgerService
 from services.node_communication import NodeCommunicationService
+from services.submission_batch import get_submission_batch_builder
+from services.rate_limiter import RateLimiter
+from config_chain import chain_config
 # from services.ai_transparency import AITransparencyService  # Phase 7: Database-dependent
 # from models import db, PredictionMarket, Submission, Actor, Transaction, AIAgentProfile, VerificationModule  # Phase 7: Models removed
 import uuid
 
 logger = logging.getLogger(__name__)
 
-# Initialize rate limiter
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["100 per hour"]
+# Initialize rate limiter (shared through Redis; per wallet when authenticated, else per IP)
+limiter = RateLimiter(
+    default_limits=["100 per hour"],
+    wallet_multiplier=chain_config.RATE_LIMIT_WALLET_MULTIPLIER,
+    agent_multiplier=chain_config.RATE_LIMIT_AGENT_MULTIPLIER,
+    agent_wallets=chain_config.AI_AGENT_WALLETS
 )
 
 # Create blueprint
@@ -47,6 +51,9 @@ node_comm_service = NodeCommunicationService()
 # Get platform fee from environment
 PLATFORM_FEE = Decimal(os.environ.get('PLATFORM_FEE', '0.07'))  # Default 7%
 
+# Items accepted by one /v1/submissions:batch request
+MAX_BATCH_SUBMISSIONS = int(os.environ.get('AI_AGENT_MAX_BATCH', '500'))
+
 @ai_agent_api_bp.route('/docs')
 def api_documentation():
     """Render API documentation page"""
@@ -59,7 +66,8 @@ def health_check():
         'status': 'healthy',
         'api_version': 'v1',
         'timestamp': datetime.now(timezone.utc).isoformat(),
-        'rate_limit': '10 per minute for submissions'
+        'rate_limit': '10 per minute for submissions',
+        'max_batch_submissions': MAX_BATCH_SUBMISSIONS
     })
 
 @ai_agent_api_bp.route('/v1/markets', methods=['GET'])
@@ -342,6 +350,45 @@ def create_submission():
         db.session.rollback()
         return jsonify({'error': 'Failed to create submission'}), 500
 
+@ai_agent_api_bp.route('/v1/submissions:batch', methods=['POST'])
+@limiter.limit("10 per minute")
+def create_submissions_batch():
+    """Validate many submissions for one wallet and return unsigned createSubmission transactions
+
+    Body: {"wallet": "0x...", "submissions": [{"market_id": 1, "predicted_text": "...",
+           "amount_wei": "1000000000000000"}, ...]}
+
+    amount_wei defaults to the contract's MIN_BET. Every item gets its own
+    result; valid items carry a transaction with consecutive nonces, ready
+    to sign and broadcast in order.
+    """
+    data = request.get_json(silent=True) or {}
+    wallet = data.get('wallet')
+    items = data.get('submissions')
+    if not wallet or not Web3.is_address(wallet):
+        return jsonify({'error': 'Missing or invalid field: wallet'}), 400
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'submissions must be a non-empty list'}), 400
+    if len(items) > MAX_BATCH_SUBMISSIONS:
+        return jsonify({'error': f'At most {MAX_BATCH_SUBMISSIONS} submissions per request'}), 400
+
+    try:
+        batch = get_submission_batch_builder().build(wallet, items)
+    except Exception as e:
+        logger.error(f"Error building submission batch: {e}")
+        return jsonify({'error': 'Failed to build submission batch'}), 502
+
+    # Wei amounts exceed JavaScript's safe integer range
+    for result in batch['results']:
+        if 'amount' in result:
+            result['amount'] = str(result['amount'])
+        if 'transaction' in result:
+            result['transaction']['value'] = str(result['transaction']['value'])
+    for field in ('total_value', 'max_cost', 'balance'):
+        if batch[field] is not None:
+            batch[field] = str(batch[field])
+    return jsonify(batch), 200
+
 @ai_agent_api_bp.route('/v1/calculate_fees', methods=['POST'])
 @limiter.limit("60 per minute")
 def calculate_fees():
@@ -505,5 +552,5 @@ def get_transparency_modules():
 # Initialize limiter with app context
 def init_limiter(app):
     """Initialize the rate limiter with the Flask app"""
-    limiter.init_app(app)
+    limiter.init_app(app, blueprints=[ai_agent_api_bp.name])
     return limiter
\ No newline at end of file
@@ -12,11 +12,13 @@ from services.blockchain_base import BaseBlockchainService
 # from services.payout_base import BasePayoutService  # Phase 7: Database-dependent
 from services.time_sync import TimeSyncService
 from services.text_analysis import TextAnalysisService
+from services.corpus_search import get_corpus_search, KIND_ACTUAL, KIND_PREDICTION
 from services.node_communication import NodeCommunicationService
 # from models import PredictionMarket, Submission, Bet, Actor, NodeOperator, Transaction, OracleSubmission, SyntheticTimeEntry  # Phase 7: Models removed
 # from app import db  # Phase 7: Database removed
 from utils.validation import ValidationUtils
 from utils.crypto import CryptoUtils
+from utils.logging_config import get_log_stats
 import os
 
 logger = logging.getLogger(__name__)
@@ -75,7 +77,8 @@ def health_check():
         return jsonify({
             'status': 'healthy',
             'timestamp': datetime.now(timezone.utc).isoformat(),
-            'service': 'proteus-node'
+            'service': 'proteus-node',
+            'logging': get_log_stats()
         })
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -784,6 +787,44 @@ def analyze_text():
         logger.error(f"Error analyzing text: {e}")
         return jsonify({'error': 'Failed to analyze text'}), 500
 
+MAX_SEARCH_RESULTS = 100
+
+@api_bp.route('/text/search', methods=['POST'])
+def search_text():
+    """Find the historical predictions and actual texts closest to a text
+
+    Body: text (required), k (return everything within this distance;
+    omit for the nearest), limit (default 10, max 100), actor, kind
+    ('prediction' or 'actual').
+    """
+    try:
+        data = request.get_json() or {}
+
+        if not isinstance(data.get('text'), str) or not data['text']:
+            return jsonify({'error': 'text is required'}), 400
+        kind = data.get('kind')
+        if kind not in (None, KIND_PREDICTION, KIND_ACTUAL):
+            return jsonify({'error': f"kind must be '{KIND_PREDICTION}' or '{KIND_ACTUAL}'"}), 400
+        try:
+            limit = min(int(data.get('limit', 10)), MAX_SEARCH_RESULTS)
+            k = int(data['k']) if data.get('k') is not None else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'k and limit must be integers'}), 400
+        if limit < 0 or (k is not None and k < 0):
+            return jsonify({'error': 'k and limit must not be negative'}), 400
+
+        corpus = get_corpus_search()
+        if k is None:
+            results = corpus.nearest(data['text'], limit, actor=data.get('actor'), kind=kind)
+        else:
+            results = corpus.within(data['text'], k, actor=data.get('actor'), kind=kind, limit=limit)
+
+        return jsonify({'results': results, 'corpus_size': corpus.size})
+
+    except Exception as e:
+        logger.error(f"Error searching text corpus: {e}")
+        return jsonify({'error': 'Failed to search text corpus'}), 500
+
 @api_bp.route('/ledger/summary', methods=['GET'])
 def get_ledger_summary():
     """Get ledger summary"""
@@ -7,8 +7,15 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 from web3 import Web3
 from services.blockchain_base import BaseBlockchainService
+from services.claim_planner import get_claim_planner
+from services.leaderboard import COHORTS, METRICS, WINDOWS, get_leaderboard
+from services.payout_simulator import get_payout_simulator
+from services.portfolio_index import get_portfolio_index
+from services.prediction_index import get_prediction_index
+from services.semantic_scorer import get_semantic_scorer
+from services.win_probability import get_win_probability_engine
 from utils.api_errors import (
-    error_response, success_response, not_found, blockchain_error, ErrorCode
+    error_response, success_response, not_found, validation_error, blockchain_error, internal_error, ErrorCode
 )
 from utils.logging_config import get_logger
 import json
@@ -98,7 +105,7 @@ def get_actors_chain():
                                 'block_number': log['blockNumber']
                             })
                 except Exception as e:
-                    logger.debug(f"Could not process actor log: {e}")
+                    logger.debug(f"Could not process actor log: {e}", sample=True)
                     
         except Exception as e:
             logger.debug(f"Could not query actor events: {e}")
@@ -176,7 +183,7 @@ def get_markets_chain():
                             'transaction_hash': log['transactionHash'].hex()
                         })
                 except Exception as e:
-                    logger.debug(f"Could not process market log: {e}")
+                    logger.debug(f"Could not process market log: {e}", sample=True)
                     
         except Exception as e:
             logger.debug(f"Could not query market events: {e}")
@@ -275,9 +282,9 @@ def get_stats_chain():
             except Exception as e:
                 logger.warning(f"Could not fetch NFT stats: {e}")
         
-        # Get current gas price
+        # Get current gas price (shared fee oracle snapshot)
         try:
-            gas_price = blockchain_service.w3.eth.gas_price
+            gas_price = blockchain_service.estimate_gas_price()['standard']
             stats['gas_price'] = str(gas_price)
         except:
             pass
@@ -346,6 +353,228 @@ def get_market_detail_chain(market_id):
         logger.error(f"Error fetching market detail from chain: {e}")
         return blockchain_error(f'Failed to fetch market details: {str(e)}')
 
+MAX_PAYOUT_MARKETS = 50
+MAX_VERIFY_BLOCKS = 10000  # verify=true reads events from at most this far back
+WEI_FIELDS = ('total_pool', 'fee', 'stake', 'payout', 'profit', 'payout_if_wins',
+              'total_claimable', 'estimated_cost_wei', 'claimable', 'total_staked', 'total_won',
+              'pending_fees', 'expected_payout')
+
+
+def _wei_to_str(value):
+    """Wei amounts exceed JavaScript's safe integer range; send them as strings"""
+    if isinstance(value, dict):
+        return {k: (str(v) if k in WEI_FIELDS and v is not None else _wei_to_str(v))
+                for k, v in value.items()}
+    if isinstance(value, list):
+        return [_wei_to_str(v) for v in value]
+    return value
+
+
+@api_chain_bp.route('/v2/market/<int:market_id>/payouts', methods=['GET'])
+def get_market_payouts(market_id):
+    """Payout for every submission of a V2 market, in wei
+
+    Query params:
+        actual_text: Optional hypothetical tweet text for an unresolved market
+    """
+    try:
+        actual_text = request.args.get('actual_text')
+        results = get_payout_simulator().simulate(
+            [market_id], {market_id: actual_text} if actual_text is not None else None)
+        if market_id not in results:
+            return not_found('Market', market_id)
+        return success_response(_wei_to_str(results[market_id]))
+    except Exception as e:
+        logger.error(f"Error simulating payouts for market {market_id}: {e}")
+        return blockchain_error(f'Failed to simulate payouts: {str(e)}')
+
+
+@api_chain_bp.route('/v2/market/<int:market_id>/odds', methods=['GET'])
+def get_market_odds(market_id):
+    """Monte Carlo win probability and expected payout of every submission"""
+    try:
+        estimate = get_win_probability_engine().get(market_id)
+        if estimate is None:
+            return not_found('Market', market_id)
+        return success_response(_wei_to_str(estimate))
+    except Exception as e:
+        logger.error(f"Error estimating odds for market {market_id}: {e}")
+        return blockchain_error(f'Failed to estimate odds: {str(e)}')
+
+
+@api_chain_bp.route('/v2/market/<int:market_id>/semantic', methods=['GET'])
+def get_market_semantic_preview(market_id):
+    """Preview a semantic-distance market mode next to Levenshtein
+
+    Query params:
+        actual_text: Tweet text to score the market's submissions against (required)
+    """
+    actual_text = request.args.get('actual_text')
+    if actual_text is None:
+        return validation_error('actual_text is required', 'actual_text')
+    try:
+        market = blockchain_service.get_v2_market_snapshots([market_id]).get(market_id)
+        if market is None:
+            return not_found('Market', market_id)
+        return success_response(get_semantic_scorer().score_market(market, actual_text))
+    except Exception as e:
+        logger.error(f"Error scoring market {market_id} semantically: {e}")
+        return blockchain_error(f'Failed to score market: {str(e)}')
+
+
+MAX_SIMILAR_DISTANCE = 20
+MAX_SIMILAR_RESULTS = 20
+
+
+@api_chain_bp.route('/v2/market/<int:market_id>/similar', methods=['GET'])
+def get_similar_predictions(market_id):
+    """Existing predictions in a market close to a candidate text, before gas is spent
+
+    Query params:
+        text: Candidate prediction
+        k: Edit distance counted as a near-duplicate (default NEAR_DUPLICATE_DISTANCE, max 20)
+        limit: Nearest predictions to return (default 5, max 20)
+    """
+    from config_chain import chain_config
+
+    text = request.args.get('text')
+    if not text:
+        return validation_error('text is required', 'text')
+    try:
+        k = min(int(request.args.get('k', chain_config.NEAR_DUPLICATE_DISTANCE)), MAX_SIMILAR_DISTANCE)
+        limit = min(int(request.args.get('limit', 5)), MAX_SIMILAR_RESULTS)
+    except ValueError:
+        return validation_error('k and limit must be integers')
+
+    try:
+        index = get_prediction_index()
+        near = index.near_duplicates(market_id, text, k)
+        return success_response({
+            'market_id': market_id,
+            'k': k,
+            'near_duplicates': near,
+            'nearest': index.nearest(market_id, text, limit),
+        })
+    except Exception as e:
+        logger.error(f"Error searching similar predictions for market {market_id}: {e}")
+        return blockchain_error(f'Failed to search predictions: {str(e)}')
+
+
+@api_chain_bp.route('/v2/payouts', methods=['GET'])
+def get_payouts_batch():
+    """Payouts for several V2 markets at once
+
+    Query params:
+        market_ids: Comma-separated market ids (max 50)
+        verify: If "true", also check resolved markets against on-chain events
+        from_block: Required with verify; events are read from here to head,
+            at most MAX_VERIFY_BLOCKS blocks
+    """
+    try:
+        market_ids = [int(m) for m in request.args.get('market_ids', '').split(',') if m.strip()]
+    except ValueError:
+        return validation_error('market_ids must be comma-separated integers', 'market_ids')
+    if not market_ids:
+        return validation_error('market_ids is required', 'market_ids')
+    if len(market_ids) > MAX_PAYOUT_MARKETS:
+        return validation_error(f'At most {MAX_PAYOUT_MARKETS} markets per request', 'market_ids')
+    verify = request.args.get('verify', '').lower() == 'true'
+    from_block = request.args.get('from_block', type=int)
+    if verify and (from_block is None or from_block < 0):
+        return validation_error('verify requires a from_block', 'from_block')
+
+    try:
+        simulator = get_payout_simulator()
+        if verify and simulator.blockchain.w3.eth.block_number - from_block > MAX_VERIFY_BLOCKS:
+            return validation_error(f'from_block must be within {MAX_VERIFY_BLOCKS} blocks of head', 'from_block')
+        data = {'markets': _wei_to_str(list(simulator.simulate(market_ids).values()))}
+        if verify:
+            data['verification'] = _wei_to_str(simulator.verify(market_ids, from_block=from_block))
+        return success_response(data)
+    except Exception as e:
+        logger.error(f"Error simulating payouts: {e}")
+        return blockchain_error(f'Failed to simulate payouts: {str(e)}')
+
+@api_chain_bp.route('/v2/claims/<address>', methods=['GET'])
+def get_claim_plan(address):
+    """Unclaimed winnings for a wallet and unsigned transactions that claim them
+
+    Claims are bundled through Multicall3 into as few transactions as fit
+    the per-transaction gas cap; a lone claim calls claimPayout directly.
+    """
+    if not Web3.is_address(address):
+        return validation_error('Invalid wallet address', 'address')
+    try:
+        return success_response(_wei_to_str(get_claim_planner().plan(address)))
+    except Exception as e:
+        logger.error(f"Error planning claims for {address}: {e}")
+        return blockchain_error(f'Failed to plan claims: {str(e)}')
+
+@api_chain_bp.route('/portfolio/<address>', methods=['GET'])
+def get_portfolio(address):
+    """Every V2 position of a wallet with outcomes, distances, claimable amounts and pending fees
+
+    Served from a per-wallet cache that the chain indexer drops on the
+    wallet's next event.
+    """
+    if not Web3.is_address(address):
+        return validation_error('Invalid wallet address', 'address')
+    try:
+        return success_response(_wei_to_str(get_portfolio_index().get(address)))
+    except Exception as e:
+        logger.error(f"Error building portfolio for {address}: {e}")
+        return blockchain_error(f'Failed to build portfolio: {str(e)}')
+
+MAX_LEADERBOARD_LIMIT = 100
+
+
+@api_chain_bp.route('/leaderboard', methods=['GET'])
+def get_leaderboard_chain():
+    """Top predictors, updated incrementally on each MarketResolved event
+
+    Query params:
+        metric: winnings (ETH), win_rate, distance (mean normalized, lower is better) or roi
+        window: all, 7d or 30d
+        cohort: all, agent or human
+        limit: Entries to return (max 100)
+        offset: Entries to skip
+        address: Optional wallet whose own rank is included
+    """
+    metric = request.args.get('metric', 'winnings')
+    window = request.args.get('window', 'all')
+    cohort = request.args.get('cohort', 'all')
+    if metric not in METRICS:
+        return validation_error(f'metric must be one of {", ".join(METRICS)}', 'metric')
+    if window not in WINDOWS:
+        return validation_error(f'window must be one of {", ".join(WINDOWS)}', 'window')
+    if cohort not in COHORTS:
+        return validation_error(f'cohort must be one of {", ".join(COHORTS)}', 'cohort')
+    try:
+        limit = min(int(request.args.get('limit', 10)), MAX_LEADERBOARD_LIMIT)
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return validation_error('limit and offset must be integers')
+    if limit < 0 or offset < 0:
+        return validation_error('limit and offset must not be negative')
+    address = request.args.get('address')
+    if address is not None and not Web3.is_address(address):
+        return validation_error('Invalid wallet address', 'address')
+
+    try:
+        leaderboard = get_leaderboard()
+        data = {
+            'metric': metric,
+            'window': window,
+            'cohort': cohort,
+            'entries': leaderboard.top(metric, window, cohort, limit, offset),
+        }
+        if address is not None:
+            data['wallet'] = leaderboard.rank(address, metric, window, cohort)
+        return success_response(data)
+    except Exception as e:
+        logger.error(f"Error reading leaderboard: {e}")
+        return internal_error('Failed to read leaderboard')
+
 @api_chain_bp.route('/oracle/submissions/<market_id>', methods=['GET'])
 def get_oracle_submissions_chain(market_id):
     """Get oracle submissions for a market from blockchain"""
@@ -430,7 +659,7 @@ def get_genesis_holders():
                             ownership[to_address] = set()
                         ownership[to_address].add(token_id)
                 except Exception as e:
-                    logger.debug(f"Could not process transfer log: {e}")
+                    logger.debug(f"Could not process transfer log: {e}", sample=True)
                     
         except Exception as e:
             logger.debug(f"Could not query transfer events: {e}")
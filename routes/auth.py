@@ -10,7 +10,7 @@ import secrets
 import random
 from services.wallet_auth import wallet_auth_service
 from services.firebase_auth import FirebaseAuthService
-from services.auth_store import get_auth_store
+from services.auth_store import get_auth_store, OTP_INVALID, OTP_LOCKED, OTP_MISSING
 from utils.api_errors import (
     error_response, success_response, validation_error, unauthorized,
     internal_error, ErrorCode
@@ -59,21 +59,20 @@ def send_otp():
         if not email:
             return validation_error('Email is required', 'email')
 
-        # Check rate limit
-        rate_check = auth_store.check_otp_rate_limit(email)
-        if not rate_check['allowed']:
+        # Generate 6-digit OTP
+        otp = str(random.randint(100000, 999999))
+
+        # Check rate limit and store OTP in Redis with TTL (one atomic call)
+        issued = auth_store.issue_otp(email, otp)
+        if not issued['allowed']:
             logger.warning("OTP rate limit exceeded", email=email)
             return error_response(
                 ErrorCode.RATE_LIMITED,
                 'Too many OTP requests. Please try again later.',
                 429
             )
-
-        # Generate 6-digit OTP
-        otp = str(random.randint(100000, 999999))
-
-        # Store OTP in Redis with TTL
-        auth_store.store_otp(email, otp)
+        if not issued['stored']:
+            return internal_error('Failed to send OTP')
 
         # Send OTP via Firebase
         success = firebase_auth.send_otp_email(email, otp)
@@ -99,31 +98,23 @@ def verify_otp():
         if not all([email, otp]):
             return validation_error('Email and OTP are required')
 
-        # Check brute-force lockout
-        attempts_check = auth_store.check_verify_attempts(email)
-        if not attempts_check['allowed']:
-            logger.warning("OTP verify locked out", email=email, attempts=attempts_check['attempts'])
+        # Check brute-force lockout, verify OTP, and either record the failed
+        # attempt or consume the OTP and clear attempts (one atomic call)
+        verified = auth_store.verify_otp(email, otp)
+        if verified['status'] == OTP_LOCKED:
+            logger.warning("OTP verify locked out", email=email, attempts=verified['attempts'])
             return error_response(
                 ErrorCode.RATE_LIMITED,
                 'Too many failed attempts. Please try again later.',
                 429
             )
 
-        # Get stored OTP from Redis
-        stored_otp = auth_store.get_otp(email)
-
-        if not stored_otp:
+        if verified['status'] == OTP_MISSING:
             return error_response(ErrorCode.TOKEN_EXPIRED, 'Invalid or expired OTP', 400)
 
-        # Verify OTP
-        if stored_otp != otp:
-            auth_store.record_failed_attempt(email)
+        if verified['status'] == OTP_INVALID:
             return error_response(ErrorCode.INVALID_TOKEN, 'Invalid OTP', 400)
 
-        # Clean up used OTP and clear failed attempts
-        auth_store.delete_otp(email)
-        auth_store.clear_verify_attempts(email)
-
         # Create authenticated session
         session['authenticated'] = True
         session['email'] = email
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import json
 from services.blockchain_base import BaseBlockchainService
+from services.fee_oracle import get_fee_oracle
 # from services.oracle_xcom import XcomOracleService  # Phase 7: Database-dependent
 # from services.payout_base import BasePayoutService  # Phase 7: Database-dependent
 # from models import PredictionMarket, Submission, Bet, Actor, Transaction  # Phase 7: Models removed
@@ -165,6 +166,7 @@ def estimate_gas():
         tx_type = data.get('type', 'transfer')
         
         gas_prices = blockchain_service.estimate_gas_price()
+        fee_snapshot = get_fee_oracle().get_snapshot()
         
         # Estimate gas based on transaction type
         gas_estimates = {
@@ -193,6 +195,14 @@ def estimate_gas():
                     'gwei': blockchain_service.w3.from_wei(gas_prices['fast'], 'gwei'),
                     'total_cost_eth': blockchain_service.w3.from_wei(gas_limit * gas_prices['fast'], 'ether')
                 }
+            },
+            # Type-2 transaction fee fields from the shared fee oracle snapshot
+            'eip1559': {
+                'base_fee_per_gas': fee_snapshot['base_fee'],
+                'block_number': fee_snapshot['block_number'],
+                'slow': fee_snapshot['slow'],
+                'standard': fee_snapshot['standard'],
+                'fast': fee_snapshot['fast']
             }
         }), 200
         
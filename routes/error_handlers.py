@@ -83,13 +83,16 @@ def register_error_handlers(app: Flask) -> None:
     def handle_rate_limit(error):
         """Handle 429 Too Many Requests errors."""
         message = str(error.description) if hasattr(error, 'description') else "Too many requests"
+        headers = {}
+        if getattr(error, 'retry_after', None) is not None:
+            headers['Retry-After'] = str(error.retry_after)
         return jsonify({
             "success": False,
             "error": {
                 "code": ErrorCode.RATE_LIMITED,
                 "message": message
             }
-        }), 429
+        }), 429, headers
 
     @app.errorhandler(500)
     def handle_internal_error(error):
@@ -2,11 +2,13 @@
 import logging
 import json
 import asyncio
-from flask import Blueprint, render_template, request, jsonify, abort, session
+import base64
+from flask import Blueprint, render_template, request, jsonify, abort, session, send_file, url_for
 # from models import PredictionMarket, OracleSubmission, Actor  # Phase 7: Models removed
 # from services.oracle_xcom import XcomOracleService  # Phase 7: Database-dependent
 from services.xcom_api_service import XComAPIService
 from services.blockchain_base import BaseBlockchainService
+from services.distributed_storage import get_distributed_storage
 from utils.crypto import CryptoUtils
 # from app import db  # Phase 7: Database removed
 from datetime import datetime
@@ -15,6 +17,9 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 oracle_manual_bp = Blueprint('oracle_manual', __name__)
 
+# Screenshot blobs never change for a given digest
+SCREENSHOT_MAX_AGE = 365 * 24 * 3600
+
 @oracle_manual_bp.route('/oracle/manual/submit/<market_id>')
 def manual_submission_form(market_id):
     """Show manual X.com submission form for a market"""
@@ -108,11 +113,13 @@ async def preview_submission():
                 
         result['distances'] = sorted(distances, key=lambda x: x['distance'])
         
-        # Try to capture screenshot if possible
+        # Try to capture screenshot if possible; it is served by URL, not inlined
         try:
-            screenshot = await xcom_service.capture_tweet_screenshot(tweet_url)
-            if screenshot:
-                result['screenshot'] = screenshot
+            screenshot_bytes = await xcom_service.capture_tweet_screenshot_bytes(tweet_url)
+            if screenshot_bytes:
+                digest = get_distributed_storage().store_screenshot_blob(screenshot_bytes)
+                result['screenshot_hash'] = digest
+                result['screenshot'] = url_for('oracle_manual.get_screenshot', digest=digest)
         except Exception as e:
             logger.warning(f"Could not capture screenshot: {e}")
             result['screenshot'] = None
@@ -123,6 +130,18 @@ async def preview_submission():
         logger.error(f"Error previewing submission: {e}")
         return jsonify({'error': str(e)}), 500
 
+@oracle_manual_bp.route('/oracle/screenshots/<digest>')
+def get_screenshot(digest):
+    """Stream a stored screenshot; content-addressed, so cacheable forever"""
+    found = get_distributed_storage().open_screenshot(digest)
+    if not found:
+        abort(404)
+
+    path, content_type = found
+    response = send_file(path, mimetype=content_type, max_age=SCREENSHOT_MAX_AGE, etag=digest)
+    response.headers['Cache-Control'] = f'public, max-age={SCREENSHOT_MAX_AGE}, immutable'
+    return response
+
 @oracle_manual_bp.route('/oracle/manual/submit', methods=['POST'])
 def submit_manual_oracle():
     """Submit manual X.com oracle data"""
@@ -135,6 +154,7 @@ def submit_manual_oracle():
         tweet_url = data.get('tweet_url')
         tweet_text = data.get('tweet_text')
         screenshot_base64 = data.get('screenshot', '')
+        screenshot_hash = data.get('screenshot_hash')
         signature = data.get('signature')
         
         # Validate required fields
@@ -148,6 +168,11 @@ def submit_manual_oracle():
         if not tweet_id:
             return jsonify({'error': 'Invalid X.com URL'}), 400
             
+        # Screenshots captured during preview are referenced by digest
+        if screenshot_hash:
+            screenshot_bytes = get_distributed_storage().blobs.read(screenshot_hash)
+            screenshot_base64 = base64.b64encode(screenshot_bytes).decode('utf-8') if screenshot_bytes else ''
+
         # Use oracle service to submit
         oracle_service = XcomOracleService()
         success = oracle_service.submit_oracle_statement(
@@ -7,6 +7,9 @@ from datetime import datetime, timedelta, timezone
 from services.time_sync import TimeSyncService
 from services.blockchain_base import BaseBlockchainService
 from services.v2_resolution import get_resolution_service
+from services.tx_tracker import get_tx_tracker
+from services.leaderboard import get_leaderboard
+from services.resolution_jobs import get_resolution_jobs
 from utils.api_errors import (
     error_response, success_response, validation_error, not_found,
     unauthorized, internal_error, blockchain_error, ErrorCode
@@ -84,7 +87,7 @@ def proteus_view():
                         }
                         timeline_segments.append(segment)
                 except Exception as e:
-                    logger.debug(f"Error fetching market {market_id}: {e}")
+                    logger.debug(f"Error fetching market {market_id}: {e}", extra={'sample': True})
                     continue
         except Exception as e:
             logger.error(f"Error fetching markets from blockchain: {e}")
@@ -299,7 +302,7 @@ def resolved_view():
                         }
                         resolved_segments.append(segment)
                 except Exception as e:
-                    logger.debug(f"Error fetching market {market_id}: {e}")
+                    logger.debug(f"Error fetching market {market_id}: {e}", extra={'sample': True})
                     continue
         except Exception as e:
             logger.error(f"Error fetching resolved markets from blockchain: {e}")
@@ -383,7 +386,7 @@ def active_view():
                             }
                             active_segments.append(segment)
                 except Exception as e:
-                    logger.debug(f"Error fetching market {market_id}: {e}")
+                    logger.debug(f"Error fetching market {market_id}: {e}", extra={'sample': True})
                     continue
         except Exception as e:
             logger.error(f"Error fetching active markets from blockchain: {e}")
@@ -453,7 +456,7 @@ def get_resolution_stats():
     """Get overall resolution statistics"""
     try:
         resolution_service = get_resolution_service()
-        stats = resolution_service.get_resolution_stats()
+        stats = resolution_service.get_cached_resolution_stats()
         return success_response(stats)
     except Exception as e:
         logger.error(f"Error getting resolution stats: {e}")
@@ -504,6 +507,23 @@ def resolve_market(market_id):
     if not verify_admin_key():
         return unauthorized('Invalid admin key')
 
+    return _with_resolution_lease(market_id, _resolve_market)
+
+
+def _with_resolution_lease(market_id, handler):
+    """Run handler(market_id) while holding the market's resolution lease"""
+    try:
+        with get_resolution_jobs().lease(market_id) as lease:
+            if lease is None:
+                return error_response(ErrorCode.RESOLUTION_IN_PROGRESS,
+                                      f'Market {market_id} is already being resolved', 409)
+            return handler(market_id)
+    except Exception as e:
+        logger.error(f"Error acquiring resolution lease for market {market_id}: {e}")
+        return internal_error('Resolution coordination unavailable')
+
+
+def _resolve_market(market_id):
     try:
         data = request.get_json() or {}
         actual_text = data.get('actual_text', '').strip()
@@ -535,17 +555,17 @@ def resolve_market(market_id):
         if not actual_text:
             return validation_error('actual_text is required (or provide tweet_url)', 'actual_text')
 
-        # Resolve the market
-        result = resolution_service.resolve_market(market_id, actual_text)
+        # Submit the resolution; the tx tracker follows it to confirmation
+        result = resolution_service.resolve_market(market_id, actual_text, wait_for_receipt=False)
 
         if result['success']:
             return success_response({
                 'market_id': market_id,
                 'tx_hash': result['tx_hash'],
-                'gas_used': result.get('gas_used'),
-                'block_number': result.get('block_number'),
+                'status': result.get('status'),
+                'status_url': url_for('proteus.get_tx_status', tx_hash=result['tx_hash']),
                 'actual_text': actual_text
-            })
+            }, status=202)
         else:
             # If we have unsigned_tx, it's a partial success (key not configured)
             if result.get('unsigned_tx'):
@@ -573,6 +593,10 @@ def auto_resolve_market(market_id):
     if not verify_admin_key():
         return unauthorized('Invalid admin key')
 
+    return _with_resolution_lease(market_id, _auto_resolve_market)
+
+
+def _auto_resolve_market(market_id):
     try:
         data = request.get_json() or {}
         tweet_url = data.get('tweet_url', '').strip()
@@ -587,7 +611,7 @@ def auto_resolve_market(market_id):
         asyncio.set_event_loop(loop)
         try:
             result = loop.run_until_complete(
-                resolution_service.auto_resolve_market(market_id, tweet_url)
+                resolution_service.auto_resolve_market(market_id, tweet_url, wait_for_receipt=False)
             )
         finally:
             loop.close()
@@ -596,9 +620,10 @@ def auto_resolve_market(market_id):
             return success_response({
                 'market_id': market_id,
                 'tx_hash': result['tx_hash'],
-                'tweet_text': result.get('tweet_text'),
-                'gas_used': result.get('gas_used')
-            })
+                'status': result.get('status'),
+                'status_url': url_for('proteus.get_tx_status', tx_hash=result['tx_hash']),
+                'tweet_text': result.get('tweet_text')
+            }, status=202)
         else:
             return error_response(ErrorCode.CONTRACT_ERROR, result.get('error', 'Auto-resolution failed'), 400)
 
@@ -615,13 +640,15 @@ def withdraw_platform_fees():
 
     try:
         resolution_service = get_resolution_service()
-        result = resolution_service.withdraw_fees()
+        result = resolution_service.withdraw_fees(wait_for_receipt=False)
 
         if result['success']:
             return success_response({
                 'tx_hash': result['tx_hash'],
-                'amount': result['amount']
-            })
+                'amount': result['amount'],
+                'status': result.get('status'),
+                'status_url': url_for('proteus.get_tx_status', tx_hash=result['tx_hash'])
+            }, status=202)
         else:
             return error_response(ErrorCode.CONTRACT_ERROR, result.get('error', 'Fee withdrawal failed'), 400)
 
@@ -630,12 +657,41 @@ def withdraw_platform_fees():
         return blockchain_error(f'Failed to withdraw fees: {str(e)}')
 
 
+@proteus_bp.route('/api/admin/agents/<address>', methods=['POST'])
+def register_agent(address):
+    """Register a wallet as an AI agent
+
+    The wallet moves to the agent cohort of the leaderboards and gets the
+    agent rate-limit tier.
+    """
+    if not verify_admin_key():
+        return unauthorized('Invalid admin key')
+    if not Web3.is_address(address):
+        return validation_error('Invalid wallet address', 'address')
+
+    try:
+        get_leaderboard().register_agent(address)
+        return success_response({'address': Web3.to_checksum_address(address), 'cohort': 'agent'})
+    except Exception as e:
+        logger.error(f"Error registering agent {address}: {e}")
+        return internal_error('Failed to register agent')
+
+
+@proteus_bp.route('/api/admin/tx/<tx_hash>')
+def get_tx_status(tx_hash):
+    """Get the lifecycle status of a tracked admin transaction"""
+    record = get_tx_tracker().get_status(tx_hash)
+    if not record:
+        return not_found('Transaction', tx_hash)
+    return success_response(record)
+
+
 @proteus_bp.route('/proteus/admin/resolution')
 def resolution_dashboard():
     """Admin dashboard for market resolution"""
     try:
         resolution_service = get_resolution_service()
-        stats = resolution_service.get_resolution_stats()
+        stats = resolution_service.get_cached_resolution_stats()
         pending = resolution_service.get_pending_markets()
 
         return render_template('proteus/admin_resolution.html',
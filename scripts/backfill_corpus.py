@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Add every resolved V2 market that is missing from the corpus log.
+
+The chain indexer adds markets to the resolved-text corpus
+(services/corpus_search.py) as they resolve. This walks marketCount and
+adds the resolved markets it never saw: ones resolved before the indexer
+was deployed, or whose add failed. Safe to re-run; markets already in
+the corpus are left alone.
+
+Usage:
+  python scripts/backfill_corpus.py
+  python scripts/backfill_corpus.py --batch-size 50
+
+Env vars:
+  REDIS_URL / REDIS_HOST / REDIS_PORT   Where the corpus log lives
+  INDEXER_START_BLOCK                   First block to read MarketResolved from
+                                        (default: the deployment block)
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.corpus_search import CorpusSearch
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Add resolved markets missing from the corpus log"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100,
+        help="Markets read per JSON-RPC batch"
+    )
+    args = parser.parse_args()
+
+    added = CorpusSearch().backfill(batch_size=args.batch_size)
+    print(f"Added {added} documents to the corpus")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Backtest alternative scoring rules over every resolved V2 market.
+
+Replays the resolved-text corpus log in Redis (services/corpus_search.py)
+and reports, per rule, how many winners would flip against the contract's
+byte-level Levenshtein, how much payout would move between wallets, and
+the CPU time spent scoring.
+
+Usage:
+  python scripts/backtest_scoring.py                          # all built-in rules
+  python scripts/backtest_scoring.py --rule word --rule casefold
+  python scripts/backtest_scoring.py --rule mypkg.metrics:semantic_distance --workers 8
+
+Env vars:
+  REDIS_URL / REDIS_HOST / REDIS_PORT   Where the corpus log lives
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.backtest import CHUNK_SIZE, RULES, Backtest, load_markets
+from utils.redis_client import create_redis_client
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Backtest alternative scoring rules over resolved markets"
+    )
+    parser.add_argument(
+        "--rule", action="append", dest="rules",
+        help=f"Scoring rule to compare: one of {sorted(RULES)} or module:function (repeatable)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=CHUNK_SIZE,
+        help="Markets per worker task"
+    )
+    args = parser.parse_args()
+
+    backtest = Backtest(args.rules or RULES, workers=args.workers, chunk_size=args.chunk_size)
+    report = backtest.run(load_markets(create_redis_client()))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,10 @@ Redis-backed authentication store for nonces and OTPs.
 
 Replaces in-memory dicts with persistent Redis storage with TTL expiry,
 rate limiting for OTP sends, and brute-force protection for OTP verification.
+
+The login flow uses issue_otp() and verify_otp(). Each runs as a single Lua
+script, so a send or a verify is one round trip. Two concurrent requests
+cannot both pass a rate-limit or lockout check that only one of them should.
 """
 
 import json
@@ -16,6 +20,50 @@ from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# KEYS: otp, send counter; ARGV: otp payload, otp ttl, max sends, send window
+# Returns {allowed, remaining sends}
+ISSUE_OTP_SCRIPT = """
+local sent = tonumber(redis.call('GET', KEYS[2]) or 0)
+local max_sends = tonumber(ARGV[3])
+if sent >= max_sends then
+    return {0, 0}
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+sent = redis.call('INCR', KEYS[2])
+if redis.call('TTL', KEYS[2]) == -1 then
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+end
+return {1, max_sends - sent}
+"""
+
+# KEYS: otp, failed attempts; ARGV: submitted otp, max attempts, lockout
+# Returns {status, failed attempts}
+VERIFY_OTP_SCRIPT = """
+local attempts = tonumber(redis.call('GET', KEYS[2]) or 0)
+if attempts >= tonumber(ARGV[2]) then
+    return {'locked', attempts}
+end
+local stored = redis.call('GET', KEYS[1])
+if not stored then
+    return {'missing', attempts}
+end
+if cjson.decode(stored)['otp'] ~= ARGV[1] then
+    attempts = redis.call('INCR', KEYS[2])
+    if attempts == 1 then
+        redis.call('EXPIRE', KEYS[2], ARGV[3])
+    end
+    return {'invalid', attempts}
+end
+redis.call('DEL', KEYS[1], KEYS[2])
+return {'ok', attempts}
+"""
+
+# verify_otp() statuses
+OTP_OK = "ok"
+OTP_LOCKED = "locked"
+OTP_MISSING = "missing"
+OTP_INVALID = "invalid"
+
 
 class AuthStore:
     """Redis-backed store for auth nonces and OTPs with TTL expiry."""
@@ -59,6 +107,7 @@ class AuthStore:
         self.otp_send_window = otp_send_window
         self.otp_max_verify_attempts = otp_max_verify_attempts
         self.otp_verify_lockout = otp_verify_lockout
+        self._scripts: Dict[str, Any] = {}
 
     # -------------------------------------------------------------------------
     # Nonce operations
@@ -170,6 +219,59 @@ class AuthStore:
             logger.error("Failed to delete OTP", email=email, error=str(e))
             return False
 
+    def issue_otp(self, email: str, otp: str) -> Dict[str, Any]:
+        """Check the send rate limit and, if allowed, store the OTP in one step.
+
+        Returns:
+            Dict with 'allowed' bool, 'remaining' sends in the window and
+            'stored' bool (False if Redis failed; the OTP must not be sent).
+        """
+        otp_key = self.OTP_PREFIX + email.lower()
+        rate_key = self.OTP_RATE_PREFIX + email.lower()
+        script = self._script("issue_otp", ISSUE_OTP_SCRIPT)
+        data = {
+            "otp": otp,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            allowed, remaining = script(
+                keys=[otp_key, rate_key],
+                args=[json.dumps(data), self.otp_ttl, self.otp_max_send_per_window, self.otp_send_window],
+            )
+            return {"allowed": bool(allowed), "remaining": remaining, "stored": bool(allowed)}
+        except Exception as e:
+            logger.error("Failed to issue OTP", email=email, error=str(e))
+            return {"allowed": True, "remaining": self.otp_max_send_per_window, "stored": False}
+
+    def verify_otp(self, email: str, otp: str) -> Dict[str, Any]:
+        """Check the lockout, compare the OTP, then count the failure or consume the OTP.
+
+        Returns:
+            Dict with 'status' (OTP_OK, OTP_LOCKED, OTP_MISSING or
+            OTP_INVALID) and the failed 'attempts' count.
+        """
+        otp = str(otp)
+        otp_key = self.OTP_PREFIX + email.lower()
+        attempts_key = self.OTP_ATTEMPTS_PREFIX + email.lower()
+        script = self._script("verify_otp", VERIFY_OTP_SCRIPT)
+        try:
+            status, attempts = script(
+                keys=[otp_key, attempts_key],
+                args=[otp, self.otp_max_verify_attempts, self.otp_verify_lockout],
+            )
+            if isinstance(status, bytes):
+                status = status.decode()
+            return {"status": status, "attempts": attempts}
+        except Exception as e:
+            logger.error("Failed to verify OTP", email=email, error=str(e))
+            return {"status": OTP_MISSING, "attempts": 0}
+
+    def _script(self, name: str, source: str):
+        """Registered Lua script, created on first use."""
+        if name not in self._scripts:
+            self._scripts[name] = self.redis.register_script(source)
+        return self._scripts[name]
+
     # -------------------------------------------------------------------------
     # OTP brute-force protection
     # -------------------------------------------------------------------------
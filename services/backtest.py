@@ -0,0 +1,232 @@
+"""
+Backtest alternative scoring rules over resolved PredictionMarketV2 markets.
+
+Replays every market in the resolved-text corpus log (corpus:v2:docs,
+written by services/corpus_search.py). For each market it picks the winner
+under each rule with the contract's tie-break: strictly smallest score,
+earliest submission wins ties. It then compares the result with the
+contract's own rule, byte-level Levenshtein. Markets with fewer than
+MIN_SUBMISSIONS entries are refunds under every rule and are skipped.
+Markets logged before prediction documents carried submitter and stake
+cannot be priced; they are skipped too and counted in the report.
+
+Scoring runs in a process pool over chunks of markets. Rules travel to
+workers by name: either a key of RULES or a "module:function" path, so
+new metrics plug in without touching this file. For each rule the report
+gives:
+
+- winner flips against the contract rule
+- the payout moved between wallets
+- the largest per-wallet gains and losses
+- the CPU time spent scoring
+"""
+
+import heapq
+import importlib
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import Levenshtein
+
+from services.corpus_search import DOCS_KEY, KIND_ACTUAL
+from services.payout_simulator import MIN_SUBMISSIONS, PLATFORM_FEE_BPS, contract_distance, platform_fee
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+BASELINE_RULE = 'levenshtein'
+LOG_PAGE_SIZE = 10000
+CHUNK_SIZE = 500
+TOP_WALLETS = 10
+
+
+def normalized_levenshtein(predicted: str, actual: str) -> float:
+    """Byte distance divided by the longer text's byte length."""
+    a, b = predicted.encode('utf-8'), actual.encode('utf-8')
+    return Levenshtein.distance(a, b) / max(len(a), len(b), 1)
+
+
+def word_levenshtein(predicted: str, actual: str) -> int:
+    """Edits counted in whole words."""
+    return Levenshtein.distance(predicted.split(), actual.split())
+
+
+def casefold_levenshtein(predicted: str, actual: str) -> int:
+    return contract_distance(predicted.casefold(), actual.casefold())
+
+
+def casefold_word_levenshtein(predicted: str, actual: str) -> int:
+    return word_levenshtein(predicted.casefold(), actual.casefold())
+
+
+RULES: Dict[str, Callable[[str, str], float]] = {
+    BASELINE_RULE: contract_distance,
+    'normalized': normalized_levenshtein,
+    'word': word_levenshtein,
+    'casefold': casefold_levenshtein,
+    'casefold_word': casefold_word_levenshtein,
+}
+
+
+def resolve_rule(name: str) -> Callable[[str, str], float]:
+    """A built-in rule, or "package.module:function" for a custom one."""
+    if name in RULES:
+        return RULES[name]
+    module_name, _, attr = name.partition(':')
+    if not attr:
+        raise ValueError(f"Unknown scoring rule {name!r}; use one of {sorted(RULES)} or module:function")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def pick_winner(submissions: List[Dict[str, Any]], actual_text: str,
+                score: Callable[[str, str], float]) -> int:
+    """Index of the winning submission under score, first submitter on ties."""
+    winner, best = 0, None
+    for index, submission in enumerate(submissions):
+        value = score(submission['text'], actual_text)
+        if best is None or value < best:
+            winner, best = index, value
+    return winner
+
+
+def score_chunk(markets: List[Dict[str, Any]], rule_names: List[str]) -> Dict[str, Any]:
+    """Worker: winner index of every market under every rule, plus time per rule."""
+    winners, seconds = {}, {}
+    for name in rule_names:
+        score = resolve_rule(name)
+        started = time.process_time()
+        winners[name] = [pick_winner(m['submissions'], m['actual_text'], score) for m in markets]
+        seconds[name] = time.process_time() - started
+    return {'winners': winners, 'seconds': seconds}
+
+
+def load_markets(redis_client, page_size: int = LOG_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Resolved competitive markets from the corpus log, paged so 100k+ markets never sit in one reply."""
+    current = None
+    offset = 0
+    while True:
+        page = redis_client.lrange(DOCS_KEY, offset, offset + page_size - 1)
+        for raw in page:
+            doc = json.loads(raw)
+            if doc['kind'] == KIND_ACTUAL:
+                if current and len(current['submissions']) >= MIN_SUBMISSIONS:
+                    yield current
+                current = {'market_id': doc['market_id'], 'actual_text': doc['text'], 'submissions': []}
+            elif current is not None and doc['market_id'] == current['market_id']:
+                current['submissions'].append({
+                    'submission_id': doc['submission_id'],
+                    'text': doc['text'],
+                    'submitter': doc['submitter'].lower() if doc.get('submitter') else None,
+                    'amount': int(doc['amount']) if doc.get('amount') is not None else None,
+                })
+        if len(page) < page_size:
+            break
+        offset += page_size
+    if current and len(current['submissions']) >= MIN_SUBMISSIONS:
+        yield current
+
+
+def _complete(market: Dict[str, Any]) -> bool:
+    """Whether every submission has the submitter and stake payout deltas need."""
+    return all(s['submitter'] and s['amount'] is not None for s in market['submissions'])
+
+
+def _chunks(markets: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for market in markets:
+        chunk.append(market)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Backtest:
+    """Replays resolved markets under alternative scoring rules."""
+
+    def __init__(self, rule_names: Iterable[str] = tuple(RULES), workers: Optional[int] = None,
+                 chunk_size: int = CHUNK_SIZE, fee_bps: int = PLATFORM_FEE_BPS):
+        self.rule_names = list(dict.fromkeys([BASELINE_RULE, *rule_names]))
+        for name in self.rule_names:
+            resolve_rule(name)    # fail before forking on a bad rule name
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.fee_bps = fee_bps
+
+    def run(self, markets: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Score every market under every rule and summarize against the baseline."""
+        started = time.monotonic()
+        totals = {name: {'flips': 0, 'payout_moved': 0, 'seconds': 0.0} for name in self.rule_names}
+        deltas = {name: defaultdict(int) for name in self.rule_names}
+        market_count = skipped = 0
+
+        def priced(markets):
+            nonlocal skipped
+            for market in markets:
+                if _complete(market):
+                    yield market
+                else:
+                    skipped += 1
+
+        def fold(chunk, scored):
+            nonlocal market_count
+            market_count += len(chunk)
+            baseline = scored['winners'][BASELINE_RULE]
+            for name in self.rule_names:
+                totals[name]['seconds'] += scored['seconds'][name]
+                for market, base, alt in zip(chunk, baseline, scored['winners'][name]):
+                    if base == alt:
+                        continue
+                    total_pool = sum(s['amount'] for s in market['submissions'])
+                    payout = total_pool - platform_fee(total_pool, self.fee_bps)
+                    totals[name]['flips'] += 1
+                    totals[name]['payout_moved'] += payout
+                    deltas[name][market['submissions'][base]['submitter']] -= payout
+                    deltas[name][market['submissions'][alt]['submitter']] += payout
+
+        chunks = _chunks(priced(markets), self.chunk_size)
+        if self.workers == 1:
+            for chunk in chunks:
+                fold(chunk, score_chunk(chunk, self.rule_names))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                # Keep a bounded number of chunks in flight so 100k+ markets are never all in memory.
+                pending = []
+                for chunk in chunks:
+                    pending.append((chunk, executor.submit(score_chunk, chunk, self.rule_names)))
+                    if len(pending) >= self.workers * 2:
+                        chunk_done, future = pending.pop(0)
+                        fold(chunk_done, future.result())
+                for chunk_done, future in pending:
+                    fold(chunk_done, future.result())
+
+        rules = {}
+        for name in self.rule_names:
+            wallet_deltas = {w: d for w, d in deltas[name].items() if d}
+            rules[name] = {
+                'flips': totals[name]['flips'],
+                'flip_rate': totals[name]['flips'] / market_count if market_count else 0.0,
+                'payout_moved': totals[name]['payout_moved'],
+                'wallets_affected': len(wallet_deltas),
+                'top_gainers': heapq.nlargest(TOP_WALLETS, wallet_deltas.items(), key=lambda kv: kv[1]),
+                'top_losers': heapq.nsmallest(TOP_WALLETS, wallet_deltas.items(), key=lambda kv: kv[1]),
+                'cpu_seconds': round(totals[name]['seconds'], 3),
+            }
+        report = {
+            'markets': market_count,
+            'skipped_markets': skipped,
+            'workers': self.workers,
+            'baseline': BASELINE_RULE,
+            'rules': rules,
+            'wall_seconds': round(time.monotonic() - started, 3),
+        }
+        if skipped:
+            logger.warning("Skipped markets without submitter or stake", skipped=skipped)
+        logger.info("Backtest complete", markets=market_count, rules=self.rule_names,
+                    wall_seconds=report['wall_seconds'])
+        return report
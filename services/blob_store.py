@@ -0,0 +1,220 @@
+"""
+Content-addressed on-disk blob store for screenshots.
+
+Blobs are re-encoded (lossless WebP, or optimized PNG when WebP is not
+available), named by the SHA-256 of the stored bytes and sharded into
+<root>/<2 hex>/<digest>.<ext>. Identical screenshots therefore share one
+file, and a digest always identifies immutable content, so readers can
+cache it forever. Total size is bounded: least recently used blobs are
+evicted once max_bytes is exceeded.
+
+All state lives on disk so every worker process sharing the directory
+sees the same store. Lookups stat the sharded path, recency is the file
+mtime, and the blob count and total size are kept in a small ledger file
+that writers update under an exclusive flock.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from PIL import Image, features
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CONTENT_TYPES = {'webp': 'image/webp', 'png': 'image/png'}
+DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+LOCK_FILE = '.lock'
+USAGE_FILE = '.usage'
+
+
+def encode_image(data: bytes) -> Tuple[bytes, str]:
+    """Re-encode image bytes for storage. Returns (bytes, extension)."""
+    with Image.open(BytesIO(data)) as image:
+        image.load()
+        out = BytesIO()
+        if features.check('webp'):
+            image.save(out, format='WEBP', lossless=True, method=4)
+            ext = 'webp'
+        else:
+            image.save(out, format='PNG', optimize=True)
+            ext = 'png'
+    encoded = out.getvalue()
+    # Screenshots that don't shrink are kept as the original PNG
+    if ext != 'png' and len(encoded) >= len(data) and data[:8] == b'\x89PNG\r\n\x1a\n':
+        return data, 'png'
+    return encoded, ext
+
+
+class BlobStore:
+    """SHA-256 addressed image store with size-bounded LRU eviction."""
+
+    def __init__(self, root_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self._lock_path = os.path.join(root_dir, LOCK_FILE)
+        self._usage_path = os.path.join(root_dir, USAGE_FILE)
+        os.makedirs(root_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock shared by every process writing to root_dir."""
+        with open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root_dir, digest[:2], f"{digest}.{ext}")
+
+    def _find(self, digest: str) -> Optional[str]:
+        for ext in CONTENT_TYPES:
+            path = self._path(digest, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _scan(self) -> List[Tuple[int, str, int]]:
+        """(mtime_ns, path, size) of every blob on disk."""
+        entries = []
+        for shard in os.listdir(self.root_dir):
+            shard_dir = os.path.join(self.root_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for entry in os.scandir(shard_dir):
+                digest, _, ext = entry.name.partition('.')
+                if not DIGEST_RE.match(digest) or ext not in CONTENT_TYPES:
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, entry.path, stat.st_size))
+        return entries
+
+    def _read_usage(self) -> Tuple[int, int]:
+        """(blobs, bytes) from the ledger, rebuilt from disk if it is missing."""
+        try:
+            with open(self._usage_path) as f:
+                usage = json.load(f)
+            return usage['blobs'], usage['bytes']
+        except (OSError, ValueError, KeyError):
+            entries = self._scan()
+            return len(entries), sum(size for _, _, size in entries)
+
+    def _write_usage(self, blobs: int, used: int):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'blobs': blobs, 'bytes': used}, f)
+        os.replace(tmp_path, self._usage_path)
+
+    def put(self, data: bytes) -> str:
+        """Store an image and return its digest."""
+        encoded, ext = encode_image(data)
+        digest = hashlib.sha256(encoded).hexdigest()
+
+        with self._locked():
+            existing = self._find(digest)
+            if existing:
+                self._touch(existing)
+                return digest
+
+            blobs, used = self._read_usage()
+            path = self._path(digest, ext)
+            shard_dir = os.path.dirname(path)
+            os.makedirs(shard_dir, exist_ok=True)
+
+            # Write-then-rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=shard_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encoded)
+            os.replace(tmp_path, path)
+
+            blobs, used = blobs + 1, used + len(encoded)
+            if used > self.max_bytes:
+                blobs, used = self._evict()
+            self._write_usage(blobs, used)
+
+        return digest
+
+    def open(self, digest: str) -> Optional[Tuple[str, str]]:
+        """Return (path, content_type) for a stored blob, or None."""
+        if not DIGEST_RE.match(digest or ''):
+            return None
+        path = self._find(digest)
+        if path is None:
+            return None
+        self._touch(path)
+        return path, CONTENT_TYPES[path.rsplit('.', 1)[1]]
+
+    def read(self, digest: str) -> Optional[bytes]:
+        """Read a stored blob's bytes."""
+        found = self.open(digest)
+        if not found:
+            return None
+        try:
+            with open(found[0], 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            # Evicted by another process since open()
+            return None
+
+    def _touch(self, path: str):
+        try:
+            # Recency is shared with other processes through the mtime
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict(self) -> Tuple[int, int]:
+        """Remove least recently used blobs until under max_bytes; returns the new (blobs, bytes).
+
+        Runs under the write lock and recounts from disk, which also
+        corrects any drift in the ledger.
+        """
+        entries = sorted(self._scan())
+        used = sum(size for _, _, size in entries)
+        while used > self.max_bytes and len(entries) > 1:
+            _, path, size = entries.pop(0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Failed to evict blob", path=path, error=str(e))
+                continue
+            used -= size
+        return len(entries), used
+
+    def get_stats(self) -> dict:
+        blobs, used = self._read_usage()
+        return {
+            'blobs': blobs,
+            'used_bytes': used,
+            'max_bytes': self.max_bytes,
+        }
+
+
+def get_screenshot_store() -> BlobStore:
+    """Get or create the process-wide screenshot blob store."""
+    global _screenshot_store
+    if _screenshot_store is None:
+        from config_chain import chain_config
+        _screenshot_store = BlobStore(
+            chain_config.SCREENSHOT_STORE_DIR,
+            max_bytes=chain_config.SCREENSHOT_STORE_MAX_MB * 1024 * 1024,
+        )
+    return _screenshot_store
+
+
+_screenshot_store: Optional[BlobStore] = None
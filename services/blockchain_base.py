@@ -40,6 +40,9 @@ class BaseBlockchainService:
             'AdvancedMarkets': None,
             'SecurityAudit': None
         }
+
+        # Block each contract was deployed in, when the deployment file records it
+        self.deployment_blocks: Dict[str, int] = {}
         
         # Load ABIs
         self.abis = self._load_abis()
@@ -54,7 +57,10 @@ class BaseBlockchainService:
             logger.info(f"Loaded contracts from {deployment_file}")
         
     def _load_abis(self) -> Dict[str, Any]:
-        """Load contract ABIs from compiled artifacts"""
+        """Load contract ABIs from compiled artifacts, once per process"""
+        global _abi_cache
+        if _abi_cache:
+            return dict(_abi_cache)
         abis = {}
         try:
             # Load from Hardhat artifacts
@@ -75,7 +81,8 @@ class BaseBlockchainService:
                     logger.warning(f"ABI file not found for {contract_name} at {abi_path}")
         except Exception as e:
             logger.error(f"Error loading ABIs: {e}")
-        return abis
+        _abi_cache = abis
+        return dict(abis)
         
     def load_contracts(self, deployment_file: str):
         """Load contract addresses from deployment file"""
@@ -99,6 +106,8 @@ class BaseBlockchainService:
                                 address=Web3.to_checksum_address(address),
                                 abi=self.abis[contract_name]
                             )
+                            if isinstance(contract_info, dict) and contract_info.get('deploymentBlock') is not None:
+                                self.deployment_blocks[contract_name] = int(contract_info['deploymentBlock'])
                             logger.info(f"Loaded {contract_name} at {address}")
         except Exception as e:
             logger.error(f"Error loading contracts: {e}")
@@ -144,7 +153,53 @@ class BaseBlockchainService:
         except Web3Exception as e:
             logger.error(f"Error validating BASE transaction {tx_hash}: {e}")
             return None
-            
+
+    def get_transaction_receipts(self, tx_hashes: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch receipts for many transactions in a single JSON-RPC batch
+
+        Returns a dict keyed by tx hash. Transactions that are not mined yet
+        map to None. Uses the raw provider batch so a missing receipt does
+        not fail the whole batch; falls back to sequential calls if the
+        provider does not support batching.
+        """
+        if not tx_hashes:
+            return {}
+
+        receipts: Dict[str, Optional[Dict[str, Any]]] = {}
+        try:
+            responses = self.w3.provider.make_batch_request(
+                [('eth_getTransactionReceipt', [tx_hash]) for tx_hash in tx_hashes]
+            )
+            for tx_hash, response in zip(tx_hashes, responses):
+                raw = response.get('result') if isinstance(response, dict) else None
+                if not raw:
+                    receipts[tx_hash] = None
+                    continue
+                receipts[tx_hash] = {
+                    'status': int(raw['status'], 16),
+                    'block_number': int(raw['blockNumber'], 16),
+                    'gas_used': int(raw['gasUsed'], 16),
+                    'effective_gas_price': int(raw.get('effectiveGasPrice') or '0x0', 16),
+                }
+            return receipts
+        except (AttributeError, NotImplementedError, TypeError) as e:
+            logger.debug(f"Batch receipt request unavailable, falling back: {e}")
+        except Exception as e:
+            logger.warning(f"Batch receipt request failed, falling back: {e}")
+
+        for tx_hash in tx_hashes:
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+                receipts[tx_hash] = {
+                    'status': receipt['status'],
+                    'block_number': receipt['blockNumber'],
+                    'gas_used': receipt['gasUsed'],
+                    'effective_gas_price': receipt.get('effectiveGasPrice', 0),
+                }
+            except Exception:
+                receipts[tx_hash] = None
+        return receipts
+
     def get_balance(self, address: str) -> Decimal:
         """Get BASE (ETH) balance for an address"""
         try:
@@ -155,15 +210,15 @@ class BaseBlockchainService:
             return Decimal(0)
             
     def estimate_gas_price(self) -> Dict[str, int]:
-        """Estimate current gas prices on BASE"""
+        """Estimate current gas prices on BASE
+
+        Reads the shared EIP-1559 fee oracle snapshot (fee-history
+        percentiles) and returns the expected per-gas price for each tier.
+        """
         try:
-            gas_price = self.w3.eth.gas_price
-            return {
-                'standard': gas_price,
-                'fast': int(gas_price * 1.2),
-                'slow': int(gas_price * 0.8)
-            }
-        except Web3Exception as e:
+            from services.fee_oracle import get_fee_oracle
+            return get_fee_oracle().effective_gas_prices()
+        except Exception as e:
             logger.error(f"Error estimating gas price: {e}")
             # BASE typical gas prices are very low
             return {
@@ -401,6 +456,71 @@ class BaseBlockchainService:
             logger.error(f"Error getting V2 submission {submission_id}: {e}")
             return None
 
+    def get_v2_market_snapshots(self, market_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Markets with their submissions in raw wei, read in JSON-RPC batches
+
+        One batch of getMarketDetails calls, then one of getSubmissionDetails
+        for every submission they reference. Amounts stay integer wei so
+        payout math can match the contract exactly. Markets that cannot be
+        read are omitted.
+        """
+        contract = self.contracts.get('PredictionMarketV2')
+        if not contract or not market_ids:
+            return {}
+
+        market_rows = self.batch_call([contract.functions.getMarketDetails(i) for i in market_ids])
+        markets = {}
+        for market_id, row in zip(market_ids, market_rows):
+            if row is None or row[1] == 0:
+                continue
+            markets[market_id] = {
+                'id': market_id,
+                'actor_handle': row[0],
+                'end_time': row[1],
+                'total_pool': row[2],
+                'resolved': row[3],
+                'winning_submission_id': row[4],
+                'creator': row[5],
+                'submission_ids': list(row[6]),
+                'submissions': [],
+            }
+
+        submission_ids = [sid for market in markets.values() for sid in market['submission_ids']]
+        submission_rows = self.batch_call([contract.functions.getSubmissionDetails(s) for s in submission_ids])
+        for submission_id, row in zip(submission_ids, submission_rows):
+            if row is None or row[0] not in markets:
+                continue
+            markets[row[0]]['submissions'].append({
+                'id': submission_id,
+                'market_id': row[0],
+                'submitter': row[1],
+                'predicted_text': row[2],
+                'amount': row[3],
+                'claimed': row[4],
+            })
+        return markets
+
+    def batch_call(self, calls: List[Any], chunk_size: int = 100) -> List[Optional[Any]]:
+        """Execute contract calls in JSON-RPC batches; sequential fallback per chunk"""
+        results: List[Optional[Any]] = []
+        for start in range(0, len(calls), chunk_size):
+            chunk = calls[start:start + chunk_size]
+            try:
+                with self.w3.batch_requests() as batch:
+                    for call in chunk:
+                        batch.add(call)
+                    results.extend(batch.execute())
+                continue
+            except Exception as e:
+                logger.debug(f"Batch call unavailable, falling back to sequential calls: {e}")
+            for call in chunk:
+                try:
+                    results.append(call.call())
+                except Exception as e:
+                    logger.error(f"Contract call failed: {e}")
+                    results.append(None)
+        return results
+
     def get_v2_market_submissions(self, market_id: int) -> List[int]:
         """Get list of submission IDs for a V2 market"""
         try:
@@ -440,17 +560,16 @@ class BaseBlockchainService:
             return Decimal(0)
 
     def get_v2_constants(self) -> Dict[str, Any]:
-        """Get V2 contract constants"""
+        """Get V2 contract constants (cached per deployment)"""
+        from services.contract_metadata import get_contract_metadata
         try:
-            contract = self.contracts.get('PredictionMarketV2')
-            if not contract:
-                return {}
+            metadata = get_contract_metadata().get(self)
             return {
-                'platform_fee_bps': contract.functions.PLATFORM_FEE_BPS().call(),
-                'min_bet': Web3.from_wei(contract.functions.MIN_BET().call(), 'ether'),
-                'betting_cutoff': contract.functions.BETTING_CUTOFF().call(),
-                'min_submissions': contract.functions.MIN_SUBMISSIONS().call(),
-                'max_text_length': contract.functions.MAX_TEXT_LENGTH().call()
+                'platform_fee_bps': metadata['platform_fee_bps'],
+                'min_bet': Web3.from_wei(metadata['min_bet'], 'ether'),
+                'betting_cutoff': metadata['betting_cutoff'],
+                'min_submissions': metadata['min_submissions'],
+                'max_text_length': metadata['max_text_length']
             }
         except Exception as e:
             logger.error(f"Error getting V2 constants: {e}")
@@ -606,4 +725,8 @@ class BaseBlockchainService:
             
     def calculate_platform_fee(self, amount: Decimal) -> Decimal:
         """Calculate platform fee for a given amount"""
-        return amount * self.platform_fee_percentage
\ No newline at end of file
+        return amount * self.platform_fee_percentage
+
+
+# Parsed artifacts shared by every service instance in the process
+_abi_cache: Dict[str, Any] = {}
@@ -10,6 +10,7 @@ from datetime import datetime, timezone
 from web3 import Web3
 from eth_account import Account
 import asyncio
+import bisect
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,8 @@ class BlockchainOnlyDataService:
             'nodes': {},
             'transactions': defaultdict(list)
         }
+        # Unresolved markets as (end_time, market_id), kept sorted by end time
+        self._expiry_order: List[Tuple[int, str]] = []
         
         # Load contracts
         self.contracts = {}
@@ -131,6 +134,7 @@ class BlockchainOnlyDataService:
                         'created_at': event['blockNumber'],
                         'resolved': False
                     }
+                    self._index_expiry(self.cache['markets'][market_id])
                     
                 # Get all SubmissionCreated events
                 submission_events = contract.events.SubmissionCreated.get_logs(
@@ -185,16 +189,32 @@ class BlockchainOnlyDataService:
         return active_markets
         
     def get_expired_markets(self) -> List[Dict]:
-        """Get all expired but unresolved markets"""
-        expired_markets = []
+        """Get all expired but unresolved markets, oldest first"""
         current_time = int(datetime.now(timezone.utc).timestamp())
+        end = bisect.bisect_left(self._expiry_order, (current_time,))
+        return [self.cache['markets'][market_id] for _, market_id in self._expiry_order[:end]]
         
-        for market_id, market in self.cache['markets'].items():
-            if market['end_time'] < current_time and not market['resolved']:
-                expired_markets.append(market)
-                
-        return expired_markets
+    def get_markets_ending_within(self, seconds: int) -> List[Dict]:
+        """Get unresolved markets ending in the next `seconds`, soonest first"""
+        current_time = int(datetime.now(timezone.utc).timestamp())
+        start = bisect.bisect_left(self._expiry_order, (current_time,))
+        end = bisect.bisect_left(self._expiry_order, (current_time + seconds + 1,))
+        return [self.cache['markets'][market_id] for _, market_id in self._expiry_order[start:end]]
         
+    def _index_expiry(self, market: Dict):
+        """Insert an unresolved market into the expiry order (no-op if present)"""
+        entry = (market['end_time'], market['id'])
+        position = bisect.bisect_left(self._expiry_order, entry)
+        if position == len(self._expiry_order) or self._expiry_order[position] != entry:
+            self._expiry_order.insert(position, entry)
+            
+    def _unindex_expiry(self, market: Dict):
+        """Remove a market from the expiry order"""
+        entry = (market['end_time'], market['id'])
+        position = bisect.bisect_left(self._expiry_order, entry)
+        if position < len(self._expiry_order) and self._expiry_order[position] == entry:
+            del self._expiry_order[position]
+            
     def get_market_details(self, market_id: str) -> Optional[Dict]:
         """Get detailed market information from blockchain"""
         if 'EnhancedPredictionMarket' not in self.contracts:
@@ -320,6 +340,7 @@ class BlockchainOnlyDataService:
                     'created_at': event['blockNumber'],
                     'resolved': False
                 }
+                self._index_expiry(self.cache['markets'][market_id])
                 
             elif event_name == 'SubmissionCreated':
                 market_id = event['args']['marketId']
@@ -347,6 +368,7 @@ class BlockchainOnlyDataService:
             elif event_name == 'MarketResolved':
                 market_id = event['args']['marketId']
                 if market_id in self.cache['markets']:
+                    self._unindex_expiry(self.cache['markets'][market_id])
                     self.cache['markets'][market_id]['resolved'] = True
                     self.cache['markets'][market_id]['winning_submission_id'] = event['args']['winningSubmissionId']
                     
@@ -0,0 +1,243 @@
+"""
+Persistent headless-browser pool for tweet screenshot capture.
+
+Launching Chromium costs seconds and hundreds of MB, so a single browser is
+kept alive and a fixed number of pages (one per browser context) are reused
+across captures. Playwright objects are bound to the event loop that created
+them while Flask async views and the oracle each run their own short-lived
+loops, so the pool owns a dedicated loop on a background thread and callers
+submit work to it.
+
+Controls:
+- pool_size:        concurrent captures (one reusable page each)
+- max_queue:        captures allowed to wait for a page before rejecting
+- capture_timeout:  seconds allowed per capture (navigation + screenshot)
+- crashed browsers / pages are detected and relaunched on next use
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+TWEET_SELECTOR = 'article[data-testid="tweet"]'
+VIEWPORT = {'width': 800, 'height': 1200}
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Remove cookie banner, login prompt and sticky header before capturing
+REMOVE_OVERLAYS_JS = '''
+    () => {
+        const cookieBanner = document.querySelector('[data-testid="BottomBar"]');
+        if (cookieBanner) cookieBanner.remove();
+
+        const loginPrompt = document.querySelector('[data-testid="sheetDialog"]');
+        if (loginPrompt) loginPrompt.remove();
+
+        const header = document.querySelector('header');
+        if (header) header.style.display = 'none';
+    }
+'''
+
+
+class BrowserPoolBusy(Exception):
+    """Raised when the capture queue is full."""
+
+
+async def _launch_chromium() -> Tuple[Any, Any]:
+    """Start Playwright and launch headless Chromium. Returns (playwright, browser)."""
+    from playwright.async_api import async_playwright
+
+    playwright = await async_playwright().start()
+    browser = await playwright.chromium.launch(headless=True)
+    return playwright, browser
+
+
+class BrowserPool:
+    """Long-lived Chromium with a bounded set of reusable pages."""
+
+    def __init__(
+        self,
+        pool_size: int = 2,
+        max_queue: int = 20,
+        capture_timeout: float = 15,
+        launcher: Optional[Callable[[], Awaitable[Tuple[Any, Any]]]] = None,
+    ):
+        self.pool_size = pool_size
+        self.max_queue = max_queue
+        self.capture_timeout = capture_timeout
+        self._launcher = launcher or _launch_chromium
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # State below is only touched from the pool's own loop
+        self._playwright = None
+        self._browser = None
+        self._generation = 0
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Queue] = None
+        self._waiting = 0
+
+        self.stats = {'captures': 0, 'failures': 0, 'timeouts': 0, 'rejected': 0, 'relaunches': 0}
+
+    # ------------------------------------------------------------------
+    # Public API (callable from any thread / event loop)
+    # ------------------------------------------------------------------
+
+    async def capture(self, url: str) -> Optional[bytes]:
+        """Capture a PNG screenshot of the tweet at url."""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._capture(url), loop)
+        return await asyncio.wrap_future(future)
+
+    def stop(self):
+        """Close the browser and stop the pool's event loop."""
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if not loop:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=10)
+        except Exception as e:
+            logger.warning("Browser pool shutdown failed", error=str(e))
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    # ------------------------------------------------------------------
+    # Internals (run on the pool's loop)
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._launch_lock = asyncio.Lock()
+                    self._slots = asyncio.Queue()
+                    # An empty slot (None) means "create a page on first use"
+                    for _ in range(self.pool_size):
+                        self._slots.put_nowait(None)
+                    ready.set()
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, daemon=True, name="browser-pool")
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    async def _capture(self, url: str) -> Optional[bytes]:
+        if self._slots.empty() and self._waiting >= self.max_queue:
+            self.stats['rejected'] += 1
+            raise BrowserPoolBusy("Screenshot queue is full")
+
+        self._waiting += 1
+        try:
+            slot = await self._slots.get()
+        finally:
+            self._waiting -= 1
+
+        healthy = False
+        try:
+            slot = await self._checkout(slot)
+            result = await asyncio.wait_for(self._screenshot(slot[2], url), self.capture_timeout)
+            healthy = True
+            self.stats['captures'] += 1
+            return result
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            logger.warning("Screenshot capture timed out", url=url, timeout=self.capture_timeout)
+            return None
+        except Exception as e:
+            self.stats['failures'] += 1
+            logger.error("Screenshot capture failed", url=url, error=str(e))
+            return None
+        finally:
+            if not healthy and slot is not None:
+                # The page may be mid-navigation or crashed: discard its context
+                await self._close_quietly(slot[1])
+                slot = None
+            self._slots.put_nowait(slot)
+
+    async def _checkout(self, slot):
+        """Return a usable (generation, context, page), relaunching if needed."""
+        browser = await self._ensure_browser()
+        if slot is not None:
+            generation, context, page = slot
+            if generation == self._generation and not page.is_closed():
+                return slot
+            await self._close_quietly(context)
+
+        context = await browser.new_context(viewport=VIEWPORT, user_agent=USER_AGENT)
+        page = await context.new_page()
+        return (self._generation, context, page)
+
+    async def _ensure_browser(self):
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            if self._browser is not None:
+                self.stats['relaunches'] += 1
+                logger.warning("Screenshot browser disconnected, relaunching")
+            await self._close_browser()
+
+            self._playwright, self._browser = await self._launcher()
+            self._generation += 1
+            return self._browser
+
+    @staticmethod
+    async def _screenshot(page, url: str) -> Optional[bytes]:
+        await page.goto(url, wait_until='domcontentloaded')
+        await page.wait_for_selector(TWEET_SELECTOR, timeout=10000)
+        await page.evaluate(REMOVE_OVERLAYS_JS)
+
+        tweet_element = await page.query_selector(TWEET_SELECTOR)
+        if not tweet_element:
+            logger.error("Tweet element not found on page", url=url)
+            return None
+        return await tweet_element.screenshot()
+
+    @staticmethod
+    async def _close_quietly(closable):
+        try:
+            await closable.close()
+        except Exception:
+            pass
+
+    async def _close_browser(self):
+        if self._browser is not None:
+            await self._close_quietly(self._browser)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._browser = self._playwright = None
+
+    async def _shutdown(self):
+        await self._close_browser()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get or create the process-wide browser pool."""
+    global _browser_pool
+    if _browser_pool is None:
+        from config_chain import chain_config
+        _browser_pool = BrowserPool(
+            pool_size=chain_config.SCREENSHOT_POOL_SIZE,
+            max_queue=chain_config.SCREENSHOT_QUEUE_SIZE,
+            capture_timeout=chain_config.SCREENSHOT_TIMEOUT,
+        )
+    return _browser_pool
+
+
+_browser_pool: Optional[BrowserPool] = None
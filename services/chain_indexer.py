@@ -0,0 +1,247 @@
+"""
+Incremental PredictionMarketV2 event indexer.
+
+Each run fetches all contract logs for the next block range with a single
+eth_getLogs call, decodes them locally and hands each event to the handlers
+registered for its name. The last indexed block is kept in Redis so any
+worker can pick up where the previous run stopped; a Redis lock keeps runs
+from overlapping. Handlers must be idempotent: a range is re-delivered if a
+run dies before advancing the cursor.
+
+A handler that raises does not hold up the cursor or the other handlers.
+The event is pushed to a dead-letter list with the handler's name, and
+every later run retries it before indexing new blocks, until it succeeds.
+
+The first run starts at INDEXER_START_BLOCK, else at the contract's
+deploymentBlock from the deployment file. With neither it refuses to run:
+starting near the head would leave every event-fed index without history.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+from web3 import Web3
+
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+CURSOR_KEY = "indexer:v2:last_block"
+LOCK_KEY = "indexer:v2:lock"
+DEAD_LETTER_KEY = "indexer:v2:dead_letter"
+
+EventHandler = Callable[[Dict[str, Any]], None]
+
+
+def _topic_hex(value) -> str:
+    return (Web3.to_hex(value) if isinstance(value, (bytes, bytearray)) else str(value)).lower()
+
+
+def resolve_start_block(blockchain, start_block: Optional[int] = None) -> int:
+    """First block with PredictionMarketV2 history: start_block, else its deployment block."""
+    if start_block is None:
+        start_block = blockchain.deployment_blocks.get('PredictionMarketV2')
+    if start_block is None:
+        raise RuntimeError("PredictionMarketV2 start block unknown: set INDEXER_START_BLOCK "
+                           "or deploymentBlock in the deployment file")
+    return start_block
+
+
+def get_logs_paged(blockchain, event, from_block: int, step: int,
+                   argument_filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """event.get_logs from from_block to the chain head, at most `step` blocks per call.
+
+    RPC providers reject eth_getLogs over large block ranges, so history
+    is read in the same bounded steps the indexer uses.
+    """
+    head = blockchain.w3.eth.block_number
+    logs: List[Any] = []
+    for start in range(from_block, head + 1, step):
+        logs.extend(event.get_logs(from_block=start, to_block=min(start + step - 1, head),
+                                   argument_filters=argument_filters))
+    return logs
+
+
+class ChainEventIndexer:
+    """Scans PredictionMarketV2 logs block range by block range."""
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        blockchain=None,
+        confirmations: int = 2,
+        max_blocks_per_step: int = 2000,
+        start_block: Optional[int] = None,
+        lock_timeout: int = 120,
+    ):
+        self._redis = redis_client
+        self._blockchain = blockchain
+        self.confirmations = confirmations
+        self.max_blocks_per_step = max_blocks_per_step
+        self.start_block = start_block
+        self.lock_timeout = lock_timeout
+        self._handlers: Dict[str, List[EventHandler]] = {}
+        self._topics: Optional[Dict[str, Any]] = None
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    def on(self, event_name: str, handler: EventHandler) -> None:
+        """Register handler(event) for a contract event name."""
+        handlers = self._handlers.setdefault(event_name, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+    def get_cursor(self) -> Optional[int]:
+        value = self.redis.get(CURSOR_KEY)
+        return int(value) if value is not None else None
+
+    def index_once(self, max_steps: int = 10) -> Dict[str, Any]:
+        """Index up to max_steps block ranges. Returns progress counters."""
+        result = {'from_block': None, 'to_block': None, 'events': 0, 'lag': 0, 'skipped': False,
+                  'retried': 0, 'dead_letters': 0}
+
+        contract = self.blockchain.contracts.get('PredictionMarketV2')
+        if not contract:
+            logger.warning("PredictionMarketV2 contract not loaded, skipping indexing")
+            result['skipped'] = True
+            return result
+
+        if not self.redis.set(LOCK_KEY, '1', nx=True, ex=self.lock_timeout):
+            result['skipped'] = True
+            return result
+
+        try:
+            result['retried'], result['dead_letters'] = self.retry_dead_letters()
+            head = self.blockchain.w3.eth.block_number - self.confirmations
+            cursor = self.get_cursor()
+            if cursor is None:
+                cursor = resolve_start_block(self.blockchain, self.start_block) - 1
+
+            for _ in range(max_steps):
+                from_block = cursor + 1
+                if from_block > head:
+                    break
+                to_block = min(from_block + self.max_blocks_per_step - 1, head)
+
+                logs = self.blockchain.w3.eth.get_logs({
+                    'address': contract.address,
+                    'fromBlock': from_block,
+                    'toBlock': to_block,
+                })
+                for log in logs:
+                    event = self._decode(contract, log)
+                    if event:
+                        self._dispatch(event)
+                        result['events'] += 1
+
+                cursor = to_block
+                self.redis.set(CURSOR_KEY, cursor)
+                if result['from_block'] is None:
+                    result['from_block'] = from_block
+                result['to_block'] = to_block
+
+            result['lag'] = max(head - cursor, 0)
+            return result
+        finally:
+            self.redis.delete(LOCK_KEY)
+
+    def _decode(self, contract, log) -> Optional[Dict[str, Any]]:
+        if self._topics is None:
+            self._topics = {}
+            for abi in contract.abi:
+                if abi.get('type') == 'event':
+                    event = contract.events[abi['name']]()
+                    self._topics[_topic_hex(event.topic)] = event
+
+        topics = log.get('topics') or []
+        if not topics:
+            return None
+        event = self._topics.get(_topic_hex(topics[0]))
+        if event is None:
+            return None
+        try:
+            decoded = event.process_log(log)
+        except Exception as e:
+            logger.warning("Failed to decode log", error=str(e))
+            return None
+
+        tx_hash = decoded['transactionHash']
+        return {
+            'event': decoded['event'],
+            'args': dict(decoded['args']),
+            'block_number': decoded['blockNumber'],
+            'transaction_hash': tx_hash.hex() if hasattr(tx_hash, 'hex') else tx_hash,
+            'log_index': decoded['logIndex'],
+        }
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        for handler in self._handlers.get(event['event'], []):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error("Event handler failed; queued for retry", event_name=event['event'],
+                             handler=_handler_name(handler), block_number=event['block_number'], error=str(e))
+                self.redis.rpush(DEAD_LETTER_KEY, json.dumps(
+                    {'handler': _handler_name(handler), 'event': event, 'attempts': 1}))
+
+    def retry_dead_letters(self) -> tuple:
+        """Re-run failed handler calls. Returns (succeeded, still failing)."""
+        entries = self.redis.lrange(DEAD_LETTER_KEY, 0, -1)
+        if not entries:
+            return 0, 0
+        failed = []
+        for raw in entries:
+            entry = json.loads(raw)
+            event = entry['event']
+            handler = next((h for h in self._handlers.get(event['event'], [])
+                            if _handler_name(h) == entry['handler']), None)
+            try:
+                if handler is None:
+                    raise LookupError(f"handler {entry['handler']} not registered")
+                handler(event)
+            except Exception as e:
+                entry['attempts'] += 1
+                failed.append(json.dumps(entry))
+                logger.error("Event handler retry failed", event_name=event['event'], handler=entry['handler'],
+                             block_number=event['block_number'], attempts=entry['attempts'], error=str(e))
+        # Entries pushed while retrying stay behind the ones just read
+        pipe = self.redis.pipeline()
+        pipe.ltrim(DEAD_LETTER_KEY, len(entries), -1)
+        if failed:
+            pipe.rpush(DEAD_LETTER_KEY, *failed)
+        pipe.execute()
+        return len(entries) - len(failed), len(failed)
+
+
+def _handler_name(handler: EventHandler) -> str:
+    """Stable name of a handler across processes, e.g. 'LeaderboardEngine.on_market_resolved'."""
+    return f"{getattr(handler, '__module__', '')}.{getattr(handler, '__qualname__', type(handler).__name__)}"
+
+
+def get_chain_indexer() -> ChainEventIndexer:
+    """Get or create the process-wide chain event indexer."""
+    global _chain_indexer
+    if _chain_indexer is None:
+        from config_chain import chain_config
+        _chain_indexer = ChainEventIndexer(
+            confirmations=chain_config.INDEXER_CONFIRMATIONS,
+            max_blocks_per_step=chain_config.INDEXER_MAX_BLOCKS,
+            start_block=chain_config.INDEXER_START_BLOCK,
+        )
+    return _chain_indexer
+
+
+_chain_indexer: Optional[ChainEventIndexer] = None
@@ -0,0 +1,239 @@
+"""
+Unclaimed-winnings index and batch claim planner for PredictionMarketV2.
+
+claimPayout(submissionId) pays the submission's submitter no matter who
+calls it, so several claims can be bundled into one Multicall3
+aggregate3 transaction. The planner finds every winning, unclaimed
+submission for a wallet. It then packs the claims greedily into as few
+transactions as fit under MAX_CLAIM_GAS_PER_TX. The result is unsigned
+transaction data for the wallet UI to sign.
+
+A wallet's unclaimed list is cached in Redis (claims:unclaimed:<address>).
+The chain indexer drops the entry when one of the wallet's submissions wins
+(MarketResolved) or is paid out (PayoutClaimed).
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+import redis
+from web3 import Web3
+
+from services.fee_oracle import get_fee_oracle
+from services.payout_simulator import MIN_SUBMISSIONS, simulate_market
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+CACHE_PREFIX = "claims:unclaimed:"
+
+# Canonical Multicall3 deployment (same address on Base and Base Sepolia)
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+MULTICALL3_ABI = [{
+    'name': 'aggregate3',
+    'type': 'function',
+    'stateMutability': 'payable',
+    'inputs': [{
+        'name': 'calls',
+        'type': 'tuple[]',
+        'components': [
+            {'name': 'target', 'type': 'address'},
+            {'name': 'allowFailure', 'type': 'bool'},
+            {'name': 'callData', 'type': 'bytes'},
+        ],
+    }],
+    'outputs': [{
+        'name': 'returnData',
+        'type': 'tuple[]',
+        'components': [
+            {'name': 'success', 'type': 'bool'},
+            {'name': 'returnData', 'type': 'bytes'},
+        ],
+    }],
+}]
+
+CLAIM_GAS_FALLBACK = 80000      # claimPayout when estimation fails
+MULTICALL_BASE_GAS = 30000      # aggregate3 intrinsic + loop overhead
+MULTICALL_PER_CALL_GAS = 5000   # calldata and bookkeeping per bundled call
+
+
+class ClaimPlanner:
+    """Finds unclaimed winnings per wallet and plans batched claim transactions."""
+
+    def __init__(
+        self,
+        blockchain=None,
+        redis_client: Optional[redis.Redis] = None,
+        multicall_address: str = MULTICALL3_ADDRESS,
+        max_gas_per_tx: int = 3000000,
+        cache_ttl: int = 3600,
+    ):
+        self._blockchain = blockchain
+        self._redis = redis_client
+        self.multicall_address = Web3.to_checksum_address(multicall_address)
+        self.max_gas_per_tx = max_gas_per_tx
+        self.cache_ttl = cache_ttl
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    # -------------------------------------------------------------------------
+    # Unclaimed-winnings index
+    # -------------------------------------------------------------------------
+
+    def get_unclaimed(self, address: str) -> List[Dict[str, Any]]:
+        """Winning, unclaimed submissions of a wallet with their payout in wei."""
+        address = Web3.to_checksum_address(address)
+        key = CACHE_PREFIX + address.lower()
+        try:
+            cached = self.redis.get(key)
+            if cached is not None:
+                return json.loads(cached)
+        except redis.RedisError as e:
+            logger.debug("Claim index cache read failed", error=str(e))
+
+        unclaimed = self._scan(address)
+        try:
+            self.redis.set(key, json.dumps(unclaimed), ex=self.cache_ttl)
+        except redis.RedisError as e:
+            logger.debug("Claim index cache write failed", error=str(e))
+        return unclaimed
+
+    def invalidate(self, address: str) -> None:
+        try:
+            self.redis.delete(CACHE_PREFIX + address.lower())
+        except redis.RedisError as e:
+            logger.debug("Claim index cache delete failed", error=str(e))
+
+    def _scan(self, address: str) -> List[Dict[str, Any]]:
+        contract = self.blockchain.contracts.get('PredictionMarketV2')
+        submission_ids = self.blockchain.get_v2_user_submissions(address)
+        if not contract or not submission_ids:
+            return []
+
+        rows = self.blockchain.batch_call(
+            [contract.functions.getSubmissionDetails(sid) for sid in submission_ids])
+        open_claims = {sid: row[0] for sid, row in zip(submission_ids, rows)
+                       if row is not None and not row[4]}
+        markets = self.blockchain.get_v2_market_snapshots(sorted(set(open_claims.values())))
+
+        unclaimed = []
+        for submission_id, market_id in open_claims.items():
+            market = markets.get(market_id)
+            if (not market or not market['resolved']
+                    or market['winning_submission_id'] != submission_id
+                    or len(market['submissions']) < MIN_SUBMISSIONS):
+                continue
+            result = simulate_market(market)
+            payout = next(p['payout'] for p in result['payouts'] if p['submission_id'] == submission_id)
+            unclaimed.append({
+                'submission_id': submission_id,
+                'market_id': market_id,
+                'actor_handle': market['actor_handle'],
+                'payout': payout,
+            })
+        return unclaimed
+
+    def on_market_resolved(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler: the winner now has something to claim."""
+        submission = self.blockchain.get_v2_submission(event['args']['winningSubmissionId'])
+        if submission:
+            self.invalidate(submission['submitter'])
+
+    def on_payout_claimed(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler: the claimed submission leaves the index."""
+        self.invalidate(event['args']['claimer'])
+
+    # -------------------------------------------------------------------------
+    # Claim planning
+    # -------------------------------------------------------------------------
+
+    def plan(self, address: str) -> Dict[str, Any]:
+        """Pack a wallet's claims into as few transactions as fit the gas cap."""
+        address = Web3.to_checksum_address(address)
+        claims = self.get_unclaimed(address)
+        contract = self.blockchain.contracts['PredictionMarketV2']
+
+        for claim in claims:
+            claim['gas'] = self._estimate_claim_gas(contract, claim['submission_id'], address)
+
+        batches: List[List[Dict[str, Any]]] = []
+        batch_gas = 0
+        for claim in claims:
+            added = claim['gas'] + MULTICALL_PER_CALL_GAS
+            if batches and batch_gas + added <= self.max_gas_per_tx:
+                batches[-1].append(claim)
+                batch_gas += added
+            else:
+                batches.append([claim])
+                batch_gas = MULTICALL_BASE_GAS + added
+
+        transactions = [self._build_transaction(contract, batch) for batch in batches]
+        total_gas = sum(tx['gas'] for tx in transactions)
+        gas_price = get_fee_oracle().effective_gas_prices()['standard']
+        return {
+            'address': address,
+            'claims': claims,
+            'total_claimable': sum(c['payout'] for c in claims),
+            'transactions': transactions,
+            'estimated_gas': total_gas,
+            'estimated_cost_wei': total_gas * gas_price,
+        }
+
+    def _estimate_claim_gas(self, contract, submission_id: int, address: str) -> int:
+        try:
+            return contract.functions.claimPayout(submission_id).estimate_gas({'from': address})
+        except Exception as e:
+            logger.debug("claimPayout gas estimate failed", submission_id=submission_id, error=str(e))
+            return CLAIM_GAS_FALLBACK
+
+    def _build_transaction(self, contract, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        submission_ids = [c['submission_id'] for c in batch]
+        payout = sum(c['payout'] for c in batch)
+        if len(batch) == 1:
+            return {
+                'to': contract.address,
+                'data': contract.encode_abi('claimPayout', args=[submission_ids[0]]),
+                'value': 0,
+                'gas': batch[0]['gas'],
+                'submission_ids': submission_ids,
+                'payout': payout,
+            }
+
+        multicall = self.blockchain.w3.eth.contract(address=self.multicall_address, abi=MULTICALL3_ABI)
+        calls = [(contract.address, True, contract.encode_abi('claimPayout', args=[sid]))
+                 for sid in submission_ids]
+        return {
+            'to': multicall.address,
+            'data': multicall.encode_abi('aggregate3', args=[calls]),
+            'value': 0,
+            'gas': MULTICALL_BASE_GAS + sum(c['gas'] + MULTICALL_PER_CALL_GAS for c in batch),
+            'submission_ids': submission_ids,
+            'payout': payout,
+        }
+
+
+def get_claim_planner() -> ClaimPlanner:
+    """Get or create the process-wide claim planner."""
+    global _claim_planner
+    if _claim_planner is None:
+        from config_chain import chain_config
+        _claim_planner = ClaimPlanner(
+            multicall_address=chain_config.MULTICALL3_ADDRESS,
+            max_gas_per_tx=chain_config.MAX_CLAIM_GAS_PER_TX,
+        )
+    return _claim_planner
+
+
+_claim_planner: Optional[ClaimPlanner] = None
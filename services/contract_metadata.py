@@ -0,0 +1,133 @@
+"""
+Deployment-scoped cache of PredictionMarketV2 metadata.
+
+PLATFORM_FEE_BPS, MIN_BET, BETTING_CUTOFF, MIN_SUBMISSIONS and
+MAX_TEXT_LENGTH are constants of the deployed bytecode, and owner
+changes only through an OwnershipTransferred-emitting transaction.
+Validation, fee math and resolution used to read them with one eth_call
+each, every time. Here they are read together in one JSON-RPC batch and
+cached:
+
+- in Redis under contract_meta:v2:<address>:<code_hash>, so a redeploy,
+  even at the same address, lands on a fresh key
+- in process, keyed by address, revalidated every `check_interval`
+  seconds with one eth_getCode plus one Redis GET
+
+OwnershipTransferred drops every Redis entry. Other processes pick up the
+new owner at their next revalidation, and callers that see a stale owner
+can force a refresh with get(..., refresh=True).
+"""
+
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+from web3 import Web3
+
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+CACHE_PREFIX = "contract_meta:v2:"
+
+# Contract view function -> metadata field
+FIELDS = (
+    ('PLATFORM_FEE_BPS', 'platform_fee_bps'),
+    ('MIN_BET', 'min_bet'),
+    ('BETTING_CUTOFF', 'betting_cutoff'),
+    ('MIN_SUBMISSIONS', 'min_submissions'),
+    ('MAX_TEXT_LENGTH', 'max_text_length'),
+    ('owner', 'owner'),
+)   # feeRecipient is left out: setFeeRecipient emits no event to invalidate on
+
+
+class ContractMetadataCache:
+    """Constants and owner of each deployed contract, read once."""
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None, check_interval: int = 300,
+                 ttl: int = 7 * 86400, clock=time.monotonic):
+        self._redis = redis_client
+        self.check_interval = check_interval
+        self.ttl = ttl
+        self._clock = clock
+        self._memo: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    def get(self, blockchain, contract_name: str = 'PredictionMarketV2',
+            refresh: bool = False) -> Dict[str, Any]:
+        """Metadata of the loaded contract; raises RuntimeError if it cannot be read.
+
+        Values are raw contract values: min_bet is in wei and owner is
+        checksummed.
+        """
+        contract = blockchain.contracts.get(contract_name)
+        if contract is None:
+            raise RuntimeError(f"{contract_name} contract not loaded")
+        address = contract.address
+        now = self._clock()
+        memo = self._memo.get(address)
+        if memo and not refresh and now - memo[0] < self.check_interval:
+            return memo[1]
+
+        code_hash = Web3.keccak(blockchain.w3.eth.get_code(address)).hex()
+        key = f"{CACHE_PREFIX}{address}:{code_hash}"
+        metadata = None if refresh else self._read(key)
+        if metadata is None:
+            metadata = self._load(blockchain, contract, code_hash)
+            self._write(key, metadata)
+        self._memo[address] = (now, metadata)
+        return metadata
+
+    def _load(self, blockchain, contract, code_hash: str) -> Dict[str, Any]:
+        values = blockchain.batch_call([getattr(contract.functions, fn)() for fn, _ in FIELDS])
+        if any(value is None for value in values):
+            raise RuntimeError(f"Could not read metadata of contract {contract.address}")
+        metadata = {field: value for (_, field), value in zip(FIELDS, values)}
+        metadata.update(address=contract.address, code_hash=code_hash)
+        logger.info("Loaded contract metadata", address=contract.address, code_hash=code_hash)
+        return metadata
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            cached = self.redis.get(key)
+            return json.loads(cached) if cached else None
+        except redis.RedisError as e:
+            logger.debug("Contract metadata cache read failed", error=str(e))
+            return None
+
+    def _write(self, key: str, metadata: Dict[str, Any]) -> None:
+        try:
+            self.redis.set(key, json.dumps(metadata), ex=self.ttl)
+        except redis.RedisError as e:
+            logger.debug("Contract metadata cache write failed", error=str(e))
+
+    def invalidate(self) -> None:
+        """Drop every cached deployment, here and in Redis."""
+        self._memo.clear()
+        keys = list(self.redis.scan_iter(match=CACHE_PREFIX + '*'))
+        if keys:
+            self.redis.delete(*keys)
+
+    def on_ownership_transferred(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler: the owner is the one cached value a transaction can change."""
+        logger.info("Contract ownership transferred", new_owner=event['args']['newOwner'])
+        self.invalidate()
+
+
+def get_contract_metadata() -> ContractMetadataCache:
+    """Get or create the process-wide contract metadata cache."""
+    global _contract_metadata
+    if _contract_metadata is None:
+        from config_chain import chain_config
+        _contract_metadata = ContractMetadataCache(check_interval=chain_config.CONTRACT_METADATA_CHECK_INTERVAL)
+    return _contract_metadata
+
+
+_contract_metadata: Optional[ContractMetadataCache] = None
@@ -0,0 +1,284 @@
+"""
+Corpus-wide Levenshtein search over resolved PredictionMarketV2 texts.
+
+Every prediction and every resolved actual text becomes a document. A
+query asks for the documents within distance k of a text, or for the n
+closest, optionally limited to one actor. Distances are over UTF-8 bytes,
+like the contract's (payout_simulator.contract_distance).
+
+Documents go into an inverted index of padded byte q-grams (q=3). Two
+strings within edit distance k share at least
+max(|s|, |t|) + q - 1 - k*q q-grams, so the index finds candidates by
+counting shared grams. Only candidates that pass the count and length
+filters are checked with a real Levenshtein computation. Top-n search
+verifies candidates in order of their lower bound and stops once that
+bound is worse than the n-th best distance found.
+
+The chain indexer appends the documents of each resolved market to a
+Redis list (corpus:v2:docs), once per market; markets resolved before
+the indexer ran are added by backfill() (scripts/backfill_corpus.py).
+Each process extends its in-memory index from the entries it has not
+read yet, so the corpus grows incrementally with every resolution and is
+never rebuilt from scratch.
+Prediction documents keep submitter and stake, in marketSubmissions
+order, so the log doubles as the replay source for services/backtest.py.
+"""
+
+import heapq
+import json
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import Levenshtein
+import redis
+
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+DOCS_KEY = "corpus:v2:docs"
+MARKETS_KEY = "corpus:v2:markets"
+
+Q = 3
+_PAD = b'\x00' * (Q - 1)
+
+KIND_PREDICTION = 'prediction'
+KIND_ACTUAL = 'actual'
+
+
+def qgrams(data: bytes) -> Counter:
+    """Multiset of padded q-grams; a string of n bytes has n + Q - 1."""
+    padded = _PAD + data + _PAD
+    return Counter(padded[i:i + Q] for i in range(len(padded) - Q + 1))
+
+
+def _lower_bound(query_len: int, doc_len: int, common: int) -> int:
+    """Smallest edit distance consistent with the length and q-gram count filters."""
+    gram_bound = -(-(max(query_len, doc_len) + Q - 1 - common) // Q)
+    return max(abs(query_len - doc_len), gram_bound, 0)
+
+
+class CorpusSearch:
+    """Q-gram index of resolved predictions and actual texts."""
+
+    def __init__(self, blockchain=None, redis_client: Optional[redis.Redis] = None):
+        self._blockchain = blockchain
+        self._redis = redis_client
+        self._docs: List[Dict[str, Any]] = []
+        self._bytes: List[bytes] = []
+        self._postings: Dict[bytes, Dict[int, int]] = {}
+        self._by_actor: Dict[Optional[str], List[int]] = {}
+        self._log_offset = 0
+        self._lock = threading.Lock()
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    @property
+    def size(self) -> int:
+        return len(self._docs)
+
+    # -------------------------------------------------------------------------
+    # Updates
+    # -------------------------------------------------------------------------
+
+    def on_market_resolved(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler: add the market's texts to the corpus."""
+        args = event['args']
+        self.add_market(args['marketId'], args['actualText'])
+
+    def add_market(self, market_id: int, actual_text: str, market: Optional[Dict[str, Any]] = None) -> int:
+        """Append one resolved market's documents to the shared log, once. Returns how many."""
+        if not self.redis.sadd(MARKETS_KEY, market_id):
+            return 0
+        try:
+            if market is None:
+                market = self.blockchain.get_v2_market_snapshots([market_id]).get(market_id)
+            if not market:
+                self.redis.srem(MARKETS_KEY, market_id)
+                logger.warning("Resolved market not readable for corpus", market_id=market_id)
+                return 0
+
+            actor = market.get('actor_handle')
+            docs = [{'kind': KIND_ACTUAL, 'market_id': market_id, 'submission_id': None,
+                     'actor_handle': actor, 'text': actual_text}]
+            docs += [{'kind': KIND_PREDICTION, 'market_id': market_id, 'submission_id': s['id'],
+                      'actor_handle': actor, 'text': s['predicted_text'],
+                      'submitter': s['submitter'], 'amount': s['amount']}
+                     for s in market['submissions']]
+            self.redis.rpush(DOCS_KEY, *[json.dumps(doc) for doc in docs])
+        except Exception:
+            # leave the market unmarked so the next delivery or a backfill retries it
+            self.redis.srem(MARKETS_KEY, market_id)
+            raise
+        return len(docs)
+
+    def backfill(self, batch_size: int = 100) -> int:
+        """Add every resolved market missing from the corpus. Returns documents added.
+
+        For markets resolved before the indexer ran, or whose add failed.
+        Actual texts come from MarketResolved logs, read in bounded block
+        ranges; emergency-withdrawn markets have none and are skipped.
+        """
+        from config_chain import chain_config
+        from services.chain_indexer import get_logs_paged, resolve_start_block
+
+        done = {int(m) for m in self.redis.smembers(MARKETS_KEY)}
+        market_count = self.blockchain.get_v2_market_count()
+        missing: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, market_count, batch_size):
+            ids = [i for i in range(start, min(start + batch_size, market_count)) if i not in done]
+            missing.update((market_id, market) for market_id, market
+                           in self.blockchain.get_v2_market_snapshots(ids).items() if market['resolved'])
+        if not missing:
+            return 0
+
+        contract = self.blockchain.contracts['PredictionMarketV2']
+        from_block = resolve_start_block(self.blockchain, chain_config.INDEXER_START_BLOCK)
+        texts = {}
+        for log in get_logs_paged(self.blockchain, contract.events.MarketResolved(), from_block,
+                                  chain_config.INDEXER_MAX_BLOCKS):
+            if log['args']['marketId'] in missing:
+                texts[log['args']['marketId']] = log['args']['actualText']
+
+        added = sum(self.add_market(market_id, texts[market_id], market)
+                    for market_id, market in sorted(missing.items()) if market_id in texts)
+        logger.info("Corpus backfilled", markets=len(texts), documents=added,
+                    skipped=len(missing) - len(texts))
+        return added
+
+    def _sync(self) -> None:
+        """Index the log entries this process has not read yet."""
+        with self._lock:
+            try:
+                new = self.redis.lrange(DOCS_KEY, self._log_offset, -1)
+            except redis.RedisError as e:
+                logger.debug("Corpus log read failed", error=str(e))
+                return
+            for raw in new:
+                self._index(json.loads(raw))
+            self._log_offset += len(new)
+
+    def _index(self, doc: Dict[str, Any]) -> None:
+        doc_id = len(self._docs)
+        data = doc['text'].encode('utf-8')
+        doc['actor_handle'] = (doc.get('actor_handle') or '').lower() or None
+        self._docs.append(doc)
+        self._bytes.append(data)
+        self._by_actor.setdefault((doc['actor_handle'] or '').lstrip('@') or None, []).append(doc_id)
+        for gram, count in qgrams(data).items():
+            self._postings.setdefault(gram, {})[doc_id] = count
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def within(self, text: str, k: int, actor: Optional[str] = None, kind: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Documents within distance k of text, closest first."""
+        self._sync()
+        query = text.encode('utf-8')
+        common = self._common(query)
+        hits = []
+        for doc_id in self._filtered(range(len(self._docs)) if self._short_docs_qualify(query, k)
+                                     else common, actor, kind):
+            if _lower_bound(len(query), len(self._bytes[doc_id]), common.get(doc_id, 0)) > k:
+                continue
+            distance = Levenshtein.distance(query, self._bytes[doc_id])
+            if distance <= k:
+                hits.append((distance, doc_id))
+        hits.sort()
+        return [self._result(doc_id, distance) for distance, doc_id in hits[:limit]]
+
+    def nearest(self, text: str, n: int = 10, actor: Optional[str] = None,
+                kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The n documents closest to text, closest first."""
+        self._sync()
+        if n <= 0:
+            return []
+        query = text.encode('utf-8')
+        common = self._common(query)
+        best: List[tuple] = []    # max-heap of (-distance, -doc_id)
+
+        def visit(doc_ids: Iterable[int]) -> None:
+            bounded = sorted(
+                (_lower_bound(len(query), len(self._bytes[d]), common.get(d, 0)), d)
+                for d in self._filtered(doc_ids, actor, kind)
+            )
+            for bound, doc_id in bounded:
+                if len(best) >= n and bound > -best[0][0]:
+                    break
+                distance = Levenshtein.distance(query, self._bytes[doc_id])
+                if len(best) < n:
+                    heapq.heappush(best, (-distance, -doc_id))
+                elif (distance, doc_id) < (-best[0][0], -best[0][1]):
+                    heapq.heapreplace(best, (-distance, -doc_id))
+
+        visit(common)
+        # Documents sharing no q-gram can still win when the query is short
+        # or nothing shared enough; their bound is at least (|query| + Q - 1) / Q.
+        if len(best) < n or -best[0][0] >= -(-(len(query) + Q - 1) // Q):
+            visit(d for d in range(len(self._docs)) if d not in common)
+
+        return [self._result(-neg_id, -neg_distance) for neg_distance, neg_id in sorted(best, reverse=True)]
+
+    def recent(self, actor: str, kind: Optional[str] = KIND_ACTUAL, limit: int = 100) -> List[Dict[str, Any]]:
+        """An actor's most recently resolved documents, newest first."""
+        self._sync()
+        doc_ids = self._by_actor.get(actor.lower().lstrip('@'), [])
+        found = []
+        for doc_id in reversed(doc_ids):
+            if kind is None or self._docs[doc_id]['kind'] == kind:
+                found.append(self._docs[doc_id])
+                if len(found) >= limit:
+                    break
+        return found
+
+    def _common(self, query: bytes) -> Dict[int, int]:
+        """Shared q-gram count of every document that shares at least one."""
+        common: Dict[int, int] = {}
+        for gram, query_count in qgrams(query).items():
+            for doc_id, doc_count in self._postings.get(gram, {}).items():
+                common[doc_id] = common.get(doc_id, 0) + min(query_count, doc_count)
+        return common
+
+    @staticmethod
+    def _short_docs_qualify(query: bytes, k: int) -> bool:
+        """Whether a document sharing no q-gram could be within k (the count filter is vacuous)."""
+        return len(query) + Q - 1 <= k * Q
+
+    def _filtered(self, doc_ids: Iterable[int], actor: Optional[str], kind: Optional[str]) -> Iterable[int]:
+        actor = actor.lower().lstrip('@') if actor else None
+        for doc_id in doc_ids:
+            doc = self._docs[doc_id]
+            if actor and (doc['actor_handle'] or '').lstrip('@') != actor:
+                continue
+            if kind and doc['kind'] != kind:
+                continue
+            yield doc_id
+
+    def _result(self, doc_id: int, distance: int) -> Dict[str, Any]:
+        return dict(self._docs[doc_id], distance=distance)
+
+
+def get_corpus_search() -> CorpusSearch:
+    """Get or create the process-wide corpus search index."""
+    global _corpus_search
+    if _corpus_search is None:
+        _corpus_search = CorpusSearch()
+    return _corpus_search
+
+
+_corpus_search: Optional[CorpusSearch] = None
@@ -11,6 +11,8 @@ from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timezone
 import base64
 
+from services.blob_store import BlobStore, get_screenshot_store
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -22,10 +24,13 @@ except ImportError:
 class DistributedStorageService:
     """Service for distributed storage using IPFS"""
     
-    def __init__(self, ipfs_api_url: str = "/ip4/127.0.0.1/tcp/5001"):
+    def __init__(self, ipfs_api_url: str = "/ip4/127.0.0.1/tcp/5001", blob_store: Optional[BlobStore] = None):
         self.ipfs_api_url = ipfs_api_url
         self.client = None
         self._connect_to_ipfs()
+
+        # Screenshot bytes live on disk, addressed by SHA-256
+        self.blobs = blob_store or get_screenshot_store()
         
         # Local cache for IPFS hashes
         self.cache = {
@@ -56,17 +61,31 @@ class DistributedStorageService:
             logger.info("Running in offline mode - using mock IPFS")
             self.client = None
             
-    def store_screenshot(self, screenshot_data: str, tweet_id: str) -> str:
-        """Store screenshot in IPFS"""
+    @staticmethod
+    def _screenshot_bytes(screenshot_data) -> bytes:
+        """Accept raw bytes, a base64 string or a data URI"""
+        if isinstance(screenshot_data, bytes):
+            return screenshot_data
+        return base64.b64decode(screenshot_data.split(',')[1] if ',' in screenshot_data else screenshot_data)
+
+    def store_screenshot_blob(self, screenshot_data) -> str:
+        """Store screenshot in the local content-addressed store, return its SHA-256 digest"""
+        return self.blobs.put(self._screenshot_bytes(screenshot_data))
+
+    def open_screenshot(self, digest: str) -> Optional[Tuple[str, str]]:
+        """Return (path, content_type) of a locally stored screenshot for streaming"""
+        return self.blobs.open(digest)
+
+    def store_screenshot(self, screenshot_data, tweet_id: str) -> str:
+        """Store screenshot locally and in IPFS"""
         try:
+            image_data = self._screenshot_bytes(screenshot_data)
+            digest = self.blobs.put(image_data)
+
             if not self.client:
-                # Mock IPFS hash for development
-                mock_hash = f"Qm{hashlib.sha256(screenshot_data.encode()).hexdigest()[:44]}"
-                self.cache['screenshots'][tweet_id] = mock_hash
-                return mock_hash
-                
-            # Decode base64 screenshot
-            image_data = base64.b64decode(screenshot_data.split(',')[1] if ',' in screenshot_data else screenshot_data)
+                # Without IPFS the local digest is the screenshot's address
+                self.cache['screenshots'][tweet_id] = digest
+                return digest
             
             # Add to IPFS
             result = self.client.add_bytes(image_data)
@@ -85,19 +104,24 @@ class DistributedStorageService:
             logger.error(f"Error storing screenshot: {e}")
             raise
             
-    def retrieve_screenshot(self, ipfs_hash: str) -> Optional[str]:
-        """Retrieve screenshot from IPFS"""
+    def retrieve_screenshot(self, screenshot_hash: str) -> Optional[str]:
+        """Retrieve screenshot as a data URI (prefer open_screenshot for serving)"""
         try:
-            if not self.client:
-                # Return mock data for development
-                return f"data:image/png;base64,{ipfs_hash}"
-                
-            # Get from IPFS
-            data = self.client.cat(ipfs_hash)
+            found = self.blobs.open(screenshot_hash)
+            if found:
+                path, content_type = found
+                with open(path, 'rb') as f:
+                    data = f.read()
+            elif self.client:
+                # Get from IPFS
+                data = self.client.cat(screenshot_hash)
+                content_type = 'image/png'
+            else:
+                return None
             
             # Convert to base64
             base64_data = base64.b64encode(data).decode('utf-8')
-            return f"data:image/png;base64,{base64_data}"
+            return f"data:{content_type};base64,{base64_data}"
             
         except Exception as e:
             logger.error(f"Error retrieving screenshot: {e}")
@@ -219,7 +243,8 @@ class DistributedStorageService:
             'market_data': len(self.cache['market_data']),
             'oracle_proofs': len(self.cache['oracle_proofs']),
             'analytics': len(self.cache['analytics']),
-            'total_objects': sum(len(cache) for cache in self.cache.values())
+            'total_objects': sum(len(cache) for cache in self.cache.values()),
+            'screenshot_store': self.blobs.get_stats()
         }
         
         if self.client:
@@ -277,4 +302,15 @@ class DistributedStorageService:
             
         except Exception as e:
             logger.error(f"Error getting pinned content: {e}")
-            return []
\ No newline at end of file
+            return []
+
+
+def get_distributed_storage() -> DistributedStorageService:
+    """Get or create the process-wide storage service"""
+    global _distributed_storage
+    if _distributed_storage is None:
+        _distributed_storage = DistributedStorageService()
+    return _distributed_storage
+
+
+_distributed_storage: Optional[DistributedStorageService] = None
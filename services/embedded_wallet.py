@@ -8,6 +8,9 @@ import json
 import time
 import hashlib
 import secrets
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from web3 import Web3
@@ -24,6 +27,57 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+
+class _DerivedKeyCache:
+    """
+    Memory-only, size-bounded, short-TTL cache of derived wallet keys
+
+    Keys are held in bytearrays and overwritten with zeros when they expire,
+    are evicted or replaced, so they do not linger in the heap until garbage
+    collection. Callers get an immutable copy that lives only as long as
+    the request using it. Nothing is ever written to Redis or disk.
+    """
+
+    def __init__(self, ttl: int = 300, max_entries: int = 1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, bytearray, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, identifier: str) -> Optional[Tuple[bytes, str]]:
+        """(key, address) for a live entry, or None"""
+        with self._lock:
+            entry = self._entries.get(identifier)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                self._evict(identifier)
+                return None
+            self._entries.move_to_end(identifier)
+            return bytes(entry[1]), entry[2]
+
+    def put(self, identifier: str, key: bytes, address: str) -> None:
+        with self._lock:
+            if identifier in self._entries:
+                self._evict(identifier)
+            self._entries[identifier] = (self._clock() + self.ttl, bytearray(key), address)
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            for identifier in list(self._entries):
+                self._evict(identifier)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, identifier: str) -> None:
+        _, key, _ = self._entries.pop(identifier)
+        key[:] = bytes(len(key))
+
+
 class EmbeddedWalletService:
     """
     Service for managing embedded wallets with TEE-secured storage
@@ -45,6 +99,20 @@ class EmbeddedWalletService:
             )
         self._is_production_safe = bool(cdp_key)
 
+        # Derived keys: cached briefly in memory; cold PBKDF2 runs on a small
+        # pool (hashlib releases the GIL) so bursts cannot take every core
+        self._key_cache = _DerivedKeyCache(
+            ttl=int(os.environ.get('EMBEDDED_WALLET_KEY_TTL', '300')),
+            max_entries=int(os.environ.get('EMBEDDED_WALLET_KEY_CACHE_SIZE', '1024'))
+        )
+        self._derive_executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get('EMBEDDED_WALLET_DERIVE_WORKERS', '2')),
+            thread_name_prefix='wallet-derive'
+        )
+        self._derive_timeout = int(os.environ.get('EMBEDDED_WALLET_DERIVE_TIMEOUT', '10'))
+        self._inflight: Dict[str, object] = {}
+        self._inflight_lock = threading.Lock()
+
         # Policy configuration
         self.default_policies = {
             'daily_limit_usd': 1000,
@@ -75,15 +143,12 @@ class EmbeddedWalletService:
             Wallet details including address and JWT token
         """
         try:
-            # Generate deterministic seed from identifier (TEE-secured in production)
-            seed = self._generate_seed(identifier)
-            
-            # Create account from seed
-            account = Account.from_key(seed)
+            # Derive deterministic wallet from identifier (TEE-secured in production)
+            _, address = self._derive_wallet(identifier)
             
             # Store wallet metadata (in production, this would be in secure storage)
             wallet_data = {
-                'address': account.address,
+                'address': address,
                 'identifier': identifier,
                 'auth_method': auth_method,
                 'created_at': datetime.now(timezone.utc).isoformat(),
@@ -93,11 +158,11 @@ class EmbeddedWalletService:
             # Generate JWT for session
             token = self._generate_jwt(wallet_data)
             
-            logger.info(f"Created embedded wallet for {identifier}: {account.address}")
+            logger.info(f"Created embedded wallet for {identifier}: {address}")
             
             return {
                 'success': True,
-                'wallet_address': account.address,
+                'wallet_address': address,
                 'token': token,
                 'auth_method': auth_method
             }
@@ -128,12 +193,11 @@ class EmbeddedWalletService:
                     'error': 'Invalid verification code'
                 }
             
-            # Generate seed and recover wallet
-            seed = self._generate_seed(identifier)
-            account = Account.from_key(seed)
+            # Recover wallet
+            _, address = self._derive_wallet(identifier)
             
             wallet_data = {
-                'address': account.address,
+                'address': address,
                 'identifier': identifier,
                 'authenticated_at': datetime.now(timezone.utc).isoformat()
             }
@@ -142,7 +206,7 @@ class EmbeddedWalletService:
             
             return {
                 'success': True,
-                'wallet_address': account.address,
+                'wallet_address': address,
                 'token': token
             }
             
@@ -165,9 +229,8 @@ class EmbeddedWalletService:
             True if user owns the wallet
         """
         try:
-            seed = self._generate_seed(identifier)
-            account = Account.from_key(seed)
-            return account.address.lower() == wallet_address.lower()
+            _, address = self._derive_wallet(identifier)
+            return address.lower() == wallet_address.lower()
         except:
             return False
     
@@ -272,7 +335,7 @@ class EmbeddedWalletService:
         """
         try:
             # Check compliance
-            seed = self._generate_seed(identifier)
+            seed, _ = self._derive_wallet(identifier)
             account = Account.from_key(seed)
             
             compliance = self.check_transaction_compliance(account.address, tx_data)
@@ -312,6 +375,34 @@ class EmbeddedWalletService:
                 'error': str(e)
             }
     
+    def _derive_wallet(self, identifier: str) -> Tuple[bytes, str]:
+        """
+        Private key and address for an identifier
+
+        Served from the in-memory key cache when warm. Otherwise derived on
+        the bounded executor; concurrent requests for the same identifier
+        wait on a single derivation.
+        """
+        cached = self._key_cache.get(identifier)
+        if cached:
+            return cached
+        with self._inflight_lock:
+            future = self._inflight.get(identifier)
+            if future is None:
+                future = self._derive_executor.submit(self._derive_cold, identifier)
+                self._inflight[identifier] = future
+        return future.result(timeout=self._derive_timeout)
+
+    def _derive_cold(self, identifier: str) -> Tuple[bytes, str]:
+        try:
+            seed = self._generate_seed(identifier)
+            address = Account.from_key(seed).address
+            self._key_cache.put(identifier, seed, address)
+            return seed, address
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(identifier, None)
+
     def _generate_seed(self, identifier: str) -> bytes:
         """
         Generate deterministic seed from identifier.
@@ -0,0 +1,245 @@
+"""
+EIP-1559 fee oracle built on eth_feeHistory reward percentiles.
+
+A single background refresher samples the last FEE_HISTORY_BLOCKS blocks and
+publishes one snapshot with slow/standard/fast maxFeePerGas and
+maxPriorityFeePerGas values. The snapshot is kept in process memory and
+mirrored to Redis (CacheManager.gas_price_key) so every worker and request
+path reads the same numbers without its own gas RPC.
+
+Tiers:
+    priority fee = median over recent non-empty blocks of the tier's
+                   reward percentile (slow=10th, standard=50th, fast=90th)
+    max fee      = BASE_FEE_MULTIPLIER * next block base fee + priority fee
+"""
+
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+TIERS = ('slow', 'standard', 'fast')
+REWARD_PERCENTILES = [10, 50, 90]
+
+# Headroom for base fee growth (+12.5% per full block) before the tx is mined
+BASE_FEE_MULTIPLIER = 2
+
+# Used only if the RPC has never answered; BASE fees are typically sub-gwei
+DEFAULT_BASE_FEE = 1000000000  # 1 gwei
+DEFAULT_PRIORITY_FEES = {
+    'slow': 800000,        # 0.0008 gwei
+    'standard': 1000000,   # 0.001 gwei
+    'fast': 1200000,       # 0.0012 gwei
+}
+
+
+class FeeOracle:
+    """Cached EIP-1559 fee estimates refreshed in the background."""
+
+    def __init__(
+        self,
+        blockchain=None,
+        cache=None,
+        block_count: int = 20,
+        refresh_interval: int = 10,
+        max_age: int = 60,
+    ):
+        self._blockchain = blockchain
+        self._cache = cache
+        self.block_count = block_count
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def blockchain(self):
+        """Lazily create the blockchain service (avoids RPC setup at import)."""
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            from services.cache_manager import cache_manager
+            self._cache = cache_manager
+        return self._cache
+
+    # -------------------------------------------------------------------------
+    # Snapshot computation
+    # -------------------------------------------------------------------------
+
+    def refresh(self) -> Dict[str, Any]:
+        """Fetch fee history, compute a new snapshot and publish it."""
+        history = self.blockchain.w3.eth.fee_history(
+            self.block_count, 'latest', REWARD_PERCENTILES
+        )
+        snapshot = self.compute_snapshot(history)
+        with self._lock:
+            self._snapshot = snapshot
+        self.cache.set(self.cache.gas_price_key(), snapshot, ttl=self.max_age)
+        return snapshot
+
+    @staticmethod
+    def compute_snapshot(history: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn an eth_feeHistory result into tiered EIP-1559 fees.
+
+        baseFeePerGas has block_count + 1 entries; the last is the base fee
+        of the next (pending) block, which is what a new tx will pay.
+        """
+        base_fees: List[int] = list(history['baseFeePerGas'])
+        next_base_fee = int(base_fees[-1])
+        rewards = history.get('reward') or []
+        ratios = history.get('gasUsedRatio') or [1] * len(rewards)
+
+        # Empty blocks report zero rewards and would drag the median down
+        sampled = [r for r, ratio in zip(rewards, ratios) if ratio > 0]
+
+        snapshot: Dict[str, Any] = {
+            'base_fee': next_base_fee,
+            'block_number': int(history.get('oldestBlock', 0)) + len(rewards),
+            'updated_at': time.time(),
+            'source': 'fee_history',
+        }
+        for column, tier in enumerate(TIERS):
+            if sampled:
+                priority = int(statistics.median(int(r[column]) for r in sampled))
+            else:
+                priority = DEFAULT_PRIORITY_FEES[tier]
+            snapshot[tier] = {
+                'max_priority_fee_per_gas': priority,
+                'max_fee_per_gas': BASE_FEE_MULTIPLIER * next_base_fee + priority,
+            }
+
+        # Percentiles can cross when blocks are sparse; keep tiers ordered
+        for lower, higher in (('slow', 'standard'), ('standard', 'fast')):
+            for field in ('max_priority_fee_per_gas', 'max_fee_per_gas'):
+                if snapshot[higher][field] < snapshot[lower][field]:
+                    snapshot[higher][field] = snapshot[lower][field]
+        return snapshot
+
+    @staticmethod
+    def default_snapshot() -> Dict[str, Any]:
+        """Static fallback snapshot used before the first successful refresh."""
+        snapshot: Dict[str, Any] = {
+            'base_fee': DEFAULT_BASE_FEE,
+            'block_number': None,
+            'updated_at': 0,
+            'source': 'default',
+        }
+        for tier in TIERS:
+            priority = DEFAULT_PRIORITY_FEES[tier]
+            snapshot[tier] = {
+                'max_priority_fee_per_gas': priority,
+                'max_fee_per_gas': BASE_FEE_MULTIPLIER * DEFAULT_BASE_FEE + priority,
+            }
+        return snapshot
+
+    # -------------------------------------------------------------------------
+    # Read API (no RPC on the hot path once the refresher is running)
+    # -------------------------------------------------------------------------
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Return the freshest available snapshot.
+
+        Order: in-process copy, shared Redis copy, synchronous refresh (only
+        when nothing fresh exists, e.g. the refresher is not running here),
+        then the static default.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot and time.time() - snapshot['updated_at'] < self.max_age:
+            return snapshot
+
+        shared = self.cache.get(self.cache.gas_price_key())
+        if shared and shared.get('source') == 'fee_history':
+            with self._lock:
+                self._snapshot = shared
+            return shared
+
+        try:
+            return self.refresh()
+        except Exception as e:
+            logger.warning("Fee history refresh failed", error=str(e))
+            return snapshot or self.default_snapshot()
+
+    def get_fees(self, tier: str = 'standard') -> Dict[str, int]:
+        """maxFeePerGas / maxPriorityFeePerGas for one tier."""
+        return self.get_snapshot()[tier]
+
+    def tx_fee_params(self, tier: str = 'standard') -> Dict[str, int]:
+        """Fee fields for a type-2 transaction dict (build_transaction)."""
+        fees = self.get_fees(tier)
+        return {
+            'maxFeePerGas': fees['max_fee_per_gas'],
+            'maxPriorityFeePerGas': fees['max_priority_fee_per_gas'],
+        }
+
+    def effective_gas_prices(self) -> Dict[str, int]:
+        """Expected per-gas price paid in each tier (base fee + tip).
+
+        This is what a transaction actually costs, as opposed to the
+        maxFeePerGas ceiling, and backs legacy slow/standard/fast callers.
+        """
+        snapshot = self.get_snapshot()
+        return {
+            tier: snapshot['base_fee'] + snapshot[tier]['max_priority_fee_per_gas']
+            for tier in TIERS
+        }
+
+    # -------------------------------------------------------------------------
+    # Background refresh
+    # -------------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background refresher thread (idempotent per process)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+        logger.info("Fee oracle started", refresh_interval=self.refresh_interval)
+
+    def stop(self) -> None:
+        """Stop the background refresher thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.debug("Fee oracle refresh failed", error=str(e))
+            self._stop.wait(self.refresh_interval)
+
+
+def get_fee_oracle() -> FeeOracle:
+    """Get or create the fee oracle singleton with config values."""
+    global _fee_oracle
+    if _fee_oracle is None:
+        try:
+            from config_chain import chain_config
+
+            _fee_oracle = FeeOracle(
+                block_count=getattr(chain_config, "FEE_HISTORY_BLOCKS", 20),
+                refresh_interval=getattr(chain_config, "FEE_ORACLE_REFRESH_INTERVAL", 10),
+                max_age=getattr(chain_config, "FEE_ORACLE_MAX_AGE", 60),
+            )
+        except Exception as e:
+            logger.warning("Failed to load config, using defaults", error=str(e))
+            _fee_oracle = FeeOracle()
+    return _fee_oracle
+
+
+_fee_oracle: Optional[FeeOracle] = None
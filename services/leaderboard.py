@@ -0,0 +1,293 @@
+"""
+Incremental leaderboards for PredictionMarketV2 predictors.
+
+Every MarketResolved event adds each submitter's result to per-wallet
+counters in Redis:
+
+- entries, wins
+- stake and winnings, in gwei so HINCRBY stays within 64 bits
+- the sum of normalized distances, i.e. byte-level Levenshtein distance
+  divided by the longer of the two texts
+
+The counters live in an all-time hash and in a per-day bucket keyed by
+the market's end time. The touched wallets are then re-scored into sorted
+sets, one per (window, metric, cohort):
+
+    leaderboard:board:<all|7d|30d>:<winnings|win_rate|distance|roi>:<all|agent|human>
+
+A read is a single ZRANGE, O(log n + K). Rolling windows are kept current
+by roll_windows(): once a day leaves a window, it re-scores the wallets
+that were active on that day. Wallets listed in AI_AGENT_WALLETS, or
+registered by an admin through register_agent(), rank in the agent cohort;
+everyone else ranks in the human cohort.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import redis
+from web3 import Web3
+
+from services.payout_simulator import contract_distance, simulate_market
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+APPLIED_KEY = "leaderboard:applied"
+AGENTS_KEY = "leaderboard:agents"
+ROLLED_KEY = "leaderboard:rolled_day"
+STATS_PREFIX = "leaderboard:stats:"
+DAY_WALLETS_PREFIX = "leaderboard:day_wallets:"
+BOARD_PREFIX = "leaderboard:board:"
+
+METRICS = ('winnings', 'win_rate', 'distance', 'roi')
+ASCENDING_METRICS = ('distance',)   # lower is better
+RATIO_METRICS = ('win_rate', 'distance', 'roi')
+WINDOWS = {'all': None, '7d': 7, '30d': 30}
+COHORTS = ('all', 'agent', 'human')
+
+DAY = 86400
+GWEI = 10 ** 9
+COUNTERS = ('entries', 'wins', 'staked_gwei', 'winnings_gwei', 'distance_sum')
+
+
+def normalized_distance(predicted: str, actual: str) -> float:
+    """Contract distance scaled to [0, 1] by the longer text's byte length."""
+    longest = max(len(predicted.encode('utf-8')), len(actual.encode('utf-8')), 1)
+    return contract_distance(predicted, actual) / longest
+
+
+def score_stats(stats: Dict[str, float], min_entries: int = 1) -> Dict[str, Optional[float]]:
+    """Metric scores for one wallet's counters; ratio metrics need min_entries."""
+    entries = stats.get('entries', 0)
+    if not entries:
+        return {metric: None for metric in METRICS}
+    staked = stats.get('staked_gwei', 0) / GWEI
+    winnings = stats.get('winnings_gwei', 0) / GWEI
+    scores = {
+        'winnings': winnings,
+        'win_rate': stats.get('wins', 0) / entries,
+        'distance': stats.get('distance_sum', 0) / entries,
+        'roi': (winnings - staked) / staked if staked else None,
+    }
+    if entries < min_entries:
+        for metric in RATIO_METRICS:
+            scores[metric] = None
+    return scores
+
+
+def _board_key(window: str, metric: str, cohort: str) -> str:
+    return f"{BOARD_PREFIX}{window}:{metric}:{cohort}"
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class LeaderboardEngine:
+    """Maintains predictor leaderboards from MarketResolved events."""
+
+    def __init__(
+        self,
+        blockchain=None,
+        redis_client: Optional[redis.Redis] = None,
+        agent_wallets: Iterable[str] = (),
+        min_entries: int = 3,
+    ):
+        self._blockchain = blockchain
+        self._redis = redis_client
+        self.agent_wallets = {a.lower() for a in agent_wallets}
+        self.min_entries = min_entries
+        self.bucket_ttl = (max(n for n in WINDOWS.values() if n) + 2) * DAY
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    # -------------------------------------------------------------------------
+    # Updates
+    # -------------------------------------------------------------------------
+
+    def on_market_resolved(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler: fold a resolved market into the counters."""
+        args = event['args']
+        self.apply_resolution(args['marketId'], args['actualText'])
+
+    def apply_resolution(self, market_id: int, actual_text: str, now: Optional[float] = None) -> List[str]:
+        """Count one resolved market once. Returns the wallets that were re-scored."""
+        if self.redis.sismember(APPLIED_KEY, market_id):
+            return []
+        market = self.blockchain.get_v2_market_snapshots([market_id]).get(market_id)
+        if not market or not market['resolved']:
+            logger.warning("Resolved market not readable for leaderboard", market_id=market_id)
+            return []
+
+        payouts = {p['submission_id']: p['payout'] for p in simulate_market(market)['payouts']}
+        day = market['end_time'] // DAY
+        pipe = self.redis.pipeline(transaction=True)
+        wallets = set()
+        for submission in market['submissions']:
+            wallet = submission['submitter'].lower()
+            wallets.add(wallet)
+            payout = payouts.get(submission['id']) or 0
+            increments = {
+                'entries': 1,
+                'wins': int(submission['id'] == market['winning_submission_id']),
+                'staked_gwei': submission['amount'] // GWEI,
+                'winnings_gwei': payout // GWEI,
+            }
+            distance = normalized_distance(submission['predicted_text'], actual_text)
+            for key in (f"{STATS_PREFIX}all:{wallet}", f"{STATS_PREFIX}day:{day}:{wallet}"):
+                for field, amount in increments.items():
+                    pipe.hincrby(key, field, amount)
+                pipe.hincrbyfloat(key, 'distance_sum', distance)
+            pipe.expire(f"{STATS_PREFIX}day:{day}:{wallet}", self.bucket_ttl)
+            pipe.sadd(DAY_WALLETS_PREFIX + str(day), wallet)
+        pipe.expire(DAY_WALLETS_PREFIX + str(day), self.bucket_ttl)
+        pipe.sadd(APPLIED_KEY, market_id)
+        pipe.execute()
+
+        self.rescore(wallets, now=now)
+        return sorted(wallets)
+
+    def rescore(self, wallets: Iterable[str], windows: Iterable[str] = tuple(WINDOWS),
+                now: Optional[float] = None) -> None:
+        """Recompute board entries of the given wallets from their counters."""
+        today = int(now if now is not None else time.time()) // DAY
+        wallets = list(wallets)
+        agents = self._agents(wallets)
+        pipe = self.redis.pipeline()
+        for wallet in wallets:
+            cohorts = ('all', 'agent' if wallet in agents else 'human')
+            for window in windows:
+                scores = score_stats(self._window_stats(wallet, window, today), self.min_entries)
+                for metric, score in scores.items():
+                    for cohort in cohorts:
+                        key = _board_key(window, metric, cohort)
+                        if score is None:
+                            pipe.zrem(key, wallet)
+                        else:
+                            pipe.zadd(key, {wallet: score})
+        pipe.execute()
+
+    def _window_stats(self, wallet: str, window: str, today: int) -> Dict[str, float]:
+        days = WINDOWS[window]
+        if days is None:
+            keys = [f"{STATS_PREFIX}all:{wallet}"]
+        else:
+            keys = [f"{STATS_PREFIX}day:{day}:{wallet}" for day in range(today - days + 1, today + 1)]
+        pipe = self.redis.pipeline()
+        for key in keys:
+            pipe.hgetall(key)
+        totals: Dict[str, float] = {}
+        for bucket in pipe.execute():
+            for field, value in bucket.items():
+                field = _decode(field)
+                totals[field] = totals.get(field, 0) + float(_decode(value))
+        return totals
+
+    def roll_windows(self, now: Optional[float] = None) -> int:
+        """Re-score wallets whose oldest day just left a rolling window.
+
+        Idempotent and catches up on missed days; safe to call from any
+        periodic task. Missed days are re-scored as of now, so activity
+        after them stays counted. Returns the number of wallet re-scores.
+        """
+        now = now if now is not None else time.time()
+        today = int(now) // DAY
+        last = self.redis.get(ROLLED_KEY)
+        if last is None:
+            self.redis.set(ROLLED_KEY, today)
+            return 0
+        rescored = 0
+        for window, days in WINDOWS.items():
+            if days is None:
+                continue
+            wallets = set()
+            for day in range(int(last) + 1, today + 1):
+                wallets.update(_decode(w) for w in self.redis.smembers(DAY_WALLETS_PREFIX + str(day - days)))
+            if wallets:
+                self.rescore(sorted(wallets), windows=(window,), now=now)
+                rescored += len(wallets)
+        self.redis.set(ROLLED_KEY, today)
+        return rescored
+
+    # -------------------------------------------------------------------------
+    # Cohorts
+    # -------------------------------------------------------------------------
+
+    def _agents(self, wallets: List[str]) -> set:
+        pipe = self.redis.pipeline()
+        for wallet in wallets:
+            pipe.sismember(AGENTS_KEY, wallet)
+        return {w for w, member in zip(wallets, pipe.execute()) if member or w in self.agent_wallets}
+
+    def register_agent(self, address: str) -> None:
+        """Move a wallet into the AI-agent cohort (POST /api/admin/agents/<address>)."""
+        wallet = Web3.to_checksum_address(address).lower()
+        if not self.redis.sadd(AGENTS_KEY, wallet):
+            return
+        pipe = self.redis.pipeline()
+        for window in WINDOWS:
+            for metric in METRICS:
+                pipe.zrem(_board_key(window, metric, 'human'), wallet)
+        pipe.execute()
+        self.rescore([wallet])
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def top(self, metric: str = 'winnings', window: str = 'all', cohort: str = 'all',
+            limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """Top wallets on one board, best first."""
+        if limit < 0 or offset < 0:
+            # ZRANGE reads a negative end as counting from the tail: the whole board
+            raise ValueError("limit and offset must not be negative")
+        key = _board_key(window, metric, cohort)
+        end = offset + limit - 1
+        if metric in ASCENDING_METRICS:
+            rows = self.redis.zrange(key, offset, end, withscores=True)
+        else:
+            rows = self.redis.zrevrange(key, offset, end, withscores=True)
+        return [
+            {'rank': offset + i + 1, 'address': Web3.to_checksum_address(_decode(wallet)), 'score': score}
+            for i, (wallet, score) in enumerate(rows)
+        ]
+
+    def rank(self, address: str, metric: str = 'winnings', window: str = 'all',
+             cohort: str = 'all') -> Optional[Dict[str, Any]]:
+        """A wallet's 1-based rank and score on one board, or None if unranked."""
+        key = _board_key(window, metric, cohort)
+        wallet = address.lower()
+        position = (self.redis.zrank(key, wallet) if metric in ASCENDING_METRICS
+                    else self.redis.zrevrank(key, wallet))
+        if position is None:
+            return None
+        return {'rank': position + 1, 'score': self.redis.zscore(key, wallet),
+                'size': self.redis.zcard(key)}
+
+
+def get_leaderboard() -> LeaderboardEngine:
+    """Get or create the process-wide leaderboard engine."""
+    global _leaderboard
+    if _leaderboard is None:
+        from config_chain import chain_config
+        _leaderboard = LeaderboardEngine(
+            agent_wallets=chain_config.AI_AGENT_WALLETS,
+            min_entries=chain_config.LEADERBOARD_MIN_ENTRIES,
+        )
+    return _leaderboard
+
+
+_leaderboard: Optional[LeaderboardEngine] = None
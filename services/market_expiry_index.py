@@ -0,0 +1,115 @@
+"""
+Expiry-ordered index of unresolved PredictionMarketV2 markets.
+
+Unresolved markets live in a Redis sorted set scored by end_time, so
+"expired and not yet resolved" is a ZRANGEBYSCORE over the expired prefix
+(O(log n + k)) instead of one RPC per market ever created. The index is fed
+by the chain indexer (MarketCreated adds, MarketResolved removes) and
+topped up by sync(), which only reads market ids created since the last
+sync. Any market found resolved on read is dropped, so a missed event
+self-heals the next time it comes up.
+
+Keys:
+    markets:v2:expiry         zset: market_id -> end_time (unresolved only)
+    markets:v2:expiry:synced  number of market ids already synced
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import redis
+
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+EXPIRY_KEY = "markets:v2:expiry"
+SYNCED_KEY = "markets:v2:expiry:synced"
+
+
+class MarketExpiryIndex:
+    """Redis sorted set of unresolved market ids ordered by end_time."""
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    def add(self, market_id: int, end_time: int) -> None:
+        self.redis.zadd(EXPIRY_KEY, {str(market_id): int(end_time)})
+
+    def remove(self, market_id: int) -> None:
+        self.redis.zrem(EXPIRY_KEY, str(market_id))
+
+    def sync(self, blockchain) -> Dict[int, Dict[str, Any]]:
+        """Index markets created since the last sync.
+
+        Returns the markets read from chain, keyed by id, so callers can
+        reuse them instead of fetching again.
+        """
+        synced = int(self.redis.get(SYNCED_KEY) or 0)
+        market_count = blockchain.get_v2_market_count()
+        fetched: Dict[int, Dict[str, Any]] = {}
+        if market_count <= synced:
+            return fetched
+
+        pipe = self.redis.pipeline()
+        for market_id in range(synced, market_count):
+            market = blockchain.get_v2_market(market_id)
+            if market is None:
+                # Stop at the first unreadable market and retry it next sync
+                market_count = market_id
+                break
+            fetched[market_id] = market
+            if not market['resolved']:
+                pipe.zadd(EXPIRY_KEY, {str(market_id): int(market['end_time'])})
+        pipe.set(SYNCED_KEY, market_count)
+        pipe.execute()
+
+        logger.info("Market expiry index synced", from_id=synced, to_id=market_count)
+        return fetched
+
+    def expired(self, now: Optional[int] = None, limit: Optional[int] = None) -> List[int]:
+        """Unresolved market ids with end_time < now, oldest first."""
+        now = int(time.time()) if now is None else int(now)
+        return self._range('-inf', f'({now}', limit)
+
+    def ending_within(self, seconds: int, now: Optional[int] = None,
+                      limit: Optional[int] = None) -> List[int]:
+        """Unresolved market ids ending in [now, now + seconds], soonest first."""
+        now = int(time.time()) if now is None else int(now)
+        return self._range(now, now + int(seconds), limit)
+
+    def _range(self, low, high, limit: Optional[int]) -> List[int]:
+        if limit is None:
+            members = self.redis.zrangebyscore(EXPIRY_KEY, low, high)
+        else:
+            members = self.redis.zrangebyscore(EXPIRY_KEY, low, high, start=0, num=limit)
+        return [int(m) for m in members]
+
+    def size(self) -> int:
+        return self.redis.zcard(EXPIRY_KEY)
+
+    def on_market_created(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler for MarketCreated."""
+        self.add(event['args']['marketId'], event['args']['endTime'])
+
+    def on_market_resolved(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler for MarketResolved."""
+        self.remove(event['args']['marketId'])
+
+
+def get_market_expiry_index() -> MarketExpiryIndex:
+    """Get or create the process-wide market expiry index."""
+    global _market_expiry_index
+    if _market_expiry_index is None:
+        _market_expiry_index = MarketExpiryIndex()
+    return _market_expiry_index
+
+
+_market_expiry_index: Optional[MarketExpiryIndex] = None
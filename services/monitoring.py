@@ -16,7 +16,11 @@ from web3 import Web3
 from web3.eth import Contract
 
 from services.blockchain_base import BaseBlockchainService
+from services.fee_oracle import get_fee_oracle
 from services.xcom_api_service import XComAPIService
+from services.xcom_scheduler import get_xcom_scheduler
+from services.task_metrics import get_task_metrics
+from config_chain import chain_config
 from config import Config
 
 logger = logging.getLogger(__name__)
@@ -36,7 +40,8 @@ class MonitoringService:
             'oracle_consensus': {'failures': 0, 'total': 0, 'alert_sent': False},
             'xcom_api': {'rate_limit_remaining': 100, 'reset_time': None, 'alert_sent': False},
             'screenshot_storage': {'used_mb': 0, 'total_screenshots': 0, 'alert_sent': False},
-            'contract_events': {'last_check': None, 'events_processed': 0, 'gas_spikes': 0, 'consensus_failures': 0}
+            'contract_events': {'last_check': None, 'events_processed': 0, 'gas_spikes': 0, 'consensus_failures': 0},
+            'background_tasks': {'tasks': {}, 'backlog': {}, 'alert_sent': False}
         }
         self.app = None
         
@@ -92,6 +97,7 @@ class MonitoringService:
                 # Process accumulated metrics (no database)
                 self._monitor_oracle_consensus()
                 self._monitor_screenshot_storage()
+                self._monitor_background_tasks()
                 self._log_metrics()  # Log instead of saving to DB
                 
                 # Sleep for monitoring interval
@@ -104,8 +110,8 @@ class MonitoringService:
     def _monitor_gas_prices(self):
         """Monitor BASE gas prices and alert if above threshold"""
         try:
-            # Get current gas price from BASE
-            current_gas_price = self.blockchain_service.w3.eth.gas_price
+            # Read the shared fee oracle snapshot (no separate gas RPC)
+            current_gas_price = get_fee_oracle().effective_gas_prices()['standard']
             gas_price_gwei = Web3.from_wei(current_gas_price, 'gwei')
             
             self.metrics['gas_price']['current'] = float(gas_price_gwei)
@@ -189,24 +195,38 @@ class MonitoringService:
             logger.error(f"Error processing contract monitoring results: {e}")
     
     def _monitor_xcom_api_limits(self):
-        """Monitor X.com API rate limits"""
+        """Monitor X.com API rate limits and daily credit spend"""
         try:
-            # For now, we'll track API usage through the X.com service
-            # In production, this would query the actual rate limit status
-            # from the Twitter API v2 rate_limit_status endpoint
+            # Limits observed from real response headers by the shared scheduler
+            status = get_xcom_scheduler().get_status()
+            endpoints = status['endpoints']
             
-            # Default values for monitoring
             remaining = self.metrics['xcom_api'].get('rate_limit_remaining', 100)
             reset_time = self.metrics['xcom_api'].get('reset_time')
-            
-            # TODO: When X.com API is fully configured, implement:
-            # if self.xcom_service.client and hasattr(self.xcom_service.client, 'rate_limit_status'):
-            #     rate_limit_info = self.xcom_service.client.rate_limit_status()
-            #     remaining = rate_limit_info.get('remaining', 100)
-            #     reset_time = rate_limit_info.get('reset_time')
+            if endpoints:
+                # Report the most constrained endpoint
+                endpoint, tightest = min(endpoints.items(), key=lambda item: item[1]['remaining'])
+                remaining = tightest['remaining']
+                reset_time = tightest['reset_at']
+                self.metrics['xcom_api']['tightest_endpoint'] = endpoint
             
             self.metrics['xcom_api']['rate_limit_remaining'] = remaining
             self.metrics['xcom_api']['reset_time'] = reset_time
+            self.metrics['xcom_api']['endpoints'] = endpoints
+            self.metrics['xcom_api']['credits_used'] = status['credits']['used']
+            self.metrics['xcom_api']['credit_budget'] = status['credits']['budget']
+            
+            credits = status['credits']
+            if credits['budget'] and credits['used'] >= 0.9 * credits['budget']:
+                if not self.metrics['xcom_api'].get('credit_alert_sent'):
+                    self._create_alert(
+                        'XCOM_API_CREDITS',
+                        f'X.com API credits at {credits["used"]}/{credits["budget"]} for today',
+                        'warning'
+                    )
+                    self.metrics['xcom_api']['credit_alert_sent'] = True
+            else:
+                self.metrics['xcom_api']['credit_alert_sent'] = False
             
             # Alert if rate limit is low
             if remaining < 10:
@@ -223,6 +243,29 @@ class MonitoringService:
         except Exception as e:
             logger.error(f"Error monitoring X.com API limits: {e}")
     
+    def _monitor_background_tasks(self):
+        """Monitor Celery task durations and queue backlog"""
+        try:
+            task_metrics = get_task_metrics().get_metrics()
+            self.metrics['background_tasks']['tasks'] = task_metrics['tasks']
+            self.metrics['background_tasks']['backlog'] = task_metrics['backlog']
+            
+            backed_up = {queue: depth for queue, depth in task_metrics['backlog'].items()
+                         if depth > chain_config.TASK_BACKLOG_ALERT}
+            if backed_up:
+                if not self.metrics['background_tasks']['alert_sent']:
+                    self._create_alert(
+                        'TASK_BACKLOG',
+                        f'Background task queues backed up: {backed_up}',
+                        'warning'
+                    )
+                    self.metrics['background_tasks']['alert_sent'] = True
+            else:
+                self.metrics['background_tasks']['alert_sent'] = False
+                
+        except Exception as e:
+            logger.debug(f"Error monitoring background tasks: {e}")
+    
     def _monitor_screenshot_storage(self):
         """Monitor screenshot storage (chain-only, tracking IPFS/on-chain references)"""
         try:
@@ -12,6 +12,7 @@ from services.node_communication import NodeCommunicationService
 from services.text_analysis import TextAnalysisService
 from services.blockchain_base import BaseBlockchainService
 from services.xcom_api_service import XComAPIService
+from services.xcom_scheduler import PRIORITY_RESOLUTION
 from config import Config
 import requests
 from io import BytesIO
@@ -138,7 +139,7 @@ class XcomOracleService:
             # Try API verification first
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            tweet_data = loop.run_until_complete(self.xcom_api.fetch_tweet_by_id(tweet_id))
+            tweet_data = loop.run_until_complete(self.xcom_api.fetch_tweet_by_id(tweet_id, priority=PRIORITY_RESOLUTION))
             loop.close()
             
             if tweet_data:
@@ -0,0 +1,247 @@
+"""
+Off-chain payout engine for PredictionMarketV2.
+
+Mirrors the contract exactly, in integer wei:
+
+- resolveMarket: the winner is the submission with the smallest byte-level
+  Levenshtein distance to the actual text; ties go to the earliest
+  submission (strict less-than over marketSubmissions order).
+- claimPayout: the winner takes the whole pool minus
+  fee = totalPool * PLATFORM_FEE_BPS // 10000; every other submission gets 0.
+- refundSingleSubmission: a market that ends with one submission refunds
+  its full stake with no fee.
+- emergencyWithdraw: the owner can close a market that was never resolved
+  (7 days after end). Every stake is refunded with no fee. The market is
+  marked resolved and claimed but keeps winningSubmissionId 0, and no
+  MarketResolved is emitted.
+
+Wei amounts exceed int64, so the math uses Python integers rather than
+NumPy arrays; many markets are simulated from one batched chain read
+(BaseBlockchainService.get_v2_market_snapshots). verify() checks the
+engine against on-chain MarketResolved and PayoutClaimed events.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import Levenshtein
+
+from services.chain_indexer import get_logs_paged, resolve_start_block
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PLATFORM_FEE_BPS = 700
+BPS_DENOMINATOR = 10000
+MIN_SUBMISSIONS = 2
+
+STATUS_EMPTY = 'empty'            # no submissions
+STATUS_OPEN = 'open'              # unresolved, no actual text to simulate with
+STATUS_SIMULATED = 'simulated'    # unresolved, winner picked from a hypothetical actual text
+STATUS_RESOLVED = 'resolved'      # resolved on chain
+STATUS_REFUND = 'refund'          # single submission, full stake returned
+STATUS_EMERGENCY_REFUND = 'emergency_refund'  # closed by emergencyWithdraw, every stake returned
+
+
+def contract_distance(a: str, b: str) -> int:
+    """Levenshtein distance over UTF-8 bytes, as levenshteinDistance() computes it."""
+    return Levenshtein.distance(a.encode('utf-8'), b.encode('utf-8'))
+
+
+def pick_winner(submissions: List[Dict[str, Any]], actual_text: str) -> Tuple[int, int]:
+    """(winning submission id, distance) with the contract's first-submitter tie-break."""
+    winner_id, best = None, None
+    for submission in submissions:
+        distance = contract_distance(submission['predicted_text'], actual_text)
+        if best is None or distance < best:
+            winner_id, best = submission['id'], distance
+    return winner_id, best
+
+
+def platform_fee(total_pool: int, fee_bps: int = PLATFORM_FEE_BPS) -> int:
+    return total_pool * fee_bps // BPS_DENOMINATOR
+
+
+def is_emergency_refunded(market: Dict[str, Any]) -> bool:
+    """True for a competitive market closed by emergencyWithdraw rather than resolveMarket.
+
+    Its winningSubmissionId is still 0, which is not one of its submissions
+    unless it holds submission 0. In that case every submission being
+    claimed gives it away: after a real resolution only the winner can claim.
+    """
+    submissions = market['submissions']
+    if not market['resolved'] or len(submissions) < MIN_SUBMISSIONS:
+        return False
+    if market['winning_submission_id'] not in {s['id'] for s in submissions}:
+        return True
+    return all(s['claimed'] for s in submissions)
+
+
+def simulate_market(market: Dict[str, Any], actual_text: Optional[str] = None,
+                    fee_bps: int = PLATFORM_FEE_BPS) -> Dict[str, Any]:
+    """Payout for every submission of one market.
+
+    `market` is a snapshot in wei as returned by get_v2_market_snapshots.
+    For an unresolved market, pass actual_text to see who would win;
+    without it, each row carries payout_if_wins instead.
+    """
+    submissions = market['submissions']
+    total_pool = market['total_pool']
+    fee = platform_fee(total_pool, fee_bps)
+    result = {
+        'market_id': market['id'],
+        'status': None,
+        'total_pool': total_pool,
+        'fee': 0,
+        'winning_submission_id': None,
+        'winning_distance': None,
+        'payouts': [],
+    }
+
+    if not submissions:
+        result['status'] = STATUS_EMPTY
+        return result
+
+    if len(submissions) < MIN_SUBMISSIONS:
+        result['status'] = STATUS_REFUND
+        result['payouts'] = [_row(s, s['amount']) for s in submissions]
+        return result
+
+    if is_emergency_refunded(market):
+        result['status'] = STATUS_EMERGENCY_REFUND
+        result['payouts'] = [_row(s, s['amount']) for s in submissions]
+        return result
+
+    if market['resolved']:
+        result['status'] = STATUS_RESOLVED
+        winner_id = market['winning_submission_id']
+        winner = next((s for s in submissions if s['id'] == winner_id), None)
+        if winner is not None and actual_text is not None:
+            result['winning_distance'] = contract_distance(winner['predicted_text'], actual_text)
+    elif actual_text is not None:
+        result['status'] = STATUS_SIMULATED
+        winner_id, result['winning_distance'] = pick_winner(submissions, actual_text)
+    else:
+        result['status'] = STATUS_OPEN
+        result['payouts'] = [dict(_row(s, None), payout_if_wins=total_pool - fee) for s in submissions]
+        return result
+
+    result['fee'] = fee
+    result['winning_submission_id'] = winner_id
+    result['payouts'] = [_row(s, total_pool - fee if s['id'] == winner_id else 0) for s in submissions]
+    return result
+
+
+def _row(submission: Dict[str, Any], payout: Optional[int]) -> Dict[str, Any]:
+    return {
+        'submission_id': submission['id'],
+        'submitter': submission['submitter'],
+        'stake': submission['amount'],
+        'payout': payout,
+        'profit': payout - submission['amount'] if payout is not None else None,
+        'claimed': submission['claimed'],
+    }
+
+
+class PayoutSimulator:
+    """Loads market snapshots from chain and runs the payout engine over them."""
+
+    def __init__(self, blockchain=None, fee_bps: Optional[int] = None):
+        self._blockchain = blockchain
+        self._fee_bps = fee_bps
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def fee_bps(self) -> int:
+        if self._fee_bps is None:
+            self._fee_bps = self.blockchain.get_v2_constants().get('platform_fee_bps', PLATFORM_FEE_BPS)
+        return self._fee_bps
+
+    def simulate(self, market_ids: Iterable[int],
+                 actual_texts: Optional[Dict[int, str]] = None) -> Dict[int, Dict[str, Any]]:
+        """Simulate payouts for many markets from one batched chain read."""
+        actual_texts = actual_texts or {}
+        snapshots = self.blockchain.get_v2_market_snapshots(list(market_ids))
+        return {
+            market_id: simulate_market(market, actual_texts.get(market_id), self.fee_bps)
+            for market_id, market in snapshots.items()
+        }
+
+    def verify(self, market_ids: Iterable[int], from_block: Optional[int] = None) -> Dict[str, Any]:
+        """Check the engine against resolved markets on chain.
+
+        For each resolved market: the stakes must sum to the pool, re-running
+        the winner pick on the emitted actual text must reproduce the
+        on-chain winner and distance, and a claimed payout must equal the
+        simulated one. Event logs are read from the indexer's start block
+        unless from_block is given, INDEXER_MAX_BLOCKS blocks per call.
+        """
+        from config_chain import chain_config
+        if from_block is None:
+            from_block = resolve_start_block(self.blockchain, chain_config.INDEXER_START_BLOCK)
+        step = chain_config.INDEXER_MAX_BLOCKS
+        snapshots = self.blockchain.get_v2_market_snapshots(list(market_ids))
+        refunded = [mid for mid, m in snapshots.items() if is_emergency_refunded(m)]
+        resolved = {mid: m for mid, m in snapshots.items()
+                    if m['resolved'] and len(m['submissions']) >= MIN_SUBMISSIONS and mid not in refunded}
+
+        contract = self.blockchain.contracts['PredictionMarketV2']
+        resolutions = {}
+        claims = {}
+        if resolved:
+            for log in get_logs_paged(self.blockchain, contract.events.MarketResolved(), from_block, step,
+                                      argument_filters={'marketId': list(resolved)}):
+                resolutions[log['args']['marketId']] = log['args']
+            winner_ids = [m['winning_submission_id'] for m in resolved.values()]
+            for log in get_logs_paged(self.blockchain, contract.events.PayoutClaimed(), from_block, step,
+                                      argument_filters={'submissionId': winner_ids}):
+                claims[log['args']['submissionId']] = log['args']['amount']
+
+        mismatches = []
+        for market_id, market in resolved.items():
+            event = resolutions.get(market_id)
+            actual_text = event['actualText'] if event else None
+            simulated = simulate_market(market, actual_text, self.fee_bps)
+            stakes = sum(s['amount'] for s in market['submissions'])
+
+            if stakes != market['total_pool']:
+                mismatches.append({'market_id': market_id, 'check': 'pool',
+                                   'expected': stakes, 'actual': market['total_pool']})
+            if event:
+                winner_id, distance = pick_winner(market['submissions'], actual_text)
+                if winner_id != event['winningSubmissionId'] or distance != event['winningDistance']:
+                    mismatches.append({'market_id': market_id, 'check': 'winner',
+                                       'expected': [winner_id, distance],
+                                       'actual': [event['winningSubmissionId'], event['winningDistance']]})
+            claimed = claims.get(market['winning_submission_id'])
+            if claimed is not None:
+                expected = next((p['payout'] for p in simulated['payouts']
+                                 if p['submission_id'] == market['winning_submission_id']), None)
+                if claimed != expected:
+                    mismatches.append({'market_id': market_id, 'check': 'payout',
+                                       'expected': expected, 'actual': claimed})
+
+        if mismatches:
+            logger.error("Payout simulator disagrees with chain", mismatches=mismatches)
+        return {
+            'checked': len(resolved),
+            'claims_checked': len(claims),
+            'emergency_refunds': len(refunded),
+            'mismatches': mismatches,
+        }
+
+
+def get_payout_simulator() -> PayoutSimulator:
+    """Get or create the process-wide payout simulator."""
+    global _payout_simulator
+    if _payout_simulator is None:
+        _payout_simulator = PayoutSimulator()
+    return _payout_simulator
+
+
+_payout_simulator: Optional[PayoutSimulator] = None
@@ -0,0 +1,271 @@
+"""
+Per-wallet portfolio index for PredictionMarketV2.
+
+A wallet's dashboard used to walk getUserSubmissions, then one
+getSubmissionDetails per id, one getMarketDetails per market and
+pendingFees, serially. build() reads the same data in one pass:
+getUserSubmissions, one JSON-RPC batch of submission details plus
+pendingFees, then get_v2_market_snapshots for the markets involved. From
+that it derives every position: open, won or lost, distance achieved,
+claimable amount.
+
+The result is cached in Redis (portfolio:v2:wallet:<address>) until the
+wallet's next event. Each market the cached portfolio touches lists the
+wallet in portfolio:v2:watchers:<market_id>, so a new submission or a
+resolution in that market drops it as well. Resolved tweet texts, needed
+for distances, are kept in a hash fed by MarketResolved; the chain indexer
+replays it from the deployment block, so every resolved market gets one.
+build() never reads logs itself: until a market's text is in the hash its
+distances are None, and the resolution's event drops the cached portfolio.
+"""
+
+import json
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import redis
+from web3 import Web3
+
+from services.payout_simulator import MIN_SUBMISSIONS, contract_distance, is_emergency_refunded, platform_fee
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+PORTFOLIO_PREFIX = "portfolio:v2:wallet:"
+WATCHERS_PREFIX = "portfolio:v2:watchers:"
+ACTUAL_TEXT_KEY = "portfolio:v2:actual_text"
+
+POSITION_OPEN = 'open'                  # market still accepting submissions
+POSITION_AWAITING = 'awaiting'          # ended, waiting for resolveMarket
+POSITION_REFUNDABLE = 'refundable'      # ended with a single submission, refund not yet taken
+POSITION_REFUNDED = 'refunded'          # single-submission or emergency refund paid
+POSITION_WON = 'won'
+POSITION_LOST = 'lost'
+
+
+def _position(submission_id: int, market: Dict[str, Any], actual_text: Optional[str],
+              now: int) -> Dict[str, Any]:
+    submission = next(s for s in market['submissions'] if s['id'] == submission_id)
+    total_pool = market['total_pool']
+    winner_payout = total_pool - platform_fee(total_pool)
+    competitive = len(market['submissions']) >= MIN_SUBMISSIONS
+    payout, claimable, distance, winning_distance = None, 0, None, None
+
+    if not market['resolved']:
+        if now < market['end_time']:
+            status = POSITION_OPEN
+        elif competitive:
+            status = POSITION_AWAITING
+        else:
+            status = POSITION_REFUNDABLE
+            claimable = submission['amount']
+    elif is_emergency_refunded(market):
+        status = POSITION_REFUNDED
+        payout = submission['amount']
+    elif market['winning_submission_id'] == submission_id and competitive:
+        status = POSITION_WON
+        payout = winner_payout
+        claimable = 0 if submission['claimed'] else payout
+    elif not competitive or submission['claimed']:
+        # A losing submission is only ever marked claimed by a refund
+        status = POSITION_REFUNDED
+        payout = submission['amount']
+    else:
+        status = POSITION_LOST
+        payout = 0
+
+    if actual_text is not None and status in (POSITION_WON, POSITION_LOST):
+        distance = contract_distance(submission['predicted_text'], actual_text)
+        winner = next((s for s in market['submissions'] if s['id'] == market['winning_submission_id']), None)
+        if winner is not None:
+            winning_distance = contract_distance(winner['predicted_text'], actual_text)
+
+    return {
+        'submission_id': submission_id,
+        'market_id': market['id'],
+        'actor_handle': market['actor_handle'],
+        'end_time': market['end_time'],
+        'predicted_text': submission['predicted_text'],
+        'status': status,
+        'stake': submission['amount'],
+        'total_pool': total_pool,
+        'submission_count': len(market['submissions']),
+        'payout_if_wins': winner_payout if not market['resolved'] else None,
+        'payout': payout,
+        'claimed': submission['claimed'],
+        'claimable': claimable,
+        'distance': distance,
+        'winning_distance': winning_distance,
+    }
+
+
+class PortfolioIndex:
+    """Builds wallet portfolios from chain and caches them until the wallet's next event."""
+
+    def __init__(self, blockchain=None, redis_client: Optional[redis.Redis] = None, cache_ttl: int = 3600):
+        self._blockchain = blockchain
+        self._redis = redis_client
+        self.cache_ttl = cache_ttl
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    def get(self, address: str, now: Optional[int] = None) -> Dict[str, Any]:
+        """Cached portfolio for a wallet, rebuilt from chain on a miss."""
+        address = Web3.to_checksum_address(address)
+        try:
+            cached = self.redis.get(PORTFOLIO_PREFIX + address.lower())
+            if cached is not None:
+                return json.loads(cached)
+        except redis.RedisError as e:
+            logger.debug("Portfolio cache read failed", error=str(e))
+
+        portfolio = self.build(address, now)
+        self._store(portfolio)
+        return portfolio
+
+    def build(self, address: str, now: Optional[int] = None) -> Dict[str, Any]:
+        """Compute a wallet's portfolio from chain in one pass."""
+        address = Web3.to_checksum_address(address)
+        now = int(time.time()) if now is None else now
+        contract = self.blockchain.contracts.get('PredictionMarketV2')
+        submission_ids = self.blockchain.get_v2_user_submissions(address) if contract else []
+
+        pending_fees = 0
+        market_of: Dict[int, int] = {}
+        if contract:
+            rows = self.blockchain.batch_call(
+                [contract.functions.getSubmissionDetails(sid) for sid in submission_ids]
+                + [contract.functions.pendingFees(address)])
+            pending_fees = rows[-1] or 0
+            market_of = {sid: row[0] for sid, row in zip(submission_ids, rows[:-1]) if row is not None}
+
+        markets = self.blockchain.get_v2_market_snapshots(sorted(set(market_of.values())))
+        actual_texts = self._actual_texts(
+            [mid for mid, m in markets.items() if m['resolved'] and len(m['submissions']) >= MIN_SUBMISSIONS
+             and not is_emergency_refunded(m)])
+
+        positions = [_position(sid, markets[mid], actual_texts.get(mid), now)
+                     for sid, mid in sorted(market_of.items(), reverse=True) if mid in markets]
+        return self._summarize(address, positions, pending_fees, now)
+
+    @staticmethod
+    def _summarize(address: str, positions: List[Dict[str, Any]], pending_fees: int,
+                   now: int) -> Dict[str, Any]:
+        decided = [p for p in positions if p['status'] in (POSITION_WON, POSITION_LOST)]
+        distances = [p['distance'] for p in decided if p['distance'] is not None]
+        return {
+            'address': address,
+            'positions': positions,
+            'open_positions': sum(p['status'] in (POSITION_OPEN, POSITION_AWAITING) for p in positions),
+            'wins': sum(p['status'] == POSITION_WON for p in positions),
+            'losses': sum(p['status'] == POSITION_LOST for p in positions),
+            'best_distance': min(distances) if distances else None,
+            'total_staked': sum(p['stake'] for p in positions),
+            'total_won': sum(p['payout'] for p in positions if p['status'] == POSITION_WON),
+            'total_claimable': sum(p['claimable'] for p in positions),
+            'pending_fees': pending_fees,
+            'computed_at': now,
+        }
+
+    def _actual_texts(self, market_ids: List[int]) -> Dict[int, str]:
+        """Resolved tweet texts known to the hash; markets not indexed yet are left out."""
+        if not market_ids:
+            return {}
+        texts: Dict[int, str] = {}
+        try:
+            for market_id, text in zip(market_ids, self.redis.hmget(ACTUAL_TEXT_KEY, market_ids)):
+                if text is not None:
+                    texts[market_id] = text.decode() if isinstance(text, bytes) else text
+        except redis.RedisError as e:
+            logger.debug("Actual text cache read failed", error=str(e))
+        return texts
+
+    def _store(self, portfolio: Dict[str, Any]) -> None:
+        # An open position turns into an awaiting one at end_time without any event
+        ttl = self.cache_ttl
+        for position in portfolio['positions']:
+            if position['status'] == POSITION_OPEN:
+                ttl = min(ttl, max(position['end_time'] - portfolio['computed_at'], 1))
+
+        address = portfolio['address'].lower()
+        try:
+            pipe = self.redis.pipeline()
+            pipe.set(PORTFOLIO_PREFIX + address, json.dumps(portfolio), ex=ttl)
+            for market_id in {p['market_id'] for p in portfolio['positions']}:
+                pipe.sadd(WATCHERS_PREFIX + str(market_id), address)
+                pipe.expire(WATCHERS_PREFIX + str(market_id), self.cache_ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.debug("Portfolio cache write failed", error=str(e))
+
+    # -------------------------------------------------------------------------
+    # Invalidation (chain indexer handlers)
+    # -------------------------------------------------------------------------
+
+    def invalidate(self, addresses: Iterable[str] = (), market_id: Optional[int] = None) -> None:
+        """Drop cached portfolios of the given wallets and of every wallet watching market_id."""
+        keys = {PORTFOLIO_PREFIX + a.lower() for a in addresses if a}
+        try:
+            if market_id is not None:
+                watchers_key = WATCHERS_PREFIX + str(market_id)
+                for watcher in self.redis.smembers(watchers_key):
+                    watcher = watcher.decode() if isinstance(watcher, bytes) else watcher
+                    keys.add(PORTFOLIO_PREFIX + watcher)
+                keys.add(watchers_key)
+            if keys:
+                self.redis.delete(*keys)
+        except redis.RedisError as e:
+            logger.debug("Portfolio cache invalidation failed", error=str(e))
+
+    def on_submission_created(self, event: Dict[str, Any]) -> None:
+        """The submitter has a new position; everyone else in the market sees a bigger pool."""
+        args = event['args']
+        self.invalidate([args['submitter']], market_id=args['marketId'])
+
+    def on_market_resolved(self, event: Dict[str, Any]) -> None:
+        args = event['args']
+        try:
+            self.redis.hset(ACTUAL_TEXT_KEY, args['marketId'], args['actualText'])
+        except redis.RedisError as e:
+            logger.debug("Actual text cache write failed", error=str(e))
+        self.invalidate(market_id=args['marketId'])
+
+    def on_single_submission_refunded(self, event: Dict[str, Any]) -> None:
+        args = event['args']
+        self.invalidate([args['submitter']], market_id=args['marketId'])
+
+    def on_payout_claimed(self, event: Dict[str, Any]) -> None:
+        """The claimer's position is paid and the fee recipient's pendingFees grew."""
+        addresses = [event['args']['claimer']]
+        try:
+            addresses.append(self.blockchain.contracts['PredictionMarketV2'].functions.feeRecipient().call())
+        except Exception as e:
+            logger.debug("Could not read fee recipient", error=str(e))
+        self.invalidate(addresses)
+
+    def on_fees_withdrawn(self, event: Dict[str, Any]) -> None:
+        self.invalidate([event['args']['recipient']])
+
+
+def get_portfolio_index() -> PortfolioIndex:
+    """Get or create the process-wide portfolio index."""
+    global _portfolio_index
+    if _portfolio_index is None:
+        from config_chain import chain_config
+        _portfolio_index = PortfolioIndex(cache_ttl=chain_config.PORTFOLIO_CACHE_TTL)
+    return _portfolio_index
+
+
+_portfolio_index: Optional[PortfolioIndex] = None
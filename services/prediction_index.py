@@ -0,0 +1,251 @@
+"""
+Per-market BK-tree index of prediction texts for near-duplicate detection.
+
+A BK-tree stores texts so that every child edge is labeled with its
+Levenshtein distance to the parent. By the triangle inequality, a search
+for texts within distance k of a query only has to descend into the edges
+labeled d-k..d+k, where d is the distance from the query to the node. That
+makes both "anything within k?" and "n nearest" sublinear in the number
+of submissions, in place of one distance computation per existing
+prediction. Texts are compared after TextAnalysisService.clean_text.
+
+Trees live in process memory, one per market, with an LRU bound. The
+chain indexer appends every SubmissionCreated to a Redis list per market
+(predictions:v2:log:<market_id>). Before answering, a process pulls only
+the log entries it has not seen yet. A market is seeded from a chain
+snapshot the first time it is queried and again every max_age seconds,
+and submission ids de-duplicate the seed against the log.
+"""
+
+import heapq
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import Levenshtein
+import redis
+
+from services.text_analysis import TextAnalysisService
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+LOG_PREFIX = "predictions:v2:log:"
+LOG_TTL = 30 * 86400
+
+_cleaner = TextAnalysisService()
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings under Levenshtein distance.
+
+    Each node is [text, ids, children]; identical texts share a node and
+    accumulate ids. Not thread-safe: callers serialize adds and queries.
+    """
+
+    def __init__(self):
+        self._root: Optional[list] = None
+        self.size = 0
+
+    def add(self, text: str, item_id: Any) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = [text, [item_id], {}]
+            return
+        node = self._root
+        while True:
+            distance = Levenshtein.distance(text, node[0])
+            if distance == 0:
+                node[1].append(item_id)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [text, [item_id], {}]
+                return
+            node = child
+
+    def within(self, query: str, k: int) -> List[Tuple[int, str, Any]]:
+        """All (distance, text, id) with distance <= k, closest first."""
+        found = []
+        stack = [self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            distance = Levenshtein.distance(query, node[0])
+            if distance <= k:
+                found.extend((distance, node[0], item_id) for item_id in node[1])
+            for edge, child in node[2].items():
+                if distance - k <= edge <= distance + k:
+                    stack.append(child)
+        return sorted(found, key=lambda hit: hit[0])
+
+    def any_within(self, query: str, k: int) -> bool:
+        """True as soon as one text within distance k is found."""
+        stack = [self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            distance = Levenshtein.distance(query, node[0])
+            if distance <= k:
+                return True
+            stack.extend(child for edge, child in node[2].items() if distance - k <= edge <= distance + k)
+        return False
+
+    def nearest(self, query: str, n: int = 1) -> List[Tuple[int, str, Any]]:
+        """The n closest (distance, text, id), closest first.
+
+        Best-first descent: the search radius shrinks to the n-th best
+        distance found so far, pruning edges outside it.
+        """
+        if self._root is None or n <= 0:
+            return []
+        best: List[Tuple[int, int, str, Any]] = []   # max-heap via negated distance
+        counter = 0
+        frontier = [(0, 0, self._root)]
+        while frontier:
+            lower_bound, _, node = heapq.heappop(frontier)
+            radius = -best[0][0] if len(best) >= n else None
+            if radius is not None and lower_bound > radius:
+                break
+            distance = Levenshtein.distance(query, node[0])
+            for item_id in node[1]:
+                counter += 1
+                if len(best) < n:
+                    heapq.heappush(best, (-distance, counter, node[0], item_id))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, counter, node[0], item_id))
+            radius = -best[0][0] if len(best) >= n else None
+            for edge, child in node[2].items():
+                child_bound = abs(distance - edge)
+                if radius is None or child_bound <= radius:
+                    counter += 1
+                    heapq.heappush(frontier, (child_bound, counter, child))
+        return sorted(((-d, text, item_id) for d, _, text, item_id in best), key=lambda hit: hit[0])
+
+
+class _MarketTree:
+    def __init__(self):
+        self.tree = BKTree()
+        self.ids = set()
+        self.log_offset = 0
+        self.seeded = False
+        self.seeded_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add(self, submission_id: int, text: str) -> None:
+        if submission_id not in self.ids:
+            self.ids.add(submission_id)
+            self.tree.add(_cleaner.clean_text(text), submission_id)
+
+
+class MarketPredictionIndex:
+    """BK-trees of each market's predictions, kept current from the SubmissionCreated log."""
+
+    def __init__(self, blockchain=None, redis_client: Optional[redis.Redis] = None,
+                 max_markets: int = 256, max_age: float = 300):
+        self._blockchain = blockchain
+        self._redis = redis_client
+        self.max_markets = max_markets
+        self.max_age = max_age    # reseed from chain in case the indexer log fell behind
+        self._markets: "OrderedDict[int, _MarketTree]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    def _tree(self, market_id: int, snapshot: Optional[Dict[str, Any]] = None) -> _MarketTree:
+        with self._lock:
+            entry = self._markets.get(market_id)
+            if entry is not None and time.monotonic() - entry.seeded_at > self.max_age:
+                entry = None
+            if entry is not None:
+                self._markets.move_to_end(market_id)
+            else:
+                entry = self._markets[market_id] = _MarketTree()
+                if len(self._markets) > self.max_markets:
+                    self._markets.popitem(last=False)
+
+        # Seed under the market's own lock: a slow RPC read holds up only
+        # callers of this market, and they wait for it instead of re-reading.
+        with entry.lock:
+            if not entry.seeded:
+                if snapshot is None:
+                    snapshot = self.blockchain.get_v2_market_snapshots([market_id]).get(market_id)
+                for submission in (snapshot or {}).get('submissions', []):
+                    entry.add(submission['id'], submission['predicted_text'])
+                entry.seeded = True
+                entry.seeded_at = time.monotonic()
+            try:
+                new = self.redis.lrange(LOG_PREFIX + str(market_id), entry.log_offset, -1)
+                for raw in new:
+                    record = json.loads(raw)
+                    entry.add(record['id'], record['text'])
+                entry.log_offset += len(new)
+            except redis.RedisError as e:
+                logger.debug("Prediction log read failed", market_id=market_id, error=str(e))
+        return entry
+
+    def near_duplicates(self, market_id: int, text: str, k: int,
+                        snapshot: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Existing submissions within distance k of text, closest first."""
+        entry = self._tree(market_id, snapshot)
+        with entry.lock:
+            hits = entry.tree.within(_cleaner.clean_text(text), k)
+        return [_hit(hit) for hit in hits]
+
+    def has_near_duplicate(self, market_id: int, text: str, k: int,
+                           snapshot: Optional[Dict[str, Any]] = None) -> bool:
+        entry = self._tree(market_id, snapshot)
+        with entry.lock:
+            return entry.tree.any_within(_cleaner.clean_text(text), k)
+
+    def nearest(self, market_id: int, text: str, n: int = 5,
+                snapshot: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """The n existing submissions closest to text."""
+        entry = self._tree(market_id, snapshot)
+        with entry.lock:
+            hits = entry.tree.nearest(_cleaner.clean_text(text), n)
+        return [_hit(hit) for hit in hits]
+
+    def on_submission_created(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler: append the prediction to its market's log."""
+        args = event['args']
+        key = LOG_PREFIX + str(args['marketId'])
+        pipe = self.redis.pipeline()
+        pipe.rpush(key, json.dumps({'id': args['submissionId'], 'text': args['predictedText']}))
+        pipe.expire(key, LOG_TTL)
+        pipe.execute()
+
+    def on_market_resolved(self, event: Dict[str, Any]) -> None:
+        """Resolved markets take no more submissions; drop their log and tree."""
+        market_id = event['args']['marketId']
+        self.redis.delete(LOG_PREFIX + str(market_id))
+        with self._lock:
+            self._markets.pop(market_id, None)
+
+
+def _hit(hit: Tuple[int, str, Any]) -> Dict[str, Any]:
+    distance, text, submission_id = hit
+    return {'submission_id': submission_id, 'distance': distance, 'cleaned_text': text}
+
+
+def get_prediction_index() -> MarketPredictionIndex:
+    """Get or create the process-wide prediction index."""
+    global _prediction_index
+    if _prediction_index is None:
+        _prediction_index = MarketPredictionIndex()
+    return _prediction_index
+
+
+_prediction_index: Optional[MarketPredictionIndex] = None
@@ -0,0 +1,197 @@
+"""
+Shared, Redis-backed sliding-window rate limiting for API routes.
+
+flask-limiter's default in-memory storage counted per gunicorn worker and
+per proxy address. Here every worker shares counters in Redis, and the
+caller is identified by their authenticated wallet, from a Bearer JWT,
+falling back to the client IP.
+
+Each rule ("60 per minute") is a sliding-window counter. It keeps two
+fixed-window counts, ratelimit:<scope>:<identity>:<window>:<index> for
+the current and previous windows. The previous count is weighted by how
+much of it still overlaps the sliding window. One Lua script checks every
+rule of a request and increments them only if all pass, so a request
+costs one round trip and concurrent workers cannot overshoot.
+
+Quotas are tiered. A rule's limit applies to anonymous IPs; authenticated
+wallets get it times wallet_multiplier and AI agents times
+agent_multiplier. Agents are wallets in AI_AGENT_WALLETS or in the
+leaderboard's agent set, which the script checks itself with SISMEMBER.
+If Redis is down, requests are let through rather than failing the API.
+"""
+
+import re
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from flask import request
+from werkzeug.exceptions import TooManyRequests
+
+from services.leaderboard import AGENTS_KEY
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "ratelimit:"
+
+TIER_IP = 'ip'
+TIER_WALLET = 'wallet'
+TIER_AGENT = 'agent'
+
+UNITS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+RULE_PATTERN = re.compile(r'^\s*(\d+)\s*(?:per|/)\s*(\d*)\s*(second|minute|hour|day)s?\s*$')
+
+# KEYS: agent set, then (current, previous) window counters per rule
+# ARGV: now_ms, multiplier, agent multiplier (0 = no agent check), wallet,
+#       then (limit, window_ms) per rule
+# Returns {allowed, limit, remaining, retry_after_ms} for the tightest rule
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local multiplier = tonumber(ARGV[2])
+local agent_multiplier = tonumber(ARGV[3])
+if agent_multiplier > 0 and redis.call('SISMEMBER', KEYS[1], ARGV[4]) == 1 then
+    multiplier = agent_multiplier
+end
+
+local rules = (#KEYS - 1) / 2
+local tightest_limit, remaining = 0, -1
+for i = 1, rules do
+    local limit = tonumber(ARGV[3 + 2 * i]) * multiplier
+    local window = tonumber(ARGV[4 + 2 * i])
+    local elapsed = now % window
+    local current = tonumber(redis.call('GET', KEYS[2 * i]) or 0)
+    local previous = tonumber(redis.call('GET', KEYS[2 * i + 1]) or 0)
+    local count = previous * (window - elapsed) / window + current
+    if count + 1 > limit then
+        -- wait for the previous window's share to decay, or for this window to end
+        local wait = window - elapsed
+        if current + 1 <= limit and previous > 0 then
+            wait = math.max(0, wait - (limit - current - 1) * window / previous)
+        end
+        return {0, limit, 0, math.ceil(wait)}
+    end
+    local left = math.floor(limit - count - 1)
+    if remaining < 0 or left < remaining then
+        tightest_limit, remaining = limit, left
+    end
+end
+
+for i = 1, rules do
+    local window = tonumber(ARGV[4 + 2 * i])
+    redis.call('INCR', KEYS[2 * i])
+    redis.call('PEXPIRE', KEYS[2 * i], 2 * window)
+end
+return {1, tightest_limit, remaining, 0}
+"""
+
+
+def parse_rules(spec: str) -> List[Tuple[int, int]]:
+    """'10 per minute; 100 per hour' -> [(10, 60), (100, 3600)]."""
+    rules = []
+    for part in spec.split(';'):
+        match = RULE_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"Invalid rate limit: {part!r}")
+        limit, multiple, unit = match.groups()
+        rules.append((int(limit), int(multiple or 1) * UNITS[unit]))
+    return rules
+
+
+class RateLimiter:
+    """Sliding-window limits shared by every worker through Redis."""
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None, default_limits: Iterable[str] = (),
+                 wallet_multiplier: int = 1, agent_multiplier: int = 1,
+                 agent_wallets: Iterable[str] = (), clock: Callable[[], float] = time.time):
+        self._redis = redis_client
+        self._script = None
+        self.default_rules = [rule for spec in default_limits for rule in parse_rules(spec)]
+        self.wallet_multiplier = wallet_multiplier
+        self.agent_multiplier = agent_multiplier
+        self.agent_wallets = {w.lower() for w in agent_wallets}
+        self._clock = clock
+        self._limited = set()
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    @property
+    def script(self):
+        if self._script is None:
+            self._script = self.redis.register_script(SLIDING_WINDOW_SCRIPT)
+        return self._script
+
+    def hit(self, scope: str, rules: List[Tuple[int, int]], identity: str, tier: str) -> Dict[str, Any]:
+        """Count one request against every rule; nothing is counted if any rule is exceeded."""
+        now_ms = int(self._clock() * 1000)
+        multiplier = {TIER_IP: 1, TIER_WALLET: self.wallet_multiplier,
+                      TIER_AGENT: self.agent_multiplier}[tier]
+        keys, args = [AGENTS_KEY], [now_ms, multiplier,
+                                    self.agent_multiplier if tier == TIER_WALLET else 0, identity]
+        for limit, window in rules:
+            window_ms = window * 1000
+            index = now_ms // window_ms
+            base = f"{KEY_PREFIX}{scope}:{identity}:{window}:"
+            keys += [f"{base}{index}", f"{base}{index - 1}"]
+            args += [limit, window_ms]
+
+        allowed, limit, remaining, retry_after_ms = self.script(keys=keys, args=args)
+        return {'allowed': bool(allowed), 'limit': limit, 'remaining': remaining,
+                'retry_after': -(-retry_after_ms // 1000)}
+
+    def identify(self) -> Tuple[str, str]:
+        """(identity, tier) of the current request: JWT wallet if valid, else client IP."""
+        wallet = getattr(request, 'wallet_address', None)
+        auth_header = request.headers.get('Authorization', '')
+        if not wallet and auth_header.startswith('Bearer '):
+            from services.wallet_auth import wallet_auth_service
+            payload = wallet_auth_service.verify_jwt_token(auth_header.split(' ')[1])
+            wallet = payload and payload.get('address')
+        if wallet:
+            wallet = wallet.lower()
+            return wallet, TIER_AGENT if wallet in self.agent_wallets else TIER_WALLET
+        return request.remote_addr or 'unknown', TIER_IP
+
+    def check(self, scope: str, rules: List[Tuple[int, int]]) -> None:
+        """Raise 429 if the current request is over any rule."""
+        identity, tier = self.identify()
+        try:
+            result = self.hit(scope, rules, identity, tier)
+        except redis.RedisError as e:
+            logger.warning("Rate limiter unavailable; allowing request", scope=scope, error=str(e))
+            return
+        if not result['allowed']:
+            logger.info("Rate limit exceeded", scope=scope, identity=identity, tier=tier,
+                        limit=result['limit'])
+            raise TooManyRequests(description=f"Rate limit exceeded: {result['limit']} requests",
+                                  retry_after=result['retry_after'])
+
+    def limit(self, spec: str):
+        """Route decorator: '10 per minute', or several rules separated by ';'."""
+        rules = parse_rules(spec)
+
+        def decorator(f):
+            @wraps(f)
+            def limited(*args, **kwargs):
+                self.check(f.__name__, rules)
+                return f(*args, **kwargs)
+            self._limited.add(f.__name__)
+            return limited
+        return decorator
+
+    def init_app(self, app, blueprints: Iterable[str] = ()) -> None:
+        """Apply the default limits to the blueprints' routes that have no limit of their own."""
+        blueprints = set(blueprints)
+
+        @app.before_request
+        def apply_default_limits():
+            if not self.default_rules or request.blueprint not in blueprints or request.endpoint is None:
+                return
+            if request.endpoint.rsplit('.', 1)[-1] not in self._limited:
+                self.check('default', self.default_rules)
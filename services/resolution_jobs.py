@@ -0,0 +1,262 @@
+"""
+Per-market resolution jobs shared by every gunicorn and Celery worker.
+
+Any worker may try to resolve the same market (beat-driven auto-resolution,
+Celery retries, the admin endpoints). Each attempt would fetch the actor's
+tweet and submit its own resolveMarket transaction, and all but the first
+revert. This module keeps exactly one resolution in flight per market:
+
+- enqueue() adds the market to the active set only if it is not already
+  there, so repeated scans and retries never queue a second job.
+- lease() takes a Redis lock for the market. A heartbeat thread extends it
+  while the holder works. A crashed worker stops heartbeating and the
+  lease expires.
+- Once a transaction is submitted its hash is stored on the job, and later
+  attempts skip the market while that transaction is pending or confirmed.
+- recover_stalled() finds jobs whose worker died (no lease, stale update)
+  so the scheduler can dispatch them again.
+- mark_failed() sets next_attempt_at with exponential backoff on the
+  attempt count, and enqueue() refuses the market until then, so a market
+  that keeps failing does not spend X API credits on every scan.
+
+Keys:
+    resolution:job:<market_id>    hash: state, attempts, next_attempt_at, tx_hash, error, enqueued_at, updated_at
+    resolution:lease:<market_id>  lock held while a worker resolves the market
+    resolution:jobs:active        zset of market ids with an unfinished job, scored by enqueue time
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import redis
+from redis.exceptions import LockError
+
+from services.tx_tracker import STATUS_CONFIRMED, STATUS_PENDING, get_tx_tracker
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+JOB_PREFIX = "resolution:job:"
+LEASE_PREFIX = "resolution:lease:"
+ACTIVE_KEY = "resolution:jobs:active"
+
+STATE_QUEUED = 'queued'
+STATE_RUNNING = 'running'
+STATE_SUBMITTED = 'submitted'
+STATE_FAILED = 'failed'
+STATE_DONE = 'done'
+
+
+class ResolutionLease:
+    """A held market lease, extended by a heartbeat thread until released."""
+
+    def __init__(self, market_id: int, lock, ttl: int, heartbeat_interval: float):
+        self.market_id = market_id
+        self._lock = lock
+        self._ttl = ttl
+        self._interval = heartbeat_interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self.lost = False
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def release(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=self._interval)
+        try:
+            self._lock.release()
+        except LockError:
+            # Expired and possibly re-acquired elsewhere; nothing of ours to release
+            pass
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self._lock.extend(self._ttl, replace_ttl=True)
+            except LockError:
+                self.lost = True
+                logger.error("Resolution lease lost", market_id=self.market_id)
+                return
+            except Exception as e:
+                logger.warning("Resolution lease heartbeat failed", market_id=self.market_id, error=str(e))
+
+
+class ResolutionJobQueue:
+    """Redis-backed resolution jobs keyed by market id."""
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        lease_ttl: int = 60,
+        stale_after: int = 300,
+        job_ttl: int = 7 * 24 * 3600,
+        retry_base: int = 60,
+        retry_max: int = 3600,
+    ):
+        self._redis = redis_client
+        self.lease_ttl = lease_ttl
+        self.heartbeat_interval = lease_ttl / 3
+        self.stale_after = stale_after
+        self.job_ttl = job_ttl
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    def enqueue(self, market_id: int) -> bool:
+        """Create a job for the market. Returns False if one is already active or backing off."""
+        now = int(time.time())
+        if int(self.redis.hget(JOB_PREFIX + str(market_id), 'next_attempt_at') or 0) > now:
+            return False
+        if not self.redis.zadd(ACTIVE_KEY, {str(market_id): now}, nx=True):
+            return False
+        self._update(market_id, state=STATE_QUEUED, enqueued_at=now, error='')
+        return True
+
+    def get_job(self, market_id: int) -> Optional[Dict[str, Any]]:
+        job = self.redis.hgetall(JOB_PREFIX + str(market_id))
+        if not job:
+            return None
+        for field in ('attempts', 'next_attempt_at', 'enqueued_at', 'updated_at'):
+            if field in job:
+                job[field] = int(job[field])
+        job['market_id'] = market_id
+        return job
+
+    @contextmanager
+    def lease(self, market_id: int) -> Iterator[Optional[ResolutionLease]]:
+        """Hold the market's lease for the duration of the block.
+
+        Yields None without waiting if another worker holds it.
+        """
+        lock = self.redis.lock(LEASE_PREFIX + str(market_id), timeout=self.lease_ttl,
+                               blocking=False, thread_local=False)
+        if not lock.acquire():
+            yield None
+            return
+
+        held = ResolutionLease(market_id, lock, self.lease_ttl, self.heartbeat_interval)
+        held.start()
+        try:
+            self.redis.hincrby(JOB_PREFIX + str(market_id), 'attempts', 1)
+            self._update(market_id, state=STATE_RUNNING)
+            yield held
+        finally:
+            held.release()
+
+    def in_flight_tx(self, market_id: int) -> Optional[str]:
+        """Hash of a submitted resolution that is pending or confirmed, if any."""
+        try:
+            tx_hash, updated_at = self.redis.hmget(JOB_PREFIX + str(market_id), 'tx_hash', 'updated_at')
+        except redis.RedisError as e:
+            logger.warning("Could not read resolution job", market_id=market_id, error=str(e))
+            return None
+        if not tx_hash:
+            return None
+        record = get_tx_tracker().get_status(tx_hash)
+        if record is None:
+            # Submitted with wait_for_receipt; trust it until the job goes stale
+            fresh = time.time() - int(updated_at or 0) < self.stale_after
+            return tx_hash if fresh else None
+        if record['status'] not in (STATUS_PENDING, STATUS_CONFIRMED):
+            return None
+        return tx_hash
+
+    def record_submission(self, market_id: int, tx_hash: str) -> None:
+        self._safe_update(market_id, state=STATE_SUBMITTED, tx_hash=tx_hash, error='')
+
+    def mark_failed(self, market_id: int, error: str) -> None:
+        """Finish the job unsuccessfully; scans may enqueue it again once its backoff ends."""
+        next_attempt_at = int(time.time())
+        try:
+            attempts = int(self.redis.hget(JOB_PREFIX + str(market_id), 'attempts') or 0)
+            next_attempt_at += min(self.retry_base * 2 ** max(attempts - 1, 0), self.retry_max)
+            pipe = self.redis.pipeline()
+            pipe.hdel(JOB_PREFIX + str(market_id), 'tx_hash')
+            pipe.zrem(ACTIVE_KEY, str(market_id))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not update resolution job", market_id=market_id, error=str(e))
+        self._safe_update(market_id, state=STATE_FAILED, error=error or '', next_attempt_at=next_attempt_at)
+
+    def complete(self, market_id: int) -> None:
+        try:
+            self.redis.zrem(ACTIVE_KEY, str(market_id))
+        except redis.RedisError as e:
+            logger.warning("Could not update resolution job", market_id=market_id, error=str(e))
+        self._safe_update(market_id, state=STATE_DONE)
+
+    def recover_stalled(self) -> List[int]:
+        """Market ids whose job was abandoned by a crashed or lost worker.
+
+        A job is stalled when nobody holds its lease and it has not moved
+        for stale_after seconds while queued or running. Returned jobs are
+        touched so concurrent scans do not recover them twice.
+        """
+        now = int(time.time())
+        recovered = []
+        for member in self.redis.zrange(ACTIVE_KEY, 0, -1):
+            market_id = int(member)
+            job = self.get_job(market_id)
+            if job is None:
+                self.redis.zrem(ACTIVE_KEY, member)
+                continue
+            if job['state'] not in (STATE_QUEUED, STATE_RUNNING):
+                continue
+            if now - job.get('updated_at', 0) < self.stale_after:
+                continue
+            if self.redis.exists(LEASE_PREFIX + member):
+                continue
+            self._update(market_id, state=STATE_QUEUED)
+            recovered.append(market_id)
+
+        if recovered:
+            logger.warning("Recovered stalled resolution jobs", market_ids=recovered)
+        return recovered
+
+    def active_count(self) -> int:
+        return self.redis.zcard(ACTIVE_KEY)
+
+    def on_market_resolved(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler for MarketResolved."""
+        self.complete(event['args']['marketId'])
+
+    def _update(self, market_id: int, **fields) -> None:
+        key = JOB_PREFIX + str(market_id)
+        fields['updated_at'] = int(time.time())
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, self.job_ttl)
+        pipe.execute()
+
+    def _safe_update(self, market_id: int, **fields) -> None:
+        try:
+            self._update(market_id, **fields)
+        except redis.RedisError as e:
+            logger.warning("Could not update resolution job", market_id=market_id, error=str(e))
+
+
+def get_resolution_jobs() -> ResolutionJobQueue:
+    """Get or create the process-wide resolution job queue."""
+    global _resolution_jobs
+    if _resolution_jobs is None:
+        from config_chain import chain_config
+        _resolution_jobs = ResolutionJobQueue(
+            lease_ttl=chain_config.RESOLUTION_LEASE_TTL,
+            stale_after=chain_config.RESOLUTION_STALE_AFTER,
+            retry_base=chain_config.RESOLUTION_RETRY_BASE,
+            retry_max=chain_config.RESOLUTION_RETRY_MAX,
+        )
+    return _resolution_jobs
+
+
+_resolution_jobs: Optional[ResolutionJobQueue] = None
@@ -51,7 +51,8 @@ class RPCRetryManager:
                         
                         logger.debug(
                             f"RPC call failed (attempt {attempt + 1}/{self.max_retries}), "
-                            f"retrying in {delay:.2f}s: {e}"
+                            f"retrying in {delay:.2f}s: {e}",
+                            extra={'sample': True}
                         )
                         
                         time.sleep(delay)
@@ -0,0 +1,152 @@
+"""
+Lexical-semantic distance preview: hashed n-gram TF-IDF cosine distance.
+
+A preview of a V2 "semantic distance" market mode that runs offline, on
+CPU, with NumPy only. Each text becomes a sparse vector of casefolded
+character 3-5-grams and word 1-2-grams. Features are hashed with CRC32
+into a 2**20 space, so no vocabulary is stored and vectors are stable
+across processes. Term frequencies are log-scaled.
+
+IDF is fitted on the texts being compared (the actual text plus every
+prediction of the market), so n-grams that every submission shares count
+for little. Distances from one actual text to N predictions come from a
+single pass over the stacked sparse rows: gather, multiply and
+np.bincount. No dense N x 2**20 matrix is ever built.
+
+Raw vectors do not depend on IDF, so they are cached per submission id (or
+per text for ad-hoc predictions) in a bounded LRU.
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.payout_simulator import contract_distance
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+N_FEATURES = 2 ** 20
+CHAR_NGRAMS = (3, 5)
+WORD_NGRAMS = (1, 2)
+
+Vector = Tuple[np.ndarray, np.ndarray]    # (feature indices, log-tf weights)
+
+
+def _features(text: str) -> List[str]:
+    text = ' '.join(text.casefold().split())
+    features = []
+    padded = f' {text} '
+    for n in range(CHAR_NGRAMS[0], CHAR_NGRAMS[1] + 1):
+        features.extend('c' + padded[i:i + n] for i in range(len(padded) - n + 1))
+    words = text.split()
+    for n in range(WORD_NGRAMS[0], WORD_NGRAMS[1] + 1):
+        features.extend('w' + ' '.join(words[i:i + n]) for i in range(len(words) - n + 1))
+    return features
+
+
+def vectorize(text: str, n_features: int = N_FEATURES) -> Vector:
+    """Sparse hashed log-tf vector of one text."""
+    hashed = np.fromiter((zlib.crc32(f.encode('utf-8')) % n_features for f in _features(text)),
+                         dtype=np.int64)
+    indices, counts = np.unique(hashed, return_counts=True)
+    return indices, 1.0 + np.log(counts)
+
+
+def cosine_distances(actual: Vector, predictions: Sequence[Vector]) -> np.ndarray:
+    """1 - cosine similarity of TF-IDF vectors, IDF fitted on actual + predictions."""
+    if not predictions:
+        return np.zeros(0)
+    rows = np.repeat(np.arange(len(predictions)), [len(p[0]) for p in predictions])
+    indices = np.concatenate([p[0] for p in predictions])
+    weights = np.concatenate([p[1] for p in predictions])
+
+    # Compact the hashed space to the features present, then smooth IDF over n docs
+    vocab, columns = np.unique(np.concatenate([actual[0], indices]), return_inverse=True)
+    actual_columns, columns = columns[:len(actual[0])], columns[len(actual[0]):]
+    n_docs = len(predictions) + 1
+    df = np.bincount(columns, minlength=len(vocab)) + np.bincount(actual_columns, minlength=len(vocab))
+    idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+
+    actual_dense = np.zeros(len(vocab))
+    actual_dense[actual_columns] = actual[1] * idf[actual_columns]
+    weighted = weights * idf[columns]
+
+    dots = np.bincount(rows, weights=weighted * actual_dense[columns], minlength=len(predictions))
+    norms = np.sqrt(np.bincount(rows, weights=weighted ** 2, minlength=len(predictions)))
+    denominator = norms * np.linalg.norm(actual_dense)
+    similarity = np.divide(dots, denominator, out=np.zeros_like(dots), where=denominator > 0)
+    return np.clip(1.0 - similarity, 0.0, 1.0)
+
+
+class SemanticScorer:
+    """Cosine distance from one actual text to many predictions, with cached vectors."""
+
+    def __init__(self, cache_size: int = 100000, n_features: int = N_FEATURES):
+        self.cache_size = cache_size
+        self.n_features = n_features
+        self._cache: "OrderedDict[Hashable, Vector]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def vector(self, text: str, key: Optional[Hashable] = None) -> Vector:
+        """Vector for text, cached under key (a submission id) or the text itself."""
+        key = ('text', text) if key is None else key
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        vector = vectorize(text, self.n_features)
+        with self._lock:
+            self._cache[key] = vector
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return vector
+
+    def distances(self, actual_text: str, predictions: Sequence[str],
+                  keys: Optional[Sequence[Hashable]] = None) -> np.ndarray:
+        """Distance in [0, 1] from actual_text to each prediction."""
+        keys = keys if keys is not None else [None] * len(predictions)
+        vectors = [self.vector(text, key) for text, key in zip(predictions, keys)]
+        return cosine_distances(self.vector(actual_text), vectors)
+
+    def score_market(self, market: Dict[str, Any], actual_text: str) -> Dict[str, Any]:
+        """Semantic and Levenshtein distance of every submission, and the winner under each.
+
+        Both winners use the contract's tie-break: the earliest submission
+        wins among equals.
+        """
+        submissions = market['submissions']
+        semantic = self.distances(actual_text, [s['predicted_text'] for s in submissions],
+                                  [('submission', market['id'], s['id']) for s in submissions])
+        rows = [{
+            'submission_id': s['id'],
+            'semantic_distance': round(float(d), 6),
+            'levenshtein_distance': contract_distance(s['predicted_text'], actual_text),
+        } for s, d in zip(submissions, semantic)]
+
+        def winner(field):
+            if not rows:
+                return None
+            return min(rows, key=lambda row: row[field])['submission_id']
+
+        return {
+            'market_id': market['id'],
+            'submissions': rows,
+            'semantic_winner': winner('semantic_distance'),
+            'levenshtein_winner': winner('levenshtein_distance'),
+        }
+
+
+def get_semantic_scorer() -> SemanticScorer:
+    """Get or create the process-wide semantic scorer."""
+    global _semantic_scorer
+    if _semantic_scorer is None:
+        _semantic_scorer = SemanticScorer()
+    return _semantic_scorer
+
+
+_semantic_scorer: Optional[SemanticScorer] = None
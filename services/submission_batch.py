@@ -0,0 +1,236 @@
+"""
+Batched validation and transaction building for PredictionMarketV2 submissions.
+
+An agent sends hundreds of (market_id, predicted_text, amount) items for
+one wallet. Validation reads the chain a fixed number of times, however
+many items there are:
+
+- paused(); the contract limits (MAX_TEXT_LENGTH, MIN_BET,
+  BETTING_CUTOFF) come from the deployment's metadata cache
+  (services/contract_metadata.py)
+- get_v2_market_snapshots for every distinct market, which also returns
+  existing predictions for the duplicate check
+- the wallet's pending nonce and balance
+
+Each item is checked against the same rules createSubmission enforces. Each
+valid item gets an unsigned createSubmission transaction with consecutive
+nonces, EIP-1559 fees from the shared fee oracle and a gas limit sized
+from the text length. Results come back per item, in request order, so one
+bad prediction never fails the rest. A prediction within a few edits of an
+existing one, or of an earlier item in the batch, is still built but
+carries a near_duplicate warning (services/prediction_index.py).
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from web3 import Web3
+
+from services.contract_metadata import get_contract_metadata
+from services.fee_oracle import get_fee_oracle
+from services.prediction_index import BKTree, get_prediction_index
+from services.text_analysis import TextAnalysisService
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# createSubmission writes a 5-slot struct, two array pushes and the pool
+# total, plus one storage word per 32 bytes of text; 20% headroom on top.
+SUBMISSION_BASE_GAS = 200000
+SUBMISSION_GAS_PER_WORD = 22100
+GAS_HEADROOM = 1.2
+
+ERROR_INVALID_ITEM = 'invalid_item'
+ERROR_PAUSED = 'contract_paused'
+ERROR_MARKET_NOT_FOUND = 'market_not_found'
+ERROR_MARKET_RESOLVED = 'market_resolved'
+ERROR_BETTING_CLOSED = 'betting_closed'
+ERROR_EMPTY_TEXT = 'empty_text'
+ERROR_TEXT_TOO_LONG = 'text_too_long'
+ERROR_AMOUNT_BELOW_MIN = 'amount_below_min_bet'
+ERROR_DUPLICATE = 'duplicate_prediction'
+
+WARNING_NEAR_DUPLICATE = 'near_duplicate'
+
+
+def submission_gas(predicted_text: str) -> int:
+    words = -(-len(predicted_text.encode('utf-8')) // 32)
+    return int((SUBMISSION_BASE_GAS + words * SUBMISSION_GAS_PER_WORD) * GAS_HEADROOM)
+
+
+class SubmissionBatchBuilder:
+    """Validates many submissions for one wallet and builds their unsigned transactions."""
+
+    def __init__(self, blockchain=None, chain_id: Optional[int] = None,
+                 prediction_index=None, near_duplicate_distance: int = 3, metadata=None):
+        self._blockchain = blockchain
+        self._chain_id = chain_id
+        self._prediction_index = prediction_index
+        self._metadata = metadata
+        self.near_duplicate_distance = near_duplicate_distance
+        self._cleaner = TextAnalysisService()
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def prediction_index(self):
+        if self._prediction_index is None:
+            self._prediction_index = get_prediction_index()
+        return self._prediction_index
+
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            self._metadata = get_contract_metadata()
+        return self._metadata
+
+    @property
+    def chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = self.blockchain.chain_id
+        return self._chain_id
+
+    def build(self, wallet: str, items: List[Dict[str, Any]], now: Optional[int] = None) -> Dict[str, Any]:
+        """Validate items and build transactions; see the module docstring."""
+        wallet = Web3.to_checksum_address(wallet)
+        now = int(time.time()) if now is None else now
+        contract = self.blockchain.contracts['PredictionMarketV2']
+
+        limits = self.metadata.get(self.blockchain)
+        max_text_length, min_bet, betting_cutoff = (
+            limits['max_text_length'], limits['min_bet'], limits['betting_cutoff'])
+        paused, = self.blockchain.batch_call([contract.functions.paused()])
+        if paused is None:
+            raise RuntimeError("Could not read PredictionMarketV2 paused state")
+
+        parsed = [self._parse(item, min_bet) for item in items]
+        if paused:
+            parsed = [{'error': ERROR_PAUSED, 'message': 'Contract is paused'} for _ in items]
+        market_ids = sorted({p['market_id'] for p in parsed if 'error' not in p})
+        markets = self.blockchain.get_v2_market_snapshots(market_ids)
+        taken = {(m['id'], s['predicted_text']) for m in markets.values() for s in m['submissions']}
+
+        results = []
+        for index, item in enumerate(parsed):
+            if 'error' not in item:
+                error = self._check(item, markets.get(item['market_id']), taken,
+                                    max_text_length, min_bet, betting_cutoff, now)
+                if error:
+                    item = {'market_id': item['market_id'], 'error': error[0], 'message': error[1]}
+                else:
+                    taken.add((item['market_id'], item['predicted_text']))
+            results.append(dict(item, index=index, valid='error' not in item))
+
+        valid = [r for r in results if r['valid']]
+        self._warn_near_duplicates(valid, markets)
+        nonce = self.blockchain.w3.eth.get_transaction_count(wallet, 'pending') if valid else None
+        fees = get_fee_oracle().tx_fee_params() if valid else {}
+        total_value = 0
+        total_gas = 0
+        for offset, result in enumerate(valid):
+            gas = submission_gas(result['predicted_text'])
+            result['transaction'] = dict({
+                'from': wallet,
+                'to': contract.address,
+                'data': contract.encode_abi('createSubmission',
+                                            args=[result['market_id'], result['predicted_text']]),
+                'value': result['amount'],
+                'gas': gas,
+                'nonce': nonce + offset,
+                'chainId': self.chain_id,
+                'type': 2,
+            }, **fees)
+            total_value += result['amount']
+            total_gas += gas
+
+        max_cost = total_value + total_gas * fees.get('maxFeePerGas', 0)
+        balance = self.blockchain.w3.eth.get_balance(wallet) if valid else None
+        return {
+            'wallet': wallet,
+            'paused': bool(paused),
+            'results': results,
+            'valid': len(valid),
+            'invalid': len(results) - len(valid),
+            'total_value': total_value,
+            'total_gas': total_gas,
+            'max_cost': max_cost,
+            'balance': balance,
+            'balance_sufficient': balance is None or balance >= max_cost,
+        }
+
+    def _warn_near_duplicates(self, valid: List[Dict[str, Any]], markets: Dict[int, Dict[str, Any]]) -> None:
+        """Flag predictions within near_duplicate_distance of one already on chain or earlier in the batch."""
+        k = self.near_duplicate_distance
+        if k <= 0:
+            return
+        batch_trees: Dict[int, BKTree] = {}
+        for result in valid:
+            market_id = result['market_id']
+            cleaned = self._cleaner.clean_text(result['predicted_text'])
+            warnings = [
+                {'code': WARNING_NEAR_DUPLICATE, 'submission_id': hit['submission_id'], 'distance': hit['distance']}
+                for hit in self.prediction_index.near_duplicates(
+                    market_id, result['predicted_text'], k, snapshot=markets[market_id])
+            ]
+            tree = batch_trees.setdefault(market_id, BKTree())
+            warnings += [
+                {'code': WARNING_NEAR_DUPLICATE, 'batch_index': batch_index, 'distance': distance}
+                for distance, _, batch_index in tree.within(cleaned, k)
+            ]
+            tree.add(cleaned, result['index'])
+            if warnings:
+                result['warnings'] = warnings
+
+    @staticmethod
+    def _parse(item: Any, min_bet: int) -> Dict[str, Any]:
+        if not isinstance(item, dict):
+            return {'error': ERROR_INVALID_ITEM, 'message': 'Item must be an object'}
+        try:
+            market_id = int(item['market_id'])
+            amount = int(item.get('amount_wei', min_bet))
+        except (KeyError, TypeError, ValueError):
+            return {'error': ERROR_INVALID_ITEM,
+                    'message': 'market_id and amount_wei must be integers'}
+        text = item.get('predicted_text')
+        if not isinstance(text, str):
+            return {'market_id': market_id, 'error': ERROR_INVALID_ITEM,
+                    'message': 'predicted_text must be a string'}
+        return {'market_id': market_id, 'predicted_text': text, 'amount': amount}
+
+    @staticmethod
+    def _check(item, market, taken, max_text_length, min_bet, betting_cutoff, now):
+        """Mirror createSubmission's reverts; returns (code, message) or None."""
+        if market is None:
+            return ERROR_MARKET_NOT_FOUND, f"Market {item['market_id']} not found"
+        if market['resolved']:
+            return ERROR_MARKET_RESOLVED, 'Market is already resolved'
+        if now >= market['end_time'] - betting_cutoff:
+            return ERROR_BETTING_CLOSED, 'Betting cutoff has passed'
+        text_bytes = len(item['predicted_text'].encode('utf-8'))
+        if text_bytes == 0:
+            return ERROR_EMPTY_TEXT, 'predicted_text is empty'
+        if text_bytes > max_text_length:
+            return ERROR_TEXT_TOO_LONG, f'predicted_text is {text_bytes} bytes; max is {max_text_length}'
+        if item['amount'] < min_bet:
+            return ERROR_AMOUNT_BELOW_MIN, f'amount_wei must be at least {min_bet}'
+        if (item['market_id'], item['predicted_text']) in taken:
+            return ERROR_DUPLICATE, 'This exact prediction already exists for this market'
+        return None
+
+
+def get_submission_batch_builder() -> SubmissionBatchBuilder:
+    """Get or create the process-wide submission batch builder."""
+    global _submission_batch_builder
+    if _submission_batch_builder is None:
+        from config_chain import chain_config
+        _submission_batch_builder = SubmissionBatchBuilder(
+            near_duplicate_distance=chain_config.NEAR_DUPLICATE_DISTANCE)
+    return _submission_batch_builder
+
+
+_submission_batch_builder: Optional[SubmissionBatchBuilder] = None
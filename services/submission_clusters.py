@@ -0,0 +1,273 @@
+"""
+Pairwise distance matrix, clustering and diversity metrics per market.
+
+To spot copy-cat agents and measure how varied a market's predictions
+are, we need every pairwise byte-level Levenshtein distance among its
+submissions. The matrix is kept in Redis (distmatrix:v2:<market_id>) as a
+list with one entry per submission, in marketSubmissions order. Each
+entry holds the submission's distances to every earlier one, so a new
+submission costs one row, computed in a single bit-parallel cdist call
+(services/win_probability.distance_matrix). The SubmissionCreated handler
+appends that row when the market's matrix already exists. Otherwise the
+matrix is built, or caught up, from a chain snapshot the next time it is
+read.
+
+Clustering is single-linkage over distance normalized by the longer
+text's byte length. The minimum spanning tree (Prim, vectorized) gives
+the full merge hierarchy, and cutting it at `threshold` gives flat
+clusters. Pairs below the threshold from different wallets are reported
+as likely copies.
+"""
+
+import json
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import redis
+
+from services.win_probability import distance_matrix
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+MATRIX_PREFIX = "distmatrix:v2:"
+MAX_COPY_PAIRS = 50
+WATCH_RETRIES = 3
+
+
+def append_rows(entries: List[Dict[str, Any]], submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Extend entries in place with submissions not in it yet, one distance row each."""
+    known = {entry['id'] for entry in entries}
+    new = []
+    for submission in submissions:
+        if submission['id'] in known:
+            continue
+        texts = [entry['text'] for entry in entries]
+        row = distance_matrix([submission['predicted_text']], texts)[0].tolist() if texts else []
+        entry = {'id': submission['id'], 'submitter': submission['submitter'],
+                 'text': submission['predicted_text'], 'row': row}
+        entries.append(entry)
+        known.add(entry['id'])
+        new.append(entry)
+    return new
+
+
+def normalize(distances: np.ndarray, texts: List[str]) -> np.ndarray:
+    """Divide each distance by the longer of the two texts' byte lengths."""
+    lengths = np.array([len(t.encode('utf-8')) for t in texts], dtype=float)
+    longer = np.maximum.outer(lengths, lengths)
+    return np.divide(distances, longer, out=np.zeros(distances.shape), where=longer > 0)
+
+
+def single_linkage(distances: np.ndarray) -> List[List[float]]:
+    """Merge steps [cluster_a, cluster_b, distance, size] in the scipy linkage layout.
+
+    Leaves are 0..n-1 and the i-th merge creates cluster n + i.
+    """
+    n = len(distances)
+    if n < 2:
+        return []
+    # Prim's minimum spanning tree; single linkage merges its edges in order
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    best = distances[0].astype(float).copy()
+    parent = np.zeros(n, dtype=int)
+    edges = []
+    for _ in range(n - 1):
+        candidates = np.where(in_tree, np.inf, best)
+        node = int(candidates.argmin())
+        edges.append((float(best[node]), int(parent[node]), node))
+        in_tree[node] = True
+        closer = distances[node] < best
+        best = np.where(closer, distances[node], best)
+        parent = np.where(closer, node, parent)
+    edges.sort()
+
+    root = list(range(n))
+    cluster = list(range(n))
+    size = [1] * n
+
+    def find(x):
+        while root[x] != x:
+            root[x] = root[root[x]]
+            x = root[x]
+        return x
+
+    linkage = []
+    for distance, a, b in edges:
+        ra, rb = find(a), find(b)
+        linkage.append([cluster[ra], cluster[rb], distance, size[ra] + size[rb]])
+        root[rb] = ra
+        size[ra] += size[rb]
+        cluster[ra] = n + len(linkage) - 1
+    return linkage
+
+
+def flat_clusters(linkage: List[List[float]], n: int, threshold: float) -> List[int]:
+    """Cluster label of each leaf after merging everything at or below threshold."""
+    root = list(range(2 * n))
+
+    def find(x):
+        while root[x] != x:
+            root[x] = root[root[x]]
+            x = root[x]
+        return x
+
+    for step, (a, b, distance, _) in enumerate(linkage):
+        if distance <= threshold:
+            root[find(int(a))] = n + step
+            root[find(int(b))] = n + step
+    labels: Dict[int, int] = {}
+    return [labels.setdefault(find(leaf), len(labels)) for leaf in range(n)]
+
+
+def diversity(entries: List[Dict[str, Any]], distances: np.ndarray, threshold: float) -> Dict[str, Any]:
+    """Cluster and diversity summary of one market's submissions."""
+    n = len(entries)
+    texts = [e['text'] for e in entries]
+    normalized = normalize(distances, texts)
+    linkage = single_linkage(normalized)
+    labels = flat_clusters(linkage, n, threshold) if n else []
+
+    sizes = np.bincount(labels) if labels else np.zeros(0, dtype=int)
+    shares = sizes / n if n else sizes
+    upper = np.triu_indices(n, k=1)
+    pair_values = normalized[upper]
+
+    copies = []
+    for i, j in zip(*upper):
+        if normalized[i, j] <= threshold and entries[i]['submitter'].lower() != entries[j]['submitter'].lower():
+            copies.append({'submission_ids': [entries[i]['id'], entries[j]['id']],
+                           'submitters': [entries[i]['submitter'], entries[j]['submitter']],
+                           'distance': int(distances[i, j]),
+                           'normalized_distance': round(float(normalized[i, j]), 4)})
+    copies.sort(key=lambda pair: pair['normalized_distance'])
+
+    closest = None
+    if len(pair_values):
+        k = int(pair_values.argmin())
+        i, j = int(upper[0][k]), int(upper[1][k])
+        closest = {'submission_ids': [entries[i]['id'], entries[j]['id']], 'distance': int(distances[i, j])}
+
+    return {
+        'submissions': n,
+        'threshold': threshold,
+        'clusters': len(sizes),
+        'largest_cluster': int(sizes.max()) if len(sizes) else 0,
+        # exp(Shannon entropy) of cluster shares: n when all differ, 1 when all are copies
+        'effective_clusters': round(math.exp(-float(np.sum(shares * np.log(shares)))), 3) if n else 0,
+        'mean_normalized_distance': round(float(pair_values.mean()), 4) if len(pair_values) else None,
+        'closest_pair': closest,
+        'copy_pairs': copies[:MAX_COPY_PAIRS],
+        'labels': {entry['id']: label for entry, label in zip(entries, labels)},
+        'linkage': [[int(a), int(b), round(d, 4), int(s)] for a, b, d, s in linkage],
+    }
+
+
+class SubmissionClusters:
+    """Incrementally extended per-market distance matrices."""
+
+    def __init__(self, blockchain=None, redis_client: Optional[redis.Redis] = None,
+                 threshold: float = 0.2, ttl: int = 30 * 86400):
+        self._blockchain = blockchain
+        self._redis = redis_client
+        self.threshold = threshold
+        self.ttl = ttl
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    def extend(self, market_id: int, submissions: List[Dict[str, Any]],
+               create: bool = True) -> List[Dict[str, Any]]:
+        """Append one row per submission not cached yet; returns every entry.
+
+        WATCH guards the read-compute-append cycle, so two workers extending
+        the same market never interleave rows computed against different
+        prefixes.
+        """
+        key = MATRIX_PREFIX + str(market_id)
+        for _ in range(WATCH_RETRIES):
+            with self.redis.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    entries = [json.loads(raw) for raw in pipe.lrange(key, 0, -1)]
+                    if not entries and not create:
+                        return entries
+                    new = append_rows(entries, submissions)
+                    if not new:
+                        return entries
+                    pipe.multi()
+                    pipe.rpush(key, *[json.dumps(entry) for entry in new])
+                    pipe.expire(key, self.ttl)
+                    pipe.execute()
+                    return entries
+                except redis.WatchError:
+                    continue
+        logger.info("Distance matrix contended; computed without caching", market_id=market_id)
+        return self._uncached(submissions)
+
+    @staticmethod
+    def _uncached(submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        entries: List[Dict[str, Any]] = []
+        append_rows(entries, submissions)
+        return entries
+
+    def matrix(self, market_id: int) -> Optional[Dict[str, Any]]:
+        """Entries and the square distance matrix, caught up with the chain. None if no such market."""
+        market = self.blockchain.get_v2_market_snapshots([market_id]).get(market_id)
+        if market is None:
+            return None
+        try:
+            entries = self.extend(market_id, market['submissions'])
+        except redis.RedisError as e:
+            logger.debug("Distance matrix cache unavailable", market_id=market_id, error=str(e))
+            entries = self._uncached(market['submissions'])
+
+        n = len(entries)
+        distances = np.zeros((n, n), dtype=np.int32)
+        for i, entry in enumerate(entries):
+            distances[i, :i] = entry['row']
+        distances += distances.T
+        return {'market': market, 'entries': entries, 'distances': distances}
+
+    def analyze(self, market_id: int, threshold: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Clusters, copy pairs and diversity metrics for one market."""
+        result = self.matrix(market_id)
+        if result is None:
+            return None
+        summary = diversity(result['entries'], result['distances'],
+                            self.threshold if threshold is None else threshold)
+        summary['market_id'] = market_id
+        summary['actor_handle'] = result['market'].get('actor_handle')
+        return summary
+
+    def on_submission_created(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler: add one row to a matrix that is already cached."""
+        args = event['args']
+        self.extend(args['marketId'], [{
+            'id': args['submissionId'], 'submitter': args['submitter'], 'predicted_text': args['predictedText'],
+        }], create=False)   # uncached markets are built from a snapshot on first read
+
+
+def get_submission_clusters() -> SubmissionClusters:
+    """Get or create the process-wide submission cluster analyzer."""
+    global _submission_clusters
+    if _submission_clusters is None:
+        from config_chain import chain_config
+        _submission_clusters = SubmissionClusters(threshold=chain_config.COPYCAT_DISTANCE_THRESHOLD)
+    return _submission_clusters
+
+
+_submission_clusters: Optional[SubmissionClusters] = None
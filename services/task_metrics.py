@@ -0,0 +1,81 @@
+"""
+Duration and backlog metrics for Celery tasks, stored in Redis so every
+worker and the web process see the same numbers.
+
+Keys:
+    celery:metrics:task:<name>  hash: runs, failures, total_ms, last_ms, max_ms, last_run
+    celery:metrics:backlog      hash: <queue> -> messages waiting at last check
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+TASK_KEY_PREFIX = "celery:metrics:task:"
+BACKLOG_KEY = "celery:metrics:backlog"
+
+
+class TaskMetrics:
+    """Records task runs and queue depth."""
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    def record_run(self, task_name: str, duration_ms: float, success: bool) -> None:
+        key = TASK_KEY_PREFIX + task_name
+        duration_ms = int(duration_ms)
+        try:
+            previous_max = int(self.redis.hget(key, 'max_ms') or 0)
+            pipe = self.redis.pipeline()
+            pipe.hincrby(key, 'runs', 1)
+            if not success:
+                pipe.hincrby(key, 'failures', 1)
+            pipe.hincrby(key, 'total_ms', duration_ms)
+            pipe.hset(key, mapping={
+                'last_ms': duration_ms,
+                'max_ms': max(previous_max, duration_ms),
+                'last_run': int(time.time()),
+            })
+            pipe.execute()
+        except Exception as e:
+            logger.debug("Failed to record task metrics", task=task_name, error=str(e))
+
+    def record_backlog(self, queue: str, depth: int) -> None:
+        try:
+            self.redis.hset(BACKLOG_KEY, queue, depth)
+        except Exception as e:
+            logger.debug("Failed to record queue backlog", queue=queue, error=str(e))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """All task metrics with derived mean duration, plus queue backlog."""
+        tasks = {}
+        for key in self.redis.scan_iter(match=TASK_KEY_PREFIX + '*'):
+            data = {k: int(v) for k, v in self.redis.hgetall(key).items()}
+            runs = data.get('runs', 0)
+            data['mean_ms'] = data.get('total_ms', 0) // runs if runs else 0
+            tasks[key[len(TASK_KEY_PREFIX):]] = data
+        backlog = {q: int(v) for q, v in self.redis.hgetall(BACKLOG_KEY).items()}
+        return {'tasks': tasks, 'backlog': backlog}
+
+
+def get_task_metrics() -> TaskMetrics:
+    """Get or create the process-wide task metrics recorder."""
+    global _task_metrics
+    if _task_metrics is None:
+        _task_metrics = TaskMetrics()
+    return _task_metrics
+
+
+_task_metrics: Optional[TaskMetrics] = None
@@ -0,0 +1,164 @@
+"""
+Immutable tweet cache shared by every XComAPIService instance.
+
+A tweet's text, author and timestamp never change once posted, so fetched
+tweets are stored write-once: a bounded in-process LRU in front of Redis
+(key xcom:tweet:<id>, long TTL). Under X's pay-per-use pricing every read
+costs credits, so resolution, the manual oracle preview and
+verify_tweet_authenticity all hit this cache before the API.
+
+Username -> user id lookups are cached the same way (xcom:user:<username>)
+so the resolution path can skip the user lookup for pre-warmed actors.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+import redis
+
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+
+class TweetCache:
+    """Write-once tweet store: in-memory LRU backed by Redis."""
+
+    KEY_PREFIX = "xcom:tweet:"
+    USER_KEY_PREFIX = "xcom:user:"
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        max_memory_items: int = 10000,
+        redis_ttl: int = 30 * 24 * 3600,
+    ):
+        self._redis = redis_client
+        self.max_memory_items = max_memory_items
+        self.redis_ttl = redis_ttl
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._user_ids: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'redis_hits': 0, 'misses': 0}
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    def get_many(self, tweet_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return cached tweets for the given ids (missing ids are omitted).
+
+        Each call gets its own copies, so callers may modify them.
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        remaining = []
+        with self._lock:
+            for tweet_id in tweet_ids:
+                tweet_id = str(tweet_id)
+                tweet = self._memory.get(tweet_id)
+                if tweet is not None:
+                    self._memory.move_to_end(tweet_id)
+                    found[tweet_id] = dict(tweet)
+                    self.stats['memory_hits'] += 1
+                else:
+                    remaining.append(tweet_id)
+
+        if remaining:
+            try:
+                raw_values = self.redis.mget([self.KEY_PREFIX + t for t in remaining])
+            except Exception as e:
+                logger.debug("Tweet cache Redis read failed", error=str(e))
+                raw_values = [None] * len(remaining)
+
+            for tweet_id, raw in zip(remaining, raw_values):
+                if raw:
+                    tweet = self._deserialize(raw)
+                    found[tweet_id] = dict(tweet)
+                    self._remember(tweet_id, tweet)
+                    self.stats['redis_hits'] += 1
+                else:
+                    self.stats['misses'] += 1
+        return found
+
+    def get(self, tweet_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([tweet_id]).get(str(tweet_id))
+
+    def put_many(self, tweets: Dict[str, Dict[str, Any]]) -> None:
+        """Store fetched tweets. Existing entries are never overwritten."""
+        if not tweets:
+            return
+        for tweet_id, tweet in tweets.items():
+            self._remember(str(tweet_id), dict(tweet))
+        try:
+            pipe = self.redis.pipeline()
+            for tweet_id, tweet in tweets.items():
+                pipe.set(self.KEY_PREFIX + str(tweet_id), self._serialize(tweet),
+                         ex=self.redis_ttl, nx=True)
+            pipe.execute()
+        except Exception as e:
+            logger.debug("Tweet cache Redis write failed", error=str(e))
+
+    def get_user_id(self, username: str) -> Optional[str]:
+        """Cached X user id for a username, if known."""
+        key = username.lower().lstrip('@')
+        with self._lock:
+            user_id = self._user_ids.get(key)
+        if user_id is not None:
+            return user_id
+        try:
+            user_id = self.redis.get(self.USER_KEY_PREFIX + key)
+        except Exception as e:
+            logger.debug("Tweet cache Redis read failed", error=str(e))
+            return None
+        if user_id is not None:
+            with self._lock:
+                self._user_ids[key] = user_id
+        return user_id
+
+    def put_user_id(self, username: str, user_id: str) -> None:
+        key = username.lower().lstrip('@')
+        with self._lock:
+            self._user_ids[key] = str(user_id)
+        try:
+            self.redis.set(self.USER_KEY_PREFIX + key, str(user_id), ex=self.redis_ttl)
+        except Exception as e:
+            logger.debug("Tweet cache Redis write failed", error=str(e))
+
+    def _remember(self, tweet_id: str, tweet: Dict[str, Any]) -> None:
+        with self._lock:
+            if tweet_id not in self._memory:
+                self._memory[tweet_id] = tweet
+            self._memory.move_to_end(tweet_id)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    @staticmethod
+    def _serialize(tweet: Dict[str, Any]) -> str:
+        data = dict(tweet)
+        if isinstance(data.get('created_at'), datetime):
+            data['created_at'] = data['created_at'].isoformat()
+        return json.dumps(data)
+
+    @staticmethod
+    def _deserialize(raw: str) -> Dict[str, Any]:
+        data = json.loads(raw)
+        if isinstance(data.get('created_at'), str):
+            data['created_at'] = datetime.fromisoformat(data['created_at'])
+        return data
+
+
+def get_tweet_cache() -> TweetCache:
+    """Get or create the process-wide tweet cache."""
+    global _tweet_cache
+    if _tweet_cache is None:
+        _tweet_cache = TweetCache()
+    return _tweet_cache
+
+
+_tweet_cache: Optional[TweetCache] = None
@@ -0,0 +1,242 @@
+"""
+Transaction lifecycle tracker for owner-signed transactions.
+
+Admin endpoints (market resolution, fee withdrawal) submit a transaction and
+hand it to the tracker instead of blocking a Flask worker inside
+wait_for_transaction_receipt. A background poller fetches receipts for every
+pending transaction in one JSON-RPC batch per interval and records the
+outcome. Clients follow progress via the polling or SSE endpoints in
+routes/proteus.py.
+
+State lives in Redis so it survives worker restarts:
+    tx:record:<hash>   JSON record (status, kind, metadata, receipt fields)
+    tx:pending         ZSET of pending hashes scored by submission time
+    tx:poller_lock     short lease so only one worker polls per interval
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+# Terminal statuses -- records in these states are no longer polled
+STATUS_PENDING = 'pending'
+STATUS_CONFIRMED = 'confirmed'
+STATUS_FAILED = 'failed'
+STATUS_DROPPED = 'dropped'
+TERMINAL_STATUSES = (STATUS_CONFIRMED, STATUS_FAILED, STATUS_DROPPED)
+
+
+class TransactionTracker:
+    """Redis-backed tracker that polls pending transaction receipts in batch."""
+
+    RECORD_PREFIX = "tx:record:"
+    PENDING_KEY = "tx:pending"
+    POLLER_LOCK_KEY = "tx:poller_lock"
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        blockchain=None,
+        poll_interval: int = 3,
+        pending_timeout: int = 600,
+        record_ttl: int = 7 * 24 * 3600,
+        batch_size: int = 100,
+    ):
+        self.redis = redis_client or create_redis_client()
+        self._blockchain = blockchain
+        self.poll_interval = poll_interval
+        self.pending_timeout = pending_timeout
+        self.record_ttl = record_ttl
+        self.batch_size = batch_size
+
+        # Callbacks invoked once when a transaction of a given kind settles
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def blockchain(self):
+        """Lazily create the blockchain service (avoids RPC setup at import)."""
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    # -------------------------------------------------------------------------
+    # Registration and lookup
+    # -------------------------------------------------------------------------
+
+    def on_settled(self, kind: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback for when a transaction of `kind` settles."""
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def track(self, tx_hash: str, kind: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Start tracking a submitted transaction. Returns the stored record."""
+        tx_hash = self._normalize(tx_hash)
+        now = int(time.time())
+        record = {
+            'tx_hash': tx_hash,
+            'kind': kind,
+            'status': STATUS_PENDING,
+            'submitted_at': now,
+            'updated_at': now,
+            'metadata': metadata or {},
+            'block_number': None,
+            'gas_used': None,
+            'error': None,
+        }
+        pipe = self.redis.pipeline()
+        pipe.setex(self.RECORD_PREFIX + tx_hash, self.record_ttl, json.dumps(record))
+        pipe.zadd(self.PENDING_KEY, {tx_hash: now})
+        pipe.execute()
+        logger.info("Tracking transaction", tx_hash=tx_hash, kind=kind)
+        return record
+
+    def get_status(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the tracked record for a transaction, or None if unknown."""
+        try:
+            raw = self.redis.get(self.RECORD_PREFIX + self._normalize(tx_hash))
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.error("Failed to read transaction status", tx_hash=tx_hash, error=str(e))
+            return None
+
+    def pending_count(self) -> int:
+        """Number of transactions still awaiting a receipt."""
+        try:
+            return self.redis.zcard(self.PENDING_KEY)
+        except Exception:
+            return 0
+
+    # -------------------------------------------------------------------------
+    # Polling
+    # -------------------------------------------------------------------------
+
+    def poll_once(self) -> int:
+        """Fetch receipts for all pending transactions. Returns settled count."""
+        tx_hashes = self.redis.zrange(self.PENDING_KEY, 0, -1)
+        if not tx_hashes:
+            return 0
+
+        settled = 0
+        now = int(time.time())
+        for start in range(0, len(tx_hashes), self.batch_size):
+            chunk = tx_hashes[start:start + self.batch_size]
+            receipts = self.blockchain.get_transaction_receipts(chunk)
+            for tx_hash in chunk:
+                if self._settle(tx_hash, receipts.get(tx_hash), now):
+                    settled += 1
+        return settled
+
+    def _settle(self, tx_hash: str, receipt: Optional[Dict[str, Any]], now: int) -> bool:
+        """Update one record from its receipt. Returns True if it left pending."""
+        record = self.get_status(tx_hash)
+        if record is None:
+            # Record expired or was never written; stop polling for it
+            self.redis.zrem(self.PENDING_KEY, tx_hash)
+            return False
+
+        if receipt is None:
+            if now - record['submitted_at'] < self.pending_timeout:
+                return False
+            record['status'] = STATUS_DROPPED
+            record['error'] = f"No receipt after {self.pending_timeout}s"
+        elif receipt['status'] == 1:
+            record['status'] = STATUS_CONFIRMED
+        else:
+            record['status'] = STATUS_FAILED
+            record['error'] = "Transaction reverted"
+
+        if receipt is not None:
+            record['block_number'] = receipt['block_number']
+            record['gas_used'] = receipt['gas_used']
+        record['updated_at'] = now
+
+        pipe = self.redis.pipeline()
+        pipe.setex(self.RECORD_PREFIX + tx_hash, self.record_ttl, json.dumps(record))
+        pipe.zrem(self.PENDING_KEY, tx_hash)
+        removed = pipe.execute()[-1]
+
+        # Another worker may have settled it between our read and write;
+        # only the one that removed it from the pending set fires handlers.
+        if removed:
+            logger.info(
+                "Transaction settled",
+                tx_hash=tx_hash,
+                kind=record['kind'],
+                status=record['status'],
+                block_number=record['block_number'],
+            )
+            self._dispatch(record)
+        return bool(removed)
+
+    def _dispatch(self, record: Dict[str, Any]) -> None:
+        for handler in self._handlers.get(record['kind'], []):
+            try:
+                handler(record)
+            except Exception as e:
+                logger.error("Transaction handler failed", tx_hash=record['tx_hash'], error=str(e))
+
+    # -------------------------------------------------------------------------
+    # Background loop
+    # -------------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background poller thread (idempotent per process)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._thread.start()
+        logger.info("Transaction tracker started", poll_interval=self.poll_interval)
+
+    def stop(self) -> None:
+        """Stop the background poller thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _poll_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # One poller per interval across all workers
+                if self.redis.set(self.POLLER_LOCK_KEY, os.getpid(), nx=True, ex=self.poll_interval):
+                    self.poll_once()
+            except Exception as e:
+                logger.error("Transaction tracker poll failed", error=str(e))
+            self._stop.wait(self.poll_interval)
+
+    @staticmethod
+    def _normalize(tx_hash: str) -> str:
+        tx_hash = tx_hash.lower()
+        return tx_hash if tx_hash.startswith('0x') else '0x' + tx_hash
+
+
+def get_tx_tracker() -> TransactionTracker:
+    """Get or create the transaction tracker singleton with config values."""
+    global _tx_tracker
+    if _tx_tracker is None:
+        try:
+            from config_chain import chain_config
+
+            _tx_tracker = TransactionTracker(
+                poll_interval=getattr(chain_config, "TX_TRACKER_POLL_INTERVAL", 3),
+                pending_timeout=getattr(chain_config, "TX_TRACKER_PENDING_TIMEOUT", 600),
+            )
+        except Exception as e:
+            logger.warning("Failed to load config, using defaults", error=str(e))
+            _tx_tracker = TransactionTracker()
+    return _tx_tracker
+
+
+_tx_tracker: Optional[TransactionTracker] = None
@@ -8,16 +8,56 @@ import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List
 from decimal import Decimal
+import redis
 from web3 import Web3
 from eth_account import Account
 
 from services.blockchain_base import BaseBlockchainService
+from services.cache_manager import cache_manager
+from services.contract_metadata import get_contract_metadata
 from services.event_hooks import emit_event
+from services.fee_oracle import get_fee_oracle
+from services.market_expiry_index import get_market_expiry_index
+from services.resolution_jobs import get_resolution_jobs
+from services.tx_tracker import get_tx_tracker, STATUS_CONFIRMED
 from services.xcom_api_service import XComAPIService
+from services.xcom_scheduler import PRIORITY_RESOLUTION
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Transaction kinds recorded with the tx tracker
+TX_KIND_RESOLUTION = 'market_resolution'
+TX_KIND_FEE_WITHDRAWAL = 'fee_withdrawal'
+
+# Aggregates refreshed by the refresh_aggregates background task
+RESOLUTION_STATS_CACHE_KEY = 'v2:resolution_stats'
+RESOLUTION_STATS_TTL = 900
+
+
+def _emit_market_resolved(market_id: int, actual_text: str, tx_hash: str,
+                          block_number: int, gas_used: int) -> None:
+    """Emit event for external consumers (Pro, SNAG-Bench)"""
+    emit_event('market.resolved', {
+        'market_id': market_id,
+        'actual_text': actual_text,
+        'tx_hash': tx_hash,
+        'block_number': block_number,
+        'gas_used': gas_used,
+    })
+
+
+def _on_resolution_settled(record: Dict[str, Any]) -> None:
+    """Tx tracker callback for resolutions submitted without waiting"""
+    metadata = record.get('metadata', {})
+    if record['status'] != STATUS_CONFIRMED:
+        logger.error(f"Resolution transaction {record['tx_hash']} {record['status']}: {record.get('error')}")
+        get_resolution_jobs().mark_failed(metadata.get('market_id'), record.get('error'))
+        return
+    get_resolution_jobs().complete(metadata.get('market_id'))
+    _emit_market_resolved(metadata.get('market_id'), metadata.get('actual_text'),
+                          record['tx_hash'], record['block_number'], record['gas_used'])
+
 
 class V2ResolutionService:
     """Service to resolve PredictionMarketV2 markets using X.com data"""
@@ -25,6 +65,8 @@ class V2ResolutionService:
     def __init__(self):
         self.blockchain = BaseBlockchainService()
         self.xcom = XComAPIService()
+        self.expiry_index = get_market_expiry_index()
+        self.jobs = get_resolution_jobs()
 
         # Owner wallet for signing transactions (contract owner only can resolve)
         self.owner_private_key = os.environ.get('OWNER_PRIVATE_KEY')
@@ -47,15 +89,23 @@ class V2ResolutionService:
     def get_pending_markets(self) -> List[Dict[str, Any]]:
         """Get markets that are past end time but not yet resolved"""
         try:
-            pending = []
-            market_count = self.blockchain.get_v2_market_count()
             current_time = int(datetime.now().timestamp())
+            try:
+                fetched = self.expiry_index.sync(self.blockchain)
+                candidate_ids = self.expiry_index.expired(now=current_time)
+            except redis.RedisError as e:
+                logger.warning(f"Market expiry index unavailable, scanning all markets: {e}")
+                fetched = {}
+                candidate_ids = range(self.blockchain.get_v2_market_count())
 
-            for market_id in range(market_count):
-                market = self.blockchain.get_v2_market(market_id)
+            pending = []
+            for market_id in candidate_ids:
+                market = fetched.get(market_id) or self.blockchain.get_v2_market(market_id)
                 if market:
                     # Market is pending if: not resolved AND end time has passed
-                    if not market['resolved'] and market['end_time'] < current_time:
+                    if market['resolved']:
+                        self._drop_from_expiry_index(market_id)
+                    elif market['end_time'] < current_time:
                         # Get submission count
                         submissions = self.blockchain.get_v2_market_submissions(market_id)
                         market['submission_count'] = len(submissions)
@@ -69,6 +119,28 @@ class V2ResolutionService:
             logger.error(f"Error getting pending markets: {e}")
             return []
 
+    def get_markets_ending_soon(self, within_seconds: int) -> List[Dict[str, Any]]:
+        """Get unresolved markets whose end time falls in the next within_seconds"""
+        try:
+            self.expiry_index.sync(self.blockchain)
+            market_ids = self.expiry_index.ending_within(within_seconds)
+        except redis.RedisError as e:
+            logger.warning(f"Market expiry index unavailable: {e}")
+            return []
+
+        markets = []
+        for market_id in market_ids:
+            market = self.blockchain.get_v2_market(market_id)
+            if market and not market['resolved']:
+                markets.append(market)
+        return markets
+
+    def _drop_from_expiry_index(self, market_id: int) -> None:
+        try:
+            self.expiry_index.remove(market_id)
+        except redis.RedisError:
+            pass
+
     def get_market_for_resolution(self, market_id: int) -> Optional[Dict[str, Any]]:
         """Get detailed market info needed for resolution"""
         try:
@@ -115,7 +187,7 @@ class V2ResolutionService:
                 # Fetch specific tweet by URL
                 tweet_id = self.xcom.extract_tweet_id_from_url(tweet_url)
                 if tweet_id:
-                    tweet_data = await self.xcom.fetch_tweet_by_id(tweet_id)
+                    tweet_data = await self.xcom.fetch_tweet_by_id(tweet_id, priority=PRIORITY_RESOLUTION)
                     if tweet_data:
                         # Verify it's from the expected user
                         if tweet_data.get('author_username', '').lower() == actor_handle.lower():
@@ -133,7 +205,8 @@ class V2ResolutionService:
                 username=actor_handle,
                 start_time=start_time,
                 end_time=end_time,
-                max_results=10
+                max_results=10,
+                priority=PRIORITY_RESOLUTION
             )
 
             if tweets:
@@ -146,15 +219,18 @@ class V2ResolutionService:
             logger.error(f"Error fetching tweet for {actor_handle}: {e}")
             return None
 
-    def resolve_market(self, market_id: int, actual_text: str) -> Dict[str, Any]:
+    def resolve_market(self, market_id: int, actual_text: str,
+                       wait_for_receipt: bool = True) -> Dict[str, Any]:
         """Resolve a market with the actual tweet text
 
         Args:
             market_id: The market ID to resolve
             actual_text: The actual tweet text to compare against predictions
+            wait_for_receipt: Block until mined. When False, the transaction is
+                handed to the tx tracker and the result has status 'pending'.
 
         Returns:
-            Dict with 'success', 'tx_hash', 'error' fields
+            Dict with 'success', 'tx_hash', 'status', 'error' fields
         """
         result = {
             'success': False,
@@ -194,6 +270,14 @@ class V2ResolutionService:
                 result['error'] = f"Actual text too long ({len(actual_text)} chars, max 280)"
                 return result
 
+            # A resolution already pending or confirmed for this market would only revert
+            in_flight = self.jobs.in_flight_tx(market_id)
+            if in_flight:
+                result['error'] = f"Resolution already submitted for market {market_id}"
+                result['tx_hash'] = in_flight
+                result['status'] = 'pending'
+                return result
+
             # Get contract
             contract = self.blockchain.contracts.get('PredictionMarketV2')
             if not contract:
@@ -214,15 +298,20 @@ class V2ResolutionService:
             # Build and sign transaction
             account = Account.from_key(self.owner_private_key)
 
-            # Verify this is the contract owner
-            contract_owner = contract.functions.owner().call()
+            # Verify this is the contract owner; a mismatch re-reads in case
+            # another process has not seen an OwnershipTransferred yet
+            metadata = get_contract_metadata()
+            contract_owner = metadata.get(self.blockchain)['owner']
+            if account.address.lower() != contract_owner.lower():
+                contract_owner = metadata.get(self.blockchain, refresh=True)['owner']
             if account.address.lower() != contract_owner.lower():
                 result['error'] = f"Account {account.address} is not the contract owner ({contract_owner})"
                 return result
 
-            # Build transaction
-            nonce = self.blockchain.w3.eth.get_transaction_count(account.address)
-            gas_price = self.blockchain.w3.eth.gas_price
+            # Build transaction ('pending' nonce so back-to-back async
+            # submissions don't collide while earlier ones are unmined)
+            nonce = self.blockchain.w3.eth.get_transaction_count(account.address, 'pending')
+            fee_params = get_fee_oracle().tx_fee_params('fast')
 
             # Estimate gas - Levenshtein calculation can be expensive
             try:
@@ -238,7 +327,7 @@ class V2ResolutionService:
                 'from': account.address,
                 'nonce': nonce,
                 'gas': gas_limit,
-                'gasPrice': gas_price,
+                **fee_params,
                 'chainId': self.blockchain.chain_id
             })
 
@@ -251,27 +340,41 @@ class V2ResolutionService:
 
             logger.info(f"Resolution transaction sent for market {market_id}: {tx_hash_hex}")
 
+            self.jobs.record_submission(market_id, tx_hash_hex)
+
+            if not wait_for_receipt:
+                # The transaction is broadcast: a tracker outage must not report it as failed
+                try:
+                    get_tx_tracker().track(tx_hash_hex, TX_KIND_RESOLUTION, {
+                        'market_id': market_id,
+                        'actual_text': actual_text,
+                    })
+                except Exception as e:
+                    logger.error(f"Could not track resolution transaction {tx_hash_hex}: {e}")
+                result['success'] = True
+                result['tx_hash'] = tx_hash_hex
+                result['status'] = 'pending'
+                return result
+
             # Wait for receipt
             receipt = self.blockchain.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
 
             if receipt['status'] == 1:
                 result['success'] = True
                 result['tx_hash'] = tx_hash_hex
+                result['status'] = 'confirmed'
                 result['gas_used'] = receipt['gasUsed']
                 result['block_number'] = receipt['blockNumber']
                 logger.info(f"Market {market_id} resolved successfully in block {receipt['blockNumber']}")
 
-                # Emit event for external consumers (Pro, SNAG-Bench)
-                emit_event('market.resolved', {
-                    'market_id': market_id,
-                    'actual_text': actual_text,
-                    'tx_hash': tx_hash_hex,
-                    'block_number': receipt['blockNumber'],
-                    'gas_used': receipt['gasUsed'],
-                })
+                self.jobs.complete(market_id)
+                _emit_market_resolved(market_id, actual_text, tx_hash_hex,
+                                      receipt['blockNumber'], receipt['gasUsed'])
             else:
                 result['error'] = "Transaction failed"
                 result['tx_hash'] = tx_hash_hex
+                result['status'] = 'failed'
+                self.jobs.mark_failed(market_id, result['error'])
                 logger.error(f"Resolution transaction failed for market {market_id}")
 
             return result
@@ -281,12 +384,14 @@ class V2ResolutionService:
             result['error'] = str(e)
             return result
 
-    async def auto_resolve_market(self, market_id: int, tweet_url: str) -> Dict[str, Any]:
+    async def auto_resolve_market(self, market_id: int, tweet_url: str,
+                                  wait_for_receipt: bool = True) -> Dict[str, Any]:
         """Automatically resolve a market by fetching tweet and calling resolveMarket
 
         Args:
             market_id: The market ID to resolve
             tweet_url: URL of the actual tweet to use for resolution
+            wait_for_receipt: Passed through to resolve_market
 
         Returns:
             Dict with resolution result
@@ -331,10 +436,11 @@ class V2ResolutionService:
             result['tweet_text'] = actual_text
 
             # Resolve market with actual text
-            resolution_result = self.resolve_market(market_id, actual_text)
+            resolution_result = self.resolve_market(market_id, actual_text, wait_for_receipt)
 
             result['success'] = resolution_result['success']
             result['tx_hash'] = resolution_result.get('tx_hash')
+            result['status'] = resolution_result.get('status')
             result['error'] = resolution_result.get('error')
             result['gas_used'] = resolution_result.get('gas_used')
 
@@ -345,11 +451,15 @@ class V2ResolutionService:
             result['error'] = str(e)
             return result
 
-    def withdraw_fees(self) -> Dict[str, Any]:
+    def withdraw_fees(self, wait_for_receipt: bool = True) -> Dict[str, Any]:
         """Withdraw accumulated platform fees (owner only)
 
+        Args:
+            wait_for_receipt: Block until mined. When False, the transaction is
+                handed to the tx tracker and the result has status 'pending'.
+
         Returns:
-            Dict with 'success', 'tx_hash', 'amount', 'error' fields
+            Dict with 'success', 'tx_hash', 'amount', 'status', 'error' fields
         """
         result = {
             'success': False,
@@ -379,14 +489,14 @@ class V2ResolutionService:
             result['amount'] = str(pending_fees)
 
             # Build transaction
-            nonce = self.blockchain.w3.eth.get_transaction_count(account.address)
-            gas_price = self.blockchain.w3.eth.gas_price
+            nonce = self.blockchain.w3.eth.get_transaction_count(account.address, 'pending')
+            fee_params = get_fee_oracle().tx_fee_params('standard')
 
             tx = contract.functions.withdrawFees().build_transaction({
                 'from': account.address,
                 'nonce': nonce,
                 'gas': 100000,
-                'gasPrice': gas_price,
+                **fee_params,
                 'chainId': self.blockchain.chain_id
             })
 
@@ -394,16 +504,30 @@ class V2ResolutionService:
             signed_tx = self.blockchain.w3.eth.account.sign_transaction(tx, self.owner_private_key)
             tx_hash = self.blockchain.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
+            if not wait_for_receipt:
+                try:
+                    get_tx_tracker().track(tx_hash.hex(), TX_KIND_FEE_WITHDRAWAL, {
+                        'amount': str(pending_fees),
+                    })
+                except Exception as e:
+                    logger.error(f"Could not track fee withdrawal transaction {tx_hash.hex()}: {e}")
+                result['success'] = True
+                result['tx_hash'] = tx_hash.hex()
+                result['status'] = 'pending'
+                return result
+
             # Wait for receipt
             receipt = self.blockchain.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
 
             if receipt['status'] == 1:
                 result['success'] = True
                 result['tx_hash'] = tx_hash.hex()
+                result['status'] = 'confirmed'
                 logger.info(f"Fees withdrawn: {pending_fees} ETH, tx: {tx_hash.hex()}")
             else:
                 result['error'] = "Transaction failed"
                 result['tx_hash'] = tx_hash.hex()
+                result['status'] = 'failed'
 
             return result
 
@@ -452,6 +576,18 @@ class V2ResolutionService:
             logger.error(f"Error getting resolution stats: {e}")
             return {}
 
+    def refresh_resolution_stats(self) -> Dict[str, Any]:
+        """Recompute resolution stats and publish them to the shared cache"""
+        stats = self.get_resolution_stats()
+        if stats:
+            stats['refreshed_at'] = datetime.now(timezone.utc).isoformat()
+            cache_manager.set(RESOLUTION_STATS_CACHE_KEY, stats, ttl=RESOLUTION_STATS_TTL)
+        return stats
+
+    def get_cached_resolution_stats(self) -> Dict[str, Any]:
+        """Resolution stats as last refreshed by the aggregates task (computed on a cache miss)"""
+        return cache_manager.get(RESOLUTION_STATS_CACHE_KEY) or self.refresh_resolution_stats()
+
 
 # Singleton instance
 _resolution_service = None
@@ -462,3 +598,8 @@ def get_resolution_service() -> V2ResolutionService:
     if _resolution_service is None:
         _resolution_service = V2ResolutionService()
     return _resolution_service
+
+
+def register_tx_handlers(tracker) -> None:
+    """Attach resolution callbacks to the tx tracker (called at app startup)"""
+    tracker.on_settled(TX_KIND_RESOLUTION, _on_resolution_settled)
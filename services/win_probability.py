@@ -0,0 +1,204 @@
+"""
+Monte Carlo win odds for every submission of a PredictionMarketV2 market.
+
+The actual tweet is unknown until resolution, so the engine builds a
+distribution of plausible actual texts:
+
+- the actor's recently resolved tweets from the text corpus
+  (services/corpus_search.py), sharing history_weight of the mass
+- the market's own predictions, sharing the rest
+
+A candidates x submissions distance matrix is computed once with
+rapidfuzz's bit-parallel, multi-threaded Levenshtein over UTF-8 bytes,
+which is the contract's metric. The argmin of each row, first submission
+on ties as in resolveMarket, is who would win if that candidate were the
+tweet.
+
+Uncertainty in the candidate weights is sampled with a Bayesian
+bootstrap. `draws` Dirichlet weight vectors times the one-hot winner
+matrix give `draws` win-probability vectors in one matrix product, and
+their 5th and 95th percentiles form the interval. Expected payout follows
+the V2 rules: the winner takes the pool less the platform fee, and a
+market left with one submission refunds it.
+
+Estimates are cached in Redis per market (winprob:v2:<market_id>). The
+cache entry is dropped by SubmissionCreated and MarketResolved.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import redis
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein as RapidLevenshtein
+
+from services.payout_simulator import MIN_SUBMISSIONS, PLATFORM_FEE_BPS, platform_fee
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+CACHE_PREFIX = "winprob:v2:"
+INTERVAL = (5, 95)
+
+
+def distance_matrix(candidates: Sequence[str], predictions: Sequence[str]) -> np.ndarray:
+    """Byte-level Levenshtein distance of every candidate to every prediction."""
+    return process.cdist([c.encode('utf-8') for c in candidates],
+                         [p.encode('utf-8') for p in predictions],
+                         scorer=RapidLevenshtein.distance, dtype=np.int32, workers=-1)
+
+
+def estimate_market(market: Dict[str, Any], history: Sequence[str], draws: int = 2000,
+                    history_weight: float = 0.5, fee_bps: int = PLATFORM_FEE_BPS,
+                    rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+    """Win probability, interval and expected payout of each submission."""
+    submissions = market['submissions']
+    total_pool = market['total_pool']
+    prize = total_pool - platform_fee(total_pool, fee_bps)
+    result = {'market_id': market['id'], 'total_pool': total_pool, 'candidates': 0,
+              'history_candidates': len(history), 'draws': 0, 'submissions': []}
+    if not submissions:
+        return result
+
+    if len(submissions) < MIN_SUBMISSIONS:
+        # Nobody to beat yet: the stake comes back if nobody else joins
+        submission = submissions[0]
+        result['submissions'] = [{
+            'submission_id': submission['id'], 'win_probability': 1.0, 'interval': [1.0, 1.0],
+            'stake': submission['amount'], 'payout_if_wins': submission['amount'],
+            'expected_payout': submission['amount'],
+        }]
+        return result
+
+    rng = rng or np.random.default_rng()
+    predictions = [s['predicted_text'] for s in submissions]
+    candidates = list(history) + predictions
+    if history:
+        weights = np.concatenate([np.full(len(history), history_weight / len(history)),
+                                  np.full(len(predictions), (1 - history_weight) / len(predictions))])
+    else:
+        weights = np.full(len(predictions), 1 / len(predictions))
+
+    winners = distance_matrix(candidates, predictions).argmin(axis=1)
+    wins = np.zeros((len(candidates), len(predictions)))
+    wins[np.arange(len(candidates)), winners] = 1.0
+
+    probability = weights @ wins
+    sampled = rng.dirichlet(weights * len(candidates), size=draws) @ wins
+    low, high = np.percentile(sampled, INTERVAL, axis=0)
+
+    result.update(candidates=len(candidates), draws=draws)
+    result['submissions'] = [{
+        'submission_id': submission['id'],
+        'win_probability': round(float(p), 6),
+        'interval': [round(float(lo), 6), round(float(hi), 6)],
+        'stake': submission['amount'],
+        'payout_if_wins': prize,
+        'expected_payout': int(prize * float(p)),
+    } for submission, p, lo, hi in zip(submissions, probability, low, high)]
+    return result
+
+
+class WinProbabilityEngine:
+    """Per-market win odds, cached until the market's next submission."""
+
+    def __init__(self, blockchain=None, redis_client: Optional[redis.Redis] = None, corpus=None,
+                 draws: int = 2000, history: int = 200, history_weight: float = 0.5, cache_ttl: int = 900):
+        self._blockchain = blockchain
+        self._redis = redis_client
+        self._corpus = corpus
+        self.draws = draws
+        self.history = history
+        self.history_weight = history_weight
+        self.cache_ttl = cache_ttl
+
+    @property
+    def blockchain(self):
+        if self._blockchain is None:
+            from services.blockchain_base import BaseBlockchainService
+            self._blockchain = BaseBlockchainService()
+        return self._blockchain
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    @property
+    def corpus(self):
+        if self._corpus is None:
+            from services.corpus_search import get_corpus_search
+            self._corpus = get_corpus_search()
+        return self._corpus
+
+    def get(self, market_id: int) -> Optional[Dict[str, Any]]:
+        """Cached estimate for a market, computed on a miss. None if the market does not exist."""
+        try:
+            cached = self.redis.get(CACHE_PREFIX + str(market_id))
+            if cached:
+                return json.loads(cached)
+        except redis.RedisError as e:
+            logger.debug("Win probability cache read failed", market_id=market_id, error=str(e))
+
+        market = self.blockchain.get_v2_market_snapshots([market_id]).get(market_id)
+        if market is None:
+            return None
+        estimate = self.estimate(market)
+        try:
+            self.redis.set(CACHE_PREFIX + str(market_id), json.dumps(estimate), ex=self.cache_ttl)
+        except redis.RedisError as e:
+            logger.debug("Win probability cache write failed", market_id=market_id, error=str(e))
+        return estimate
+
+    def estimate(self, market: Dict[str, Any]) -> Dict[str, Any]:
+        fee_bps = self.blockchain.get_v2_constants().get('platform_fee_bps', PLATFORM_FEE_BPS)
+        if market['resolved']:
+            # Nothing left to estimate: the winner is on chain
+            estimate = estimate_market(dict(market, submissions=[]), [], fee_bps=fee_bps)
+            prize = market['total_pool'] - platform_fee(market['total_pool'], fee_bps)
+            for submission in market['submissions']:
+                won = float(submission['id'] == market['winning_submission_id'])
+                estimate['submissions'].append({
+                    'submission_id': submission['id'], 'win_probability': won, 'interval': [won, won],
+                    'stake': submission['amount'], 'payout_if_wins': prize,
+                    'expected_payout': int(prize * won),
+                })
+        else:
+            history = self._history(market.get('actor_handle'))
+            estimate = estimate_market(market, history, self.draws, self.history_weight, fee_bps)
+        estimate['resolved'] = market['resolved']
+        return estimate
+
+    def _history(self, actor: Optional[str]) -> List[str]:
+        if not actor or self.history <= 0:
+            return []
+        return [doc['text'] for doc in self.corpus.recent(actor, limit=self.history)]
+
+    def invalidate(self, market_id: int) -> None:
+        self.redis.delete(CACHE_PREFIX + str(market_id))
+
+    def on_submission_created(self, event: Dict[str, Any]) -> None:
+        """Chain indexer handler: a new submission changes every submission's odds."""
+        self.invalidate(event['args']['marketId'])
+
+    def on_market_resolved(self, event: Dict[str, Any]) -> None:
+        self.invalidate(event['args']['marketId'])
+
+
+def get_win_probability_engine() -> WinProbabilityEngine:
+    """Get or create the process-wide win probability engine."""
+    global _win_probability_engine
+    if _win_probability_engine is None:
+        from config_chain import chain_config
+        _win_probability_engine = WinProbabilityEngine(
+            draws=chain_config.WIN_PROBABILITY_DRAWS,
+            history=chain_config.WIN_PROBABILITY_HISTORY,
+            cache_ttl=chain_config.WIN_PROBABILITY_CACHE_TTL,
+        )
+    return _win_probability_engine
+
+
+_win_probability_engine: Optional[WinProbabilityEngine] = None
@@ -6,12 +6,18 @@ import asyncio
 import re
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from playwright.async_api import async_playwright
 from PIL import Image
 from io import BytesIO
 
+from services.browser_pool import get_browser_pool
+from services.tweet_cache import get_tweet_cache
+from services.xcom_scheduler import PRIORITY_PREVIEW, get_xcom_scheduler
+
 logger = logging.getLogger(__name__)
 
+# X API v2 tweet lookup accepts at most 100 ids per request
+MAX_TWEETS_PER_LOOKUP = 100
+
 class XComAPIService:
     """Enhanced X.com API service with both API integration and manual fallback.
 
@@ -28,6 +34,9 @@ class XComAPIService:
         self.access_token = os.environ.get('X_ACCESS_TOKEN')
         self.access_token_secret = os.environ.get('X_ACCESS_TOKEN_SECRET')
         
+        # All API calls are admitted through the shared credit-aware scheduler
+        self.scheduler = get_xcom_scheduler()
+
         # Initialize API client if credentials are available
         self.client = None
         if self.bearer_token or self.api_key:
@@ -48,6 +57,8 @@ class XComAPIService:
                     if self.access_token and self.access_token_secret:
                         auth.set_access_token(self.access_token, self.access_token_secret)
                     self.client = tweepy.Client(auth=auth, wait_on_rate_limit=False)
+                # Rate-limit headers from every response feed the shared scheduler
+                self.scheduler.install(self.client)
                 logger.info("X.com API client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize X.com API client: {e}")
@@ -82,59 +93,117 @@ class XComAPIService:
                     return username
         return None
     
-    async def fetch_tweet_by_id(self, tweet_id: str) -> Optional[Dict[str, Any]]:
-        """Fetch tweet data using X.com API"""
+    async def fetch_tweet_by_id(self, tweet_id: str, priority: int = PRIORITY_PREVIEW) -> Optional[Dict[str, Any]]:
+        """Fetch tweet data using X.com API (served from the tweet cache when possible)"""
+        tweets = await self.get_tweets([tweet_id], priority=priority)
+        return tweets.get(str(tweet_id))
+
+    async def get_tweets(self, tweet_ids: List[str], priority: int = PRIORITY_PREVIEW) -> Dict[str, Dict[str, Any]]:
+        """Fetch several tweets, keyed by tweet id.
+
+        Cached tweets are returned without touching the API; the rest are
+        looked up MAX_TWEETS_PER_LOOKUP at a time and cached. Tweets that
+        could not be fetched are omitted from the result.
+        """
+        tweet_ids = list(dict.fromkeys(str(t) for t in tweet_ids if t))
+        if not tweet_ids:
+            return {}
+
+        cache = get_tweet_cache()
+        tweets = cache.get_many(tweet_ids)
+        missing = [t for t in tweet_ids if t not in tweets]
+        if not missing:
+            return tweets
+
         if not self.client:
-            logger.warning("X.com API client not initialized, cannot fetch tweet")
-            return None
-            
-        try:
-            # Get tweet with expansions for author info
-            tweet = self.client.get_tweet(
-                tweet_id,
-                expansions=['author_id'],
-                tweet_fields=['created_at', 'text', 'author_id'],
-                user_fields=['username', 'name']
-            )
-            
-            if tweet.data:
-                author = tweet.includes['users'][0] if tweet.includes and 'users' in tweet.includes else None
-                return {
-                    'id': tweet.data.id,
-                    'text': tweet.data.text,
+            logger.warning("X.com API client not initialized, cannot fetch tweets")
+            return tweets
+
+        fetched: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(missing), MAX_TWEETS_PER_LOOKUP):
+            chunk = missing[i:i + MAX_TWEETS_PER_LOOKUP]
+            try:
+                # Get tweets with expansions for author info
+                response = self.scheduler.call(
+                    '/2/tweets',
+                    lambda chunk=chunk: self.client.get_tweets(
+                        ids=chunk,
+                        expansions=['author_id'],
+                        tweet_fields=['created_at', 'text', 'author_id'],
+                        user_fields=['username', 'name']
+                    ),
+                    priority=priority,
+                    cost=len(chunk),
+                    key=('tweets', tuple(chunk)),
+                )
+            except Exception as e:
+                logger.error(f"Error fetching tweets {chunk}: {e}")
+                continue
+
+            users = {}
+            if response.includes and 'users' in response.includes:
+                users = {str(u.id): u for u in response.includes['users']}
+
+            for tweet in response.data or []:
+                author = users.get(str(tweet.author_id))
+                fetched[str(tweet.id)] = {
+                    'id': tweet.id,
+                    'text': tweet.text,
                     'author_username': author.username if author else None,
                     'author_name': author.name if author else None,
-                    'created_at': tweet.data.created_at
+                    'created_at': tweet.created_at
                 }
+
+        cache.put_many(fetched)
+        tweets.update(fetched)
+        return tweets
+
+    def lookup_user_id(self, username: str, priority: int = PRIORITY_PREVIEW) -> Optional[str]:
+        """Resolve a username to its X user id, caching the result"""
+        cache = get_tweet_cache()
+        user_id = cache.get_user_id(username)
+        if user_id or not self.client:
+            return user_id
+
+        user = self.scheduler.call(
+            '/2/users/by/username/:username',
+            lambda: self.client.get_user(username=username),
+            priority=priority,
+            key=('user', username.lower()),
+        )
+        if not user or not user.data:
+            logger.error(f"User {username} not found")
             return None
-            
-        except Exception as e:
-            logger.error(f"Error fetching tweet {tweet_id}: {e}")
-            return None
-    
+
+        cache.put_user_id(username, user.data.id)
+        return str(user.data.id)
+
     async def fetch_tweets_by_username(self, username: str, start_time: datetime, 
-                                     end_time: datetime, max_results: int = 100) -> List[Dict[str, Any]]:
+                                     end_time: datetime, max_results: int = 100,
+                                     priority: int = PRIORITY_PREVIEW) -> List[Dict[str, Any]]:
         """Fetch tweets from a user within a time window"""
         if not self.client:
             logger.warning("X.com API client not initialized")
             return []
             
         try:
-            # Get user ID from username
-            user = self.client.get_user(username=username)
-            if not user or not user.data:
-                logger.error(f"User {username} not found")
+            user_id = self.lookup_user_id(username, priority=priority)
+            if not user_id:
                 return []
-                
-            user_id = user.data.id
             
             # Fetch tweets in time window
-            tweets = self.client.get_users_tweets(
-                user_id,
-                start_time=start_time.isoformat() + 'Z',
-                end_time=end_time.isoformat() + 'Z',
-                max_results=max_results,
-                tweet_fields=['created_at', 'text']
+            tweets = self.scheduler.call(
+                '/2/users/:id/tweets',
+                lambda: self.client.get_users_tweets(
+                    user_id,
+                    start_time=start_time.isoformat() + 'Z',
+                    end_time=end_time.isoformat() + 'Z',
+                    max_results=max_results,
+                    tweet_fields=['created_at', 'text']
+                ),
+                priority=priority,
+                cost=max_results,
+                key=('user_tweets', user_id, start_time, end_time, max_results),
             )
             
             if not tweets.data:
@@ -154,65 +223,32 @@ class XComAPIService:
             logger.error(f"Error fetching tweets for {username}: {e}")
             return []
     
+    async def capture_tweet_screenshot_bytes(self, tweet_url: str) -> Optional[bytes]:
+        """Capture screenshot of tweet as raw PNG bytes"""
+        try:
+            return await get_browser_pool().capture(tweet_url)
+        except Exception as e:
+            logger.error(f"Error capturing screenshot: {e}")
+            return None
+
     async def capture_tweet_screenshot(self, tweet_url: str) -> Optional[str]:
-        """Capture screenshot of tweet using Playwright"""
+        """Capture screenshot of tweet as a base64 PNG data URI"""
         try:
-            async with async_playwright() as p:
-                # Launch browser in headless mode
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    viewport={'width': 800, 'height': 1200},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                )
-                
-                page = await context.new_page()
-                
-                # Navigate to tweet
-                await page.goto(tweet_url, wait_until='networkidle')
-                
-                # Wait for tweet to load
-                await page.wait_for_selector('article[data-testid="tweet"]', timeout=10000)
-                
-                # Remove cookie banner and other overlays if present
-                await page.evaluate('''
-                    () => {
-                        // Remove cookie banner
-                        const cookieBanner = document.querySelector('[data-testid="BottomBar"]');
-                        if (cookieBanner) cookieBanner.remove();
-                        
-                        // Remove login prompt
-                        const loginPrompt = document.querySelector('[data-testid="sheetDialog"]');
-                        if (loginPrompt) loginPrompt.remove();
-                        
-                        // Remove sticky header
-                        const header = document.querySelector('header');
-                        if (header) header.style.display = 'none';
-                    }
-                ''')
-                
-                # Find the tweet element
-                tweet_element = await page.query_selector('article[data-testid="tweet"]')
-                
-                if tweet_element:
-                    # Take screenshot of just the tweet
-                    screenshot_bytes = await tweet_element.screenshot()
-                    
-                    # Convert to base64
-                    base64_screenshot = base64.b64encode(screenshot_bytes).decode('utf-8')
-                    
-                    await browser.close()
-                    return f"data:image/png;base64,{base64_screenshot}"
-                else:
-                    logger.error("Tweet element not found on page")
-                    await browser.close()
-                    return None
-                    
+            screenshot_bytes = await self.capture_tweet_screenshot_bytes(tweet_url)
+            if not screenshot_bytes:
+                return None
+
+            # Convert to base64
+            base64_screenshot = base64.b64encode(screenshot_bytes).decode('utf-8')
+            return f"data:image/png;base64,{base64_screenshot}"
+
         except Exception as e:
             logger.error(f"Error capturing screenshot: {e}")
             return None
     
     async def verify_tweet_authenticity(self, tweet_id: str, expected_username: str,
-                                      start_time: datetime, end_time: datetime) -> Dict[str, Any]:
+                                      start_time: datetime, end_time: datetime,
+                                      priority: int = PRIORITY_PREVIEW) -> Dict[str, Any]:
         """Verify tweet authenticity using API or manual verification"""
         result = {
             'verified': False,
@@ -226,7 +262,7 @@ class XComAPIService:
         
         # Try API verification first
         if self.client:
-            tweet_data = await self.fetch_tweet_by_id(tweet_id)
+            tweet_data = await self.fetch_tweet_by_id(tweet_id, priority=priority)
             if tweet_data:
                 result['method'] = 'api'
                 result['text'] = tweet_data['text']
@@ -291,11 +327,7 @@ class XComAPIService:
         }
         
         if self.client:
-            try:
-                # Get rate limit status
-                limits = self.client.get_me()
-                status['rate_limits'] = 'Available'
-            except Exception as e:
-                status['rate_limits'] = f'Error: {str(e)}'
+            # Observed limits only: probing the API here would spend credits
+            status['rate_limits'] = self.scheduler.get_status()
         
-        return status
\ No newline at end of file
+        return status
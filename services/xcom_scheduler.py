@@ -0,0 +1,322 @@
+"""
+Credit-aware scheduler for X API calls.
+
+Every XComAPIService request goes through XApiScheduler.call(), which:
+- keeps a token bucket per endpoint, refilled from the real
+  x-rate-limit-limit / -remaining / -reset response headers,
+- charges a daily credit budget shared across workers via Redis
+  (X pay-per-use bills per post read),
+- orders waiters by priority lane so resolution is served before previews,
+  and holds back a share of each bucket and of the budget for resolution,
+- coalesces identical in-flight requests so concurrent callers share one
+  API call.
+"""
+
+import itertools
+import math
+import re
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, Optional
+from urllib.parse import urlparse
+
+import redis
+
+from utils.logging_config import get_logger
+from utils.redis_client import create_redis_client
+
+logger = get_logger(__name__)
+
+PRIORITY_RESOLUTION = 0
+PRIORITY_PREVIEW = 1
+LANES = {PRIORITY_RESOLUTION: 'resolution', PRIORITY_PREVIEW: 'preview'}
+
+CREDITS_KEY_PREFIX = "xcom:credits:"
+
+_ID_SEGMENT = re.compile(r'(?<=.)/\d+(?=/|$)')  # skips the leading /2 version
+_USERNAME_SEGMENT = re.compile(r'/by/username/[^/]+')
+
+
+class XApiThrottled(Exception):
+    """Raised when a call cannot be admitted within its lane's limits."""
+
+
+def normalize_endpoint(path: str) -> str:
+    """Map a request path to its rate-limit bucket, e.g. /2/users/123/tweets -> /2/users/:id/tweets."""
+    path = path.split('?', 1)[0]
+    path = _USERNAME_SEGMENT.sub('/by/username/:username', path)
+    return _ID_SEGMENT.sub('/:id', path)
+
+
+class _Bucket:
+    __slots__ = ('limit', 'remaining', 'reset_at')
+
+    def __init__(self, limit: int, remaining: int, reset_at: float):
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_at = reset_at
+
+    def refill(self, now: float):
+        if now >= self.reset_at:
+            self.remaining = self.limit
+
+
+class XApiScheduler:
+    """Admission control for X API calls."""
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        daily_credit_budget: int = 10000,
+        resolution_reserve: float = 0.2,
+        resolution_max_wait: float = 30,
+        preview_max_wait: float = 0,
+    ):
+        self._redis = redis_client
+        self.daily_credit_budget = daily_credit_budget
+        self.resolution_reserve = resolution_reserve
+        self.max_wait = {PRIORITY_RESOLUTION: resolution_max_wait, PRIORITY_PREVIEW: preview_max_wait}
+
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, _Bucket] = {}
+        self._waiters: Dict[str, list] = {}
+        self._seq = itertools.count()
+
+        self._inflight_lock = threading.Lock()
+        self._inflight: Dict[Hashable, tuple] = {}
+
+        # Fallback when Redis is unavailable: per-process daily counter
+        self._local_credits = {'date': None, 'used': 0}
+
+        self.stats = {'calls': 0, 'coalesced': 0, 'throttled': 0, 'budget_rejected': 0}
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = create_redis_client()
+        return self._redis
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def call(
+        self,
+        endpoint: str,
+        fn: Callable[[], Any],
+        priority: int = PRIORITY_PREVIEW,
+        cost: int = 1,
+        key: Optional[Hashable] = None,
+    ) -> Any:
+        """Run fn() once admitted. Identical keys in flight share one result.
+
+        A follower in a better lane than the leader is not bound by the
+        leader's limits: if the leader is throttled, it runs the call itself.
+        """
+        if key is None:
+            return self._execute(endpoint, fn, priority, cost)
+
+        with self._inflight_lock:
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                future = Future()
+                self._inflight[key] = (future, priority)
+
+        if not leader:
+            future, leader_priority = inflight
+            self.stats['coalesced'] += 1
+            try:
+                return future.result()
+            except XApiThrottled:
+                if priority >= leader_priority:
+                    raise
+            return self.call(endpoint, fn, priority, cost, key)
+
+        try:
+            result = self._execute(endpoint, fn, priority, cost)
+        except BaseException as e:
+            # Unregister before waking followers so a retrying one cannot rejoin this call
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def install(self, client) -> None:
+        """Feed rate-limit headers from a tweepy client's HTTP session."""
+        session = getattr(client, 'session', None)
+        if session is not None and self.observe_response not in session.hooks['response']:
+            session.hooks['response'].append(self.observe_response)
+
+    def observe_response(self, response, *args, **kwargs):
+        """requests response hook: update the endpoint's bucket from headers."""
+        headers = response.headers
+        if 'x-rate-limit-remaining' not in headers:
+            return response
+        try:
+            self.update_limits(
+                normalize_endpoint(urlparse(response.url).path),
+                limit=int(headers.get('x-rate-limit-limit', headers['x-rate-limit-remaining'])),
+                remaining=int(headers['x-rate-limit-remaining']),
+                reset_at=float(headers.get('x-rate-limit-reset', time.time() + 900)),
+            )
+        except (TypeError, ValueError) as e:
+            logger.debug("Unparseable X rate-limit headers", error=str(e))
+        return response
+
+    def update_limits(self, endpoint: str, limit: int, remaining: int, reset_at: float):
+        with self._cond:
+            self._buckets[endpoint] = _Bucket(limit, remaining, reset_at)
+            self._cond.notify_all()
+
+    def credits_used_today(self) -> int:
+        try:
+            return int(self.redis.get(self._credits_key()) or 0)
+        except Exception:
+            return self._local_credits['used'] if self._local_credits['date'] == self._today() else 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Snapshot of buckets and credit usage for monitoring."""
+        now = time.time()
+        with self._cond:
+            endpoints = {}
+            for endpoint, bucket in self._buckets.items():
+                bucket.refill(now)
+                endpoints[endpoint] = {
+                    'limit': bucket.limit,
+                    'remaining': bucket.remaining,
+                    'reset_at': datetime.fromtimestamp(bucket.reset_at, timezone.utc).isoformat(),
+                }
+            waiting = {LANES[p]: 0 for p in LANES}
+            for queue in self._waiters.values():
+                for priority, _ in queue:
+                    waiting[LANES[priority]] += 1
+        return {
+            'endpoints': endpoints,
+            'credits': {'used': self.credits_used_today(), 'budget': self.daily_credit_budget},
+            'waiting': waiting,
+            'stats': dict(self.stats),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _finish(self, key: Hashable):
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+
+    def _execute(self, endpoint, fn, priority, cost):
+        self._reserve_credits(priority, cost)
+        try:
+            self._acquire(endpoint, priority)
+        except XApiThrottled:
+            self._refund_credits(cost)
+            raise
+        self.stats['calls'] += 1
+        return fn()
+
+    def _acquire(self, endpoint: str, priority: int):
+        deadline = time.monotonic() + self.max_wait.get(priority, 0)
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            queue = self._waiters.setdefault(endpoint, [])
+            queue.append(ticket)
+            try:
+                while True:
+                    wait = self._blocked_for(endpoint, ticket)
+                    if wait == 0:
+                        bucket = self._buckets.get(endpoint)
+                        if bucket is not None:
+                            bucket.remaining -= 1
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or wait > remaining:
+                        self.stats['throttled'] += 1
+                        raise XApiThrottled(
+                            f"X API {endpoint} rate limit reached for {LANES[priority]} lane"
+                        )
+                    self._cond.wait(timeout=min(wait, remaining))
+            finally:
+                queue.remove(ticket)
+                self._cond.notify_all()
+
+    def _blocked_for(self, endpoint: str, ticket) -> float:
+        """Seconds to wait before ticket may proceed (0 = go now)."""
+        priority = ticket[0]
+        # Strict ordering per endpoint: better (priority, seq) tickets go first
+        if min(self._waiters[endpoint]) < ticket:
+            return 0.05
+
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            return 0
+        now = time.time()
+        bucket.refill(now)
+        reserve = math.ceil(bucket.limit * self.resolution_reserve) if priority > PRIORITY_RESOLUTION else 0
+        if bucket.remaining - reserve >= 1:
+            return 0
+        return max(bucket.reset_at - now, 0.05)
+
+    def _reserve_credits(self, priority: int, cost: int):
+        if not self.daily_credit_budget:
+            return
+        allowed = self.daily_credit_budget
+        if priority > PRIORITY_RESOLUTION:
+            allowed = int(allowed * (1 - self.resolution_reserve))
+
+        key = self._credits_key()
+        try:
+            used = self.redis.incrby(key, cost)
+            if used == cost:
+                self.redis.expire(key, 2 * 24 * 3600)
+        except Exception as e:
+            logger.debug("X credit counter unavailable, using local count", error=str(e))
+            today = self._today()
+            if self._local_credits['date'] != today:
+                self._local_credits = {'date': today, 'used': 0}
+            self._local_credits['used'] += cost
+            used = self._local_credits['used']
+
+        if used > allowed:
+            self._refund_credits(cost)
+            self.stats['budget_rejected'] += 1
+            raise XApiThrottled(
+                f"Daily X API credit budget exhausted for {LANES[priority]} lane ({used - cost}/{allowed})"
+            )
+
+    def _refund_credits(self, cost: int):
+        if not self.daily_credit_budget:
+            return
+        try:
+            self.redis.decrby(self._credits_key(), cost)
+        except Exception:
+            if self._local_credits['date'] == self._today():
+                self._local_credits['used'] -= cost
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime('%Y%m%d')
+
+    def _credits_key(self) -> str:
+        return CREDITS_KEY_PREFIX + self._today()
+
+
+def get_xcom_scheduler() -> XApiScheduler:
+    """Get or create the process-wide X API scheduler."""
+    global _xcom_scheduler
+    if _xcom_scheduler is None:
+        from config_chain import chain_config
+        _xcom_scheduler = XApiScheduler(
+            daily_credit_budget=chain_config.XCOM_DAILY_CREDIT_BUDGET,
+            resolution_reserve=chain_config.XCOM_RESOLUTION_RESERVE,
+            resolution_max_wait=chain_config.XCOM_RESOLUTION_MAX_WAIT,
+        )
+    return _xcom_scheduler
+
+
+_xcom_scheduler: Optional[XApiScheduler] = None
@@ -363,6 +363,28 @@ class BettingContract {
         return tx;
     }
 
+    async claimAllPayouts() {
+        // Server plans the claims: winning unclaimed submissions bundled
+        // through Multicall3 into as few transactions as possible
+        const response = await fetch(`/api/chain/v2/claims/${this.account}`);
+        const body = await response.json();
+        if (!body.success) {
+            throw new Error(body.error?.message || 'Failed to load claim plan');
+        }
+
+        const receipts = [];
+        for (const tx of body.data.transactions) {
+            receipts.push(await this.web3.eth.sendTransaction({
+                from: this.account,
+                to: tx.to,
+                data: tx.data,
+                value: '0',
+                gas: Math.floor(tx.gas * 1.2)
+            }));
+        }
+        return receipts;
+    }
+
     async refundSingleSubmission(marketId) {
         // For markets with only 1 submission after end time
         const gasEstimate = await this.contract.methods
@@ -317,6 +317,11 @@ class MarketDetailBlockchain {
                 throw new Error('Minimum stake is 0.001 ETH');
             }
 
+            // Warn before spending gas on a near-copy of an existing prediction
+            if (!(await this.confirmNotNearDuplicate(predictedText))) {
+                return;
+            }
+
             // Show loading
             const submitBtn = document.getElementById('submit-prediction-btn');
             submitBtn.disabled = true;
@@ -366,6 +371,27 @@ class MarketDetailBlockchain {
         }
     }
 
+    async confirmNotNearDuplicate(predictedText) {
+        try {
+            const params = new URLSearchParams({ text: predictedText, limit: '1' });
+            const response = await fetch(`/api/chain/v2/market/${this.marketId}/similar?${params}`);
+            const body = await response.json();
+            const near = body.success ? body.data.near_duplicates : [];
+            if (near.length === 0) {
+                return true;
+            }
+            return confirm(
+                `Your prediction is ${near[0].distance} edit(s) away from an existing one ` +
+                `(submission #${near[0].submission_id}):\n\n"${near[0].cleaned_text}"\n\n` +
+                'Submit anyway?'
+            );
+        } catch (error) {
+            // The check is advisory; never block a submission on it
+            console.warn('Near-duplicate check failed:', error);
+            return true;
+        }
+    }
+
     async handleClaimPayout(submissionId) {
         try {
             // Check wallet connection
@@ -1,417 +1,250 @@
-from celery import Celery
-from app import app, celery, db
-from models import Bet, Stake, Transaction, SyntheticTimeEntry, NodeOperator, Oracle
-from services.reconciliation import ReconciliationService
-from services.network import NetworkService
-from services.time_ledger import TimeLedgerService
-from services.oracle import OracleService
-from services.blockchain import BlockchainService
-from services.time_consensus import TimeConsensusService
-from config import Config
-import logging
-from datetime import datetime, timedelta, timezone
-
-# Background task definitions for Celery
-
-@celery.task(bind=True)
-def reconcile_network(self):
-    """Periodic network reconciliation task"""
-    try:
-        with app.app_context():
-            logging.info("Starting network reconciliation task")
-            
-            # Perform full reconciliation
-            result = ReconciliationService.reconcile_full()
-            
-            if result.get('error'):
-                logging.error(f"Network reconciliation failed: {result['error']}")
-                raise Exception(result['error'])
-            
-            logging.info(f"Network reconciliation completed: {result}")
-            return result
-            
-    except Exception as e:
-        logging.error(f"Error in network reconciliation task: {e}")
-        raise self.retry(exc=e, countdown=300, max_retries=3)
-
-@celery.task(bind=True)
-def sync_time_ledger(self):
-    """Periodic time ledger synchronization task"""
-    try:
-        with app.app_context():
-            logging.info("Starting time ledger sync task")
-            
-            # Sync with network
-            result = ReconciliationService.reconcile_time_ledger()
-            
-            if result.get('error'):
-                logging.error(f"Time ledger sync failed: {result['error']}")
-                raise Exception(result['error'])
-            
-            logging.info(f"Time ledger sync completed: {result}")
-            return result
-            
-    except Exception as e:
-        logging.error(f"Error in time ledger sync task: {e}")
-        raise self.retry(exc=e, countdown=60, max_retries=5)
-
-@celery.task(bind=True)
-def process_pending_transactions(self):
-    """Process pending blockchain transactions"""
-    try:
-        with app.app_context():
-            logging.info("Starting pending transaction processing")
-            
-            # Get pending transactions
-            pending_txs = Transaction.query.filter_by(status='pending').all()
-            
-            processed_count = 0
-            
-            for tx in pending_txs:
-                try:
-                    # Validate transaction on blockchain
-                    is_valid = BlockchainService.validate_transaction(
-                        tx.tx_hash,
-                        tx.currency,
-                        str(tx.amount)
-                    )
-                    
-                    if is_valid:
-                        tx.status = 'confirmed'
-                        tx.confirmed_at = datetime.now(timezone.utc)
-                        
-                        # Get transaction details
-                        details = BlockchainService.get_transaction_details(
-                            tx.tx_hash,
-                            tx.currency
-                        )
-                        
-                        if details:
-                            tx.block_number = details.get('block_number')
-                            tx.confirmations = details.get('confirmations', 0)
-                        
-                        processed_count += 1
-                        
-                        # Record in time ledger
-                        TimeLedgerService.record_entry('transaction_confirmed', {
-                            'tx_hash': tx.tx_hash,
-                            'amount': str(tx.amount),
-                            'currency': tx.currency,
-                            'confirmations': tx.confirmations
-                        })
-                        
-                    else:
-                        # Check if transaction is old enough to mark as failed
-                        if tx.created_at < datetime.now(timezone.utc) - timedelta(hours=24):
-                            tx.status = 'failed'
-                            logging.warning(f"Transaction marked as failed: {tx.tx_hash}")
-                    
-                except Exception as e:
-                    logging.error(f"Error processing transaction {tx.tx_hash}: {e}")
-                    continue
-            
-            db.session.commit()
-            
-            logging.info(f"Processed {processed_count} pending transactions")
-            return {'processed': processed_count, 'total_pending': len(pending_txs)}
-            
-    except Exception as e:
-        logging.error(f"Error in pending transaction processing: {e}")
-        raise self.retry(exc=e, countdown=120, max_retries=3)
-
-@celery.task(bind=True)
-def resolve_pending_bets(self):
-    """Resolve bets that have passed their end time"""
-    try:
-        with app.app_context():
-            logging.info("Starting pending bet resolution")
-            
-            # Get pending resolutions
-            pending_bets = OracleService.get_pending_resolutions()
-            
-            resolved_count = 0
-            
-            for bet in pending_bets:
-                try:
-                    # Check if oracle statements exist
-                    from models import OracleStatement
-                    statements = OracleStatement.query.filter_by(
-                        bet_id=bet.id,
-                        approved=True
-                    ).all()
-                    
-                    if statements:
-                        # Use the first approved statement
-                        statement = statements[0]
-                        
-                        # Resolve the bet
-                        success = OracleService.resolve_bet(bet.id, statement.statement)
-                        
-                        if success:
-                            resolved_count += 1
-                            logging.info(f"Bet resolved: {bet.id}")
-                        else:
-                            logging.error(f"Failed to resolve bet: {bet.id}")
-                    else:
-                        logging.debug(f"No approved oracle statements for bet: {bet.id}")
-                    
-                except Exception as e:
-                    logging.error(f"Error resolving bet {bet.id}: {e}")
-                    continue
-            
-            logging.info(f"Resolved {resolved_count} pending bets")
-            return {'resolved': resolved_count, 'total_pending': len(pending_bets)}
-            
-    except Exception as e:
-        logging.error(f"Error in pending bet resolution: {e}")
-        raise self.retry(exc=e, countdown=180, max_retries=3)
-
-@celery.task(bind=True)
-def update_oracle_reputations(self):
-    """Update oracle reputation scores"""
-    try:
-        with app.app_context():
-            logging.info("Starting oracle reputation update")
-            
-            # Get all oracles
-            oracles = Oracle.query.filter_by(active=True).all()
-            
-            updated_count = 0
-            
-            for oracle in oracles:
-                try:
-                    # Calculate reputation
-                    reputation = OracleService.get_oracle_reputation(oracle.id)
-                    
-                    if reputation != oracle.reputation_score:
-                        oracle.reputation_score = reputation
-                        updated_count += 1
-                        
-                        logging.debug(f"Updated reputation for oracle {oracle.id}: {reputation}")
-                    
-                except Exception as e:
-                    logging.error(f"Error updating reputation for oracle {oracle.id}: {e}")
-                    continue
-            
-            db.session.commit()
-            
-            logging.info(f"Updated {updated_count} oracle reputations")
-            return {'updated': updated_count, 'total_oracles': len(oracles)}
-            
-    except Exception as e:
-        logging.error(f"Error in oracle reputation update: {e}")
-        raise self.retry(exc=e, countdown=300, max_retries=3)
-
-@celery.task(bind=True)
-def cleanup_old_data(self):
-    """Clean up old data to prevent database bloat"""
-    try:
-        with app.app_context():
-            logging.info("Starting data cleanup")
-            
-            # Clean up old time ledger entries
-            time_entries_cleaned = TimeLedgerService.cleanup_old_entries(days_to_keep=30)
-            
-            # Clean up old failed transactions
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
-            failed_txs_cleaned = Transaction.query.filter(
-                Transaction.status == 'failed',
-                Transaction.created_at < cutoff_date
-            ).delete()
-            
-            # Clean up old resolved bets (keep for 90 days)
-            bet_cutoff_date = datetime.now(timezone.utc) - timedelta(days=90)
-            old_bets_cleaned = Bet.query.filter(
-                Bet.status == 'resolved',
-                Bet.resolution_time < bet_cutoff_date
-            ).delete()
-            
-            db.session.commit()
-            
-            result = {
-                'time_entries_cleaned': time_entries_cleaned,
-                'failed_transactions_cleaned': failed_txs_cleaned,
-                'old_bets_cleaned': old_bets_cleaned
-            }
-            
-            logging.info(f"Data cleanup completed: {result}")
-            return result
-            
-    except Exception as e:
-        logging.error(f"Error in data cleanup: {e}")
-        raise self.retry(exc=e, countdown=600, max_retries=2)
-
-@celery.task(bind=True)
-def monitor_network_health(self):
-    """Monitor network health and node status"""
-    try:
-        with app.app_context():
-            logging.info("Starting network health monitoring")
-            
-            # Get network status
-            network_status = NetworkService.get_network_status()
-            
-            # Check for unhealthy nodes
-            unhealthy_nodes = []
-            cutoff_time = datetime.now(timezone.utc) - timedelta(minutes=10)
-            
-            nodes = NodeOperator.query.filter_by(status='active').all()
-            
-            for node in nodes:
-                if not node.last_heartbeat or node.last_heartbeat < cutoff_time:
-                    unhealthy_nodes.append(node.operator_id)
-                    logging.warning(f"Node appears unhealthy: {node.operator_id}")
-            
-            # Try to sync with network
-            sync_result = NetworkService.sync_with_network()
-            
-            result = {
-                'network_status': network_status,
-                'unhealthy_nodes': unhealthy_nodes,
-                'sync_successful': sync_result,
-                'timestamp': TimeLedgerService.get_current_time_ms()
-            }
-            
-            logging.info(f"Network health monitoring completed: {result}")
-            return result
-            
-    except Exception as e:
-        logging.error(f"Error in network health monitoring: {e}")
-        raise self.retry(exc=e, countdown=180, max_retries=3)
-
-@celery.task(bind=True)
-def validate_data_integrity(self):
-    """Validate data integrity across the system"""
+"""
+Chain-native background tasks, scheduled by Celery beat (tasks/schedule.py).
+
+- index_new_blocks:      advance the PredictionMarketV2 event indexer
+- find_expired_markets:  enqueue auto-resolution for resolvable expired markets
+                         and pre-warm actor lookups for markets about to end
+- auto_resolve_market:   fetch the actor's tweet and submit resolveMarket
+- refresh_aggregates:    recompute cached platform/resolution stats and roll
+                         leaderboard windows
+
+Every task run records its duration and the depth of the queue it came
+from (services/task_metrics.py).
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import redis
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import task_postrun, task_prerun
+
+from app import celery
+from services.cache_manager import cache_manager
+from services.chain_indexer import get_chain_indexer
+from services.contract_metadata import get_contract_metadata
+from services.claim_planner import get_claim_planner
+from services.corpus_search import get_corpus_search
+from services.leaderboard import get_leaderboard
+from services.market_expiry_index import get_market_expiry_index
+from services.portfolio_index import get_portfolio_index
+from services.prediction_index import get_prediction_index
+from services.resolution_jobs import get_resolution_jobs
+from services.submission_clusters import get_submission_clusters
+from services.task_metrics import get_task_metrics
+from services.win_probability import get_win_probability_engine
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_task_started = {}
+_broker_client = None
+
+
+def _broker():
+    """Redis client for the Celery broker (queues are Redis lists)."""
+    global _broker_client
+    if _broker_client is None:
+        _broker_client = redis.from_url(celery.conf.broker_url, decode_responses=True,
+                                        socket_connect_timeout=5, socket_timeout=5)
+    return _broker_client
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.monotonic()
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    metrics = get_task_metrics()
+    metrics.record_run(task.name, (time.monotonic() - started) * 1000, state == 'SUCCESS')
+
+    queue = (task.request.delivery_info or {}).get('routing_key')
+    if queue:
+        try:
+            metrics.record_backlog(queue, _broker().llen(queue))
+        except Exception as e:
+            logger.debug("Could not read queue depth", queue=queue, error=str(e))
+
+
+# ====================================================================
+# EVENT INDEXING
+# ====================================================================
+
+def _invalidate_market_cache(event):
+    market_id = event['args'].get('marketId')
+    if market_id is not None:
+        cache_manager.delete(cache_manager.market_key(market_id))
+
+
+def register_event_handlers(indexer) -> None:
+    """Attach chain event consumers to the indexer"""
+    for event_name in ('MarketCreated', 'SubmissionCreated', 'MarketResolved', 'SingleSubmissionRefunded'):
+        indexer.on(event_name, _invalidate_market_cache)
+
+    expiry_index = get_market_expiry_index()
+    indexer.on('MarketCreated', expiry_index.on_market_created)
+    indexer.on('MarketResolved', expiry_index.on_market_resolved)
+    indexer.on('MarketResolved', get_resolution_jobs().on_market_resolved)
+
+    claim_planner = get_claim_planner()
+    indexer.on('MarketResolved', claim_planner.on_market_resolved)
+    indexer.on('PayoutClaimed', claim_planner.on_payout_claimed)
+
+    portfolio_index = get_portfolio_index()
+    indexer.on('SubmissionCreated', portfolio_index.on_submission_created)
+    indexer.on('MarketResolved', portfolio_index.on_market_resolved)
+    indexer.on('SingleSubmissionRefunded', portfolio_index.on_single_submission_refunded)
+    indexer.on('PayoutClaimed', portfolio_index.on_payout_claimed)
+    indexer.on('FeesWithdrawn', portfolio_index.on_fees_withdrawn)
+
+    indexer.on('MarketResolved', get_leaderboard().on_market_resolved)
+
+    prediction_index = get_prediction_index()
+    indexer.on('SubmissionCreated', prediction_index.on_submission_created)
+    indexer.on('MarketResolved', prediction_index.on_market_resolved)
+    indexer.on('MarketResolved', get_corpus_search().on_market_resolved)
+
+    win_probability = get_win_probability_engine()
+    indexer.on('SubmissionCreated', win_probability.on_submission_created)
+    indexer.on('MarketResolved', win_probability.on_market_resolved)
+    indexer.on('SubmissionCreated', get_submission_clusters().on_submission_created)
+    indexer.on('OwnershipTransferred', get_contract_metadata().on_ownership_transferred)
+
+
+@celery.task(bind=True, soft_time_limit=50, time_limit=60)
+def index_new_blocks(self):
+    """Index PredictionMarketV2 events since the last indexed block"""
     try:
-        with app.app_context():
-            logging.info("Starting data integrity validation")
-            
-            # Validate time chain
-            time_chain_valid = TimeLedgerService.validate_time_chain()
-            
-            # Validate transaction integrity
-            transaction_integrity = ReconciliationService._validate_transaction_integrity()
-            
-            # Check for orphaned stakes
-            orphaned_stakes = Stake.query.filter(
-                ~Stake.bet_id.in_(db.session.query(Bet.id))
-            ).count()
-            
-            # Check for inconsistent bet statuses
-            inconsistent_bets = Bet.query.filter(
-                Bet.status == 'resolved',
-                Bet.resolution_time.is_(None)
-            ).count()
-            
-            # Check for unpaid winning stakes
-            unpaid_winning_stakes = Stake.query.join(Bet).filter(
-                Bet.status == 'resolved',
-                Bet.won == True,
-                Stake.position == 'for',
-                Stake.paid_out == False
-            ).count()
-            
-            result = {
-                'time_chain_valid': time_chain_valid,
-                'transaction_integrity': transaction_integrity,
-                'orphaned_stakes': orphaned_stakes,
-                'inconsistent_bets': inconsistent_bets,
-                'unpaid_winning_stakes': unpaid_winning_stakes,
-                'timestamp': TimeLedgerService.get_current_time_ms()
-            }
-            
-            # Log any issues
-            if not time_chain_valid:
-                logging.error("Time chain validation failed!")
-            if not transaction_integrity:
-                logging.error("Transaction integrity validation failed!")
-            if orphaned_stakes > 0:
-                logging.warning(f"Found {orphaned_stakes} orphaned stakes")
-            if inconsistent_bets > 0:
-                logging.warning(f"Found {inconsistent_bets} inconsistent bets")
-            if unpaid_winning_stakes > 0:
-                logging.warning(f"Found {unpaid_winning_stakes} unpaid winning stakes")
-            
-            logging.info(f"Data integrity validation completed: {result}")
-            return result
-            
-    except Exception as e:
-        logging.error(f"Error in data integrity validation: {e}")
-        raise self.retry(exc=e, countdown=300, max_retries=2)
-
-@celery.task(bind=True)
-def synchronize_time_consensus(self):
-    """Synchronize time consensus across nodes"""
+        indexer = get_chain_indexer()
+        register_event_handlers(indexer)
+        result = indexer.index_once()
+        if result['lag']:
+            logger.info("Indexer behind chain head", lag=result['lag'], to_block=result['to_block'])
+        return result
+    except SoftTimeLimitExceeded:
+        logger.warning("Block indexing hit its time limit; will resume from cursor")
+        return {'status': 'timeout'}
+
+
+# ====================================================================
+# RESOLUTION
+# ====================================================================
+
+@celery.task(bind=True, soft_time_limit=50, time_limit=60)
+def find_expired_markets(self):
+    """Enqueue auto-resolution for expired, unresolved markets"""
+    from services.v2_resolution import get_resolution_service
+
+    resolution_service = get_resolution_service()
+    if not resolution_service.owner_private_key:
+        return {'status': 'skipped', 'reason': 'owner_key_not_configured'}
+    if not resolution_service.xcom.get_api_status()['api_configured']:
+        return {'status': 'skipped', 'reason': 'xcom_api_not_configured'}
+
+    jobs = get_resolution_jobs()
+    pending = resolution_service.get_pending_markets()
+    enqueued = []
+    for market in pending:
+        # enqueue() is a no-op while the market already has an active job
+        if market.get('can_resolve') and jobs.enqueue(market['id']):
+            auto_resolve_market.delay(market['id'])
+            enqueued.append(market['id'])
+
+    recovered = jobs.recover_stalled()
+    for market_id in recovered:
+        auto_resolve_market.delay(market_id)
+
+    prewarmed = _prewarm_actor_lookups(resolution_service)
+    return {'status': 'success', 'pending_count': len(pending), 'enqueued': enqueued,
+            'recovered': recovered, 'prewarmed': prewarmed}
+
+
+def _prewarm_actor_lookups(resolution_service) -> int:
+    """Cache user ids for actors of markets about to end so resolution costs one API read"""
+    from config_chain import chain_config
+
+    handles = {m['actor_handle'] for m in
+               resolution_service.get_markets_ending_soon(chain_config.RESOLUTION_PREWARM_WINDOW)}
+    prewarmed = 0
+    for handle in handles:
+        try:
+            if resolution_service.xcom.lookup_user_id(handle):
+                prewarmed += 1
+        except Exception as e:
+            logger.debug("Actor pre-warm skipped", actor_handle=handle, error=str(e))
+    return prewarmed
+
+
+@celery.task(bind=True, soft_time_limit=110, time_limit=120, max_retries=3)
+def auto_resolve_market(self, market_id):
+    """Resolve one market from its actor's most recent tweet.
+
+    Runs under the market's resolution lease, so duplicate deliveries and
+    retries never fetch or submit twice.
+    """
+    from services.v2_resolution import get_resolution_service
+
+    jobs = get_resolution_jobs()
+    with jobs.lease(market_id) as lease:
+        if lease is None:
+            return {'status': 'skipped', 'market_id': market_id, 'reason': 'in_flight'}
+
+        tx_hash = jobs.in_flight_tx(market_id)
+        if tx_hash:
+            return {'status': 'skipped', 'market_id': market_id, 'reason': 'already_submitted',
+                    'tx_hash': tx_hash}
+
+        resolution_service = get_resolution_service()
+        try:
+            market = resolution_service.blockchain.get_v2_market(market_id)
+            if not market or market['resolved']:
+                jobs.complete(market_id)
+                return {'status': 'skipped', 'market_id': market_id, 'reason': 'not_pending'}
+
+            tweet_data = asyncio.run(resolution_service.fetch_actual_tweet(market['actor_handle']))
+            actual_text = (tweet_data or {}).get('text')
+            if not actual_text:
+                logger.warning("No tweet available for resolution", market_id=market_id,
+                               actor_handle=market['actor_handle'])
+                jobs.mark_failed(market_id, 'tweet_not_found')
+                return {'status': 'skipped', 'market_id': market_id, 'reason': 'tweet_not_found'}
+
+            result = resolution_service.resolve_market(market_id, actual_text, wait_for_receipt=False)
+            if not result['success']:
+                logger.error("Auto-resolution failed", market_id=market_id, error=result.get('error'))
+                jobs.mark_failed(market_id, result.get('error'))
+                return {'status': 'failed', 'market_id': market_id, 'error': result.get('error')}
+
+            logger.info("Auto-resolution submitted", market_id=market_id, tx_hash=result['tx_hash'])
+            return {'status': 'submitted', 'market_id': market_id, 'tx_hash': result['tx_hash']}
+
+        except SoftTimeLimitExceeded:
+            raise self.retry(countdown=60)
+
+
+# ====================================================================
+# AGGREGATES
+# ====================================================================
+
+@celery.task(bind=True, soft_time_limit=240, time_limit=280)
+def refresh_aggregates(self):
+    """Recompute cached aggregates served by admin and stats endpoints"""
+    from services.v2_resolution import get_resolution_service
+
+    stats = get_resolution_service().refresh_resolution_stats()
     try:
-        with app.app_context():
-            logging.info("Starting time consensus synchronization")
-            
-            time_consensus_service = TimeConsensusService()
-            
-            # Broadcast time sync to network
-            time_consensus_service.broadcast_time_sync()
-            
-            # Get network time consensus
-            consensus = time_consensus_service.get_network_time_consensus()
-            
-            if consensus['consensus']:
-                logging.info(f"Time consensus achieved: {consensus['consensus_ratio']:.2%} nodes in sync")
-                
-                # Create time checkpoint if consensus is strong
-                if consensus['consensus_ratio'] >= 0.8:
-                    checkpoint_id = time_consensus_service.create_time_checkpoint()
-                    if checkpoint_id:
-                        logging.info(f"Created time checkpoint: {checkpoint_id}")
-                        
-            else:
-                logging.warning(f"Time consensus not achieved: {consensus}")
-                
-            # Schedule next sync
-            synchronize_time_consensus.apply_async(countdown=30)
-            
-            return {
-                'consensus': consensus['consensus'],
-                'consensus_ratio': consensus.get('consensus_ratio', 0),
-                'nodes_in_sync': consensus.get('nodes_in_sync', 0),
-                'average_time_diff': consensus.get('average_time_diff', 0)
-            }
-            
-    except Exception as e:
-        logging.error(f"Error in time consensus synchronization: {e}")
-        raise self.retry(exc=e, countdown=60, max_retries=3)
-
-# Periodic task scheduler
-@celery.task
-def schedule_periodic_tasks():
-    """Schedule all periodic tasks"""
-    
-    # Network reconciliation every 5 minutes
-    reconcile_network.apply_async(countdown=300)
-    
-    # Time ledger sync every 1 minute
-    sync_time_ledger.apply_async(countdown=60)
-    
-    # Process pending transactions every 2 minutes
-    process_pending_transactions.apply_async(countdown=120)
-    
-    # Resolve pending bets every 3 minutes
-    resolve_pending_bets.apply_async(countdown=180)
-    
-    # Update oracle reputations every 15 minutes
-    update_oracle_reputations.apply_async(countdown=900)
-    
-    # Clean up old data every hour
-    cleanup_old_data.apply_async(countdown=3600)
-    
-    # Monitor network health every 3 minutes
-    monitor_network_health.apply_async(countdown=180)
-    
-    # Validate data integrity every 30 minutes
-    validate_data_integrity.apply_async(countdown=1800)
-    
-    # Synchronize time consensus every 30 seconds
-    synchronize_time_consensus.apply_async(countdown=30)
-
-# Initialize periodic tasks on startup
-with app.app_context():
-    schedule_periodic_tasks.apply_async(countdown=10)
+        rescored = get_leaderboard().roll_windows()
+    except redis.RedisError as e:
+        logger.warning("Leaderboard window roll failed", error=str(e))
+        rescored = None
+    return {
+        'status': 'success' if stats else 'error',
+        'leaderboard_rescored': rescored,
+        'refreshed_at': datetime.now(timezone.utc).isoformat(),
+    }
@@ -450,12 +450,8 @@ def setup_consensus_periodic_tasks(sender, **kwargs):
         name='resolve_expired_bets'
     )
 
-    # Resolve V2 pending markets every 5 minutes
-    sender.add_periodic_task(
-        300.0,
-        resolve_v2_pending_markets.s(),
-        name='resolve_v2_pending_markets'
-    )
+    # V2 markets are resolved by the beat schedule in tasks/schedule.py
+    # (find_expired_markets -> auto_resolve_market)
 
 
 # ====================================================================
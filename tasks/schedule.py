@@ -0,0 +1,41 @@
+"""
+Celery beat schedule and queue routing for chain-native background tasks.
+
+Kept free of app imports so make_celery() can apply it before any task
+module is loaded. Run workers per queue, e.g.:
+
+    celery -A app.celery worker -Q indexing,resolution,aggregates
+    celery -A app.celery beat
+"""
+
+QUEUE_INDEXING = 'indexing'
+QUEUE_RESOLUTION = 'resolution'
+QUEUE_AGGREGATES = 'aggregates'
+
+TASK_ROUTES = {
+    'tasks.background.index_new_blocks': {'queue': QUEUE_INDEXING},
+    'tasks.background.find_expired_markets': {'queue': QUEUE_RESOLUTION},
+    'tasks.background.auto_resolve_market': {'queue': QUEUE_RESOLUTION},
+    'tasks.background.refresh_aggregates': {'queue': QUEUE_AGGREGATES},
+}
+
+
+def build_beat_schedule(config):
+    """Periodic tasks; each run expires after one interval so a stalled queue never piles up duplicates."""
+    return {
+        'index-new-blocks': {
+            'task': 'tasks.background.index_new_blocks',
+            'schedule': float(config.INDEX_BLOCKS_INTERVAL),
+            'options': {'expires': config.INDEX_BLOCKS_INTERVAL},
+        },
+        'find-expired-markets': {
+            'task': 'tasks.background.find_expired_markets',
+            'schedule': float(config.EXPIRED_MARKETS_INTERVAL),
+            'options': {'expires': config.EXPIRED_MARKETS_INTERVAL},
+        },
+        'refresh-aggregates': {
+            'task': 'tasks.background.refresh_aggregates',
+            'schedule': float(config.AGGREGATES_REFRESH_INTERVAL),
+            'options': {'expires': config.AGGREGATES_REFRESH_INTERVAL},
+        },
+    }
@@ -2,6 +2,8 @@
 Shared pytest fixtures for Proteus tests.
 """
 
+import copy
+import fnmatch
 import pytest
 import os
 import sys
@@ -12,6 +14,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from web3 import Web3
 from eth_account import Account
 from eth_account.messages import encode_defunct
+import redis
+from redis.exceptions import LockError
 
 
 # =============================================================================
@@ -214,6 +218,322 @@ def sample_submission_data():
     }
 
 
+# =============================================================================
+# Redis Fixtures
+# =============================================================================
+
+class FakeRedis:
+    """
+    In-memory Redis for unit tests, decoding responses like create_redis_client().
+
+    Covers the string, hash, set, list and sorted-set commands the services
+    use, plus pipelines (with WATCH/MULTI) and locks. Expiry is recorded in
+    `ttls` but never applied. Set `conflicts` to make the next N
+    transactional EXECs raise WatchError, as if another client wrote first.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.conflicts = 0
+
+    # Keys
+
+    def exists(self, *keys):
+        return sum(key in self.data for key in keys)
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self.data.pop(key, None) is not None
+            self.ttls.pop(key, None)
+        return removed
+
+    def expire(self, key, seconds):
+        if key not in self.data:
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    def ttl(self, key):
+        if key not in self.data:
+            return -2
+        return self.ttls.get(key, -1)
+
+    def keys(self, pattern='*'):
+        return [key for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+    def scan_iter(self, match='*'):
+        return iter(self.keys(match))
+
+    # Strings
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys, *more):
+        keys = list(keys) + list(more) if not isinstance(keys, str) else [keys, *more]
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        self.ttls.pop(key, None)
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value, ex=seconds)
+
+    def incrby(self, key, amount=1):
+        value = int(self.data.get(key, 0)) + amount
+        self.data[key] = str(value)
+        return value
+
+    def incr(self, key, amount=1):
+        return self.incrby(key, amount)
+
+    def decrby(self, key, amount=1):
+        return self.incrby(key, -amount)
+
+    # Hashes
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        h = self.data.setdefault(key, {})
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        added = sum(str(f) not in h for f in items)
+        h.update({str(f): str(v) for f, v in items.items()})
+        return added
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(str(field))
+
+    def hmget(self, key, fields, *more):
+        fields = [fields, *more] if isinstance(fields, (str, int)) else list(fields) + list(more)
+        return [self.hget(key, f) for f in fields]
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hincrby(self, key, field, amount=1):
+        h = self.data.setdefault(key, {})
+        h[str(field)] = str(int(h.get(str(field), 0)) + amount)
+        return int(h[str(field)])
+
+    def hincrbyfloat(self, key, field, amount=1.0):
+        h = self.data.setdefault(key, {})
+        h[str(field)] = str(float(h.get(str(field), 0)) + amount)
+        return float(h[str(field)])
+
+    def hdel(self, key, *fields):
+        h = self.data.get(key, {})
+        return sum(h.pop(str(f), None) is not None for f in fields)
+
+    # Sets
+
+    def sadd(self, key, *members):
+        s = self.data.setdefault(key, set())
+        added = sum(str(m) not in s for m in members)
+        s.update(str(m) for m in members)
+        return added
+
+    def srem(self, key, *members):
+        s = self.data.get(key, set())
+        removed = sum(str(m) in s for m in members)
+        s.difference_update(str(m) for m in members)
+        return removed
+
+    def sismember(self, key, member):
+        return str(member) in self.data.get(key, set())
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    # Lists
+
+    def rpush(self, key, *values):
+        lst = self.data.setdefault(key, [])
+        lst.extend(str(v) for v in values)
+        return len(lst)
+
+    def lrange(self, key, start, end):
+        lst = self.data.get(key, [])
+        return lst[start:None if end == -1 else end + 1]
+
+    def ltrim(self, key, start, end):
+        if key in self.data:
+            self.data[key] = self.lrange(key, start, end)
+        return True
+
+    # Sorted sets
+
+    def zadd(self, key, mapping, nx=False):
+        z = self.data.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if nx and str(member) in z:
+                continue
+            added += str(member) not in z
+            z[str(member)] = float(score)
+        return added
+
+    def zrem(self, key, *members):
+        z = self.data.get(key, {})
+        return sum(z.pop(str(m), None) is not None for m in members)
+
+    def zscore(self, key, member):
+        return self.data.get(key, {}).get(str(member))
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def _zsorted(self, key, reverse=False):
+        return sorted(self.data.get(key, {}).items(), key=lambda kv: (kv[1], kv[0]), reverse=reverse)
+
+    def _zslice(self, rows, start, end, withscores):
+        rows = rows[start:None if end == -1 else end + 1]
+        return rows if withscores else [member for member, _ in rows]
+
+    def zrange(self, key, start, end, withscores=False):
+        return self._zslice(self._zsorted(key), start, end, withscores)
+
+    def zrevrange(self, key, start, end, withscores=False):
+        return self._zslice(self._zsorted(key, reverse=True), start, end, withscores)
+
+    def zrevrank(self, key, member):
+        members = [m for m, _ in self._zsorted(key, reverse=True)]
+        return members.index(str(member)) if str(member) in members else None
+
+    def zrangebyscore(self, key, low, high, start=None, num=None):
+        def bound(value, inclusive_pad):
+            value = str(value)
+            if value in ('-inf', '+inf', 'inf'):
+                return float(value)
+            if value.startswith('('):
+                return float(value[1:]) + inclusive_pad
+            return float(value)
+
+        low, high = bound(low, 1e-9), bound(high, -1e-9)
+        members = [m for m, score in self._zsorted(key) if low <= score <= high]
+        if num is not None:
+            members = members[start:start + num]
+        return members
+
+    # Pipelines and locks
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def lock(self, name, timeout=None, blocking=True, thread_local=True):
+        return FakeLock(self, name, timeout)
+
+
+class FakePipeline:
+    """Queues commands until execute(); after watch() and before multi() they run immediately."""
+
+    def __init__(self, fake_redis):
+        self._redis = fake_redis
+        self._queued = []
+        self._watched = None
+        self._buffering = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+        return False
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+
+        def run(*args, **kwargs):
+            if not self._buffering:
+                return command(*args, **kwargs)
+            self._queued.append((command, args, kwargs))
+            return self
+        return run
+
+    def watch(self, *keys):
+        self._watched = {key: copy.deepcopy(self._redis.data.get(key)) for key in keys}
+        self._buffering = False
+
+    def multi(self):
+        self._buffering = True
+
+    def execute(self):
+        try:
+            if self._watched is not None:
+                if self._redis.conflicts:
+                    self._redis.conflicts -= 1
+                    raise redis.WatchError("Watched variable changed.")
+                if any(self._redis.data.get(key) != seen for key, seen in self._watched.items()):
+                    raise redis.WatchError("Watched variable changed.")
+            return [command(*args, **kwargs) for command, args, kwargs in self._queued]
+        finally:
+            self.reset()
+
+    def reset(self):
+        self._queued = []
+        self._watched = None
+        self._buffering = True
+
+
+class FakeLock:
+    """redis-py Lock over a FakeRedis key."""
+
+    def __init__(self, fake_redis, name, timeout=None):
+        self._redis = fake_redis
+        self.name = name
+        self.timeout = timeout
+        self.owned = False
+
+    def acquire(self, blocking=None):
+        if not self._redis.set(self.name, 'token', ex=self.timeout, nx=True):
+            return False
+        self.owned = True
+        return True
+
+    def extend(self, additional_time, replace_ttl=False):
+        if not self.owned or self.name not in self._redis.data:
+            raise LockError("Cannot extend a lock that's no longer owned")
+        return True
+
+    def release(self):
+        if not self.owned:
+            raise LockError("Cannot release an unlocked lock")
+        self._redis.delete(self.name)
+        self.owned = False
+
+
+@pytest.fixture
+def fake_redis():
+    """Fresh in-memory Redis client."""
+    return FakeRedis()
+
+
+@pytest.fixture
+def redis_server():
+    """
+    Client for a real Redis, for tests that run Lua scripts.
+
+    Connects to TEST_REDIS_URL (default: database 15 on localhost), which
+    is flushed before and after each test. Skips if Redis is unreachable.
+    """
+    client = redis.from_url(os.environ.get("TEST_REDIS_URL", "redis://localhost:6379/15"),
+                            decode_responses=True, socket_connect_timeout=2)
+    try:
+        client.flushdb()
+    except redis.ConnectionError:
+        pytest.skip("Redis not available")
+    yield client
+    client.flushdb()
+
+
 # =============================================================================
 # Markers
 # =============================================================================
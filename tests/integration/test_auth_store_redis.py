@@ -0,0 +1,60 @@
+"""
+Integration tests for the auth store's OTP Lua scripts (services/auth_store.py).
+
+Runs ISSUE_OTP_SCRIPT and VERIFY_OTP_SCRIPT on a real Redis; see the
+redis_server fixture for how to point them at one.
+"""
+
+import pytest
+
+from services.auth_store import AuthStore, OTP_INVALID, OTP_LOCKED, OTP_MISSING, OTP_OK
+
+EMAIL = "test@example.com"
+
+
+@pytest.fixture
+def auth_store(redis_server):
+    return AuthStore(
+        redis_client=redis_server,
+        otp_ttl=300,
+        otp_max_send_per_window=3,
+        otp_send_window=900,
+        otp_max_verify_attempts=5,
+        otp_verify_lockout=900,
+    )
+
+
+@pytest.mark.integration
+class TestOTPScripts:
+    """Tests for issue_otp() and verify_otp() against Redis"""
+
+    def test_issue_then_verify(self, auth_store, redis_server):
+        """A wrong code counts a failure; the right one consumes the OTP and clears the count."""
+        assert auth_store.issue_otp(EMAIL, "123456") == {"allowed": True, "remaining": 2, "stored": True}
+        assert 0 < redis_server.ttl("auth:otp:test@example.com") <= 300
+        assert 0 < redis_server.ttl("auth:otp_rate:test@example.com") <= 900
+
+        assert auth_store.verify_otp(EMAIL, "000000") == {"status": OTP_INVALID, "attempts": 1}
+        assert 0 < redis_server.ttl("auth:otp_attempts:test@example.com") <= 900
+        assert auth_store.verify_otp(EMAIL, 123456) == {"status": OTP_OK, "attempts": 1}
+
+        assert auth_store.get_otp(EMAIL) is None
+        assert auth_store.check_verify_attempts(EMAIL)["attempts"] == 0
+        assert auth_store.verify_otp(EMAIL, "123456")["status"] == OTP_MISSING
+
+    def test_issue_respects_send_limit(self, auth_store):
+        """The fourth send in the window is refused and nothing is stored."""
+        for i in range(3):
+            auth_store.issue_otp(EMAIL, str(100000 + i))
+
+        assert auth_store.issue_otp(EMAIL, "999999") == {"allowed": False, "remaining": 0, "stored": False}
+        assert auth_store.get_otp(EMAIL) == "100002"
+
+    def test_verify_lockout(self, auth_store):
+        """A locked-out email is refused before the OTP is compared."""
+        auth_store.issue_otp(EMAIL, "123456")
+        for _ in range(5):
+            auth_store.verify_otp(EMAIL, "000000")
+
+        assert auth_store.verify_otp(EMAIL, "123456") == {"status": OTP_LOCKED, "attempts": 5}
+        assert auth_store.get_otp(EMAIL) == "123456"
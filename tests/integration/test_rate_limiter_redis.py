@@ -0,0 +1,88 @@
+"""
+Integration tests for the sliding-window Lua script (services/rate_limiter.py).
+
+Runs SLIDING_WINDOW_SCRIPT on a real Redis; see the redis_server fixture
+for how to point them at one.
+"""
+
+import pytest
+from flask import Flask, Blueprint, jsonify
+
+from services.leaderboard import AGENTS_KEY
+from services.rate_limiter import KEY_PREFIX, TIER_AGENT, TIER_IP, TIER_WALLET, RateLimiter
+
+WALLET = '0x' + 'ab' * 20
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def counters(redis_server):
+    return {key: int(redis_server.get(key)) for key in redis_server.scan_iter(match=KEY_PREFIX + '*')}
+
+
+@pytest.mark.integration
+class TestSlidingWindowScript:
+    """Tests for RateLimiter.hit() against Redis"""
+
+    def test_previous_window_is_weighted(self, redis_server):
+        """Right after a window rolls over, the last window's hits still count."""
+        clock = Clock(now=120.0)                      # start of a minute window
+        limiter = RateLimiter(redis_client=redis_server, clock=clock)
+        rules = [(4, 60)]
+
+        assert all(limiter.hit('s', rules, '1.2.3.4', TIER_IP)['allowed'] for _ in range(4))
+        assert not limiter.hit('s', rules, '1.2.3.4', TIER_IP)['allowed']
+
+        clock.now = 195.0                             # 25% into the next window: 3 of 4 still count
+        assert limiter.hit('s', rules, '1.2.3.4', TIER_IP)['allowed']
+        blocked = limiter.hit('s', rules, '1.2.3.4', TIER_IP)
+        assert not blocked['allowed'] and blocked['retry_after'] == 15
+
+    def test_rejected_request_counts_nowhere(self, redis_server):
+        """A request over one rule does not consume the others; counters expire."""
+        limiter = RateLimiter(redis_client=redis_server, clock=Clock())
+        rules = [(1, 60), (100, 3600)]
+
+        assert limiter.hit('s', rules, '1.2.3.4', TIER_IP)['remaining'] == 0
+        assert not limiter.hit('s', rules, '1.2.3.4', TIER_IP)['allowed']
+
+        assert sorted(counters(redis_server).values()) == [1, 1]
+        assert all(0 < redis_server.pttl(key) <= 2 * 3_600_000 for key in counters(redis_server))
+
+    def test_tiers_scale_the_quota(self, redis_server):
+        """Wallets and agents get multiples of the per-IP rule; agents may come from Redis."""
+        redis_server.sadd(AGENTS_KEY, WALLET)
+        limiter = RateLimiter(redis_client=redis_server, wallet_multiplier=2, agent_multiplier=5, clock=Clock())
+
+        assert limiter.hit('s', [(10, 60)], '1.2.3.4', TIER_IP)['limit'] == 10
+        assert limiter.hit('s', [(10, 60)], '0x' + 'cd' * 20, TIER_WALLET)['limit'] == 20
+        assert limiter.hit('s', [(10, 60)], WALLET, TIER_WALLET)['limit'] == 50
+        assert limiter.hit('s', [(10, 60)], '0x' + 'ef' * 20, TIER_AGENT)['limit'] == 50
+
+    def test_route_limits_end_to_end(self, redis_server):
+        """Decorated routes use their own rule; the rest of the blueprint gets the default."""
+        limiter = RateLimiter(redis_client=redis_server, default_limits=["3 per hour"], clock=Clock())
+        app = Flask(__name__)
+        bp = Blueprint('agents', __name__)
+
+        @bp.route('/strict')
+        @limiter.limit("2 per minute")
+        def strict():
+            return jsonify({'ok': True})
+
+        @bp.route('/open')
+        def unlimited_route():
+            return jsonify({'ok': True})
+
+        app.register_blueprint(bp, url_prefix='/agents')
+        limiter.init_app(app, blueprints=['agents'])
+        client = app.test_client()
+
+        assert [client.get('/agents/strict').status_code for _ in range(3)] == [200, 200, 429]
+        assert [client.get('/agents/open').status_code for _ in range(4)] == [200, 200, 200, 429]
@@ -1,14 +1,15 @@
 """
 Unit tests for Redis-backed auth store (services/auth_store.py).
 
-Uses a fake Redis client to test without a running Redis server.
+Uses a fake Redis client to test without a running Redis server. The OTP
+Lua scripts run against a real Redis in tests/integration/test_auth_store_redis.py.
 """
 
 import json
 import pytest
 from unittest.mock import MagicMock, patch
 
-from services.auth_store import AuthStore
+from services.auth_store import AuthStore, OTP_INVALID, OTP_MISSING
 
 
 class FakeRedis:
@@ -318,3 +319,38 @@ class TestRedisErrorHandling:
         store = AuthStore(redis_client=mock_redis)
         result = store.check_verify_attempts("test@example.com")
         assert result["allowed"] is True
+
+
+# -------------------------------------------------------------------------
+# Single-call OTP flow tests
+# -------------------------------------------------------------------------
+
+class TestAtomicOTPFlow:
+    """Tests for issue_otp() and verify_otp()."""
+
+    @pytest.mark.unit
+    def test_scripts_are_one_call_each(self):
+        """With scripting, a send and a verify are one script call with both keys."""
+        mock_redis = MagicMock()
+        issue, verify = MagicMock(return_value=[1, 2]), MagicMock(return_value=[b"invalid", 1])
+        mock_redis.register_script.side_effect = [issue, verify]
+        store = AuthStore(redis_client=mock_redis, otp_ttl=300, otp_send_window=900)
+
+        assert store.issue_otp("Test@Example.com", "123456") == {"allowed": True, "remaining": 2, "stored": True}
+        assert store.verify_otp("Test@Example.com", "000000") == {"status": OTP_INVALID, "attempts": 1}
+
+        kwargs = issue.call_args.kwargs
+        assert kwargs["keys"] == ["auth:otp:test@example.com", "auth:otp_rate:test@example.com"]
+        assert json.loads(kwargs["args"][0])["otp"] == "123456"
+        assert verify.call_args.kwargs["keys"] == ["auth:otp:test@example.com", "auth:otp_attempts:test@example.com"]
+        mock_redis.get.assert_not_called()
+
+    @pytest.mark.unit
+    def test_script_errors(self):
+        """A failed send is reported as not stored; a failed verify as no OTP."""
+        mock_redis = MagicMock()
+        mock_redis.register_script.return_value = MagicMock(side_effect=Exception("Connection refused"))
+        store = AuthStore(redis_client=mock_redis)
+
+        assert store.issue_otp("test@example.com", "123456")["stored"] is False
+        assert store.verify_otp("test@example.com", "123456")["status"] == OTP_MISSING
@@ -0,0 +1,106 @@
+"""
+Unit tests for the scoring-rule backtest (services/backtest.py).
+"""
+
+import json
+import pytest
+
+from services.backtest import Backtest, load_markets, pick_winner, word_levenshtein, casefold_levenshtein
+from services.corpus_search import DOCS_KEY
+from services.payout_simulator import contract_distance
+
+ETH = 10 ** 18
+ALICE = '0x' + 'aa' * 20
+BOB = '0x' + 'bb' * 20
+
+
+def market_docs(market_id, actual, predictions):
+    docs = [{'kind': 'actual', 'market_id': market_id, 'submission_id': None, 'text': actual}]
+    docs += [{'kind': 'prediction', 'market_id': market_id, 'submission_id': market_id * 10 + i,
+              'text': text, 'submitter': wallet, 'amount': ETH}
+             for i, (wallet, text) in enumerate(predictions)]
+    return docs
+
+
+@pytest.fixture
+def corpus(fake_redis):
+    docs = (
+        # Case-folding makes Bob exact; byte Levenshtein prefers Alice
+        market_docs(1, 'Hello World', [(ALICE, 'Hello Wxrld'), (BOB, 'hello world')])
+        # Same winner under every rule
+        + market_docs(2, 'to the moon', [(ALICE, 'to the moon'), (BOB, 'doge')])
+        # Single submission: a refund under every rule
+        + market_docs(3, 'gm', [(BOB, 'gn')])
+    )
+    fake_redis.rpush(DOCS_KEY, *[json.dumps(doc) for doc in docs])
+    return fake_redis
+
+
+class TestRules:
+    """Tests for the built-in scoring rules"""
+
+    @pytest.mark.unit
+    def test_ties_go_to_first_submitter(self):
+        """Equal scores keep the earliest submission, like the contract."""
+        submissions = [{'text': 'abc'}, {'text': 'abd'}]
+        assert pick_winner(submissions, 'abx', contract_distance) == 0
+
+    @pytest.mark.unit
+    def test_word_and_casefold_variants(self):
+        """Word distance counts whole words; casefold ignores case."""
+        assert word_levenshtein('to the moon', 'to da moon') == 1
+        assert casefold_levenshtein('HELLO', 'hello') == 0
+
+
+class TestBacktest:
+    """Tests for Backtest.run()"""
+
+    @pytest.mark.unit
+    def test_load_markets_pages_and_skips_refunds(self, corpus):
+        """Pages through the log; single-submission markets are left out."""
+        markets = list(load_markets(corpus, page_size=2))
+
+        assert [m['market_id'] for m in markets] == [1, 2]
+        assert [s['submitter'] for s in markets[0]['submissions']] == [ALICE, BOB]
+
+    @pytest.mark.unit
+    def test_reports_flips_and_payout_deltas(self, corpus):
+        """Case-folding flips market 1 from Alice to Bob."""
+        report = Backtest(['casefold', 'word'], workers=1).run(load_markets(corpus))
+
+        assert report['markets'] == 2
+        casefold = report['rules']['casefold']
+        assert casefold['flips'] == 1
+        assert casefold['payout_moved'] == 2 * ETH - 2 * ETH * 700 // 10000
+        assert casefold['top_gainers'][0] == (BOB, casefold['payout_moved'])
+        assert casefold['top_losers'][0] == (ALICE, -casefold['payout_moved'])
+        assert report['rules']['levenshtein']['flips'] == 0
+
+    @pytest.mark.unit
+    def test_legacy_entries_are_skipped_and_counted(self, corpus):
+        """Markets logged without submitter or stake are left out of the report, not priced at 0."""
+        legacy = market_docs(4, 'Hello World', [(ALICE, 'Hello Wxrld'), (BOB, 'hello world')])
+        for doc in legacy[1:]:
+            del doc['submitter'], doc['amount']
+        corpus.rpush(DOCS_KEY, *[json.dumps(doc) for doc in legacy])
+
+        report = Backtest(['casefold'], workers=1).run(load_markets(corpus))
+
+        assert report['markets'] == 2
+        assert report['skipped_markets'] == 1
+        assert report['rules']['casefold']['flips'] == 1
+
+    @pytest.mark.unit
+    def test_process_pool_matches_serial(self, corpus):
+        """Chunks scored in worker processes give the same report."""
+        serial = Backtest(['casefold'], workers=1, chunk_size=1).run(load_markets(corpus))
+        parallel = Backtest(['casefold'], workers=2, chunk_size=1).run(load_markets(corpus))
+
+        assert parallel['rules']['casefold']['flips'] == serial['rules']['casefold']['flips']
+        assert parallel['rules']['casefold']['payout_moved'] == serial['rules']['casefold']['payout_moved']
+
+    @pytest.mark.unit
+    def test_unknown_rule_fails_fast(self):
+        """A bad rule name is rejected before any worker starts."""
+        with pytest.raises(ValueError):
+            Backtest(['not_a_rule'])
@@ -0,0 +1,117 @@
+"""
+Unit tests for the content-addressed screenshot store (services/blob_store.py)
+and its use by DistributedStorageService.
+"""
+
+import base64
+import hashlib
+import pytest
+from io import BytesIO
+from PIL import Image
+
+from services.blob_store import BlobStore
+from services.distributed_storage import DistributedStorageService
+
+
+def make_png(color=(255, 0, 0), size=(64, 64)):
+    out = BytesIO()
+    Image.new('RGB', size, color).save(out, format='PNG')
+    return out.getvalue()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path), max_bytes=10 * 1024 * 1024)
+
+
+class TestBlobStore:
+    """Tests for BlobStore"""
+
+    @pytest.mark.unit
+    def test_digest_addresses_stored_bytes(self, store):
+        """The digest is the SHA-256 of the file served for it."""
+        digest = store.put(make_png())
+
+        path, content_type = store.open(digest)
+        with open(path, 'rb') as f:
+            assert hashlib.sha256(f.read()).hexdigest() == digest
+        assert content_type in ('image/webp', 'image/png')
+
+    @pytest.mark.unit
+    def test_identical_content_is_stored_once(self, store):
+        """Storing the same screenshot twice yields one blob."""
+        assert store.put(make_png()) == store.put(make_png())
+        assert store.get_stats()['blobs'] == 1
+
+    @pytest.mark.unit
+    def test_least_recently_used_blob_is_evicted(self, tmp_path):
+        """Past max_bytes the least recently read blob is removed."""
+        probe = BlobStore(str(tmp_path / 'probe'))
+        probe.put(make_png())
+        blob_size = probe.get_stats()['used_bytes']
+        store = BlobStore(str(tmp_path / 'lru'), max_bytes=int(blob_size * 2.5))
+
+        red = store.put(make_png((255, 0, 0)))
+        green = store.put(make_png((0, 255, 0)))
+        store.open(red)  # red is now most recently used
+        blue = store.put(make_png((0, 0, 255)))
+
+        assert store.open(green) is None
+        assert store.open(red) is not None
+        assert store.open(blue) is not None
+
+    @pytest.mark.unit
+    def test_index_survives_restart(self, tmp_path, store):
+        """A new store instance finds blobs written by a previous one."""
+        digest = store.put(make_png())
+
+        assert BlobStore(str(tmp_path)).read(digest) == store.read(digest)
+
+    @pytest.mark.unit
+    def test_workers_see_each_others_blobs(self, tmp_path):
+        """A blob written by one worker's store is served by another's, already running."""
+        first, second = BlobStore(str(tmp_path)), BlobStore(str(tmp_path))
+
+        digest = first.put(make_png())
+
+        assert second.read(digest) == first.read(digest)
+        assert second.get_stats()['blobs'] == 1
+
+    @pytest.mark.unit
+    def test_size_cap_is_shared_between_workers(self, tmp_path):
+        """Writes from every worker count against one max_bytes."""
+        probe = BlobStore(str(tmp_path / 'probe'))
+        probe.put(make_png())
+        blob_size = probe.get_stats()['used_bytes']
+        root = str(tmp_path / 'shared')
+        first = BlobStore(root, max_bytes=int(blob_size * 2.5))
+        second = BlobStore(root, max_bytes=int(blob_size * 2.5))
+
+        red = first.put(make_png((255, 0, 0)))
+        second.put(make_png((0, 255, 0)))
+        first.put(make_png((0, 0, 255)))
+
+        assert second.open(red) is None
+        assert first.get_stats() == second.get_stats()
+        assert first.get_stats()['blobs'] == 2
+
+    @pytest.mark.unit
+    def test_rejects_non_digest_names(self, store):
+        """Path-like names never reach the filesystem."""
+        assert store.open('../../etc/passwd') is None
+
+
+class TestDistributedStorageScreenshots:
+    """Tests for DistributedStorageService screenshot storage in mock mode"""
+
+    @pytest.mark.unit
+    def test_store_and_retrieve_data_uri(self, store):
+        """Data URIs are decoded, stored on disk and retrievable by digest."""
+        storage = DistributedStorageService(blob_store=store)
+        data_uri = 'data:image/png;base64,' + base64.b64encode(make_png()).decode()
+
+        digest = storage.store_screenshot(data_uri, tweet_id='123')
+
+        assert storage.cache['screenshots']['123'] == digest
+        assert storage.open_screenshot(digest) is not None
+        assert storage.retrieve_screenshot(digest).startswith('data:image/')
@@ -0,0 +1,167 @@
+"""
+Unit tests for the persistent screenshot browser pool (services/browser_pool.py).
+Playwright is replaced by lightweight fakes so no browser is launched.
+"""
+
+import asyncio
+import pytest
+
+from services.browser_pool import BrowserPool, BrowserPoolBusy
+
+
+class FakeElement:
+    async def screenshot(self):
+        return b'png-bytes'
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url, wait_until=None):
+        self.browser.active += 1
+        self.browser.peak = max(self.browser.peak, self.browser.active)
+        try:
+            await asyncio.sleep(self.browser.delay)
+        finally:
+            self.browser.active -= 1
+        if 'crash' in url:
+            self.browser.connected = False
+            raise RuntimeError("Target closed")
+
+    async def wait_for_selector(self, selector, timeout=None):
+        return True
+
+    async def evaluate(self, script):
+        return None
+
+    async def query_selector(self, selector):
+        return FakeElement()
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return FakePage(self.browser)
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.connected = True
+        self.contexts = 0
+        self.active = 0
+        self.peak = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        self.contexts += 1
+        return FakeContext(self)
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    async def stop(self):
+        pass
+
+
+def make_pool(delay=0, **kwargs):
+    browsers = []
+
+    async def launcher():
+        browser = FakeBrowser(delay=delay)
+        browsers.append(browser)
+        return FakePlaywright(), browser
+
+    pool = BrowserPool(launcher=launcher, **kwargs)
+    return pool, browsers
+
+
+@pytest.fixture
+def cleanup():
+    pools = []
+    yield pools.append
+    for pool in pools:
+        pool.stop()
+
+
+class TestBrowserPool:
+    """Tests for BrowserPool"""
+
+    @pytest.mark.unit
+    def test_browser_and_pages_are_reused(self, cleanup):
+        """Sequential captures share one browser launch and one page."""
+        pool, browsers = make_pool(pool_size=1)
+        cleanup(pool)
+
+        async def run():
+            return [await pool.capture('https://x.com/a/status/1') for _ in range(3)]
+
+        assert asyncio.run(run()) == [b'png-bytes'] * 3
+        assert len(browsers) == 1
+        assert browsers[0].contexts == 1
+
+    @pytest.mark.unit
+    def test_concurrency_is_bounded(self, cleanup):
+        """No more than pool_size captures run at once; the rest queue."""
+        pool, browsers = make_pool(delay=0.05, pool_size=2, max_queue=10)
+        cleanup(pool)
+
+        async def run():
+            return await asyncio.gather(*[pool.capture(f'https://x.com/a/status/{i}') for i in range(6)])
+
+        assert all(r == b'png-bytes' for r in asyncio.run(run()))
+        assert browsers[0].peak == 2
+
+    @pytest.mark.unit
+    def test_full_queue_rejects(self, cleanup):
+        """Captures beyond the queue bound fail fast."""
+        pool, _ = make_pool(delay=0.1, pool_size=1, max_queue=1)
+        cleanup(pool)
+
+        async def run():
+            return await asyncio.gather(
+                *[pool.capture(f'https://x.com/a/status/{i}') for i in range(4)],
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+        assert any(isinstance(r, BrowserPoolBusy) for r in results)
+        assert pool.stats['rejected'] >= 1
+
+    @pytest.mark.unit
+    def test_timeout_returns_none(self, cleanup):
+        """A capture exceeding capture_timeout is abandoned."""
+        pool, _ = make_pool(delay=0.5, pool_size=1, capture_timeout=0.05)
+        cleanup(pool)
+
+        assert asyncio.run(pool.capture('https://x.com/a/status/1')) is None
+        assert pool.stats['timeouts'] == 1
+
+    @pytest.mark.unit
+    def test_crashed_browser_is_relaunched(self, cleanup):
+        """A browser that dies mid-capture is replaced on the next capture."""
+        pool, browsers = make_pool(pool_size=1)
+        cleanup(pool)
+
+        async def run():
+            first = await pool.capture('https://x.com/crash/status/1')
+            second = await pool.capture('https://x.com/a/status/2')
+            return first, second
+
+        assert asyncio.run(run()) == (None, b'png-bytes')
+        assert len(browsers) == 2
+        assert pool.stats['relaunches'] == 1
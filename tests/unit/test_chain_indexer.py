@@ -0,0 +1,167 @@
+"""
+Unit tests for the PredictionMarketV2 event indexer (services/chain_indexer.py).
+Logs are encoded against the real contract ABI and decoded locally.
+"""
+
+import json
+import pytest
+from unittest.mock import Mock
+
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from services.chain_indexer import ChainEventIndexer, CURSOR_KEY, DEAD_LETTER_KEY, LOCK_KEY
+
+CONTRACT_ADDRESS = Web3.to_checksum_address('0x' + '11' * 20)
+
+
+def load_contract():
+    with open('static/abi/PredictionMarketV2.json') as f:
+        abi = json.load(f)
+    abi = abi['abi'] if isinstance(abi, dict) else abi
+    return Web3().eth.contract(address=CONTRACT_ADDRESS, abi=abi)
+
+
+def market_created_log(contract, market_id, block_number, log_index=0):
+    topic = contract.events.MarketCreated().topic
+    return {
+        'address': CONTRACT_ADDRESS,
+        'topics': [HexBytes(topic), HexBytes(market_id.to_bytes(32, 'big'))],
+        'data': HexBytes(encode(['string', 'uint256', 'address'],
+                                ['elonmusk', 1700000000, CONTRACT_ADDRESS])),
+        'blockNumber': block_number,
+        'blockHash': HexBytes(b'\x00' * 32),
+        'transactionHash': HexBytes(bytes([market_id]) * 32),
+        'transactionIndex': 0,
+        'logIndex': log_index,
+        'removed': False,
+    }
+
+
+@pytest.fixture
+def contract():
+    return load_contract()
+
+
+@pytest.fixture
+def blockchain(contract):
+    chain = Mock()
+    chain.contracts = {'PredictionMarketV2': contract}
+    chain.w3.eth.block_number = 1000
+    chain.w3.eth.get_logs.return_value = []
+    return chain
+
+
+@pytest.fixture
+def indexer(fake_redis, blockchain):
+    return ChainEventIndexer(redis_client=fake_redis, blockchain=blockchain,
+                             confirmations=0, max_blocks_per_step=100, start_block=901)
+
+
+class TestIndexOnce:
+    """Tests for ChainEventIndexer.index_once()"""
+
+    @pytest.mark.unit
+    def test_events_are_decoded_and_dispatched(self, indexer, blockchain, contract):
+        """Handlers receive decoded args for their event name."""
+        blockchain.w3.eth.get_logs.return_value = [market_created_log(contract, 7, 950)]
+        received = []
+        indexer.on('MarketCreated', received.append)
+
+        result = indexer.index_once()
+
+        assert result['events'] == 1
+        assert received[0]['args']['marketId'] == 7
+        assert received[0]['args']['actorHandle'] == 'elonmusk'
+        assert received[0]['block_number'] == 950
+
+    @pytest.mark.unit
+    def test_cursor_advances_in_bounded_steps(self, indexer, blockchain, fake_redis):
+        """Each getLogs call covers at most max_blocks_per_step blocks."""
+        indexer.max_blocks_per_step = 40
+
+        result = indexer.index_once()
+
+        ranges = [(c.args[0]['fromBlock'], c.args[0]['toBlock'])
+                  for c in blockchain.w3.eth.get_logs.call_args_list]
+        assert ranges == [(901, 940), (941, 980), (981, 1000)]
+        assert fake_redis.get(CURSOR_KEY) == '1000'
+        assert result['lag'] == 0
+
+    @pytest.mark.unit
+    def test_first_run_starts_at_deployment_block(self, blockchain, fake_redis):
+        """Without INDEXER_START_BLOCK the deployment file's block is the start."""
+        blockchain.deployment_blocks = {'PredictionMarketV2': 951}
+        indexer = ChainEventIndexer(redis_client=fake_redis, blockchain=blockchain,
+                                    confirmations=0, max_blocks_per_step=100)
+
+        indexer.index_once()
+
+        assert blockchain.w3.eth.get_logs.call_args.args[0]['fromBlock'] == 951
+
+    @pytest.mark.unit
+    def test_unknown_start_block_fails_loudly(self, blockchain, fake_redis):
+        """With no start block at all nothing is indexed and the lock is released."""
+        blockchain.deployment_blocks = {}
+        indexer = ChainEventIndexer(redis_client=fake_redis, blockchain=blockchain, confirmations=0)
+
+        with pytest.raises(RuntimeError):
+            indexer.index_once()
+
+        blockchain.w3.eth.get_logs.assert_not_called()
+        assert fake_redis.get(CURSOR_KEY) is None
+        assert fake_redis.get(LOCK_KEY) is None
+
+    @pytest.mark.unit
+    def test_resumes_from_stored_cursor(self, indexer, blockchain, fake_redis):
+        """A later run starts after the last indexed block."""
+        fake_redis.set(CURSOR_KEY, 990)
+
+        indexer.index_once()
+
+        assert blockchain.w3.eth.get_logs.call_args.args[0]['fromBlock'] == 991
+
+    @pytest.mark.unit
+    def test_concurrent_run_is_skipped(self, indexer, blockchain, fake_redis):
+        """Only the holder of the indexer lock scans."""
+        fake_redis.set(LOCK_KEY, '1')
+
+        result = indexer.index_once()
+
+        assert result['skipped'] is True
+        blockchain.w3.eth.get_logs.assert_not_called()
+
+    @pytest.mark.unit
+    def test_failing_handler_does_not_stop_indexing(self, indexer, blockchain, contract, fake_redis):
+        """One broken consumer does not block the cursor or other handlers."""
+        blockchain.w3.eth.get_logs.return_value = [market_created_log(contract, 1, 950)]
+        received = []
+        indexer.on('MarketCreated', Mock(side_effect=Exception("boom")))
+        indexer.on('MarketCreated', received.append)
+
+        indexer.index_once()
+
+        assert len(received) == 1
+        assert fake_redis.get(CURSOR_KEY) == '1000'
+
+    @pytest.mark.unit
+    def test_failed_event_is_retried_on_next_run(self, indexer, blockchain, contract, fake_redis):
+        """An event a handler failed on is redelivered to that handler only, until it succeeds."""
+        blockchain.w3.eth.get_logs.return_value = [market_created_log(contract, 1, 950)]
+        flaky = Mock(side_effect=[Exception("boom"), Exception("boom again"), None])
+        flaky.__qualname__ = 'Consumer.on_market_created'
+        received = []
+        indexer.on('MarketCreated', flaky)
+        indexer.on('MarketCreated', received.append)
+
+        indexer.index_once()
+        blockchain.w3.eth.get_logs.return_value = []
+        assert indexer.index_once()['dead_letters'] == 1
+        assert json.loads(fake_redis.lrange(DEAD_LETTER_KEY, 0, -1)[0])['attempts'] == 2
+
+        assert indexer.index_once()['retried'] == 1
+        assert fake_redis.lrange(DEAD_LETTER_KEY, 0, -1) == []
+        assert flaky.call_count == 3
+        assert flaky.call_args[0][0]['args']['marketId'] == 1
+        assert len(received) == 1
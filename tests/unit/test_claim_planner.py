@@ -0,0 +1,129 @@
+"""
+Unit tests for the unclaimed-winnings index and claim planner (services/claim_planner.py).
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, patch
+
+from web3 import Web3
+
+from services.claim_planner import (
+    ClaimPlanner, CACHE_PREFIX, MULTICALL3_ADDRESS, MULTICALL_BASE_GAS, MULTICALL_PER_CALL_GAS,
+)
+
+ETH = 10 ** 18
+WALLET = Web3.to_checksum_address('0x' + 'ab' * 20)
+OTHER = Web3.to_checksum_address('0x' + 'cd' * 20)
+CONTRACT_ADDRESS = Web3.to_checksum_address('0x' + '11' * 20)
+
+
+def load_contract():
+    with open('static/abi/PredictionMarketV2.json') as f:
+        abi = json.load(f)
+    abi = abi['abi'] if isinstance(abi, dict) else abi
+    return Web3().eth.contract(address=CONTRACT_ADDRESS, abi=abi)
+
+
+def make_market(market_id, winner, submissions, resolved=True):
+    return {
+        'id': market_id,
+        'actor_handle': 'elonmusk',
+        'total_pool': sum(s['amount'] for s in submissions),
+        'resolved': resolved,
+        'winning_submission_id': winner,
+        'submissions': submissions,
+    }
+
+
+def sub(sid, market_id, submitter, amount=ETH, claimed=False):
+    return {'id': sid, 'market_id': market_id, 'submitter': submitter, 'predicted_text': 'x',
+            'amount': amount, 'claimed': claimed}
+
+
+@pytest.fixture
+def blockchain():
+    contract = load_contract()
+    chain = Mock()
+    chain.contracts = {'PredictionMarketV2': contract}
+    chain.w3 = Web3()
+
+    markets = {
+        0: make_market(0, 1, [sub(0, 0, OTHER), sub(1, 0, WALLET)]),              # wallet won
+        1: make_market(1, 2, [sub(2, 1, WALLET), sub(3, 1, OTHER)]),              # wallet won
+        2: make_market(2, 5, [sub(4, 2, WALLET), sub(5, 2, OTHER)]),              # wallet lost
+        3: make_market(3, 0, [sub(6, 3, WALLET), sub(7, 3, OTHER)], resolved=False),
+    }
+    wallet_subs = {1: 0, 2: 1, 4: 2, 6: 3, 8: 4}
+    chain.get_v2_user_submissions.return_value = list(wallet_subs)
+    # Submission 8 was already claimed
+    chain.batch_call.side_effect = lambda calls: [
+        (wallet_subs[sid], WALLET, 'x', ETH, sid == 8) for sid in wallet_subs]
+    chain.get_v2_market_snapshots.side_effect = lambda ids: {i: markets[i] for i in ids if i in markets}
+    return chain
+
+
+@pytest.fixture
+def planner(blockchain, fake_redis):
+    return ClaimPlanner(blockchain=blockchain, redis_client=fake_redis, max_gas_per_tx=3000000)
+
+
+class TestUnclaimedIndex:
+    """Tests for get_unclaimed()"""
+
+    @pytest.mark.unit
+    def test_only_unclaimed_winning_submissions(self, planner):
+        """Losing, unresolved and already-claimed submissions are excluded."""
+        unclaimed = planner.get_unclaimed(WALLET)
+
+        assert [c['submission_id'] for c in unclaimed] == [1, 2]
+        pool = 2 * ETH
+        assert unclaimed[0]['payout'] == pool - pool * 700 // 10000
+
+    @pytest.mark.unit
+    def test_result_is_cached_until_invalidated(self, planner, blockchain):
+        """Repeat lookups are served from Redis until an event invalidates them."""
+        planner.get_unclaimed(WALLET)
+        planner.get_unclaimed(WALLET)
+        assert blockchain.get_v2_user_submissions.call_count == 1
+
+        planner.on_payout_claimed({'args': {'claimer': WALLET, 'submissionId': 1}})
+        assert CACHE_PREFIX + WALLET.lower() not in planner.redis.data
+        planner.get_unclaimed(WALLET)
+        assert blockchain.get_v2_user_submissions.call_count == 2
+
+
+class TestPlan:
+    """Tests for plan()"""
+
+    @pytest.fixture(autouse=True)
+    def fee_oracle(self):
+        oracle = Mock()
+        oracle.effective_gas_prices.return_value = {'standard': 10}
+        with patch('services.claim_planner.get_fee_oracle', return_value=oracle):
+            yield oracle
+
+    @pytest.mark.unit
+    def test_claims_bundled_into_one_multicall(self, planner):
+        """Claims that fit the gas cap share one Multicall3 transaction."""
+        with patch.object(ClaimPlanner, '_estimate_claim_gas', return_value=60000):
+            plan = planner.plan(WALLET)
+
+        assert len(plan['transactions']) == 1
+        tx = plan['transactions'][0]
+        assert tx['to'] == MULTICALL3_ADDRESS
+        assert tx['submission_ids'] == [1, 2]
+        assert tx['gas'] == MULTICALL_BASE_GAS + 2 * (60000 + MULTICALL_PER_CALL_GAS)
+        assert plan['estimated_cost_wei'] == tx['gas'] * 10
+        assert plan['total_claimable'] == sum(c['payout'] for c in plan['claims'])
+
+    @pytest.mark.unit
+    def test_gas_cap_splits_transactions(self, planner):
+        """A batch never exceeds max_gas_per_tx; a lone claim calls the market directly."""
+        planner.max_gas_per_tx = 100000
+        with patch.object(ClaimPlanner, '_estimate_claim_gas', return_value=60000):
+            plan = planner.plan(WALLET)
+
+        assert [tx['submission_ids'] for tx in plan['transactions']] == [[1], [2]]
+        assert all(tx['to'] == CONTRACT_ADDRESS for tx in plan['transactions'])
+        assert plan['transactions'][0]['data'].startswith('0x8a69614e')  # claimPayout selector
@@ -0,0 +1,111 @@
+"""
+Unit tests for the deployment-scoped contract metadata cache (services/contract_metadata.py).
+"""
+
+import pytest
+from unittest.mock import Mock
+
+import redis
+
+from services.contract_metadata import CACHE_PREFIX, ContractMetadataCache
+
+OWNER = '0x' + 'aa' * 20
+NEW_OWNER = '0x' + 'bb' * 20
+VALUES = [700, 10 ** 15, 3600, 2, 280, OWNER]
+
+
+def make_chain(address='0xContract', code=b'\x60\x80'):
+    chain = Mock()
+    chain.contracts = {'PredictionMarketV2': Mock(address=address)}
+    chain.w3.eth.get_code.return_value = code
+    chain.batch_call.side_effect = lambda calls: list(VALUES)
+    return chain
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestContractMetadataCache:
+    """Tests for ContractMetadataCache.get()"""
+
+    @pytest.mark.unit
+    def test_loads_everything_in_one_batch(self, fake_redis):
+        """The first read batches every view; later reads touch neither the chain nor Redis."""
+        chain = make_chain()
+        cache = ContractMetadataCache(redis_client=fake_redis)
+
+        metadata = cache.get(chain)
+        cache.get(chain)
+
+        assert metadata['platform_fee_bps'] == 700
+        assert metadata['max_text_length'] == 280
+        assert metadata['owner'] == OWNER
+        assert chain.batch_call.call_count == 1
+        assert len(chain.batch_call.call_args[0][0]) == 6
+        assert chain.w3.eth.get_code.call_count == 1
+
+    @pytest.mark.unit
+    def test_other_processes_share_the_redis_entry(self, fake_redis):
+        """A second process with an empty memo reads Redis instead of the chain."""
+        ContractMetadataCache(redis_client=fake_redis).get(make_chain())
+
+        chain = make_chain()
+        assert ContractMetadataCache(redis_client=fake_redis).get(chain)['owner'] == OWNER
+        chain.batch_call.assert_not_called()
+
+    @pytest.mark.unit
+    def test_redeploy_is_a_new_key(self, fake_redis):
+        """New bytecode at the same address is noticed at the next recheck."""
+        clock = Clock()
+        cache = ContractMetadataCache(redis_client=fake_redis, check_interval=60, clock=clock)
+        cache.get(make_chain())
+
+        redeployed = make_chain(code=b'\x60\x80\x60\x40')
+        clock.now += 30
+        cache.get(redeployed)
+        redeployed.w3.eth.get_code.assert_not_called()
+
+        clock.now += 60
+        cache.get(redeployed)
+        assert redeployed.batch_call.call_count == 1
+        assert len([key for key in fake_redis.data if key.startswith(CACHE_PREFIX + '0xContract:')]) == 2
+
+    @pytest.mark.unit
+    def test_ownership_transfer_invalidates(self, fake_redis):
+        """OwnershipTransferred drops the memo and the Redis entries."""
+        chain = make_chain()
+        cache = ContractMetadataCache(redis_client=fake_redis)
+        cache.get(chain)
+
+        cache.on_ownership_transferred({'args': {'previousOwner': OWNER, 'newOwner': NEW_OWNER}})
+        VALUES[-1] = NEW_OWNER
+        try:
+            assert fake_redis.data == {}
+            assert cache.get(chain)['owner'] == NEW_OWNER
+        finally:
+            VALUES[-1] = OWNER
+
+    @pytest.mark.unit
+    def test_failed_read_is_not_cached(self, fake_redis):
+        """A view that fails to read raises and leaves nothing behind."""
+        chain = make_chain()
+        chain.batch_call.side_effect = lambda calls: [700, None, 3600, 2, 280, OWNER]
+        cache = ContractMetadataCache(redis_client=fake_redis)
+
+        with pytest.raises(RuntimeError):
+            cache.get(chain)
+        assert fake_redis.data == {}
+
+    @pytest.mark.unit
+    def test_redis_outage_still_answers(self):
+        """Without Redis the values come straight from the chain."""
+        broken = Mock()
+        broken.get.side_effect = redis.ConnectionError()
+        broken.set.side_effect = redis.ConnectionError()
+
+        assert ContractMetadataCache(redis_client=broken).get(make_chain())['min_bet'] == 10 ** 15
@@ -0,0 +1,131 @@
+"""
+Unit tests for the q-gram corpus search (services/corpus_search.py).
+"""
+
+import json
+import random
+import pytest
+from unittest.mock import Mock
+
+from services.corpus_search import CorpusSearch, DOCS_KEY, KIND_ACTUAL, KIND_PREDICTION, MARKETS_KEY
+from services.payout_simulator import contract_distance
+
+
+def random_text(rng):
+    return ''.join(rng.choice('abcdeé ') for _ in range(rng.randint(1, 20)))
+
+
+def make_corpus(markets, redis_client):
+    blockchain = Mock()
+    blockchain.get_v2_market_snapshots.side_effect = lambda ids: {i: markets[i] for i in ids if i in markets}
+    return CorpusSearch(blockchain=blockchain, redis_client=redis_client)
+
+
+def market(market_id, actor, texts):
+    return {'id': market_id, 'actor_handle': actor,
+            'submissions': [{'id': market_id * 100 + i, 'predicted_text': t, 'submitter': '0x' + '0' * 40,
+                             'amount': 10 ** 15} for i, t in enumerate(texts)]}
+
+
+@pytest.fixture
+def random_corpus(fake_redis):
+    rng = random.Random(3)
+    markets = {i: market(i, 'elonmusk' if i % 2 else 'jack', [random_text(rng) for _ in range(10)])
+               for i in range(1, 41)}
+    corpus = make_corpus(markets, fake_redis)
+    for market_id in markets:
+        corpus.add_market(market_id, random_text(rng))
+    docs = [json.loads(raw) for raw in fake_redis.lrange(DOCS_KEY, 0, -1)]
+    return corpus, docs, rng
+
+
+class TestCorpusSearch:
+    """Tests for CorpusSearch"""
+
+    @pytest.mark.unit
+    def test_within_matches_brute_force(self, random_corpus):
+        """The q-gram filter never drops a document a linear scan would return."""
+        corpus, docs, rng = random_corpus
+        for k in (0, 2, 5, 12):
+            for _ in range(10):
+                query = random_text(rng)
+                expected = sorted(contract_distance(query, d['text']) for d in docs
+                                  if contract_distance(query, d['text']) <= k)
+                assert [hit['distance'] for hit in corpus.within(query, k)] == expected
+
+    @pytest.mark.unit
+    def test_nearest_matches_brute_force(self, random_corpus):
+        """Top-n distances equal the n smallest from a linear scan."""
+        corpus, docs, rng = random_corpus
+        for _ in range(20):
+            query = random_text(rng)
+            expected = sorted(contract_distance(query, d['text']) for d in docs)[:5]
+            assert [hit['distance'] for hit in corpus.nearest(query, 5)] == expected
+
+    @pytest.mark.unit
+    def test_filters_by_actor_and_kind(self, fake_redis):
+        """Actor and kind narrow the corpus before ranking."""
+        corpus = make_corpus({1: market(1, 'elonmusk', ['to the moon']),
+                              2: market(2, 'jack', ['to the moon!'])}, fake_redis)
+        corpus.add_market(1, 'to the mars')
+        corpus.add_market(2, 'just setting up my twttr')
+
+        hits = corpus.nearest('to the moon', 10, actor='@ElonMusk')
+        assert {(h['kind'], h['market_id']) for h in hits} == {(KIND_PREDICTION, 1), (KIND_ACTUAL, 1)}
+        assert [h['text'] for h in corpus.nearest('to the moon', 1, kind=KIND_ACTUAL)] == ['to the mars']
+
+    @pytest.mark.unit
+    def test_markets_are_indexed_once_and_incrementally(self, fake_redis):
+        """Re-delivered resolutions add nothing; new ones are picked up on the next query."""
+        corpus = make_corpus({1: market(1, 'jack', ['hello']), 2: market(2, 'jack', ['world'])}, fake_redis)
+
+        assert corpus.add_market(1, 'hello!') == 2
+        assert corpus.add_market(1, 'hello!') == 0
+        corpus.nearest('hello')
+        assert corpus.size == 2
+
+        corpus.add_market(2, 'world!')
+        assert corpus.within('world', 0)[0]['submission_id'] == 200
+        assert corpus.size == 4
+
+    @pytest.mark.unit
+    def test_recent_returns_actor_texts_newest_first(self, fake_redis):
+        """Per-actor history feeds the win-probability engine."""
+        corpus = make_corpus({1: market(1, 'jack', ['a']), 2: market(2, 'jack', ['b']),
+                              3: market(3, 'elonmusk', ['c'])}, fake_redis)
+        for market_id, text in ((1, 'first'), (2, 'second'), (3, 'other')):
+            corpus.add_market(market_id, text)
+
+        assert [doc['text'] for doc in corpus.recent('@Jack')] == ['second', 'first']
+        assert [doc['text'] for doc in corpus.recent('jack', kind=None, limit=3)] == ['b', 'second', 'a']
+
+    @pytest.mark.unit
+    def test_failed_read_leaves_market_unmarked(self, fake_redis):
+        """A market whose snapshot read raises is retried on the next delivery."""
+        corpus = make_corpus({1: market(1, 'jack', ['hello'])}, fake_redis)
+        corpus.blockchain.get_v2_market_snapshots.side_effect = ConnectionError()
+
+        with pytest.raises(ConnectionError):
+            corpus.add_market(1, 'hello')
+        assert not fake_redis.sismember(MARKETS_KEY, 1)
+
+        corpus.blockchain.get_v2_market_snapshots.side_effect = lambda ids: {1: market(1, 'jack', ['hello'])}
+        assert corpus.add_market(1, 'hello') == 2
+
+    @pytest.mark.unit
+    def test_backfill_adds_missing_resolved_markets(self, fake_redis):
+        """Resolved markets the indexer never saw are added with their MarketResolved text."""
+        markets = {i: dict(market(i, 'jack', [f'text {i}']), resolved=i != 3) for i in range(5)}
+        corpus = make_corpus(markets, fake_redis)
+        contract = Mock()
+        contract.events.MarketResolved.return_value.get_logs.return_value = [
+            {'args': {'marketId': i, 'actualText': f'actual {i}'}} for i in (0, 1, 2)]   # 4 was emergency-withdrawn
+        corpus.blockchain.contracts = {'PredictionMarketV2': contract}
+        corpus.blockchain.deployment_blocks = {'PredictionMarketV2': 0}
+        corpus.blockchain.w3.eth.block_number = 100
+        corpus.blockchain.get_v2_market_count.return_value = 5
+        corpus.add_market(0, 'actual 0')
+
+        assert corpus.backfill(batch_size=2) == 4
+        assert corpus.backfill() == 0
+        assert [hit['market_id'] for hit in corpus.within('actual', 2, kind=KIND_ACTUAL)] == [0, 1, 2]
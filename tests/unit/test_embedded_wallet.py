@@ -139,3 +139,67 @@ class TestWalletPolicy:
         update_result = wallet_service.update_wallet_policy(wallet_address, new_policy)
 
         assert update_result is True
+
+
+@pytest.mark.unit
+class TestDerivedKeyCache:
+    """Test cached, off-thread wallet key derivation."""
+
+    @pytest.fixture
+    def wallet_service(self):
+        """Create embedded wallet service instance."""
+        from services.embedded_wallet import EmbeddedWalletService
+        return EmbeddedWalletService()
+
+    def test_warm_calls_skip_pbkdf2(self, wallet_service):
+        """Only the first call for an identifier runs PBKDF2."""
+        from unittest.mock import patch
+        import hashlib
+
+        with patch('services.embedded_wallet.hashlib.pbkdf2_hmac', wraps=hashlib.pbkdf2_hmac) as pbkdf2:
+            address = wallet_service.create_wallet("warm@example.com")["wallet_address"]
+            assert wallet_service.authenticate_wallet("warm@example.com")["wallet_address"] == address
+            assert wallet_service.verify_wallet_ownership("warm@example.com", address) is True
+
+        assert pbkdf2.call_count == 1
+
+    def test_concurrent_cold_calls_share_one_derivation(self, wallet_service):
+        """A burst for one identifier waits on a single derivation."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest.mock import patch
+
+        release = threading.Event()
+        original = wallet_service._generate_seed
+
+        def slow_seed(identifier):
+            release.wait(5)
+            return original(identifier)
+
+        with patch.object(wallet_service, '_generate_seed', side_effect=slow_seed) as seed:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = [pool.submit(wallet_service._derive_wallet, "burst@example.com") for _ in range(8)]
+                release.set()
+                addresses = {future.result()[1] for future in results}
+
+        assert len(addresses) == 1
+        assert seed.call_count == 1
+
+    def test_expiry_and_eviction_zeroize(self):
+        """Expired and evicted keys are overwritten before being dropped."""
+        from services.embedded_wallet import _DerivedKeyCache
+
+        now = [0.0]
+        cache = _DerivedKeyCache(ttl=60, max_entries=2, clock=lambda: now[0])
+        cache.put("a", b"\x01" * 32, "0xa")
+        cache.put("b", b"\x02" * 32, "0xb")
+        buffers = {name: entry[1] for name, entry in cache._entries.items()}
+
+        cache.put("c", b"\x03" * 32, "0xc")
+        assert cache.get("a") is None
+        assert buffers["a"] == bytearray(32)
+
+        now[0] = 61
+        assert cache.get("b") is None
+        assert buffers["b"] == bytearray(32)
+        assert len(cache) == 1
@@ -0,0 +1,133 @@
+"""
+Unit tests for the EIP-1559 fee oracle (services/fee_oracle.py).
+"""
+
+import pytest
+from unittest.mock import MagicMock, Mock
+
+from services.fee_oracle import FeeOracle, BASE_FEE_MULTIPLIER, DEFAULT_BASE_FEE
+
+GWEI = 10 ** 9
+
+
+def make_history(base_fees, rewards, ratios=None, oldest=1000):
+    return {
+        'oldestBlock': oldest,
+        'baseFeePerGas': base_fees,
+        'reward': rewards,
+        'gasUsedRatio': ratios if ratios is not None else [0.5] * len(rewards),
+    }
+
+
+@pytest.fixture
+def cache():
+    mock = MagicMock()
+    mock.get.return_value = None
+    mock.gas_price_key.return_value = 'chain:gas_price'
+    return mock
+
+
+@pytest.fixture
+def blockchain():
+    return Mock()
+
+
+@pytest.fixture
+def oracle(blockchain, cache):
+    return FeeOracle(blockchain=blockchain, cache=cache, max_age=60)
+
+
+class TestComputeSnapshot:
+    """Tests for FeeOracle.compute_snapshot()"""
+
+    @pytest.mark.unit
+    def test_uses_next_block_base_fee_and_median_rewards(self):
+        """Max fee = multiplier * pending base fee + median tier reward."""
+        history = make_history(
+            base_fees=[1 * GWEI, 1 * GWEI, 2 * GWEI],
+            rewards=[[1, 5, 9], [3, 7, 11]],
+        )
+
+        snapshot = FeeOracle.compute_snapshot(history)
+
+        assert snapshot['base_fee'] == 2 * GWEI
+        assert snapshot['block_number'] == 1002
+        assert snapshot['standard']['max_priority_fee_per_gas'] == 6
+        assert snapshot['standard']['max_fee_per_gas'] == BASE_FEE_MULTIPLIER * 2 * GWEI + 6
+        assert snapshot['slow']['max_priority_fee_per_gas'] == 2
+        assert snapshot['fast']['max_priority_fee_per_gas'] == 10
+
+    @pytest.mark.unit
+    def test_empty_blocks_are_ignored(self):
+        """Blocks with gasUsedRatio 0 do not pull the median to zero."""
+        history = make_history(
+            base_fees=[GWEI, GWEI, GWEI, GWEI],
+            rewards=[[0, 0, 0], [0, 0, 0], [4, 8, 12]],
+            ratios=[0, 0, 0.9],
+        )
+
+        snapshot = FeeOracle.compute_snapshot(history)
+
+        assert snapshot['standard']['max_priority_fee_per_gas'] == 8
+
+    @pytest.mark.unit
+    def test_tiers_are_monotonic(self):
+        """Fast is never cheaper than standard, standard never cheaper than slow."""
+        history = make_history(base_fees=[GWEI, GWEI], rewards=[[10, 5, 1]])
+
+        snapshot = FeeOracle.compute_snapshot(history)
+
+        assert snapshot['slow']['max_priority_fee_per_gas'] <= snapshot['standard']['max_priority_fee_per_gas']
+        assert snapshot['standard']['max_priority_fee_per_gas'] <= snapshot['fast']['max_priority_fee_per_gas']
+
+
+class TestGetSnapshot:
+    """Tests for FeeOracle.get_snapshot() caching behaviour"""
+
+    @pytest.mark.unit
+    def test_refresh_publishes_to_shared_cache(self, oracle, blockchain, cache):
+        """refresh() stores the snapshot in Redis for other workers."""
+        blockchain.w3.eth.fee_history.return_value = make_history([GWEI, GWEI], [[1, 2, 3]])
+
+        snapshot = oracle.refresh()
+
+        cache.set.assert_called_once_with('chain:gas_price', snapshot, ttl=60)
+
+    @pytest.mark.unit
+    def test_fresh_snapshot_served_without_rpc(self, oracle, blockchain):
+        """Repeated reads within max_age make a single fee_history call."""
+        blockchain.w3.eth.fee_history.return_value = make_history([GWEI, GWEI], [[1, 2, 3]])
+
+        for _ in range(5):
+            oracle.get_fees('standard')
+
+        assert blockchain.w3.eth.fee_history.call_count == 1
+
+    @pytest.mark.unit
+    def test_shared_snapshot_preferred_over_rpc(self, oracle, blockchain, cache):
+        """A snapshot published by another worker avoids a local RPC."""
+        shared = FeeOracle.compute_snapshot(make_history([GWEI, GWEI], [[1, 2, 3]]))
+        cache.get.return_value = shared
+
+        assert oracle.get_snapshot() == shared
+        blockchain.w3.eth.fee_history.assert_not_called()
+
+    @pytest.mark.unit
+    def test_rpc_failure_falls_back_to_default(self, oracle, blockchain):
+        """With no snapshot and a failing RPC, the static default is returned."""
+        blockchain.w3.eth.fee_history.side_effect = Exception("rpc down")
+
+        snapshot = oracle.get_snapshot()
+
+        assert snapshot['source'] == 'default'
+        assert snapshot['base_fee'] == DEFAULT_BASE_FEE
+
+    @pytest.mark.unit
+    def test_tx_fee_params_shape(self, oracle, blockchain):
+        """tx_fee_params() returns type-2 transaction fields."""
+        blockchain.w3.eth.fee_history.return_value = make_history([GWEI, GWEI], [[1, 2, 3]])
+
+        params = oracle.tx_fee_params('fast')
+
+        assert set(params) == {'maxFeePerGas', 'maxPriorityFeePerGas'}
+        assert params['maxPriorityFeePerGas'] == 3
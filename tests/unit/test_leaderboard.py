@@ -0,0 +1,152 @@
+"""
+Unit tests for the incremental predictor leaderboards (services/leaderboard.py).
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from services.leaderboard import (
+    LeaderboardEngine, DAY, normalized_distance, score_stats,
+)
+
+ETH = 10 ** 18
+NOW = 1_700_000_000
+HUMAN = '0x' + 'aa' * 20
+RIVAL = '0x' + 'bb' * 20
+AGENT = '0x' + 'cc' * 20
+
+
+def market(market_id, end_time, winner, entries):
+    return {
+        'id': market_id,
+        'end_time': end_time,
+        'total_pool': sum(amount for _, _, amount in entries),
+        'resolved': True,
+        'winning_submission_id': winner,
+        'submissions': [
+            {'id': market_id * 10 + i, 'submitter': wallet, 'predicted_text': text,
+             'amount': amount, 'claimed': False}
+            for i, (wallet, text, amount) in enumerate(entries)
+        ],
+    }
+
+
+@pytest.fixture
+def markets():
+    return {
+        1: market(1, NOW - 3 * DAY, 10, [(HUMAN, 'hello', ETH), (RIVAL, 'world', ETH)]),
+        2: market(2, NOW - 40 * DAY, 21, [(HUMAN, 'hello', ETH), (AGENT, 'help', 3 * ETH)]),
+    }
+
+
+@pytest.fixture
+def engine(markets, fake_redis):
+    blockchain = Mock()
+    blockchain.get_v2_market_snapshots.side_effect = lambda ids: {i: markets[i] for i in ids}
+    return LeaderboardEngine(blockchain=blockchain, redis_client=fake_redis,
+                             agent_wallets=[AGENT], min_entries=1)
+
+
+class TestScoring:
+    """Tests for the per-wallet metric math"""
+
+    @pytest.mark.unit
+    def test_normalized_distance(self):
+        """Distance is divided by the longer text's byte length."""
+        assert normalized_distance('hello', 'hello') == 0
+        assert normalized_distance('abcd', 'abxd') == 0.25
+
+    @pytest.mark.unit
+    def test_ratio_metrics_need_min_entries(self):
+        """A single lucky win does not top the win-rate board."""
+        stats = {'entries': 1, 'wins': 1, 'staked_gwei': 10 ** 9, 'winnings_gwei': 2 * 10 ** 9,
+                 'distance_sum': 0.5}
+        assert score_stats(stats, min_entries=1) == {
+            'winnings': 2.0, 'win_rate': 1.0, 'distance': 0.5, 'roi': 1.0}
+        assert score_stats(stats, min_entries=3)['win_rate'] is None
+
+
+class TestLeaderboardEngine:
+    """Tests for LeaderboardEngine"""
+
+    @pytest.mark.unit
+    def test_resolution_updates_boards(self, engine):
+        """Winnings rank winners first; distance ranks ascending."""
+        engine.apply_resolution(1, 'hello', now=NOW)
+
+        top = engine.top('winnings')
+        assert [row['address'].lower() for row in top] == [HUMAN, RIVAL]
+        assert top[0]['score'] == pytest.approx(2 * 0.93)
+        assert engine.top('distance')[0]['address'].lower() == HUMAN
+        assert engine.rank(RIVAL, 'win_rate')['rank'] == 2
+
+    @pytest.mark.unit
+    def test_market_is_counted_once(self, engine):
+        """Re-delivered events do not double count."""
+        engine.apply_resolution(1, 'hello', now=NOW)
+        assert engine.apply_resolution(1, 'hello', now=NOW) == []
+        assert engine.top('winnings')[0]['score'] == pytest.approx(2 * 0.93)
+
+    @pytest.mark.unit
+    def test_rolling_window_excludes_old_markets(self, engine):
+        """A market that ended 40 days ago counts all-time but not in 30d."""
+        engine.apply_resolution(2, 'help', now=NOW)
+
+        assert engine.top('winnings', window='all', cohort='agent')[0]['address'].lower() == AGENT
+        assert engine.top('winnings', window='30d') == []
+
+    @pytest.mark.unit
+    def test_agent_and_human_cohorts_are_separate(self, engine):
+        """Agent wallets never appear on the human board and vice versa."""
+        engine.apply_resolution(1, 'hello', now=NOW)
+        engine.apply_resolution(2, 'help', now=NOW)
+
+        humans = {row['address'].lower() for row in engine.top('winnings', cohort='human')}
+        agents = {row['address'].lower() for row in engine.top('winnings', cohort='agent')}
+        assert humans == {HUMAN, RIVAL}
+        assert agents == {AGENT}
+
+    @pytest.mark.unit
+    def test_registered_agent_moves_cohort(self, engine):
+        """A wallet registered as an agent leaves the human boards at once."""
+        engine.apply_resolution(1, 'hello', now=NOW)
+
+        engine.register_agent(RIVAL)
+
+        assert [row['address'].lower() for row in engine.top('winnings', cohort='human')] == [HUMAN]
+        assert [row['address'].lower() for row in engine.top('winnings', cohort='agent')] == [RIVAL]
+
+    @pytest.mark.unit
+    def test_negative_limit_or_offset_is_rejected(self, engine):
+        """ZRANGE would read a negative end as the whole board."""
+        engine.apply_resolution(1, 'hello', now=NOW)
+
+        with pytest.raises(ValueError):
+            engine.top('winnings', limit=-1)
+        with pytest.raises(ValueError):
+            engine.top('winnings', offset=-1)
+
+    @pytest.mark.unit
+    def test_roll_windows_drops_expired_days(self, engine):
+        """Once a day leaves the 7d window its wallets are re-scored out."""
+        engine.apply_resolution(1, 'hello', now=NOW)
+        assert len(engine.top('winnings', window='7d')) == 2
+
+        engine.roll_windows(now=NOW)
+        rescored = engine.roll_windows(now=NOW + 5 * DAY)
+
+        assert rescored == 2
+        assert engine.top('winnings', window='7d') == []
+        assert len(engine.top('winnings', window='30d')) == 2
+
+    @pytest.mark.unit
+    def test_catch_up_keeps_later_activity(self, engine, markets):
+        """Days missed while rolling was down are re-scored as of now, not as of each missed day."""
+        markets[3] = market(3, NOW + 6 * DAY, 30, [(HUMAN, 'hello', ETH), (RIVAL, 'world', ETH)])
+        engine.roll_windows(now=NOW)
+        engine.apply_resolution(1, 'hello', now=NOW)
+        engine.apply_resolution(3, 'hello', now=NOW + 10 * DAY)
+
+        engine.roll_windows(now=NOW + 10 * DAY)
+
+        assert [row['address'].lower() for row in engine.top('winnings', window='7d')] == [HUMAN, RIVAL]
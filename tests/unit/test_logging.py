@@ -3,6 +3,8 @@ Unit tests for structured logging configuration.
 Tests the logging_config and request_context modules.
 """
 
+import logging
+import sys
 import pytest
 from unittest.mock import patch, MagicMock
 import os
@@ -149,6 +151,103 @@ class TestRequestContext:
         assert result == "done"
 
 
+class TestLoggingPipeline:
+    """Tests for the queued, batched, sampled logging pipeline."""
+
+    def make_record(self, msg, level=logging.DEBUG, **extra):
+        record = logging.LogRecord("test", level, __file__, 1, msg, None, None)
+        record.__dict__.update(extra)
+        return record
+
+    @pytest.mark.unit
+    def test_sampling_filter_only_touches_marked_records(self):
+        """Unmarked records and WARNING+ always pass; marked ones are sampled and counted."""
+        from utils.logging_config import SamplingFilter, get_log_stats
+
+        sampler = SamplingFilter(rate=0.0)
+        before = get_log_stats()["sampled_out"]
+
+        assert sampler.filter(self.make_record("plain")) is True
+        assert sampler.filter(self.make_record("noisy", sample=True)) is False
+        assert sampler.filter(self.make_record({"event": "noisy", "sample": True})) is False
+        assert sampler.filter(self.make_record("warn", level=logging.WARNING, sample=True)) is True
+        assert get_log_stats()["sampled_out"] - before == 2
+
+    @pytest.mark.unit
+    def test_full_queue_drops_and_counts(self):
+        """A full queue never blocks the caller."""
+        import queue
+        from utils.logging_config import DroppingQueueHandler, get_log_stats
+
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        before = get_log_stats()["dropped"]
+
+        handler.handle(self.make_record({"event": "first"}, level=logging.INFO))
+        handler.handle(self.make_record({"event": "second"}, level=logging.INFO))
+
+        assert handler.queue.qsize() == 1
+        assert get_log_stats()["dropped"] - before == 1
+
+    @pytest.mark.unit
+    def test_backlog_is_written_in_one_batch(self):
+        """Lines queued behind the current one are written together."""
+        import io
+        import queue
+        from utils.logging_config import BatchingStreamHandler
+
+        log_queue = queue.Queue()
+        stream = io.StringIO()
+        stream.write = MagicMock(wraps=stream.write)
+        writer = BatchingStreamHandler(log_queue, stream, batch_size=10)
+        records = [self.make_record(f"line {i}", level=logging.INFO) for i in range(3)]
+        for record in records[1:]:
+            log_queue.put(record)
+
+        for record in records:
+            writer.handle(record)
+            if not log_queue.empty():
+                log_queue.get()
+
+        assert stream.getvalue() == "line 0\nline 1\nline 2\n"
+        assert stream.write.call_count == 1
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+    def test_forked_child_drains_its_own_queue(self, tmp_path):
+        """A child forked after configuration (Celery prefork, gunicorn --preload) still writes its logs."""
+        import utils.logging_config as logging_config
+
+        listener = logging_config._listener
+        original_stream = listener.handlers[0].stream if listener else sys.__stdout__
+        log_file = open(tmp_path / "out.log", "w")
+        try:
+            with patch("sys.stdout", log_file):
+                logging_config.configure_structlog(json_output=True)
+            pid = os.fork()
+            if pid == 0:
+                logging.getLogger("fork-test").warning("from child")
+                logging_config._stop_listener()
+                os._exit(0)
+            os.waitpid(pid, 0)
+        finally:
+            with patch("sys.stdout", original_stream):
+                logging_config.configure_structlog()
+            log_file.close()
+
+        assert "from child" in (tmp_path / "out.log").read_text()
+
+    @pytest.mark.unit
+    def test_celery_worker_keeps_the_queue_handler(self):
+        """Celery's logging setup does not replace the root logger's handlers."""
+        from celery import Celery
+        import app  # noqa: F401 - connects the setup_logging receiver
+        from utils.logging_config import DroppingQueueHandler
+
+        Celery("test").log.setup_logging_subsystem(loglevel="INFO")
+
+        assert any(isinstance(h, DroppingQueueHandler) for h in logging.getLogger().handlers)
+
+
 @pytest.mark.integration
 class TestRequestContextMiddleware:
     """Tests for Flask request context middleware.
@@ -0,0 +1,109 @@
+"""
+Unit tests for the expiry-ordered market index (services/market_expiry_index.py).
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from services.market_expiry_index import MarketExpiryIndex, SYNCED_KEY
+
+
+def chain_with(markets):
+    blockchain = Mock()
+    blockchain.get_v2_market_count.return_value = len(markets)
+    blockchain.get_v2_market.side_effect = lambda market_id: markets[market_id]
+    return blockchain
+
+
+@pytest.fixture
+def index(fake_redis):
+    return MarketExpiryIndex(redis_client=fake_redis)
+
+
+class TestExpiryQueries:
+    """Tests for expired() and ending_within()"""
+
+    @pytest.mark.unit
+    def test_expired_returns_oldest_first(self, index):
+        """Only markets whose end time has passed are returned, oldest first."""
+        index.add(1, 300)
+        index.add(2, 100)
+        index.add(3, 1000)
+
+        assert index.expired(now=500) == [2, 1]
+
+    @pytest.mark.unit
+    def test_market_ending_now_is_not_expired(self, index):
+        """Expiry is strict: end_time < now."""
+        index.add(1, 500)
+
+        assert index.expired(now=500) == []
+        assert index.expired(now=501) == [1]
+
+    @pytest.mark.unit
+    def test_expired_respects_limit(self, index):
+        """A limit bounds the work per poll."""
+        for market_id in range(5):
+            index.add(market_id, 100 + market_id)
+
+        assert index.expired(now=1000, limit=2) == [0, 1]
+
+    @pytest.mark.unit
+    def test_ending_within_window(self, index):
+        """Markets ending inside the window are returned soonest first."""
+        index.add(1, 90)
+        index.add(2, 160)
+        index.add(3, 120)
+        index.add(4, 400)
+
+        assert index.ending_within(100, now=100) == [3, 2]
+
+
+class TestIndexMaintenance:
+    """Tests for sync() and the chain event handlers"""
+
+    @pytest.mark.unit
+    def test_sync_indexes_only_unresolved_markets(self, index):
+        """Resolved markets never enter the index."""
+        blockchain = chain_with([
+            {'id': 0, 'end_time': 100, 'resolved': True},
+            {'id': 1, 'end_time': 200, 'resolved': False},
+        ])
+
+        fetched = index.sync(blockchain)
+
+        assert set(fetched) == {0, 1}
+        assert index.expired(now=1000) == [1]
+
+    @pytest.mark.unit
+    def test_sync_reads_only_new_markets(self, index):
+        """A second sync only fetches market ids created since the first."""
+        markets = [{'id': 0, 'end_time': 100, 'resolved': False}]
+        blockchain = chain_with(markets)
+        index.sync(blockchain)
+
+        markets.append({'id': 1, 'end_time': 200, 'resolved': False})
+        blockchain.get_v2_market_count.return_value = 2
+        blockchain.get_v2_market.reset_mock()
+        index.sync(blockchain)
+
+        blockchain.get_v2_market.assert_called_once_with(1)
+        assert index.redis.get(SYNCED_KEY) == '2'
+
+    @pytest.mark.unit
+    def test_sync_stops_at_unreadable_market(self, index):
+        """A failed read is retried on the next sync rather than skipped."""
+        blockchain = chain_with([{'id': 0, 'end_time': 100, 'resolved': False}, None])
+
+        index.sync(blockchain)
+
+        assert index.redis.get(SYNCED_KEY) == '1'
+
+    @pytest.mark.unit
+    def test_event_handlers_add_and_remove(self, index):
+        """MarketCreated adds a market, MarketResolved removes it."""
+        index.on_market_created({'args': {'marketId': 7, 'endTime': 100}})
+        assert index.expired(now=200) == [7]
+
+        index.on_market_resolved({'args': {'marketId': 7}})
+        assert index.expired(now=200) == []
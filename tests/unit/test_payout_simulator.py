@@ -0,0 +1,197 @@
+"""
+Unit tests for the off-chain PredictionMarketV2 payout engine (services/payout_simulator.py).
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from services.payout_simulator import (
+    PayoutSimulator, contract_distance, pick_winner, platform_fee, simulate_market,
+    STATUS_EMERGENCY_REFUND, STATUS_OPEN, STATUS_REFUND, STATUS_RESOLVED, STATUS_SIMULATED,
+)
+
+ETH = 10 ** 18
+
+
+def submission(sid, text, amount, submitter='0xA', claimed=False):
+    return {'id': sid, 'predicted_text': text, 'amount': amount,
+            'submitter': submitter, 'claimed': claimed}
+
+
+def market(submissions, resolved=False, winner=0, market_id=1):
+    return {
+        'id': market_id,
+        'total_pool': sum(s['amount'] for s in submissions),
+        'resolved': resolved,
+        'winning_submission_id': winner,
+        'submissions': submissions,
+    }
+
+
+class TestContractMath:
+    """Tests for the primitives mirrored from the contract"""
+
+    @pytest.mark.unit
+    def test_distance_counts_utf8_bytes(self):
+        """Solidity compares bytes, so a 2-byte character costs 2 edits."""
+        assert contract_distance('héllo', 'hello') == 2
+
+    @pytest.mark.unit
+    def test_first_submission_wins_ties(self):
+        """Strict less-than: the earlier submission keeps the win on equal distance."""
+        subs = [submission(3, 'abcx', ETH), submission(4, 'abcy', ETH)]
+        assert pick_winner(subs, 'abcz') == (3, 1)
+
+    @pytest.mark.unit
+    def test_fee_rounds_down_in_wei(self):
+        """fee = pool * 700 // 10000, integer division as in Solidity."""
+        assert platform_fee(10 ** 18 + 1) == 70000000000000000
+        assert platform_fee(3) == 0
+
+
+class TestSimulateMarket:
+    """Tests for simulate_market()"""
+
+    @pytest.mark.unit
+    def test_resolved_market_pays_winner_pool_minus_fee(self):
+        """Winner gets the whole pool less 7%; everyone else gets 0."""
+        big = 123456789012345678901234  # well beyond int64
+        m = market([submission(0, 'a', big), submission(1, 'b', 2 * ETH)], resolved=True, winner=1)
+
+        result = simulate_market(m)
+
+        pool = big + 2 * ETH
+        fee = pool * 700 // 10000
+        assert result['status'] == STATUS_RESOLVED
+        assert result['fee'] == fee
+        payouts = {p['submission_id']: p['payout'] for p in result['payouts']}
+        assert payouts == {0: 0, 1: pool - fee}
+        assert sum(payouts.values()) + fee == pool
+
+    @pytest.mark.unit
+    def test_hypothetical_text_picks_winner(self):
+        """An unresolved market can be simulated against a candidate tweet."""
+        m = market([submission(0, 'hello world', ETH), submission(1, 'goodbye', ETH)])
+
+        result = simulate_market(m, actual_text='hello world!')
+
+        assert result['status'] == STATUS_SIMULATED
+        assert result['winning_submission_id'] == 0
+        assert result['winning_distance'] == 1
+
+    @pytest.mark.unit
+    def test_open_market_reports_payout_if_wins(self):
+        """Without a candidate text each submission shows what a win would pay."""
+        m = market([submission(0, 'a', ETH), submission(1, 'b', ETH)])
+
+        result = simulate_market(m)
+
+        assert result['status'] == STATUS_OPEN
+        assert all(p['payout_if_wins'] == 2 * ETH - platform_fee(2 * ETH) for p in result['payouts'])
+
+    @pytest.mark.unit
+    def test_single_submission_is_refunded_without_fee(self):
+        """refundSingleSubmission returns the full stake."""
+        m = market([submission(0, 'a', ETH)])
+
+        result = simulate_market(m)
+
+        assert result['status'] == STATUS_REFUND
+        assert result['payouts'][0]['payout'] == ETH
+        assert result['fee'] == 0
+
+    @pytest.mark.unit
+    def test_emergency_withdraw_refunds_every_stake(self):
+        """A resolved market whose winner id 0 is not one of its submissions was emergency-withdrawn."""
+        m = market([submission(5, 'a', ETH, claimed=True), submission(6, 'b', 2 * ETH, claimed=True)],
+                   resolved=True, winner=0)
+
+        result = simulate_market(m)
+
+        assert result['status'] == STATUS_EMERGENCY_REFUND
+        assert [(p['payout'], p['profit']) for p in result['payouts']] == [(ETH, 0), (2 * ETH, 0)]
+        assert result['fee'] == 0
+
+    @pytest.mark.unit
+    def test_emergency_withdraw_of_market_holding_submission_zero(self):
+        """With submission 0 in the market, all-claimed tells a refund from a win by submission 0."""
+        refunded = market([submission(0, 'a', ETH, claimed=True), submission(1, 'b', ETH, claimed=True)],
+                          resolved=True, winner=0)
+        won = market([submission(0, 'a', ETH, claimed=True), submission(1, 'b', ETH)],
+                     resolved=True, winner=0)
+
+        assert simulate_market(refunded)['status'] == STATUS_EMERGENCY_REFUND
+        assert simulate_market(won)['status'] == STATUS_RESOLVED
+
+
+class TestVerify:
+    """Tests for PayoutSimulator.verify()"""
+
+    def _simulator(self, snapshot, resolved_args, claims):
+        blockchain = Mock()
+        blockchain.w3.eth.block_number = 1000
+        blockchain.get_v2_market_snapshots.return_value = {snapshot['id']: snapshot}
+        contract = Mock()
+        blockchain.contracts = {'PredictionMarketV2': contract}
+        contract.events.MarketResolved.return_value.get_logs.return_value = [{'args': resolved_args}]
+        contract.events.PayoutClaimed.return_value.get_logs.return_value = [
+            {'args': {'submissionId': sid, 'amount': amount}} for sid, amount in claims.items()]
+        return PayoutSimulator(blockchain=blockchain, fee_bps=700)
+
+    @pytest.mark.unit
+    def test_matching_chain_has_no_mismatches(self):
+        """Winner, distance and claimed payout all agree with the chain."""
+        m = market([submission(0, 'hello', ETH), submission(1, 'help', ETH)], resolved=True, winner=0)
+        pool = 2 * ETH
+        simulator = self._simulator(
+            m, {'marketId': 1, 'winningSubmissionId': 0, 'actualText': 'hello', 'winningDistance': 0},
+            {0: pool - platform_fee(pool)})
+
+        result = simulator.verify([1], from_block=0)
+
+        assert result['checked'] == 1
+        assert result['claims_checked'] == 1
+        assert result['mismatches'] == []
+
+    @pytest.mark.unit
+    def test_wrong_claim_amount_is_reported(self):
+        """A claimed amount that differs from the simulated payout is flagged."""
+        m = market([submission(0, 'hello', ETH), submission(1, 'help', ETH)], resolved=True, winner=0)
+        simulator = self._simulator(
+            m, {'marketId': 1, 'winningSubmissionId': 0, 'actualText': 'hello', 'winningDistance': 0},
+            {0: 2 * ETH})
+
+        result = simulator.verify([1], from_block=0)
+
+        assert [mm['check'] for mm in result['mismatches']] == ['payout']
+
+    @pytest.mark.unit
+    def test_emergency_refunds_are_not_checked_as_resolutions(self):
+        """An emergency-withdrawn market has no MarketResolved to compare against."""
+        m = market([submission(5, 'hello', ETH, claimed=True), submission(6, 'help', ETH, claimed=True)],
+                   resolved=True, winner=0)
+        simulator = self._simulator(m, {'marketId': 99, 'winningSubmissionId': 0, 'actualText': '',
+                                        'winningDistance': 0}, {})
+
+        result = simulator.verify([1], from_block=0)
+
+        assert result['checked'] == 0
+        assert result['emergency_refunds'] == 1
+        assert result['mismatches'] == []
+
+    @pytest.mark.unit
+    def test_logs_are_read_in_bounded_ranges(self):
+        """History is read from the deployment block to the head in INDEXER_MAX_BLOCKS steps."""
+        m = market([submission(0, 'hello', ETH), submission(1, 'help', ETH)], resolved=True, winner=0)
+        simulator = self._simulator(
+            m, {'marketId': 1, 'winningSubmissionId': 0, 'actualText': 'hello', 'winningDistance': 0}, {})
+        simulator.blockchain.deployment_blocks = {'PredictionMarketV2': 100}
+        simulator.blockchain.w3.eth.block_number = 4500
+
+        with patch('config_chain.chain_config.INDEXER_START_BLOCK', None), \
+                patch('config_chain.chain_config.INDEXER_MAX_BLOCKS', 2000):
+            simulator.verify([1])
+
+        get_logs = simulator.blockchain.contracts['PredictionMarketV2'].events.MarketResolved.return_value.get_logs
+        assert [(c.kwargs['from_block'], c.kwargs['to_block']) for c in get_logs.call_args_list] == [
+            (100, 2099), (2100, 4099), (4100, 4500)]
@@ -0,0 +1,151 @@
+"""
+Unit tests for the per-wallet portfolio index (services/portfolio_index.py).
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from web3 import Web3
+
+from services.portfolio_index import (
+    PortfolioIndex, ACTUAL_TEXT_KEY, PORTFOLIO_PREFIX, WATCHERS_PREFIX,
+    POSITION_AWAITING, POSITION_LOST, POSITION_OPEN, POSITION_REFUNDED, POSITION_WON,
+)
+
+ETH = 10 ** 18
+NOW = 1_700_000_000
+WALLET = Web3.to_checksum_address('0x' + 'ab' * 20)
+OTHER = Web3.to_checksum_address('0x' + 'cd' * 20)
+
+
+def sub(sid, market_id, submitter, text, amount=ETH, claimed=False):
+    return {'id': sid, 'market_id': market_id, 'submitter': submitter, 'predicted_text': text,
+            'amount': amount, 'claimed': claimed}
+
+
+MARKETS = {
+    0: {'id': 0, 'actor_handle': 'a', 'end_time': NOW - 100, 'total_pool': 2 * ETH, 'resolved': True,
+        'winning_submission_id': 1,
+        'submissions': [sub(0, 0, OTHER, 'goodbye'), sub(1, 0, WALLET, 'hello world')]},
+    1: {'id': 1, 'actor_handle': 'b', 'end_time': NOW - 100, 'total_pool': 3 * ETH, 'resolved': True,
+        'winning_submission_id': 3,
+        'submissions': [sub(2, 1, WALLET, 'abc', 2 * ETH), sub(3, 1, OTHER, 'abd')]},
+    2: {'id': 2, 'actor_handle': 'c', 'end_time': NOW + 500, 'total_pool': 2 * ETH, 'resolved': False,
+        'winning_submission_id': 0,
+        'submissions': [sub(4, 2, WALLET, 'x'), sub(5, 2, OTHER, 'y')]},
+    3: {'id': 3, 'actor_handle': 'd', 'end_time': NOW - 10, 'total_pool': 2 * ETH, 'resolved': False,
+        'winning_submission_id': 0,
+        'submissions': [sub(6, 3, WALLET, 'x'), sub(7, 3, OTHER, 'y')]},
+}
+WALLET_SUBMISSIONS = {1: 0, 2: 1, 4: 2, 6: 3}
+
+
+@pytest.fixture
+def blockchain():
+    chain = Mock()
+    contract = Mock()
+    chain.contracts = {'PredictionMarketV2': contract}
+    chain.get_v2_user_submissions.return_value = list(WALLET_SUBMISSIONS)
+    chain.batch_call.side_effect = lambda calls: [
+        (mid, WALLET, '', ETH, False) for mid in WALLET_SUBMISSIONS.values()] + [5 * ETH]
+    chain.get_v2_market_snapshots.side_effect = lambda ids: {i: MARKETS[i] for i in ids}
+    return chain
+
+
+@pytest.fixture
+def index(blockchain, fake_redis):
+    fake_redis.hset(ACTUAL_TEXT_KEY, mapping={0: 'hello world!', 1: 'abd'})
+    return PortfolioIndex(blockchain=blockchain, redis_client=fake_redis, cache_ttl=3600)
+
+
+class TestBuild:
+    """Tests for PortfolioIndex.build()"""
+
+    @pytest.mark.unit
+    def test_positions_outcomes_and_totals(self, index):
+        """One pass yields status, distance and claimable amount per position."""
+        portfolio = index.build(WALLET, now=NOW)
+
+        positions = {p['submission_id']: p for p in portfolio['positions']}
+        assert positions[1]['status'] == POSITION_WON
+        assert positions[1]['distance'] == 1
+        assert positions[1]['claimable'] == 2 * ETH - 2 * ETH * 700 // 10000
+        assert positions[2]['status'] == POSITION_LOST
+        assert positions[2]['distance'] == 1
+        assert positions[2]['winning_distance'] == 0
+        assert positions[4]['status'] == POSITION_OPEN
+        assert positions[6]['status'] == POSITION_AWAITING
+
+        assert portfolio['wins'] == 1
+        assert portfolio['losses'] == 1
+        assert portfolio['open_positions'] == 2
+        assert portfolio['total_staked'] == 5 * ETH
+        assert portfolio['total_claimable'] == positions[1]['claimable']
+        assert portfolio['pending_fees'] == 5 * ETH
+
+    @pytest.mark.unit
+    def test_emergency_withdrawn_market_is_a_refund(self, index, blockchain):
+        """Stakes returned by emergencyWithdraw are refunds, not losses, and need no resolved text."""
+        refunded = dict(MARKETS[1], winning_submission_id=0,
+                        submissions=[sub(2, 1, WALLET, 'abc', 2 * ETH, claimed=True),
+                                     sub(3, 1, OTHER, 'abd', claimed=True)])
+        blockchain.get_v2_market_snapshots.side_effect = lambda ids: {
+            i: refunded if i == 1 else MARKETS[i] for i in ids}
+
+        with patch.object(index, '_actual_texts', wraps=index._actual_texts) as actual_texts:
+            portfolio = index.build(WALLET, now=NOW)
+
+        position = next(p for p in portfolio['positions'] if p['submission_id'] == 2)
+        assert position['status'] == POSITION_REFUNDED
+        assert position['payout'] == 2 * ETH
+        assert portfolio['losses'] == 0
+        actual_texts.assert_called_once_with([0])
+
+    @pytest.mark.unit
+    def test_unindexed_text_leaves_distance_unknown(self, index, blockchain):
+        """A resolution the indexer has not seen yet is not looked up in the logs."""
+        index.redis.hdel(ACTUAL_TEXT_KEY, '1')
+
+        portfolio = index.build(WALLET, now=NOW)
+
+        position = next(p for p in portfolio['positions'] if p['submission_id'] == 2)
+        assert position['status'] == POSITION_LOST
+        assert position['distance'] is None and position['winning_distance'] is None
+        blockchain.contracts['PredictionMarketV2'].events.MarketResolved.assert_not_called()
+
+        index.on_market_resolved({'args': {'marketId': 1, 'actualText': 'abd'}})
+        position = next(p for p in index.build(WALLET, now=NOW)['positions'] if p['submission_id'] == 2)
+        assert position['distance'] == 1
+
+
+class TestCaching:
+    """Tests for the event-driven cache"""
+
+    @pytest.mark.unit
+    def test_cached_until_open_position_ends(self, index, blockchain):
+        """The cache never outlives the first open market's end time."""
+        index.get(WALLET, now=NOW)
+        index.get(WALLET, now=NOW)
+
+        assert blockchain.get_v2_user_submissions.call_count == 1
+        assert index.redis.ttls[PORTFOLIO_PREFIX + WALLET.lower()] == 500
+
+    @pytest.mark.unit
+    def test_event_in_watched_market_drops_portfolio(self, index):
+        """Another wallet's submission changes the pool, so watchers are invalidated."""
+        index.get(WALLET, now=NOW)
+        assert WALLET.lower() in index.redis.data[WATCHERS_PREFIX + '2']
+
+        index.on_submission_created({'args': {'marketId': 2, 'submitter': OTHER}})
+
+        assert PORTFOLIO_PREFIX + WALLET.lower() not in index.redis.data
+
+    @pytest.mark.unit
+    def test_unrelated_event_keeps_portfolio(self, index):
+        """Events in markets the wallet never entered leave its cache alone."""
+        index.get(WALLET, now=NOW)
+
+        index.on_submission_created({'args': {'marketId': 99, 'submitter': OTHER}})
+        index.on_fees_withdrawn({'args': {'recipient': OTHER}})
+
+        assert PORTFOLIO_PREFIX + WALLET.lower() in index.redis.data
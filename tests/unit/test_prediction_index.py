@@ -0,0 +1,151 @@
+"""
+Unit tests for the BK-tree near-duplicate index (services/prediction_index.py).
+"""
+
+import json
+import random
+import threading
+import pytest
+from unittest.mock import Mock
+
+import Levenshtein
+
+from services.prediction_index import BKTree, MarketPredictionIndex, LOG_PREFIX
+
+
+def random_texts(count, seed=7):
+    rng = random.Random(seed)
+    return [''.join(rng.choice('abcde ') for _ in range(rng.randint(3, 12))) for _ in range(count)]
+
+
+def make_index(snapshot_texts=(), log=()):
+    chain = Mock()
+    chain.get_v2_market_snapshots.return_value = {1: {
+        'id': 1, 'submissions': [{'id': i, 'predicted_text': t} for i, t in enumerate(snapshot_texts)]}}
+    log = list(log)
+    redis_client = Mock()
+    redis_client.lrange.side_effect = lambda key, start, end: log[start:]
+    return MarketPredictionIndex(blockchain=chain, redis_client=redis_client), log
+
+
+class TestBKTree:
+    """Tests for BKTree queries against brute force"""
+
+    @pytest.mark.unit
+    def test_within_matches_brute_force(self):
+        """Pruned search finds exactly the texts a linear scan finds."""
+        texts = random_texts(300)
+        tree = BKTree()
+        for i, text in enumerate(texts):
+            tree.add(text, i)
+
+        for query in random_texts(20, seed=11):
+            expected = {i for i, t in enumerate(texts) if Levenshtein.distance(query, t) <= 2}
+            assert {item_id for _, _, item_id in tree.within(query, 2)} == expected
+            assert tree.any_within(query, 2) == bool(expected)
+
+    @pytest.mark.unit
+    def test_nearest_matches_brute_force(self):
+        """The n nearest distances equal the n smallest from a linear scan."""
+        texts = random_texts(300)
+        tree = BKTree()
+        for i, text in enumerate(texts):
+            tree.add(text, i)
+
+        for query in random_texts(20, seed=13):
+            expected = sorted(Levenshtein.distance(query, t) for t in texts)[:5]
+            assert [d for d, _, _ in tree.nearest(query, 5)] == expected
+
+    @pytest.mark.unit
+    def test_identical_texts_share_a_node(self):
+        """Repeated texts keep every id."""
+        tree = BKTree()
+        tree.add('same', 1)
+        tree.add('same', 2)
+
+        assert tree.size == 2
+        assert sorted(item_id for _, _, item_id in tree.within('same', 0)) == [1, 2]
+
+
+class TestMarketPredictionIndex:
+    """Tests for MarketPredictionIndex"""
+
+    @pytest.mark.unit
+    def test_seeds_from_chain_and_reads_log(self):
+        """Snapshot predictions and logged SubmissionCreated events are both searchable."""
+        index, log = make_index(['hello world'], [json.dumps({'id': 5, 'text': 'goodbye world'})])
+
+        assert [hit['submission_id'] for hit in index.near_duplicates(1, 'hello world!', 2)] == [0]
+        assert [hit['submission_id'] for hit in index.near_duplicates(1, 'goodbye world', 0)] == [5]
+
+    @pytest.mark.unit
+    def test_log_is_read_incrementally_and_deduplicated(self):
+        """Only new log entries are pulled; ids already seeded are skipped."""
+        index, log = make_index(['hello world'])
+        index.nearest(1, 'anything')
+
+        log.append(json.dumps({'id': 0, 'text': 'hello world'}))
+        log.append(json.dumps({'id': 6, 'text': 'hello world'}))
+        hits = index.near_duplicates(1, 'hello world', 0)
+
+        assert sorted(hit['submission_id'] for hit in hits) == [0, 6]
+        index.nearest(1, 'anything')
+        assert index.redis.lrange.call_args[0] == (LOG_PREFIX + '1', 2, -1)
+        index.blockchain.get_v2_market_snapshots.assert_called_once_with([1])
+
+    @pytest.mark.unit
+    def test_slow_seed_does_not_block_other_markets(self):
+        """A market waiting on its chain read leaves the other markets searchable."""
+        index, _ = make_index(['hello world'])
+        reading, release = threading.Event(), threading.Event()
+        seed = index.blockchain.get_v2_market_snapshots.return_value
+
+        def slow_read(ids):
+            reading.set()
+            release.wait(5)
+            return seed
+        index.blockchain.get_v2_market_snapshots.side_effect = slow_read
+        worker = threading.Thread(target=index.nearest, args=(1, 'hello'))
+        worker.start()
+        reading.wait(5)
+
+        hits = []
+        snapshot = {'id': 2, 'submissions': [{'id': 9, 'predicted_text': 'gm'}]}
+        other = threading.Thread(target=lambda: hits.extend(index.near_duplicates(2, 'gm', 0, snapshot=snapshot)))
+        other.start()
+        other.join(2)
+        finished_first = not other.is_alive()
+        release.set()
+        worker.join(5)
+        other.join(5)
+
+        assert finished_first
+        assert [hit['submission_id'] for hit in hits] == [9]
+
+    @pytest.mark.unit
+    def test_queries_hold_the_market_lock(self):
+        """Tree walks are serialized with adds from the log, which mutate the nodes."""
+        index, _ = make_index(['hello world'])
+        index.nearest(1, 'hello')
+        entry = index._markets[1]
+        locked = []
+        for name in ('within', 'any_within', 'nearest'):
+            query = getattr(entry.tree, name)
+            setattr(entry.tree, name, lambda *args, query=query: locked.append(entry.lock.locked()) or query(*args))
+
+        index.near_duplicates(1, 'hello', 2)
+        index.has_near_duplicate(1, 'hello', 2)
+        index.nearest(1, 'hello')
+
+        assert locked == [True, True, True]
+
+    @pytest.mark.unit
+    def test_resolution_drops_market(self):
+        """A resolved market's log and tree are discarded."""
+        index, _ = make_index(['hello world'])
+        index.nearest(1, 'hello')
+
+        index.on_market_resolved({'args': {'marketId': 1}})
+
+        index.redis.delete.assert_called_once_with(LOG_PREFIX + '1')
+        assert 1 not in index._markets
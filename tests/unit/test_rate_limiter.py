@@ -0,0 +1,141 @@
+"""
+Unit tests for the Redis sliding-window rate limiter (services/rate_limiter.py).
+
+The Lua script is mocked here; tests/integration/test_rate_limiter_redis.py
+runs SLIDING_WINDOW_SCRIPT itself against a real Redis.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+import redis
+from flask import Flask, Blueprint, jsonify
+
+from services.leaderboard import AGENTS_KEY
+from services.rate_limiter import TIER_IP, TIER_WALLET, RateLimiter, parse_rules
+
+WALLET = '0x' + 'ab' * 20
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_app(limiter):
+    app = Flask(__name__)
+    bp = Blueprint('agents', __name__)
+
+    @bp.route('/strict')
+    @limiter.limit("2 per minute")
+    def strict():
+        return jsonify({'ok': True})
+
+    @bp.route('/open')
+    def unlimited_route():
+        return jsonify({'ok': True})
+
+    @app.errorhandler(429)
+    def too_many(error):
+        return jsonify({'error': error.description}), 429, {'Retry-After': str(error.retry_after)}
+
+    app.register_blueprint(bp, url_prefix='/agents')
+    limiter.init_app(app, blueprints=['agents'])
+    return app
+
+
+def make_limiter(*results, **kwargs):
+    """Limiter whose script returns results in turn, allowing everything after."""
+    script = Mock(side_effect=list(results) + [[1, 10, 9, 0]] * 10)
+    client = Mock()
+    client.register_script.return_value = script
+    return RateLimiter(redis_client=client, clock=Clock(), **kwargs), script
+
+
+class TestParseRules:
+    """Tests for parse_rules()"""
+
+    @pytest.mark.unit
+    def test_flask_limiter_syntax(self):
+        """The strings the routes already use keep working."""
+        assert parse_rules("60 per minute") == [(60, 60)]
+        assert parse_rules("10 per minute; 100 per 2 hours") == [(10, 60), (100, 7200)]
+        assert parse_rules("5/second") == [(5, 1)]
+        with pytest.raises(ValueError):
+            parse_rules("lots per fortnight")
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter.hit() and the Flask integration"""
+
+    @pytest.mark.unit
+    def test_one_script_call_per_request(self):
+        """Every rule's current and previous window keys go to a single script call."""
+        limiter, script = make_limiter([0, 10, 0, 1500])
+
+        result = limiter.hit('s', [(10, 60), (100, 3600)], '1.2.3.4', TIER_IP)
+
+        assert result == {'allowed': False, 'limit': 10, 'remaining': 0, 'retry_after': 2}
+        assert script.call_args.kwargs['keys'] == [
+            AGENTS_KEY,
+            f"ratelimit:s:1.2.3.4:60:{1_000_000_000 // 60_000}",
+            f"ratelimit:s:1.2.3.4:60:{1_000_000_000 // 60_000 - 1}",
+            f"ratelimit:s:1.2.3.4:3600:{1_000_000_000 // 3_600_000}",
+            f"ratelimit:s:1.2.3.4:3600:{1_000_000_000 // 3_600_000 - 1}",
+        ]
+        assert script.call_args.kwargs['args'] == [1_000_000_000, 1, 0, '1.2.3.4', 10, 60_000, 100, 3_600_000]
+
+    @pytest.mark.unit
+    def test_wallets_get_their_multiplier_and_the_agent_check(self):
+        """Only wallet-tier calls ask the script to look the wallet up in the agent set."""
+        limiter, script = make_limiter(wallet_multiplier=2, agent_multiplier=5)
+
+        limiter.hit('s', [(10, 60)], WALLET, TIER_WALLET)
+
+        assert script.call_args.kwargs['args'][:4] == [1_000_000_000, 2, 5, WALLET]
+
+    @pytest.mark.unit
+    def test_route_limit_and_default_limit(self):
+        """Decorated routes use their own rule; the rest of the blueprint gets the default."""
+        limiter, script = make_limiter(default_limits=["3 per hour"])
+        client = make_app(limiter).test_client()
+
+        client.get('/agents/strict')
+        assert ':strict:' in script.call_args.kwargs['keys'][1]
+        assert script.call_args.kwargs['args'][4:] == [2, 60_000]
+        client.get('/agents/open')
+        assert ':default:' in script.call_args.kwargs['keys'][1]
+        assert script.call_args.kwargs['args'][4:] == [3, 3_600_000]
+
+    @pytest.mark.unit
+    def test_rejection_is_a_429_with_retry_after(self):
+        """A refused request gets 429 and the script's wait, rounded up to seconds."""
+        limiter, _ = make_limiter([0, 2, 0, 14_001])
+        response = make_app(limiter).test_client().get('/agents/strict')
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '15'
+
+    @pytest.mark.unit
+    def test_authenticated_wallet_is_the_key(self):
+        """A valid Bearer JWT moves the caller from IP to wallet keys."""
+        limiter, script = make_limiter()
+        client = make_app(limiter).test_client()
+
+        with patch('services.wallet_auth.wallet_auth_service.verify_jwt_token',
+                   return_value={'address': WALLET.upper().replace('0X', '0x')}):
+            client.get('/agents/strict', headers={'Authorization': 'Bearer token'})
+
+        assert script.call_args.kwargs['keys'][1] == f"ratelimit:strict:{WALLET}:60:{1_000_000_000 // 60_000}"
+
+    @pytest.mark.unit
+    def test_redis_outage_fails_open(self):
+        """Without Redis the API keeps serving."""
+        broken = Mock()
+        broken.register_script.return_value = Mock(side_effect=redis.ConnectionError())
+        client = make_app(RateLimiter(redis_client=broken)).test_client()
+
+        assert client.get('/agents/strict').status_code == 200
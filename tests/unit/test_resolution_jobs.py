@@ -0,0 +1,171 @@
+"""
+Unit tests for per-market resolution jobs and leases (services/resolution_jobs.py).
+"""
+
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from services.resolution_jobs import (
+    ResolutionJobQueue, JOB_PREFIX, STATE_DONE, STATE_FAILED, STATE_QUEUED,
+    STATE_RUNNING, STATE_SUBMITTED,
+)
+from services.tx_tracker import STATUS_FAILED, STATUS_PENDING
+
+
+@pytest.fixture
+def jobs(fake_redis):
+    return ResolutionJobQueue(redis_client=fake_redis, lease_ttl=30, stale_after=60)
+
+
+class TestEnqueue:
+    """Tests for job deduplication"""
+
+    @pytest.mark.unit
+    def test_second_enqueue_is_deduplicated(self, jobs):
+        """Only the first enqueue of an active market creates a job."""
+        assert jobs.enqueue(5) is True
+        assert jobs.enqueue(5) is False
+        assert jobs.get_job(5)['state'] == STATE_QUEUED
+        assert jobs.active_count() == 1
+
+    @pytest.mark.unit
+    def test_failed_job_can_be_enqueued_again(self, jobs):
+        """A failed job leaves the active set so a scan after its backoff retries it."""
+        jobs.enqueue(5)
+        jobs.mark_failed(5, 'tweet_not_found')
+
+        assert jobs.get_job(5)['state'] == STATE_FAILED
+        with patch('services.resolution_jobs.time.time', return_value=time.time() + 61):
+            assert jobs.enqueue(5) is True
+
+    @pytest.mark.unit
+    def test_failed_job_backs_off_exponentially(self, jobs):
+        """The next scan skips a failed market; each failed attempt doubles the wait, up to the cap."""
+        jobs.retry_max = 200
+        waits = []
+        for _ in range(4):
+            with jobs.lease(5):
+                pass
+            with patch('services.resolution_jobs.time.time', return_value=1_000_000):
+                jobs.mark_failed(5, 'tweet_not_found')
+                assert jobs.enqueue(5) is False
+            waits.append(jobs.get_job(5)['next_attempt_at'] - 1_000_000)
+
+        assert waits == [60, 120, 200, 200]
+
+    @pytest.mark.unit
+    def test_resolved_market_completes_job(self, jobs):
+        """MarketResolved finishes the job."""
+        jobs.enqueue(5)
+        jobs.on_market_resolved({'args': {'marketId': 5}})
+
+        assert jobs.get_job(5)['state'] == STATE_DONE
+        assert jobs.active_count() == 0
+
+
+class TestLease:
+    """Tests for the per-market lease"""
+
+    @pytest.mark.unit
+    def test_only_one_holder_per_market(self, jobs):
+        """A second worker gets None while the lease is held."""
+        with jobs.lease(5) as first:
+            assert first is not None
+            assert jobs.get_job(5)['state'] == STATE_RUNNING
+            with jobs.lease(5) as second:
+                assert second is None
+            with jobs.lease(6) as other_market:
+                assert other_market is not None
+
+    @pytest.mark.unit
+    def test_lease_released_after_block(self, jobs):
+        """The lease is free again once the holder finishes, even on error."""
+        with pytest.raises(RuntimeError):
+            with jobs.lease(5):
+                raise RuntimeError("worker failed")
+
+        with jobs.lease(5) as lease:
+            assert lease is not None
+        assert jobs.get_job(5)['attempts'] == 2
+
+
+class TestInFlight:
+    """Tests for submitted-transaction idempotency"""
+
+    @pytest.mark.unit
+    def test_pending_submission_is_in_flight(self, jobs):
+        """A tracked pending transaction blocks resubmission."""
+        tracker = Mock()
+        tracker.get_status.return_value = {'status': STATUS_PENDING}
+        jobs.record_submission(5, '0xabc')
+
+        with patch('services.resolution_jobs.get_tx_tracker', return_value=tracker):
+            assert jobs.in_flight_tx(5) == '0xabc'
+            assert jobs.get_job(5)['state'] == STATE_SUBMITTED
+
+    @pytest.mark.unit
+    def test_failed_submission_is_not_in_flight(self, jobs):
+        """A reverted or dropped transaction allows a new attempt."""
+        tracker = Mock()
+        tracker.get_status.return_value = {'status': STATUS_FAILED}
+        jobs.record_submission(5, '0xabc')
+
+        with patch('services.resolution_jobs.get_tx_tracker', return_value=tracker):
+            assert jobs.in_flight_tx(5) is None
+
+
+class TestRecoverStalled:
+    """Tests for resuming abandoned jobs"""
+
+    @pytest.mark.unit
+    def test_abandoned_running_job_is_recovered(self, jobs):
+        """A running job with no lease and no recent update is handed back."""
+        jobs.enqueue(5)
+        with jobs.lease(5):
+            pass
+        jobs.redis.data[JOB_PREFIX + '5']['updated_at'] = str(int(time.time()) - 120)
+
+        assert jobs.recover_stalled() == [5]
+        assert jobs.get_job(5)['state'] == STATE_QUEUED
+        # Touched on recovery, so an immediate second scan does not recover it again
+        assert jobs.recover_stalled() == []
+
+    @pytest.mark.unit
+    def test_leased_job_is_not_recovered(self, jobs):
+        """A job whose worker still holds the lease is left alone."""
+        jobs.enqueue(5)
+        with jobs.lease(5):
+            jobs.redis.data[JOB_PREFIX + '5']['updated_at'] = str(int(time.time()) - 120)
+            assert jobs.recover_stalled() == []
+
+    @pytest.mark.unit
+    def test_submitted_job_is_not_recovered(self, jobs):
+        """Submitted jobs are settled by the tx tracker, not re-run."""
+        jobs.enqueue(5)
+        jobs.record_submission(5, '0xabc')
+        jobs.redis.data[JOB_PREFIX + '5']['updated_at'] = str(int(time.time()) - 120)
+
+        assert jobs.recover_stalled() == []
+
+
+class TestExpiredMarketScan:
+    """Tests for the find_expired_markets beat task"""
+
+    @pytest.mark.unit
+    def test_failed_market_is_not_reenqueued_by_next_scan(self, jobs):
+        """A market whose resolution just failed is not dispatched again by the following scan."""
+        from tasks import background
+
+        service = Mock(owner_private_key='0xkey')
+        service.xcom.get_api_status.return_value = {'api_configured': True}
+        service.get_pending_markets.return_value = [{'id': 5, 'can_resolve': True}]
+        with patch('services.v2_resolution.get_resolution_service', return_value=service), \
+                patch.object(background, 'get_resolution_jobs', return_value=jobs), \
+                patch.object(background, '_prewarm_actor_lookups', return_value=0), \
+                patch.object(background.auto_resolve_market, 'delay') as dispatch:
+            assert background.find_expired_markets.run()['enqueued'] == [5]
+            jobs.mark_failed(5, 'tweet_not_found')
+            assert background.find_expired_markets.run()['enqueued'] == []
+
+        dispatch.assert_called_once_with(5)
@@ -149,6 +149,85 @@ class TestChainApiGenesisHoldersRoute:
         assert data['total_supply'] == 100  # Fixed supply
 
 
+class TestChainApiPayoutsRoute:
+    """Tests for /api/chain/v2/payouts endpoint."""
+
+    @pytest.fixture
+    def simulator(self):
+        simulator = MagicMock()
+        simulator.blockchain.w3.eth.block_number = 50000
+        simulator.simulate.return_value = {}
+        simulator.verify.return_value = {'checked': 0, 'mismatches': []}
+        with patch('routes.api_chain.get_payout_simulator', return_value=simulator):
+            yield simulator
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('query', ['', '&from_block=-1', '&from_block=39999'])
+    def test_verify_needs_a_bounded_from_block(self, client, simulator, query):
+        """GET /api/chain/v2/payouts?verify=true never scans the full history."""
+        response = client.get('/api/chain/v2/payouts?market_ids=1&verify=true' + query)
+        assert response.status_code == 400
+        assert response.get_json()['error']['details']['field'] == 'from_block'
+        simulator.verify.assert_not_called()
+
+    @pytest.mark.unit
+    def test_verify_reads_from_the_given_block(self, client, simulator):
+        """GET /api/chain/v2/payouts?verify=true&from_block=N verifies from N."""
+        response = client.get('/api/chain/v2/payouts?market_ids=1,2&verify=true&from_block=40000')
+        assert response.status_code == 200
+        simulator.verify.assert_called_once_with([1, 2], from_block=40000)
+
+
+class TestChainApiLeaderboardRoute:
+    """Tests for /api/chain/leaderboard endpoint."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('query', ['limit=-1', 'offset=-1'])
+    def test_negative_limit_or_offset_is_400(self, client, query):
+        """GET /api/chain/leaderboard rejects negative paging."""
+        with patch('routes.api_chain.get_leaderboard') as get_leaderboard:
+            response = client.get('/api/chain/leaderboard?' + query)
+        assert response.status_code == 400
+        get_leaderboard.assert_not_called()
+
+
+class TestTextSearchRoute:
+    """Tests for /api/text/search endpoint."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('body', [{'limit': -1}, {'k': -1}])
+    def test_negative_limit_or_k_is_400(self, client, body):
+        """POST /api/text/search rejects negative limit and k."""
+        with patch('routes.api.get_corpus_search') as get_corpus_search:
+            response = client.post('/api/text/search', json=dict(body, text='hello'))
+        assert response.status_code == 400
+        get_corpus_search.assert_not_called()
+
+
+class TestAdminAgentRoute:
+    """Tests for /api/admin/agents/<address> endpoint."""
+
+    ADDRESS = '0x' + 'ab' * 20
+
+    @pytest.mark.unit
+    def test_requires_admin_key(self, client):
+        """POST /api/admin/agents/<address> without the admin key is 401."""
+        with patch.dict('os.environ', {'ADMIN_API_KEY': 'secret'}), \
+             patch('routes.proteus.get_leaderboard') as get_leaderboard:
+            response = client.post(f'/api/admin/agents/{self.ADDRESS}')
+        assert response.status_code == 401
+        get_leaderboard.assert_not_called()
+
+    @pytest.mark.unit
+    def test_registers_agent(self, client):
+        """POST /api/admin/agents/<address> moves the wallet to the agent cohort."""
+        with patch.dict('os.environ', {'ADMIN_API_KEY': 'secret'}), \
+             patch('routes.proteus.get_leaderboard') as get_leaderboard:
+            response = client.post(f'/api/admin/agents/{self.ADDRESS}', headers={'X-Admin-Key': 'secret'})
+        assert response.status_code == 200
+        get_leaderboard.return_value.register_agent.assert_called_once_with(self.ADDRESS)
+
+
 class TestAuthRoutes:
     """Tests for authentication routes."""
 
@@ -0,0 +1,87 @@
+"""
+Unit tests for the hashed n-gram TF-IDF scorer (services/semantic_scorer.py).
+"""
+
+import math
+import numpy as np
+import pytest
+
+from services.semantic_scorer import SemanticScorer, cosine_distances, vectorize
+
+
+def reference_distance(actual, prediction, corpus):
+    """Dense, loop-based TF-IDF cosine distance for cross-checking."""
+    vectors = [dict(zip(*vectorize(text))) for text in corpus]
+    df = {}
+    for vector in vectors:
+        for feature in vector:
+            df[feature] = df.get(feature, 0) + 1
+    idf = {f: math.log((1 + len(corpus)) / (1 + n)) + 1 for f, n in df.items()}
+    a = {f: w * idf[f] for f, w in zip(*vectorize(actual))}
+    p = {f: w * idf[f] for f, w in zip(*vectorize(prediction))}
+    dot = sum(w * p.get(f, 0) for f, w in a.items())
+    norm = math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in p.values()))
+    return 1 - dot / norm
+
+
+class TestCosineDistances:
+    """Tests for the vectorized distance kernel"""
+
+    @pytest.mark.unit
+    def test_matches_reference_implementation(self):
+        """The bincount kernel equals a straightforward dense computation."""
+        actual = 'Starship flight 2 is GO for March'
+        predictions = ['Starship flight two is go for march', 'Tesla AI day soon', 'GO Starship!']
+
+        got = cosine_distances(vectorize(actual), [vectorize(p) for p in predictions])
+
+        corpus = [actual] + predictions
+        expected = [reference_distance(actual, p, corpus) for p in predictions]
+        assert got == pytest.approx(expected)
+
+    @pytest.mark.unit
+    def test_orders_paraphrase_before_unrelated(self):
+        """Word-order and case changes stay closer than an unrelated text."""
+        distances = cosine_distances(vectorize('the rocket launches tomorrow'), [
+            vectorize('Tomorrow the rocket launches'),
+            vectorize('quarterly earnings beat estimates'),
+        ])
+        assert distances[0] < distances[1]
+        assert 0.0 <= distances.min() and distances.max() <= 1.0
+
+    @pytest.mark.unit
+    def test_empty_inputs(self):
+        """No predictions gives no distances; an empty actual text is maximally far."""
+        assert cosine_distances(vectorize('gm'), []).shape == (0,)
+        assert cosine_distances(vectorize(''), [vectorize('gm')])[0] == 1.0
+
+
+class TestSemanticScorer:
+    """Tests for SemanticScorer"""
+
+    @pytest.mark.unit
+    def test_vectors_are_cached_per_submission(self):
+        """A submission is vectorized once, then served from the LRU."""
+        scorer = SemanticScorer(cache_size=2)
+        first = scorer.vector('hello world', key=1)
+
+        assert scorer.vector('hello world', key=1) is first
+        scorer.vector('a', key=2)
+        scorer.vector('b', key=3)
+        assert scorer.vector('hello world', key=1) is not first
+
+    @pytest.mark.unit
+    def test_score_market_reports_both_winners(self):
+        """Semantic and Levenshtein winners are reported side by side."""
+        market = {'id': 1, 'submissions': [
+            {'id': 10, 'predicted_text': 'march GO is flight 2 Starship'},
+            {'id': 11, 'predicted_text': 'Starfish fright 3 in NO for Marco'},
+        ]}
+
+        result = SemanticScorer().score_market(market, 'Starship flight 2 is GO for March')
+
+        assert result['semantic_winner'] == 10
+        assert result['levenshtein_winner'] == 11
+        assert [row['submission_id'] for row in result['submissions']] == [10, 11]
+        assert isinstance(result['submissions'][0]['semantic_distance'], float)
+        assert np.isfinite([row['semantic_distance'] for row in result['submissions']]).all()
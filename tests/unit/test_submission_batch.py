@@ -0,0 +1,151 @@
+"""
+Unit tests for batched submission validation and tx building (services/submission_batch.py).
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, patch
+
+from web3 import Web3
+
+from services.prediction_index import MarketPredictionIndex
+from services.submission_batch import (
+    SubmissionBatchBuilder, submission_gas, WARNING_NEAR_DUPLICATE,
+    ERROR_AMOUNT_BELOW_MIN, ERROR_BETTING_CLOSED, ERROR_DUPLICATE, ERROR_INVALID_ITEM,
+    ERROR_MARKET_NOT_FOUND, ERROR_MARKET_RESOLVED, ERROR_PAUSED, ERROR_TEXT_TOO_LONG,
+)
+
+NOW = 1_700_000_000
+MIN_BET = 10 ** 15
+WALLET = Web3.to_checksum_address('0x' + 'ab' * 20)
+CONTRACT_ADDRESS = Web3.to_checksum_address('0x' + '11' * 20)
+
+
+def load_contract():
+    with open('static/abi/PredictionMarketV2.json') as f:
+        abi = json.load(f)
+    abi = abi['abi'] if isinstance(abi, dict) else abi
+    return Web3().eth.contract(address=CONTRACT_ADDRESS, abi=abi)
+
+
+def snapshot(market_id, end_time, resolved=False, texts=()):
+    return {'id': market_id, 'end_time': end_time, 'resolved': resolved,
+            'submissions': [{'id': market_id * 100 + i, 'predicted_text': t} for i, t in enumerate(texts)]}
+
+
+def make_builder(paused=False):
+    chain = Mock()
+    chain.contracts = {'PredictionMarketV2': load_contract()}
+    chain.batch_call.return_value = [paused]
+    markets = {
+        1: snapshot(1, NOW + 7200, texts=['taken']),
+        2: snapshot(2, NOW + 1800),                  # inside the betting cutoff
+        3: snapshot(3, NOW - 100, resolved=True),
+    }
+    chain.get_v2_market_snapshots.side_effect = lambda ids: {i: markets[i] for i in ids if i in markets}
+    chain.w3.eth.get_transaction_count.return_value = 7
+    chain.w3.eth.get_balance.return_value = 10 ** 18
+    index = MarketPredictionIndex(blockchain=chain, redis_client=Mock(lrange=Mock(return_value=[])))
+    metadata = Mock()
+    metadata.get.return_value = {'max_text_length': 280, 'min_bet': MIN_BET, 'betting_cutoff': 3600}
+    return SubmissionBatchBuilder(blockchain=chain, chain_id=84532, prediction_index=index, metadata=metadata)
+
+
+@pytest.fixture(autouse=True)
+def fee_oracle():
+    oracle = Mock()
+    oracle.tx_fee_params.return_value = {'maxFeePerGas': 100, 'maxPriorityFeePerGas': 1}
+    with patch('services.submission_batch.get_fee_oracle', return_value=oracle):
+        yield oracle
+
+
+class TestSubmissionBatchBuilder:
+    """Tests for SubmissionBatchBuilder.build()"""
+
+    @pytest.mark.unit
+    def test_per_item_results_mirror_contract_checks(self):
+        """Each item is judged on its own; one bad item does not fail the batch."""
+        builder = make_builder()
+        items = [
+            {'market_id': 1, 'predicted_text': 'first'},
+            {'market_id': 1, 'predicted_text': 'x' * 281},
+            {'market_id': 1, 'predicted_text': 'taken'},
+            {'market_id': 1, 'predicted_text': 'first'},
+            {'market_id': 2, 'predicted_text': 'late'},
+            {'market_id': 3, 'predicted_text': 'done'},
+            {'market_id': 9, 'predicted_text': 'missing'},
+            {'market_id': 1, 'predicted_text': 'cheap', 'amount_wei': MIN_BET - 1},
+            {'market_id': 'abc', 'predicted_text': 'bad'},
+        ]
+
+        batch = builder.build(WALLET, items, now=NOW)
+
+        assert [r.get('error') for r in batch['results']] == [
+            None, ERROR_TEXT_TOO_LONG, ERROR_DUPLICATE, ERROR_DUPLICATE, ERROR_BETTING_CLOSED,
+            ERROR_MARKET_RESOLVED, ERROR_MARKET_NOT_FOUND, ERROR_AMOUNT_BELOW_MIN, ERROR_INVALID_ITEM,
+        ]
+        assert batch['valid'] == 1
+        assert batch['invalid'] == 8
+
+    @pytest.mark.unit
+    def test_transactions_get_consecutive_nonces(self):
+        """Valid items become signed-ready createSubmission txs in request order."""
+        builder = make_builder()
+        items = [{'market_id': 1, 'predicted_text': f'prediction number {i}'} for i in range(3)]
+
+        batch = builder.build(WALLET, items, now=NOW)
+
+        txs = [r['transaction'] for r in batch['results']]
+        assert [tx['nonce'] for tx in txs] == [7, 8, 9]
+        assert all(tx['to'] == CONTRACT_ADDRESS and tx['value'] == MIN_BET for tx in txs)
+        assert txs[0]['data'] == builder.blockchain.contracts['PredictionMarketV2'].encode_abi(
+            'createSubmission', args=[1, 'prediction number 0'])
+        assert txs[0]['maxFeePerGas'] == 100
+        assert batch['total_value'] == 3 * MIN_BET
+        assert batch['max_cost'] == 3 * MIN_BET + batch['total_gas'] * 100
+        assert batch['balance_sufficient'] is True
+
+    @pytest.mark.unit
+    def test_chain_reads_do_not_scale_with_items(self):
+        """Hundreds of items cost one paused() read, cached limits and one snapshot read."""
+        builder = make_builder()
+        items = [{'market_id': 1, 'predicted_text': f'prediction {i:03d}'} for i in range(300)]
+
+        batch = builder.build(WALLET, items, now=NOW)
+
+        assert batch['valid'] == 300
+        assert builder.blockchain.batch_call.call_count == 1
+        builder.metadata.get.assert_called_once_with(builder.blockchain)
+        builder.blockchain.get_v2_market_snapshots.assert_called_once_with([1])
+
+    @pytest.mark.unit
+    def test_paused_contract_rejects_every_item(self):
+        """No transactions are built while the contract is paused."""
+        batch = make_builder(paused=True).build(WALLET, [{'market_id': 1, 'predicted_text': 'a'}], now=NOW)
+
+        assert batch['paused'] is True
+        assert batch['results'][0]['error'] == ERROR_PAUSED
+
+    @pytest.mark.unit
+    def test_gas_grows_with_text_length(self):
+        """Each 32-byte word of text adds a storage slot."""
+        assert submission_gas('a' * 64) - submission_gas('a' * 32) == int(22100 * 1.2)
+
+    @pytest.mark.unit
+    def test_near_duplicates_are_warned_not_rejected(self):
+        """Predictions a few edits from an existing one still build, with a warning."""
+        builder = make_builder()
+        items = [
+            {'market_id': 1, 'predicted_text': 'taken!'},
+            {'market_id': 1, 'predicted_text': 'something new entirely'},
+            {'market_id': 1, 'predicted_text': 'something new entirely.'},
+        ]
+
+        batch = builder.build(WALLET, items, now=NOW)
+
+        assert batch['valid'] == 3
+        assert batch['results'][0]['warnings'] == [
+            {'code': WARNING_NEAR_DUPLICATE, 'submission_id': 100, 'distance': 1}]
+        assert 'warnings' not in batch['results'][1]
+        assert batch['results'][2]['warnings'] == [
+            {'code': WARNING_NEAR_DUPLICATE, 'batch_index': 1, 'distance': 1}]
@@ -0,0 +1,112 @@
+"""
+Unit tests for per-market distance matrices and clustering (services/submission_clusters.py).
+"""
+
+import json
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from services.payout_simulator import contract_distance
+from services.submission_clusters import (
+    MATRIX_PREFIX, SubmissionClusters, diversity, flat_clusters, single_linkage,
+)
+
+ALICE = '0x' + 'aa' * 20
+BOB = '0x' + 'bb' * 20
+CAROL = '0x' + 'cc' * 20
+
+
+def snapshot(texts):
+    return {'id': 1, 'actor_handle': 'elonmusk', 'submissions': [
+        {'id': 10 + i, 'submitter': wallet, 'predicted_text': text} for i, (wallet, text) in enumerate(texts)]}
+
+
+def make_clusters(texts, redis_client):
+    blockchain = Mock()
+    blockchain.get_v2_market_snapshots.side_effect = lambda ids: {1: snapshot(texts)}
+    return SubmissionClusters(blockchain=blockchain, redis_client=redis_client, threshold=0.2)
+
+
+TEXTS = [
+    (ALICE, 'Starship flight 2 is GO for March'),
+    (BOB, 'Starship flight 2 is GO for March!'),
+    (CAROL, 'Dogecoin to the moon'),
+    (ALICE, 'Starship flight 2 is go for march'),
+]
+
+
+class TestClustering:
+    """Tests for the linkage and diversity math"""
+
+    @pytest.mark.unit
+    def test_single_linkage_merges_closest_first(self):
+        """Merge heights are the MST edges in ascending order."""
+        distances = [[0, 1, 9, 8], [1, 0, 7, 9], [9, 7, 0, 2], [8, 9, 2, 0]]
+        linkage = single_linkage(np.array(distances, dtype=float))
+
+        assert [step[2] for step in linkage] == [1, 2, 7]
+        assert linkage[-1][3] == 4
+        assert flat_clusters(linkage, 4, threshold=2) == [0, 0, 1, 1]
+        assert flat_clusters(linkage, 4, threshold=0.5) == [0, 1, 2, 3]
+
+    @pytest.mark.unit
+    def test_copy_pairs_need_different_wallets(self, fake_redis):
+        """A wallet hedging its own wording is not a copy-cat."""
+        clusters = make_clusters(TEXTS, fake_redis)
+        result = clusters.analyze(1)
+
+        pairs = {tuple(pair['submission_ids']) for pair in result['copy_pairs']}
+        assert pairs == {(10, 11), (11, 13)}
+        assert result['clusters'] == 2
+        assert result['largest_cluster'] == 3
+        assert result['labels'][12] != result['labels'][10]
+
+
+class TestSubmissionClusters:
+    """Tests for the incrementally extended matrix"""
+
+    @pytest.mark.unit
+    def test_matrix_matches_pairwise_distances(self, fake_redis):
+        """The stored triangle rebuilds the full symmetric matrix."""
+        result = make_clusters(TEXTS, fake_redis).matrix(1)
+
+        texts = [text for _, text in TEXTS]
+        assert result['distances'].tolist() == [[contract_distance(a, b) for b in texts] for a in texts]
+
+    @pytest.mark.unit
+    def test_new_submission_adds_one_row(self, fake_redis):
+        """SubmissionCreated appends a single row to a cached matrix."""
+        clusters = make_clusters(TEXTS[:2], fake_redis)
+        clusters.matrix(1)
+
+        clusters.on_submission_created({'args': {
+            'marketId': 1, 'submissionId': 12, 'submitter': CAROL, 'predictedText': 'Dogecoin to the moon'}})
+
+        stored = fake_redis.lrange(MATRIX_PREFIX + '1', 0, -1)
+        assert len(stored) == 3
+        assert json.loads(stored[2])['row'] == [contract_distance('Dogecoin to the moon', t) for _, t in TEXTS[:2]]
+
+    @pytest.mark.unit
+    def test_uncached_market_is_left_for_first_read(self, fake_redis):
+        """The handler never starts a partial matrix."""
+        clusters = make_clusters(TEXTS, fake_redis)
+        clusters.on_submission_created({'args': {
+            'marketId': 1, 'submissionId': 10, 'submitter': ALICE, 'predictedText': 'x'}})
+        assert not fake_redis.exists(MATRIX_PREFIX + '1')
+
+    @pytest.mark.unit
+    def test_watch_conflict_retries(self, fake_redis):
+        """A concurrent writer forces a re-read rather than interleaved rows."""
+        clusters = make_clusters(TEXTS, fake_redis)
+        fake_redis.conflicts = 1
+
+        result = clusters.matrix(1)
+
+        assert len(fake_redis.lrange(MATRIX_PREFIX + '1', 0, -1)) == 4
+        assert len(result['entries']) == 4
+
+    @pytest.mark.unit
+    def test_diversity_of_empty_market(self, fake_redis):
+        """A market without submissions has no clusters."""
+        assert diversity([], make_clusters([], fake_redis).matrix(1)['distances'], 0.2)['clusters'] == 0
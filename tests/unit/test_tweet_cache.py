@@ -0,0 +1,121 @@
+"""
+Unit tests for the immutable tweet cache and batched tweet lookup
+(services/tweet_cache.py, XComAPIService.get_tweets).
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from services.tweet_cache import TweetCache
+from services.xcom_api_service import XComAPIService, MAX_TWEETS_PER_LOOKUP
+from services.xcom_scheduler import XApiScheduler
+
+
+def make_response(ids):
+    data = [
+        SimpleNamespace(id=int(i), text=f"tweet {i}", author_id=7,
+                        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc))
+        for i in ids
+    ]
+    users = [SimpleNamespace(id=7, username='elonmusk', name='Elon')]
+    return SimpleNamespace(data=data, includes={'users': users})
+
+
+@pytest.fixture
+def cache(fake_redis):
+    return TweetCache(redis_client=fake_redis, max_memory_items=100)
+
+
+@pytest.fixture
+def service(cache):
+    with patch.dict('os.environ', {}, clear=True):
+        svc = XComAPIService()
+    svc.client = Mock()
+    svc.scheduler = XApiScheduler(daily_credit_budget=0)
+    svc.client.get_tweets.side_effect = lambda ids, **kwargs: make_response(ids)
+    with patch('services.xcom_api_service.get_tweet_cache', return_value=cache):
+        yield svc
+
+
+class TestTweetCache:
+    """Tests for TweetCache"""
+
+    @pytest.mark.unit
+    def test_round_trip_through_redis_preserves_datetime(self, fake_redis):
+        """A tweet cached by one process is readable by another."""
+        created = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+        TweetCache(redis_client=fake_redis).put_many({'1': {'id': 1, 'text': 'hi', 'created_at': created}})
+
+        tweet = TweetCache(redis_client=fake_redis).get('1')
+
+        assert tweet['text'] == 'hi'
+        assert tweet['created_at'] == created
+
+    @pytest.mark.unit
+    def test_memory_is_bounded(self, fake_redis):
+        """Least recently used entries fall out of the in-process layer."""
+        cache = TweetCache(redis_client=fake_redis, max_memory_items=2)
+        cache.put_many({str(i): {'id': i, 'text': str(i)} for i in range(3)})
+
+        assert list(cache._memory) == ['1', '2']
+
+    @pytest.mark.unit
+    def test_callers_get_copies(self, cache):
+        """Modifying a stored or returned tweet leaves the cached one intact."""
+        tweet = {'id': 1, 'text': 'hi'}
+        cache.put_many({'1': tweet})
+        tweet['text'] = 'edited'
+        cache.get('1')['text'] = 'edited'
+
+        assert cache.get('1')['text'] == 'hi'
+
+    @pytest.mark.unit
+    def test_redis_failure_is_not_fatal(self):
+        """A Redis outage degrades to an in-memory cache."""
+        broken = Mock()
+        broken.mget.side_effect = Exception("connection refused")
+        broken.pipeline.side_effect = Exception("connection refused")
+        cache = TweetCache(redis_client=broken)
+
+        cache.put_many({'1': {'id': 1, 'text': 'hi'}})
+
+        assert cache.get('1')['text'] == 'hi'
+        assert cache.get('2') is None
+
+
+class TestGetTweets:
+    """Tests for XComAPIService.get_tweets()"""
+
+    @pytest.mark.unit
+    def test_repeat_lookup_served_from_cache(self, service):
+        """A tweet is fetched from the API once, then served from cache."""
+        first = asyncio.run(service.fetch_tweet_by_id('42'))
+        second = asyncio.run(service.fetch_tweet_by_id('42'))
+
+        assert first == second
+        assert first['author_username'] == 'elonmusk'
+        assert service.client.get_tweets.call_count == 1
+
+    @pytest.mark.unit
+    def test_lookups_are_chunked(self, service):
+        """Ids are resolved at most MAX_TWEETS_PER_LOOKUP per API call."""
+        ids = [str(i) for i in range(1, MAX_TWEETS_PER_LOOKUP + 51)]
+
+        tweets = asyncio.run(service.get_tweets(ids))
+
+        assert len(tweets) == len(ids)
+        assert service.client.get_tweets.call_count == 2
+        assert len(service.client.get_tweets.call_args_list[0].kwargs['ids']) == MAX_TWEETS_PER_LOOKUP
+
+    @pytest.mark.unit
+    def test_only_missing_ids_are_requested(self, service, cache):
+        """Cached ids are not sent to the API."""
+        cache.put_many({'1': {'id': 1, 'text': 'cached'}})
+
+        tweets = asyncio.run(service.get_tweets(['1', '2']))
+
+        assert tweets['1']['text'] == 'cached'
+        assert service.client.get_tweets.call_args.kwargs['ids'] == ['2']
@@ -0,0 +1,121 @@
+"""
+Unit tests for the transaction lifecycle tracker (services/tx_tracker.py).
+
+Uses a fake Redis client and a mocked blockchain service.
+"""
+
+import time
+import pytest
+from unittest.mock import Mock
+
+from services.tx_tracker import (
+    TransactionTracker, STATUS_PENDING, STATUS_CONFIRMED, STATUS_FAILED, STATUS_DROPPED
+)
+
+
+TX_HASH = '0x' + 'ab' * 32
+
+
+@pytest.fixture
+def blockchain():
+    mock = Mock()
+    mock.get_transaction_receipts.return_value = {}
+    return mock
+
+
+@pytest.fixture
+def tracker(blockchain, fake_redis):
+    return TransactionTracker(redis_client=fake_redis, blockchain=blockchain, pending_timeout=60)
+
+
+class TestTrack:
+    """Tests for TransactionTracker.track()"""
+
+    @pytest.mark.unit
+    def test_track_stores_pending_record(self, tracker):
+        """track() stores a pending record and adds it to the pending set."""
+        tracker.track(TX_HASH, 'market_resolution', {'market_id': 3})
+
+        record = tracker.get_status(TX_HASH)
+        assert record['status'] == STATUS_PENDING
+        assert record['metadata'] == {'market_id': 3}
+        assert tracker.pending_count() == 1
+
+    @pytest.mark.unit
+    def test_hash_is_normalized(self, tracker):
+        """Hashes without 0x prefix or in upper case resolve to the same record."""
+        tracker.track(TX_HASH[2:].upper(), 'fee_withdrawal')
+
+        assert tracker.get_status(TX_HASH) is not None
+
+    @pytest.mark.unit
+    def test_unknown_hash_returns_none(self, tracker):
+        """get_status() returns None for untracked transactions."""
+        assert tracker.get_status(TX_HASH) is None
+
+
+class TestPollOnce:
+    """Tests for TransactionTracker.poll_once()"""
+
+    @pytest.mark.unit
+    def test_unmined_transaction_stays_pending(self, tracker, blockchain):
+        """A missing receipt inside the timeout leaves the record pending."""
+        tracker.track(TX_HASH, 'market_resolution')
+        blockchain.get_transaction_receipts.return_value = {TX_HASH: None}
+
+        assert tracker.poll_once() == 0
+        assert tracker.get_status(TX_HASH)['status'] == STATUS_PENDING
+
+    @pytest.mark.unit
+    def test_successful_receipt_confirms_and_dispatches(self, tracker, blockchain):
+        """A status=1 receipt confirms the tx and fires the kind's handler once."""
+        handler = Mock()
+        tracker.on_settled('market_resolution', handler)
+        tracker.track(TX_HASH, 'market_resolution', {'market_id': 1})
+        blockchain.get_transaction_receipts.return_value = {
+            TX_HASH: {'status': 1, 'block_number': 100, 'gas_used': 21000}
+        }
+
+        assert tracker.poll_once() == 1
+        record = tracker.get_status(TX_HASH)
+        assert record['status'] == STATUS_CONFIRMED
+        assert record['block_number'] == 100
+        assert tracker.pending_count() == 0
+        handler.assert_called_once()
+
+        # Already settled: a second poll does not re-dispatch
+        tracker.poll_once()
+        handler.assert_called_once()
+
+    @pytest.mark.unit
+    def test_reverted_receipt_marks_failed(self, tracker, blockchain):
+        """A status=0 receipt marks the tx failed."""
+        tracker.track(TX_HASH, 'fee_withdrawal')
+        blockchain.get_transaction_receipts.return_value = {
+            TX_HASH: {'status': 0, 'block_number': 100, 'gas_used': 50000}
+        }
+
+        tracker.poll_once()
+        assert tracker.get_status(TX_HASH)['status'] == STATUS_FAILED
+
+    @pytest.mark.unit
+    def test_timeout_marks_dropped(self, tracker, blockchain, monkeypatch):
+        """A tx with no receipt past the timeout is marked dropped."""
+        tracker.track(TX_HASH, 'fee_withdrawal')
+        blockchain.get_transaction_receipts.return_value = {TX_HASH: None}
+        real_time = time.time()
+        monkeypatch.setattr('services.tx_tracker.time.time', lambda: real_time + 120)
+
+        assert tracker.poll_once() == 1
+        assert tracker.get_status(TX_HASH)['status'] == STATUS_DROPPED
+
+    @pytest.mark.unit
+    def test_receipts_fetched_in_one_batch(self, tracker, blockchain):
+        """All pending hashes are requested in a single batch call."""
+        hashes = ['0x' + f'{i:064x}' for i in range(5)]
+        for h in hashes:
+            tracker.track(h, 'market_resolution')
+
+        tracker.poll_once()
+        blockchain.get_transaction_receipts.assert_called_once()
+        assert sorted(blockchain.get_transaction_receipts.call_args[0][0]) == sorted(hashes)
@@ -350,3 +350,51 @@ class TestWithdrawFees:
             result = service.withdraw_fees()
             assert result['success'] is False
             assert 'No fees to withdraw' in result['error']
+
+
+class TestUntrackedBroadcast:
+    """A transaction already sent is reported as pending even if the tx tracker fails"""
+
+    OWNER_KEY = '0x' + 'a' * 64
+
+    def make_service(self):
+        owner = Mock(address='0x' + '11' * 20)
+        mock_bc = Mock()
+        mock_bc.contracts = {'PredictionMarketV2': Mock()}
+        mock_bc.w3.eth.send_raw_transaction.return_value = Mock(hex=Mock(return_value='0xabc'))
+        mock_bc.get_v2_pending_fees.return_value = 5
+        mock_bc.get_v2_market.return_value = {
+            'id': 0, 'resolved': False,
+            'end_time': int((datetime.now() - timedelta(hours=1)).timestamp()),
+        }
+        mock_bc.get_v2_market_submissions.return_value = [1, 2]
+
+        with patch.dict('os.environ', {}, clear=True):
+            service = V2ResolutionService()
+        service.blockchain = mock_bc
+        service.owner_private_key = self.OWNER_KEY
+        service.jobs = Mock(in_flight_tx=Mock(return_value=None))
+        return service, owner
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('send', [
+        lambda service: service.resolve_market(0, "hello world", wait_for_receipt=False),
+        lambda service: service.withdraw_fees(wait_for_receipt=False),
+    ], ids=['resolve_market', 'withdraw_fees'])
+    def test_tracker_failure_keeps_tx_hash(self, send):
+        service, owner = self.make_service()
+        tracker = Mock()
+        tracker.track.side_effect = ConnectionError("redis down")
+
+        with patch('services.v2_resolution.Account') as mock_account, \
+             patch('services.v2_resolution.get_contract_metadata') as mock_metadata, \
+             patch('services.v2_resolution.get_fee_oracle'), \
+             patch('services.v2_resolution.get_tx_tracker', return_value=tracker):
+            mock_account.from_key.return_value = owner
+            mock_metadata.return_value.get.return_value = {'owner': owner.address}
+            result = send(service)
+
+        tracker.track.assert_called_once()
+        assert result['success'] is True
+        assert result['tx_hash'] == '0xabc'
+        assert result['status'] == 'pending'
@@ -0,0 +1,115 @@
+"""
+Unit tests for the Monte Carlo win-probability engine (services/win_probability.py).
+"""
+
+import json
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+import redis
+
+from services.payout_simulator import contract_distance
+from services.win_probability import CACHE_PREFIX, WinProbabilityEngine, distance_matrix, estimate_market
+
+ETH = 10 ** 18
+
+
+def market(texts, resolved=False, winner=0):
+    return {'id': 1, 'actor_handle': 'elonmusk', 'total_pool': ETH * len(texts), 'resolved': resolved,
+            'winning_submission_id': winner,
+            'submissions': [{'id': 10 + i, 'predicted_text': t, 'amount': ETH} for i, t in enumerate(texts)]}
+
+
+class TestEstimateMarket:
+    """Tests for estimate_market()"""
+
+    @pytest.mark.unit
+    def test_distance_matrix_is_byte_levenshtein(self):
+        """The bit-parallel matrix equals the contract's pairwise distance."""
+        candidates = ['héllo wörld', 'to the moon', '']
+        predictions = ['hello world', 'to the mars']
+
+        matrix = distance_matrix(candidates, predictions)
+
+        assert matrix.tolist() == [[contract_distance(c, p) for p in predictions] for c in candidates]
+
+    @pytest.mark.unit
+    def test_probabilities_sum_to_one_and_follow_history(self):
+        """A prediction close to the actor's usual tweets gets most of the mass."""
+        history = ['Starship launch soon', 'Starship launch today', 'Starship launch tomorrow']
+        result = estimate_market(market(['Starship launch', 'Dogecoin to the moon']), history,
+                                 draws=500, history_weight=0.8, rng=np.random.default_rng(0))
+
+        probabilities = [s['win_probability'] for s in result['submissions']]
+        assert sum(probabilities) == pytest.approx(1.0)
+        assert probabilities[0] == pytest.approx(0.9)    # 0.8 history + half of 0.2 self-mass
+        low, high = result['submissions'][0]['interval']
+        assert low <= probabilities[0] <= high
+        assert result['candidates'] == 5
+
+    @pytest.mark.unit
+    def test_expected_payout_uses_v2_pool_rules(self):
+        """Winner takes the pool less the 7% fee."""
+        result = estimate_market(market(['a', 'b']), [], draws=10, rng=np.random.default_rng(0))
+
+        prize = 2 * ETH - 2 * ETH * 700 // 10000
+        assert [s['payout_if_wins'] for s in result['submissions']] == [prize, prize]
+        assert result['submissions'][0]['expected_payout'] == prize // 2
+
+    @pytest.mark.unit
+    def test_single_submission_is_a_refund(self):
+        """A lone submission expects its stake back."""
+        result = estimate_market(market(['alone']), ['anything'])
+        assert result['submissions'][0]['expected_payout'] == ETH
+
+
+class TestWinProbabilityEngine:
+    """Tests for WinProbabilityEngine caching"""
+
+    def make_engine(self, snapshot, cache=None):
+        blockchain = Mock()
+        blockchain.get_v2_market_snapshots.return_value = {1: snapshot}
+        blockchain.get_v2_constants.return_value = {'platform_fee_bps': 700}
+        corpus = Mock()
+        corpus.recent.return_value = [{'text': 'Starship launch soon'}]
+        redis_client = Mock()
+        redis_client.get.return_value = cache
+        return WinProbabilityEngine(blockchain=blockchain, redis_client=redis_client, corpus=corpus, draws=50)
+
+    @pytest.mark.unit
+    def test_estimate_is_cached_and_invalidated(self):
+        """A miss computes and stores; SubmissionCreated drops the entry."""
+        engine = self.make_engine(market(['Starship launch', 'gm']))
+
+        estimate = engine.get(1)
+
+        assert estimate['history_candidates'] == 1
+        engine.corpus.recent.assert_called_once_with('elonmusk', limit=200)
+        key, raw = engine.redis.set.call_args[0]
+        assert key == CACHE_PREFIX + '1' and json.loads(raw) == estimate
+
+        engine.on_submission_created({'args': {'marketId': 1}})
+        engine.redis.delete.assert_called_once_with(CACHE_PREFIX + '1')
+
+    @pytest.mark.unit
+    def test_cache_hit_skips_chain(self):
+        """A cached estimate is served without reading the chain."""
+        engine = self.make_engine(market(['a', 'b']), cache=json.dumps({'market_id': 1}))
+        assert engine.get(1) == {'market_id': 1}
+        engine.blockchain.get_v2_market_snapshots.assert_not_called()
+
+    @pytest.mark.unit
+    def test_redis_outage_still_answers(self):
+        """Cache failures fall through to a fresh estimate."""
+        engine = self.make_engine(market(['a', 'b']))
+        engine.redis.get.side_effect = redis.ConnectionError()
+        engine.redis.set.side_effect = redis.ConnectionError()
+
+        assert len(engine.get(1)['submissions']) == 2
+
+    @pytest.mark.unit
+    def test_resolved_market_reports_on_chain_winner(self):
+        """Resolved markets report certainty for the on-chain winner."""
+        engine = self.make_engine(market(['a', 'b'], resolved=True, winner=11))
+        assert [s['win_probability'] for s in engine.get(1)['submissions']] == [0.0, 1.0]
@@ -0,0 +1,165 @@
+"""
+Unit tests for the credit-aware X API scheduler (services/xcom_scheduler.py).
+"""
+
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+
+from services.xcom_scheduler import (
+    XApiScheduler,
+    XApiThrottled,
+    PRIORITY_PREVIEW,
+    PRIORITY_RESOLUTION,
+    normalize_endpoint,
+)
+
+
+@pytest.fixture
+def scheduler(fake_redis):
+    return XApiScheduler(redis_client=fake_redis, daily_credit_budget=100,
+                         resolution_reserve=0.2, resolution_max_wait=1)
+
+
+class TestEndpointNormalization:
+    """Tests for normalize_endpoint()"""
+
+    @pytest.mark.unit
+    def test_ids_and_usernames_share_a_bucket(self):
+        assert normalize_endpoint('/2/users/12345/tweets') == '/2/users/:id/tweets'
+        assert normalize_endpoint('/2/users/by/username/elonmusk') == '/2/users/by/username/:username'
+        assert normalize_endpoint('/2/tweets?ids=1,2') == '/2/tweets'
+
+
+class TestRateLimits:
+    """Tests for header-fed token buckets and priority lanes"""
+
+    @pytest.mark.unit
+    def test_headers_update_bucket(self, scheduler):
+        """Rate-limit headers on a response become the endpoint's bucket."""
+        response = SimpleNamespace(
+            url='https://api.twitter.com/2/tweets?ids=1',
+            headers={'x-rate-limit-limit': '300', 'x-rate-limit-remaining': '42',
+                     'x-rate-limit-reset': str(int(time.time()) + 600)},
+        )
+
+        scheduler.observe_response(response)
+
+        assert scheduler.get_status()['endpoints']['/2/tweets']['remaining'] == 42
+
+    @pytest.mark.unit
+    def test_reserve_is_held_back_from_previews(self, scheduler):
+        """Previews stop at the reserve; resolution may use it."""
+        scheduler.update_limits('/2/tweets', limit=10, remaining=2, reset_at=time.time() + 600)
+
+        with pytest.raises(XApiThrottled):
+            scheduler.call('/2/tweets', lambda: 'ok', priority=PRIORITY_PREVIEW)
+        assert scheduler.call('/2/tweets', lambda: 'ok', priority=PRIORITY_RESOLUTION) == 'ok'
+
+    @pytest.mark.unit
+    def test_resolution_waits_for_reset(self, scheduler):
+        """An exhausted bucket refills at reset for queued resolution calls."""
+        scheduler.update_limits('/2/tweets', limit=10, remaining=0, reset_at=time.time() + 0.2)
+
+        assert scheduler.call('/2/tweets', lambda: 'ok', priority=PRIORITY_RESOLUTION) == 'ok'
+
+    @pytest.mark.unit
+    def test_resolution_gives_up_past_max_wait(self, scheduler):
+        """A reset further away than max_wait fails fast instead of blocking."""
+        scheduler.update_limits('/2/tweets', limit=10, remaining=0, reset_at=time.time() + 600)
+
+        with pytest.raises(XApiThrottled):
+            scheduler.call('/2/tweets', lambda: 'ok', priority=PRIORITY_RESOLUTION)
+
+
+class TestCreditBudget:
+    """Tests for the daily credit budget"""
+
+    @pytest.mark.unit
+    def test_previews_capped_below_budget(self, scheduler):
+        """Previews may spend only the non-reserved share of the budget."""
+        scheduler.call('/2/tweets', lambda: 'ok', priority=PRIORITY_PREVIEW, cost=80)
+
+        with pytest.raises(XApiThrottled):
+            scheduler.call('/2/tweets', lambda: 'ok', priority=PRIORITY_PREVIEW, cost=1)
+        assert scheduler.call('/2/tweets', lambda: 'ok', priority=PRIORITY_RESOLUTION, cost=20) == 'ok'
+        assert scheduler.credits_used_today() == 100
+
+    @pytest.mark.unit
+    def test_rejected_calls_are_refunded(self, scheduler):
+        """Credits reserved for a throttled call are returned."""
+        scheduler.update_limits('/2/tweets', limit=10, remaining=0, reset_at=time.time() + 600)
+
+        with pytest.raises(XApiThrottled):
+            scheduler.call('/2/tweets', lambda: 'ok', cost=5)
+
+        assert scheduler.credits_used_today() == 0
+
+
+class TestCoalescing:
+    """Tests for in-flight request coalescing"""
+
+    @pytest.mark.unit
+    def test_duplicate_requests_share_one_call(self, scheduler):
+        """Concurrent calls with the same key run fn once."""
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(1)
+            return 'tweet'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                scheduler.call('/2/tweets', fetch, key=('tweets', ('1',)))))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert results == ['tweet'] * 5
+        assert len(calls) == 1
+
+    @pytest.mark.unit
+    def test_resolution_follower_runs_itself_when_preview_leader_is_throttled(self, scheduler, monkeypatch):
+        """A resolution call is not failed by the preview lane's limits."""
+        acquire = scheduler._acquire
+        joined = threading.Event()
+
+        def preview_throttled(endpoint, priority):
+            if priority == PRIORITY_PREVIEW:
+                joined.wait(1)
+                raise XApiThrottled("preview lane")
+            return acquire(endpoint, priority)
+
+        monkeypatch.setattr(scheduler, '_acquire', preview_throttled)
+        outcomes = {}
+
+        def preview():
+            try:
+                scheduler.call('/2/tweets', lambda: 'tweet', priority=PRIORITY_PREVIEW, key=('tweets', ('1',)))
+            except XApiThrottled as e:
+                outcomes['preview'] = e
+
+        leader = threading.Thread(target=preview)
+        leader.start()
+        time.sleep(0.05)
+        follower = threading.Thread(target=lambda: outcomes.setdefault('resolution', scheduler.call(
+            '/2/tweets', lambda: 'tweet', priority=PRIORITY_RESOLUTION, key=('tweets', ('1',)))))
+        follower.start()
+        while scheduler.stats['coalesced'] == 0:
+            time.sleep(0.01)
+        joined.set()
+        leader.join()
+        follower.join()
+
+        assert isinstance(outcomes['preview'], XApiThrottled)
+        assert outcomes['resolution'] == 'tweet'
+        assert scheduler.stats['calls'] == 1
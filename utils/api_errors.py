@@ -48,6 +48,7 @@ class ErrorCode:
     MARKET_ENDED = "MARKET_ENDED"
     MARKET_NOT_ENDED = "MARKET_NOT_ENDED"
     MARKET_RESOLVED = "MARKET_RESOLVED"
+    RESOLUTION_IN_PROGRESS = "RESOLUTION_IN_PROGRESS"
     INSUFFICIENT_FUNDS = "INSUFFICIENT_FUNDS"
 
 
@@ -3,12 +3,30 @@ Structured logging configuration using structlog.
 
 Provides JSON output for production and colored console output for development.
 Includes request ID binding for tracing requests across log entries.
+
+Writing is off the request thread. The root logger's only handler puts
+records on a bounded queue. A QueueListener thread renders them and writes
+to stdout in batches: whatever has queued up, up to LOG_BATCH_SIZE lines,
+goes out in one write. A slow stdout therefore backs up the queue instead of
+stalling requests. When the queue is full, records are dropped and counted.
+A forked child (Celery prefork, gunicorn --preload) does not inherit the
+listener thread, so it gets a fresh queue and listener of its own.
+
+Noisy per-request and per-event logs opt into sampling. With structlog,
+pass sample=True; with stdlib logging, pass extra={"sample": True}. Below
+WARNING, only a LOG_SAMPLE_RATE fraction of them is kept. get_log_stats()
+exposes the drop and sampling counters.
 """
 
+import atexit
 import logging
 import os
+import queue
+import random
 import sys
-from typing import Any
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
 import structlog
 
@@ -19,6 +37,112 @@ def get_log_level() -> int:
     return getattr(logging, level_name, logging.INFO)
 
 
+def get_log_sample_rate() -> float:
+    """Fraction of sampled (noisy) log entries to keep, from LOG_SAMPLE_RATE."""
+    try:
+        return min(1.0, max(0.0, float(os.environ.get("LOG_SAMPLE_RATE", "0.1"))))
+    except ValueError:
+        return 0.1
+
+
+class _LogStats:
+    """Counters for the logging pipeline, safe to bump from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"dropped": 0, "sampled_out": 0, "written": 0, "batches": 0}
+
+    def add(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[name] += n
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+_stats = _LogStats()
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records marked for sampling; never drops WARNING and above."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample = getattr(record, "sample", False)
+        if isinstance(record.msg, dict):
+            sample = record.msg.pop("sample", False) or sample
+        if not sample or record.levelno >= logging.WARNING or random.random() < self.rate:
+            return True
+        _stats.add("sampled_out")
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Enqueue without blocking or formatting; count records that do not fit."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.msg, dict):
+            # structlog event: rendered on the listener thread by ProcessorFormatter
+            return record
+        return super().prepare(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _stats.add("dropped")
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """Buffer formatted lines and write them once the queue drains or the batch fills."""
+
+    def __init__(self, log_queue: queue.Queue, stream=None, batch_size: int = 256):
+        super().__init__(stream)
+        self.log_queue = log_queue
+        self.batch_size = batch_size
+        self._buffer = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+        if len(self._buffer) >= self.batch_size or self.log_queue.empty():
+            self.flush()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self._buffer:
+                lines, self._buffer = self._buffer, []
+                self.stream.write(self.terminator.join(lines) + self.terminator)
+                _stats.add("written", len(lines))
+                _stats.add("batches")
+            super().flush()
+        finally:
+            self.release()
+
+
+def get_log_stats() -> Dict[str, int]:
+    """Logging pipeline counters: dropped (queue full), sampled_out, written, batches, queued."""
+    stats = _stats.snapshot()
+    stats["queued"] = _listener.queue.qsize() if _listener else 0
+    return stats
+
+
+def capture_exc_info(
+    logger: logging.Logger, method_name: str, event_dict: dict[str, Any]
+) -> dict[str, Any]:
+    """Resolve exc_info=True while still on the thread handling the exception."""
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
 def add_app_context(
     logger: logging.Logger, method_name: str, event_dict: dict[str, Any]
 ) -> dict[str, Any]:
@@ -49,35 +173,59 @@ def configure_structlog(json_output: bool = None) -> None:
         structlog.processors.StackInfoRenderer(),
         structlog.processors.UnicodeDecoder(),
         add_app_context,
+        capture_exc_info,
     ]
 
     if json_output:
         # Production: JSON output
-        processors = shared_processors + [
+        renderers = [
             structlog.processors.format_exc_info,
             structlog.processors.JSONRenderer(),
         ]
     else:
         # Development: Colored console output
-        processors = shared_processors + [
+        renderers = [
             structlog.dev.ConsoleRenderer(colors=True),
         ]
 
+    # Context is gathered on the calling thread; rendering is deferred to
+    # the listener thread through ProcessorFormatter
     structlog.configure(
-        processors=processors,
+        processors=shared_processors + [structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
         wrapper_class=structlog.stdlib.BoundLogger,
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
     )
-
-    # Configure standard logging to work with structlog
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=get_log_level(),
+    formatter = structlog.stdlib.ProcessorFormatter(
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta] + renderers,
+        foreign_pre_chain=[
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.processors.TimeStamper(fmt="iso"),
+            add_app_context,
+        ],
     )
 
+    # Configure standard logging to write through the queue
+    global _listener
+    _stop_listener()
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", "10000")))
+    writer = BatchingStreamHandler(log_queue, sys.stdout, batch_size=int(os.environ.get("LOG_BATCH_SIZE", "256")))
+    writer.setFormatter(formatter)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(get_log_sample_rate()))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(get_log_level())
+
+    _listener = QueueListener(log_queue, writer)
+    _listener.start()
+
     # Reduce noise from third-party libraries
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("werkzeug").setLevel(logging.WARNING)
@@ -118,3 +266,47 @@ def bind_request_context(**kwargs) -> None:
 def clear_request_context() -> None:
     """Clear all bound context variables."""
     structlog.contextvars.clear_contextvars()
+
+
+def _stop_listener() -> None:
+    """Drain the queue and write what is still buffered."""
+    if _listener is None or _listener._thread is None:
+        return
+    try:
+        _listener.stop()
+    except queue.Full:
+        return
+    for handler in _listener.handlers:
+        try:
+            handler.flush()
+        except ValueError:
+            pass  # stdout already closed at interpreter exit
+
+
+def _restart_listener_after_fork() -> None:
+    """In a forked child: give the handler a fresh queue and start a listener to drain it.
+
+    The parent's listener thread does not survive the fork, and its queue
+    may have been copied mid-operation, so neither is reused. Records and
+    lines the parent had not written yet are left to the parent.
+    """
+    global _listener
+    if _listener is None or _listener._thread is None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=_listener.queue.maxsize)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler) and handler.queue is _listener.queue:
+            handler.queue = log_queue
+    for handler in _listener.handlers:
+        if isinstance(handler, BatchingStreamHandler):
+            handler.log_queue = log_queue
+            handler._buffer = []
+    _listener = QueueListener(log_queue, *_listener.handlers)
+    _listener.start()
+
+
+atexit.register(_stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+_listener: Optional[QueueListener] = None
@@ -0,0 +1,36 @@
+"""
+Shared Redis client construction.
+
+Prefers REDIS_URL (Railway/production) and falls back to REDIS_HOST/REDIS_PORT,
+matching the resolution order used by the app-level client in app.py.
+"""
+
+import os
+
+import redis
+
+
+def create_redis_client(decode_responses: bool = True, timeout: int = 5) -> redis.Redis:
+    """Create a Redis client from environment configuration.
+
+    Args:
+        decode_responses: Return str instead of bytes (default True).
+        timeout: Socket connect/read timeout in seconds.
+
+    Returns:
+        A configured redis.Redis instance (connection is lazy).
+    """
+    if os.environ.get("REDIS_URL"):
+        return redis.from_url(
+            os.environ["REDIS_URL"],
+            decode_responses=decode_responses,
+            socket_connect_timeout=timeout,
+            socket_timeout=timeout,
+        )
+    return redis.Redis(
+        host=os.environ.get("REDIS_HOST", "localhost"),
+        port=int(os.environ.get("REDIS_PORT", 6379)),
+        decode_responses=decode_responses,
+        socket_connect_timeout=timeout,
+        socket_timeout=timeout,
+    )
@@ -64,11 +64,12 @@ def init_request_context(app: Flask) -> None:
             remote_addr=request.remote_addr,
         )
 
-        # Log request start (debug level to avoid noise)
+        # Log request start (debug level and sampled to avoid noise)
         logger.debug(
             "Request started",
             url=request.url,
             content_length=request.content_length,
+            sample=True,
         )
 
     @app.after_request
@@ -83,6 +84,7 @@ def init_request_context(app: Flask) -> None:
             "Request completed",
             status_code=response.status_code,
             content_length=response.content_length,
+            sample=True,
         )
 
         return response